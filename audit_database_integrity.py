@@ -14,15 +14,24 @@ Based on pre-mortem analysis: We must validate data integrity FIRST before
 fixing downstream bugs, or risk building on corrupted foundation.
 """
 
-import sqlite3
+import argparse
+import time
 import pandas as pd
 from collections import defaultdict, Counter
 from datetime import datetime
 import sys
 
-def connect_db():
-    """Connect to the database."""
-    return sqlite3.connect('src/nba_stats/db/nba_stats.db')
+from src.nba_stats.db.analytics import (
+    ENGINES,
+    connect_analytics,
+    lineup_rating_coverage,
+    possessions_by_season,
+    season_player_overlap,
+)
+
+def connect_db(engine=None):
+    """Connect to the database through the chosen analytics engine (sqlite or duckdb)."""
+    return connect_analytics('src/nba_stats/db/nba_stats.db', engine=engine)
 
 def audit_data_completeness(conn):
     """
@@ -41,111 +50,35 @@ def audit_data_completeness(conn):
     for season in seasons:
         print(f"\nAnalyzing {season}...")
         
-        # Sample 1000 random possessions per season
-        cursor = conn.cursor()
-        cursor.execute(f"""
-            SELECT p.game_id, p.event_num
-            FROM Possessions p
-            JOIN Games g ON p.game_id = g.game_id
-            WHERE g.season = ?
-            ORDER BY RANDOM()
-            LIMIT 1000
-        """, (season,))
-        
-        sample_possessions = cursor.fetchall()
-        total_samples = len(sample_possessions)
+        # Sample 1000 random possessions per season and join all 10 players in one query
+        archetype_table = f"PlayerArchetypeFeatures_{season.replace('-', '_')}"
+        try:
+            coverage = lineup_rating_coverage(conn, season, archetype_table, sample=1000)
+        except Exception as e:
+            print(f"  ❌  Error joining {season} possessions: {e}")
+            results[season] = {'join_success': 0, 'total': 0}
+            continue
         
+        total_samples = coverage['total']
         if total_samples == 0:
             print(f"  ⚠️  No possessions found for {season}")
             results[season] = {'join_success': 0, 'total': 0}
             continue
         
-        # Check join success
-        archetype_table = f"PlayerArchetypeFeatures_{season.replace('-', '_')}"
-        join_success = 0
-        join_failures = []
-        
-        for row in sample_possessions:
-            poss_id, game_id = row[0], row[1]
-            
-            try:
-                # Get full possession row to access individual player columns
-                full_row = conn.execute("""
-                    SELECT home_player_1_id, home_player_2_id, home_player_3_id, 
-                           home_player_4_id, home_player_5_id,
-                           away_player_1_id, away_player_2_id, away_player_3_id,
-                           away_player_4_id, away_player_5_id
-                    FROM Possessions
-                    WHERE game_id = ? AND event_num = ?
-                """, (game_id, poss_id)).fetchone()
-                
-                if not full_row:
-                    join_failures.append({'possession_id': poss_id, 'error': 'Could not fetch full row'})
-                    continue
-                
-                # Extract player IDs from columns
-                home_players = [full_row[i] for i in range(5)]
-                away_players = [full_row[i] for i in range(5, 10)]
-                all_players = home_players + away_players
-                
-                # Filter out NULL values and ensure we have exactly 10 players
-                all_players = [p for p in all_players if p is not None]
-                
-                # If we don't have 10 valid players, skip
-                if len(all_players) < 10:
-                    join_failures.append({
-                        'possession_id': f"{game_id}:{poss_id}",
-                        'darko_count': 0,
-                        'archetype_count': 0,
-                        'expected': 10,
-                        'actual_players': len(all_players)
-                    })
-                    continue
-                
-                # Check DARKO join
-                placeholders = ','.join('?'*len(all_players))
-                darko_query = f"""
-                    SELECT COUNT(*) FROM PlayerSeasonSkill
-                    WHERE player_id IN ({placeholders}) AND season = ?
-                """
-                darko_check = conn.execute(darko_query, all_players + [season])
-                
-                darko_count = darko_check.fetchone()[0]
-                
-                # Check archetype join
-                archetype_query = f"""
-                    SELECT COUNT(*) FROM {archetype_table}
-                    WHERE player_id IN ({placeholders})
-                """
-                archetype_check = conn.execute(archetype_query, all_players)
-                
-                archetype_count = archetype_check.fetchone()[0]
-                
-                # Success if all 10 players have both DARKO and archetype
-                if darko_count == 10 and archetype_count == 10:
-                    join_success += 1
-                else:
-                    join_failures.append({
-                        'possession_id': poss_id,
-                        'darko_count': darko_count,
-                        'archetype_count': archetype_count,
-                        'expected': 10
-                    })
-                    
-            except Exception as e:
-                join_failures.append({'possession_id': poss_id, 'error': str(e)})
-        
+        join_success = coverage['join_success']
+        join_failures = sum(coverage['failures'].values())
         success_rate = (join_success / total_samples) * 100
         results[season] = {'join_success': join_success, 'total': total_samples}
         
         print(f"  Total sample possessions: {total_samples:,}")
         print(f"  Successful joins: {join_success:,} ({success_rate:.1f}%)")
-        print(f"  Failed joins: {len(join_failures)}")
+        print(f"  Failed joins: {join_failures}")
         
-        if len(join_failures) > 0:
-            print(f"  ⚠️  Sample of failures:")
-            for fail in join_failures[:5]:
-                print(f"     Possession {fail.get('possession_id')}: DARKO={fail.get('darko_count', 0)}/10, Archetype={fail.get('archetype_count', 0)}/10")
+        if join_failures > 0:
+            print(f"  ⚠️  Most common failures:")
+            failures = sorted(coverage['failures'].items(), key=lambda item: -item[1])
+            for (players, darko_count, archetype_count), count in failures[:5]:
+                print(f"     {count} possessions: players={players}/10, DARKO={darko_count}/10, Archetype={archetype_count}/10")
     
     return results
 
@@ -164,33 +97,11 @@ def audit_season_alignment(conn):
     for season in seasons:
         print(f"\nAnalyzing {season}...")
         
-        # Get player count in possessions (simpler approach)
-        all_player_ids = set()
-        cursor = conn.execute("""
-            SELECT home_player_1_id, home_player_2_id, home_player_3_id, home_player_4_id, home_player_5_id,
-                   away_player_1_id, away_player_2_id, away_player_3_id, away_player_4_id, away_player_5_id
-            FROM Possessions p
-            JOIN Games g ON p.game_id = g.game_id
-            WHERE g.season = ?
-            LIMIT 10000
-        """, (season,))
-        for row in cursor:
-            all_player_ids.update([p for p in row if p is not None])
-        poss_players = len(all_player_ids)
-        
-        # Get DARKO coverage for that season
-        darko_players = conn.execute("""
-            SELECT COUNT(DISTINCT player_id)
-            FROM PlayerSeasonSkill
-            WHERE season = ?
-        """, (season,)).fetchone()[0]
-        
-        # Get overlap (simplified - check sample of players from possessions)
-        darko_player_ids = set(conn.execute("""
-            SELECT player_id FROM PlayerSeasonSkill WHERE season = ?
-        """, (season,)).fetchall())
-        darko_player_ids = {row[0] for row in darko_player_ids}
-        overlap = len(all_player_ids & darko_player_ids)
+        # Every player on court in the season, and how many of them have a DARKO rating
+        overlap_counts = season_player_overlap(conn, season)
+        poss_players = overlap_counts['players']
+        darko_players = overlap_counts['darko_players']
+        overlap = overlap_counts['rated']
         
         print(f"  Players in possessions: {poss_players}")
         print(f"  Players with DARKO ratings: {darko_players}")
@@ -352,13 +263,9 @@ def audit_historical_comparison(conn):
     seasons = ['2018-19', '2020-21', '2021-22', '2022-23']
     
     print("\n  Possession counts and expected eligibility:")
+    totals = possessions_by_season(conn, seasons)
     for season in seasons:
-        # Get total possessions
-        total = conn.execute("""
-            SELECT COUNT(*) FROM Possessions p
-            JOIN Games g ON p.game_id = g.game_id
-            WHERE g.season = ?
-        """, (season,)).fetchone()[0]
+        total = totals[season]
         
         # Get eligible player count (1000+ minutes with archetype + DARKO)
         archetype_table = f"PlayerArchetypeFeatures_{season.replace('-', '_')}"
@@ -404,13 +311,19 @@ def generate_report(results):
 
 def main():
     """Run complete database integrity audit."""
+    parser = argparse.ArgumentParser(description="Database integrity audit for Phase 2 readiness.")
+    parser.add_argument("--engine", choices=ENGINES, default=None,
+                        help="Query engine for the checks (default: NBA_STATS_ANALYTICS_ENGINE, sqlite).")
+    args = parser.parse_args()
+    
     print("\n" + "🔍" * 40)
     print("DATABASE INTEGRITY AUDIT - PHASE 2 READINESS")
     print("🔍" * 40)
     print("\nThis audit validates database integrity BEFORE attempting Phase 2 fixes.")
     print("We must ensure data is correct before fixing downstream bugs.")
     
-    conn = connect_db()
+    conn = connect_db(args.engine)
+    start = time.time()
     
     try:
         results = {}
@@ -426,7 +339,7 @@ def main():
         # Generate report
         generate_report(results)
         
-        print("\n✅ Audit complete!")
+        print(f"\n✅ Audit complete in {time.time() - start:.1f}s!")
         
     except Exception as e:
         print(f"\n❌ Audit failed with error: {e}")
@@ -17,13 +17,14 @@ import logging
 from collections import defaultdict
 import numpy as np
 
+from src.nba_stats.db.possessions_parquet import ID_COLUMNS, OUTCOME_COLUMN, load_possessions
+
 # It's good practice to reuse proven components
 from semantic_prototype import (
     get_archetypes, 
     get_darko_ratings, 
     create_mock_supercluster_map, 
     get_lineup_supercluster,
-    calculate_outcome
 )
 
 DB_PATH = "src/nba_stats/db/nba_stats.db"
@@ -66,39 +67,29 @@ def prepare_bayesian_data():
     
     try:
         con = sqlite3.connect(DB_PATH)
-        # Note: The 'Possessions' table seems to contain multiple seasons.
-        # For true reproducibility, we should filter for the '2022-23' season.
-        # This requires a join with the 'Games' table. Deferring for now to match paper's scope.
-        query = "SELECT * FROM Possessions WHERE offensive_team_id IS NOT NULL"
+        # One row per possession, with points and both lineups already resolved. Only the
+        # lineup, team and points columns are read, from Parquet when it has been exported.
+        # Note: TruePossessions contains multiple seasons; pass season= for reproducibility.
+        possessions = load_possessions(con, columns=ID_COLUMNS + [OUTCOME_COLUMN])
         
-        for chunk in pd.read_sql_query(query, con, chunksize=BATCH_SIZE):
+        for start in range(0, len(possessions), BATCH_SIZE):
+            chunk = possessions.iloc[start:start + BATCH_SIZE]
             total_processed += len(chunk)
-            
-            # Coalesce description columns for outcome calculation
-            chunk['description'] = chunk['home_description'].fillna('') + chunk['visitor_description'].fillna('') + chunk['neutral_description'].fillna('')
-            chunk['description'] = chunk['description'].replace('', None)
 
             for _, row in chunk.iterrows():
-                home_players = [row[f'home_player_{i}_id'] for i in range(1, 6)]
-                away_players = [row[f'away_player_{i}_id'] for i in range(1, 6)]
+                offensive_players = [row[f'off_player_{i}_id'] for i in range(1, 6)]
+                defensive_players = [row[f'def_player_{i}_id'] for i in range(1, 6)]
 
-                if any(pd.isnull(p) for p in home_players + away_players):
+                if any(pd.isnull(p) for p in offensive_players + defensive_players):
                     continue
                 
-                all_players = [int(p) for p in home_players + away_players]
+                offensive_players = [int(p) for p in offensive_players]
+                defensive_players = [int(p) for p in defensive_players]
                 
                 # HARDENING: Explicitly filter based on Phase 2 findings
-                if not all(p in archetypes and p in darko_ratings for p in all_players):
+                if not all(p in archetypes and p in darko_ratings for p in offensive_players + defensive_players):
                     continue
 
-                # If the row is clean, process it
-                # (This reuses the logic from the semantic prototype)
-                offensive_team_id = row['offensive_team_id']
-                if row['player1_team_id'] == offensive_team_id:
-                    offensive_players, defensive_players = home_players, away_players
-                else:
-                    offensive_players, defensive_players = away_players, home_players
-
                 offensive_archetypes = [archetypes.get(p) for p in offensive_players]
                 defensive_archetypes = [archetypes.get(p) for p in defensive_players]
 
@@ -112,7 +103,7 @@ def prepare_bayesian_data():
                 if defensive_supercluster == -1:
                     defensive_supercluster = 0 # Default to supercluster 0
                     
-                outcome = calculate_outcome(row)
+                outcome = int(row['points'])
                 
                 # Aggregate Z-scores
                 z_scores_off = defaultdict(float)
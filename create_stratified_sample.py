@@ -17,6 +17,8 @@ import numpy as np
 from typing import Dict, List, Tuple
 import logging
 
+from src.nba_stats.db.possessions_store import read_true_possessions
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -42,33 +44,11 @@ class StratifiedSampleCreator:
         """Load possession data with lineup and archetype information."""
         logger.info("Loading possession data...")
         
-        query = """
-        SELECT 
-            p.game_id,
-            p.event_num,
-            p.home_player_1_id, p.home_player_2_id, p.home_player_3_id, 
-            p.home_player_4_id, p.home_player_5_id,
-            p.away_player_1_id, p.away_player_2_id, p.away_player_3_id, 
-            p.away_player_4_id, p.away_player_5_id,
-            p.offensive_team_id,
-            p.defensive_team_id,
-            -- Add outcome data if available
-            p.score,
-            p.score_margin
-        FROM Possessions p
-        WHERE p.home_player_1_id IS NOT NULL 
-        AND p.home_player_2_id IS NOT NULL 
-        AND p.home_player_3_id IS NOT NULL 
-        AND p.home_player_4_id IS NOT NULL 
-        AND p.home_player_5_id IS NOT NULL
-        AND p.away_player_1_id IS NOT NULL 
-        AND p.away_player_2_id IS NOT NULL 
-        AND p.away_player_3_id IS NOT NULL 
-        AND p.away_player_4_id IS NOT NULL 
-        AND p.away_player_5_id IS NOT NULL
-        """
-        
-        possessions = pd.read_sql_query(query, self.conn)
+        # One row per possession, with the offensive and defensive lineups and points resolved
+        possessions = read_true_possessions(self.conn, columns=[
+            'game_id', 'possession_num', 'season', 'offensive_team_id', 'defensive_team_id', 'points',
+            *(f'{side}_player_{n}_id' for side in ('off', 'def') for n in range(1, 6))
+        ])
         logger.info(f"Loaded {len(possessions)} possessions with complete lineup data")
         
         return possessions
@@ -127,33 +107,15 @@ class StratifiedSampleCreator:
         # Sort archetypes to create consistent lineup ID
         return '_'.join(map(str, sorted(archetypes)))
     
-    def load_player_team_mappings(self) -> Dict[int, int]:
-        """Load player to team ID mappings."""
-        logger.info("Loading player team mappings...")
-        
-        query = """
-        SELECT 
-            p.player_id,
-            p.team_id
-        FROM Players p
-        """
-        
-        team_df = pd.read_sql_query(query, self.conn)
-        player_to_team = dict(zip(team_df['player_id'], team_df['team_id']))
-        
-        logger.info(f"Loaded team mappings for {len(player_to_team)} players")
-        return player_to_team
-
     def add_lineup_metadata(self, possessions: pd.DataFrame, 
                            player_to_archetype: Dict[int, int],
-                           lineup_to_supercluster: Dict[str, int],
-                           player_to_team: Dict[int, int]) -> pd.DataFrame:
+                           lineup_to_supercluster: Dict[str, int]) -> pd.DataFrame:
         """Add archetype and supercluster information to possessions."""
         logger.info("Adding lineup metadata to possessions...")
         
         # Create lineup columns
-        possessions['home_archetype_lineup'] = None
-        possessions['away_archetype_lineup'] = None
+        possessions['offensive_archetype_lineup'] = None
+        possessions['defensive_archetype_lineup'] = None
         possessions['offensive_supercluster'] = None
         possessions['defensive_supercluster'] = None
         
@@ -161,63 +123,34 @@ class StratifiedSampleCreator:
         processed_count = 0
         missing_archetype_count = 0
         missing_supercluster_count = 0
-        team_mismatch_count = 0
         
         for idx, row in possessions.iterrows():
             processed_count += 1
             if processed_count % 100000 == 0:
                 logger.info(f"Processed {processed_count} possessions...")
-            # Get home lineup player IDs
-            home_lineup = [
-                row['home_player_1_id'], row['home_player_2_id'], row['home_player_3_id'],
-                row['home_player_4_id'], row['home_player_5_id']
-            ]
-            
-            # Get away lineup player IDs  
-            away_lineup = [
-                row['away_player_1_id'], row['away_player_2_id'], row['away_player_3_id'],
-                row['away_player_4_id'], row['away_player_5_id']
-            ]
+            # TruePossessions already orients the lineups: off_* has the ball, def_* defends
+            offensive_lineup = [row[f'off_player_{i}_id'] for i in range(1, 6)]
+            defensive_lineup = [row[f'def_player_{i}_id'] for i in range(1, 6)]
             
             # Create archetype lineup IDs
-            home_archetype_lineup = self.create_archetype_lineup_id(home_lineup, player_to_archetype)
-            away_archetype_lineup = self.create_archetype_lineup_id(away_lineup, player_to_archetype)
+            offensive_archetype_lineup = self.create_archetype_lineup_id(offensive_lineup, player_to_archetype)
+            defensive_archetype_lineup = self.create_archetype_lineup_id(defensive_lineup, player_to_archetype)
             
-            if home_archetype_lineup is None or away_archetype_lineup is None:
+            if offensive_archetype_lineup is None or defensive_archetype_lineup is None:
                 missing_archetype_count += 1
                 continue
                 
             # Get supercluster assignments
-            home_supercluster = lineup_to_supercluster.get(home_archetype_lineup)
-            away_supercluster = lineup_to_supercluster.get(away_archetype_lineup)
+            offensive_supercluster = lineup_to_supercluster.get(offensive_archetype_lineup)
+            defensive_supercluster = lineup_to_supercluster.get(defensive_archetype_lineup)
             
-            if home_supercluster is None or away_supercluster is None:
+            if offensive_supercluster is None or defensive_supercluster is None:
                 missing_supercluster_count += 1
                 continue
             
-            # Determine offensive and defensive superclusters
-            # Get team IDs for home and away lineups
-            home_team_id = player_to_team.get(home_lineup[0])  # All players in lineup should have same team
-            away_team_id = player_to_team.get(away_lineup[0])
-            
-            if home_team_id is None or away_team_id is None:
-                continue
-            
-            # Determine which lineup is on offense
-            if row['offensive_team_id'] == home_team_id:
-                offensive_supercluster = home_supercluster
-                defensive_supercluster = away_supercluster
-            elif row['offensive_team_id'] == away_team_id:
-                offensive_supercluster = away_supercluster
-                defensive_supercluster = home_supercluster
-            else:
-                # Skip if offensive_team_id doesn't match either lineup
-                team_mismatch_count += 1
-                continue
-            
             # Update the row
-            row['home_archetype_lineup'] = home_archetype_lineup
-            row['away_archetype_lineup'] = away_archetype_lineup
+            row['offensive_archetype_lineup'] = offensive_archetype_lineup
+            row['defensive_archetype_lineup'] = defensive_archetype_lineup
             row['offensive_supercluster'] = offensive_supercluster
             row['defensive_supercluster'] = defensive_supercluster
             
@@ -225,7 +158,7 @@ class StratifiedSampleCreator:
         
         result_df = pd.DataFrame(valid_possessions)
         logger.info(f"Added metadata to {len(result_df)} possessions")
-        logger.info(f"Debug stats: processed={processed_count}, missing_archetype={missing_archetype_count}, missing_supercluster={missing_supercluster_count}, team_mismatch={team_mismatch_count}")
+        logger.info(f"Debug stats: processed={processed_count}, missing_archetype={missing_archetype_count}, missing_supercluster={missing_supercluster_count}")
         
         return result_df
     
@@ -286,9 +219,9 @@ class StratifiedSampleCreator:
             f.write(f"Total possessions: {len(sample_df)}\n")
             f.write(f"Unique matchups: {len(sample_df.groupby(['offensive_supercluster', 'defensive_supercluster']))}\n")
             f.write(f"Archetype distribution:\n")
-            f.write(f"  Big Men: {len(sample_df[sample_df['home_archetype_lineup'].str.contains('0')])}\n")
-            f.write(f"  Primary Ball Handlers: {len(sample_df[sample_df['home_archetype_lineup'].str.contains('1')])}\n")
-            f.write(f"  Role Players: {len(sample_df[sample_df['home_archetype_lineup'].str.contains('2')])}\n")
+            f.write(f"  Big Men: {len(sample_df[sample_df['offensive_archetype_lineup'].str.contains('0')])}\n")
+            f.write(f"  Primary Ball Handlers: {len(sample_df[sample_df['offensive_archetype_lineup'].str.contains('1')])}\n")
+            f.write(f"  Role Players: {len(sample_df[sample_df['offensive_archetype_lineup'].str.contains('2')])}\n")
         
         logger.info(f"Summary saved to {summary_path}")
     
@@ -304,11 +237,10 @@ class StratifiedSampleCreator:
             possessions = self.load_possession_data()
             player_to_archetype = self.load_player_archetypes()
             lineup_to_supercluster = self.load_lineup_superclusters()
-            player_to_team = self.load_player_team_mappings()
             
             # Add metadata
             possessions_with_metadata = self.add_lineup_metadata(
-                possessions, player_to_archetype, lineup_to_supercluster, player_to_team
+                possessions, player_to_archetype, lineup_to_supercluster
             )
             
             if len(possessions_with_metadata) == 0:
@@ -18,6 +18,8 @@ from collections import defaultdict, Counter
 import os
 from pathlib import Path
 
+from src.nba_stats.db.possessions_parquet import load_possessions
+
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # Historical training seasons
@@ -41,75 +43,6 @@ def _load_archetypes_for_season(season: str) -> dict:
     # Map IDs 1-8 to indices 0-7 for internal use
     return pd.Series(df['archetype_id'].values - 1, index=df['player_id']).to_dict()
 
-def _extract_lineup_from_possession(row) -> tuple:
-    """Extract home and away lineups from a possession row."""
-    try:
-        home_players = [row[f'home_player_{i}_id'] for i in range(1, 6)]
-        away_players = [row[f'away_player_{i}_id'] for i in range(1, 6)]
-
-        # Check if all players are present
-        if any(p is None for p in home_players + away_players):
-            return None, None
-
-        # Determine which team is on offense
-        offensive_team = row.get('offensive_team_id')
-        player1_team = row.get('player1_team_id')
-
-
-        # If we have offensive team info, use it (handle NaN values)
-        if (pd.notna(offensive_team) and pd.notna(player1_team) and
-            offensive_team != '' and player1_team != ''):
-            # Convert to same type for comparison (float vs int)
-            if float(player1_team) == float(offensive_team):
-                offensive_players, defensive_players = home_players, away_players
-            else:
-                offensive_players, defensive_players = away_players, home_players
-        else:
-            # If missing offensive team info, try to infer from score or other indicators
-            # For now, use a simple heuristic: if there's a score change, determine based on that
-            # But this is complex, so let's just skip these possessions for now
-            return None, None
-
-        return offensive_players, defensive_players
-
-    except Exception as e:
-        logging.debug(f"Error extracting lineup: {e}")
-        return None, None
-
-def _calculate_lineup_outcome(description: str) -> dict:
-    """Calculate outcome points and shot type from play description."""
-    if not isinstance(description, str):
-        return {'points': 0, 'is_2pt': False, 'is_3pt': False, 'is_ft': False}
-
-    desc_lower = description.lower()
-    points = 0
-    is_2pt = False
-    is_3pt = False
-    is_ft = False
-
-    # 3-point shots
-    if '(3pt)' in desc_lower or 'three' in desc_lower:
-        points = 3
-        is_3pt = True
-    # 2-point shots
-    elif '(2pt)' in desc_lower or ('shot' in desc_lower and '3' not in desc_lower):
-        points = 2
-        is_2pt = True
-    # Free throws
-    elif 'free throw' in desc_lower and 'miss' not in desc_lower:
-        points = 1
-        is_ft = True
-    # Turnovers or misses = 0 points
-    elif 'turnover' in desc_lower or 'miss' in desc_lower:
-        points = 0
-
-    return {
-        'points': points,
-        'is_2pt': is_2pt,
-        'is_3pt': is_3pt,
-        'is_ft': is_ft
-    }
-
 def _collect_possession_data_for_season(season: str, archetypes: dict) -> dict:
     """Collect possession data for a single season."""
     logging.info(f"Processing {season}...")
@@ -137,40 +70,17 @@ def _collect_possession_data_for_season(season: str, archetypes: dict) -> dict:
     })
 
     try:
-        # Use pandas to read the data as DataFrame for easier column access
-        query = """
-            SELECT p.*, g.season
-            FROM Possessions p
-            JOIN Games g ON p.game_id = g.game_id
-            WHERE g.season = ?
-            AND p.home_player_1_id IS NOT NULL
-            AND p.away_player_1_id IS NOT NULL
-        """
-
-        # Read all data at once for simplicity (limit for debugging)
-        df = pd.read_sql_query(query, conn, params=(season,))
-        logging.info(f"  Loaded {len(df)} rows from database")
+        # One row per possession: lineups, points and the offense's box score already resolved
+        df = load_possessions(conn, season=season)
+        logging.info(f"  Loaded {len(df)} possessions from database")
 
         processed = 0
-        skipped_lineup = 0
         skipped_archetype = 0
 
-        for idx, row in df.iterrows():
+        for row in df.itertuples(index=False):
             processed += 1
-
-            # Debug: log first few rows to see what's in the data
-            if idx < 3:
-                logging.debug(f"Row {idx}: offensive_team={row.get('offensive_team_id')}, player1_team={row.get('player1_team_id')}")
-                logging.debug(f"  Home players: {[row.get(f'home_player_{i}_id') for i in range(1, 6)]}")
-                logging.debug(f"  Away players: {[row.get(f'away_player_{i}_id') for i in range(1, 6)]}")
-
-            # Extract lineups
-            off_players, def_players = _extract_lineup_from_possession(row)
-            if off_players is None:
-                skipped_lineup += 1
-                if idx < 3:
-                    logging.debug(f"  Failed lineup extraction for row {idx}")
-                continue
+            off_players = [getattr(row, f'off_player_{i}_id') for i in range(1, 6)]
+            def_players = [getattr(row, f'def_player_{i}_id') for i in range(1, 6)]
 
             # Check if all players have archetypes (relaxed for debugging)
             all_players = off_players + def_players
@@ -183,38 +93,29 @@ def _collect_possession_data_for_season(season: str, archetypes: dict) -> dict:
 
             # Get archetypes (handle missing ones)
             off_archetypes = [archetypes.get(p, 0) for p in off_players]  # Default to archetype 0
-            def_archetypes = [archetypes.get(p, 0) for p in def_players]  # Default to archetype 0
 
             # Create lineup key (archetypes 0-7 for internal use)
             lineup_key = "_".join(map(str, sorted(off_archetypes)))
 
-            # Calculate outcome
-            description = (row['home_description'] or '') + (row['visitor_description'] or '') + (row['neutral_description'] or '')
-            outcome = _calculate_lineup_outcome(description)
-
             # Update lineup stats
+            twos_made = row.field_goals_made - row.three_pointers_made
             stats = lineup_stats[lineup_key]
             stats['possessions'] += 1
-            stats['points'] += outcome['points']
-
-            if outcome['is_2pt']:
-                stats['fga_2pt'] += 1
-                stats['fga_total'] += 1
-                if outcome['points'] > 0:
-                    stats['fgm_2pt'] += 1
-                    stats['pts_2pt'] += outcome['points']
-            elif outcome['is_3pt']:
-                stats['fga_3pt'] += 1
-                stats['fga_total'] += 1
-                if outcome['points'] > 0:
-                    stats['fgm_3pt'] += 1
-                    stats['pts_3pt'] += outcome['points']
-
-            # Estimate minutes (rough approximation)
-            stats['minutes'] += 0.5  # Approximate 30 seconds per possession
+            stats['points'] += row.points
+            stats['fga_2pt'] += row.field_goal_attempts - row.three_point_attempts
+            stats['fga_3pt'] += row.three_point_attempts
+            stats['fga_total'] += row.field_goal_attempts
+            stats['fgm_2pt'] += twos_made
+            stats['fgm_3pt'] += row.three_pointers_made
+            stats['ftm'] += row.free_throws_made
+            stats['fta'] += row.free_throw_attempts
+            stats['pts_2pt'] += 2 * twos_made
+            stats['pts_3pt'] += 3 * row.three_pointers_made
+            stats['pts_ft'] += row.free_throws_made
+            stats['tov'] += row.turnovers
+            stats['minutes'] += (row.duration_seconds or 0.0) / 60
 
         logging.info(f"  Processed {processed:,} possessions for {len(lineup_stats)} unique lineups")
-        logging.info(f"  Skipped - lineup extraction: {skipped_lineup:,}")
         logging.info(f"  Skipped - archetype coverage: {skipped_archetype:,}")
 
     finally:
@@ -27,6 +27,8 @@ import pandas as pd
 import joblib
 from pathlib import Path
 
+from src.nba_stats.db.possessions_parquet import load_possessions
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # Configuration
@@ -260,64 +262,22 @@ def prepare_matchup_specific_bayesian_data(size_limit=None):
             archetypes = archetype_maps[season]
             darko = darko_maps[season]
 
-            # Query possessions for this season
-            if size_limit:
-                query = """
-                    SELECT p.*, g.season
-                    FROM Possessions p
-                    JOIN Games g ON p.game_id = g.game_id
-                    WHERE g.season = ?
-                    AND p.home_player_1_id IS NOT NULL
-                    AND p.away_player_1_id IS NOT NULL
-                    AND p.offensive_team_id IS NOT NULL
-                    AND p.offensive_team_id != ''
-                    LIMIT ?
-                """
-                df = pd.read_sql_query(query, conn, params=(season, size_limit))
-            else:
-                query = """
-                    SELECT p.*, g.season
-                    FROM Possessions p
-                    JOIN Games g ON p.game_id = g.game_id
-                    WHERE g.season = ?
-                    AND p.home_player_1_id IS NOT NULL
-                    AND p.away_player_1_id IS NOT NULL
-                    AND p.offensive_team_id IS NOT NULL
-                    AND p.offensive_team_id != ''
-                """
-                df = pd.read_sql_query(query, conn, params=(season,))
+            # Query possessions for this season: one row per possession, lineups and points resolved
+            df = load_possessions(conn, season=season, limit=size_limit)
             logging.info(f"  Loaded {len(df)} possessions")
 
             season_rows = 0
 
             for idx, row in df.iterrows():
                 try:
-                    # Extract player IDs
-                    home_players = [row[f'home_player_{i}_id'] for i in range(1, 6)]
-                    away_players = [row[f'away_player_{i}_id'] for i in range(1, 6)]
-
-                    # Skip if any players are NULL
-                    if any(pd.isna(p) for p in home_players + away_players):
-                        continue
+                    off_players = [int(row[f'off_player_{i}_id']) for i in range(1, 6)]
+                    def_players = [int(row[f'def_player_{i}_id']) for i in range(1, 6)]
 
                     # Check if all players have both archetype AND DARKO
-                    all_players = home_players + away_players
+                    all_players = off_players + def_players
                     if not all(p in archetypes and p in darko for p in all_players):
                         continue
 
-                    # Determine offensive/defensive players
-                    offensive_team = row.get('offensive_team_id')
-                    player1_team = row.get('player1_team_id')
-
-                    if pd.isna(offensive_team) or pd.isna(player1_team):
-                        continue
-
-                    # Convert to same type for comparison
-                    if float(player1_team) == float(offensive_team):
-                        off_players, def_players = home_players, away_players
-                    else:
-                        off_players, def_players = away_players, home_players
-
                     # Get archetypes (now 0-7 after fix)
                     off_archetypes = [int(archetypes[p]) for p in off_players]
                     def_archetypes = [int(archetypes[p]) for p in def_players]
@@ -337,8 +297,8 @@ def prepare_matchup_specific_bayesian_data(size_limit=None):
                     for i, p in enumerate(def_players):
                         z_def[def_archetypes[i]] += float(darko[p]['d_darko'])
 
-                    # Calculate outcome (simplified for prototype)
-                    outcome = 0  # Placeholder - would calculate from play description
+                    # Outcome: points scored on the possession
+                    outcome = int(row['points'])
 
                     # Create record
                     rec = {
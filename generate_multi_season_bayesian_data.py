@@ -16,6 +16,8 @@ from collections import defaultdict
 import numpy as np
 import pandas as pd
 
+from src.nba_stats.db.possession_matrix import load_matrix
+
 DB_PATH = "src/nba_stats/db/nba_stats.db"
 SUPERCLUSTER_MAP_PATH = "lineup_supercluster_results/supercluster_assignments_v2.json"
 OUTPUT_CSV_PATH = "multi_season_bayesian_data.csv"
@@ -117,17 +119,6 @@ def _lookup_supercluster(archetypes_list: list[int], sc_map: dict) -> int:
     """Lookup supercluster for archetype lineup."""
     return int(sc_map.get(_lineup_key(archetypes_list), 0))
 
-def _calc_outcome(description: str) -> int:
-    """Calculate possession outcome (points scored)."""
-    if not isinstance(description, str):
-        return 0
-    t = description.lower()
-    if '(3 pts)' in t: return 3
-    if '(2 pts)' in t: return 2
-    if 'free throw' in t and 'miss' not in t: return 1
-    if 'turnover' in t or 'miss' in t: return 0
-    return 0
-
 def prepare_multi_season_bayesian_data():
     """Generate multi-season Bayesian training data."""
     logging.info("="*80)
@@ -156,44 +147,21 @@ def prepare_multi_season_bayesian_data():
             archetypes = archetype_maps[season]
             darko = darko_maps[season]
             
-            # Query possessions for this season
-            query = """
-                SELECT p.*, g.season
-                FROM Possessions p
-                JOIN Games g ON p.game_id = g.game_id
-                WHERE g.season = ? AND p.offensive_team_id IS NOT NULL
-            """
+            # Possessions for this season as memory-mapped lineup and points arrays, built
+            # from TruePossessions and rebuilt whenever its ledger has moved on
+            matrix = load_matrix(con, season)
             
             season_rows = 0
             
-            for chunk in pd.read_sql_query(query, con, params=(season,), chunksize=BATCH_SIZE):
-                # Coalesce description fields
-                for c in ['home_description','visitor_description','neutral_description']:
-                    if c not in chunk.columns:
-                        chunk[c] = ''
-                chunk['description'] = chunk['home_description'].fillna('') + chunk['visitor_description'].fillna('') + chunk['neutral_description'].fillna('')
-                
-                for _, r in chunk.iterrows():
-                    try:
-                        # Extract player IDs
-                        home = [int(r[f'home_player_{i}_id']) for i in range(1,6)]
-                        away = [int(r[f'away_player_{i}_id']) for i in range(1,6)]
-                    except Exception:
-                        continue
-                    
-                    # Skip if any players are NULL
-                    if any(pd.isna(p) for p in home+away):
-                        continue
-                    
+            for start in range(0, len(matrix), BATCH_SIZE):
+                stop = start + BATCH_SIZE
+                chunk = zip(matrix.off_players[start:stop].tolist(), matrix.def_players[start:stop].tolist(),
+                            matrix.points[start:stop].tolist())
+                for off_players, def_players, points in chunk:
                     # CRITICAL: Check if all players have both archetype AND DARKO
-                    if not all(p in archetypes and p in darko for p in home+away):
+                    if not all(p in archetypes and p in darko for p in off_players+def_players):
                         continue
                     
-                    # Determine offensive/defensive players
-                    off_team = r.get('offensive_team_id')
-                    p1_team = r.get('player1_team_id')
-                    off_players, def_players = (home, away) if p1_team == off_team else (away, home)
-                    
                     # Get archetypes (now 0-7 after fix)
                     off_arch = [int(archetypes[p]) for p in off_players]
                     def_arch = [int(archetypes[p]) for p in def_players]
@@ -210,11 +178,8 @@ def prepare_multi_season_bayesian_data():
                     for i, p in enumerate(def_players):
                         z_def[def_arch[i]] += float(darko[p]['d_darko'])
                     
-                    # Calculate outcome
-                    outc = _calc_outcome(r.get('description'))
-                    
-                    # Create record
-                    rec = {'outcome': outc, 'matchup_id': f"{off_sc}_vs_{def_sc}", 'season': season}
+                    # Create record; the outcome is the points scored on the possession
+                    rec = {'outcome': points, 'matchup_id': f"{off_sc}_vs_{def_sc}", 'season': season}
                     
                     # Write Z-matrices (indices 0-7)
                     for a in range(8):
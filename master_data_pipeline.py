@@ -17,6 +17,7 @@ import sys
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
 from src.nba_stats.api.data_fetcher import create_data_fetcher
+from src.nba_stats.api.telemetry import write_telemetry
 from canonical_metrics import CANONICAL_48_METRICS
 from definitive_metric_mapping import get_missing_metrics, get_available_metrics
 
@@ -166,6 +167,9 @@ class MasterDataPipeline:
         # Save raw data
         with open("pipeline_results.json", "w") as f:
             json.dump(self.results, f, indent=2, default=str)
+
+        # Per-endpoint API client telemetry for the run
+        write_telemetry(self.fetcher.client.stats(), "pipeline_results.json")
         
         # Save validation results
         with open("pipeline_validation.json", "w") as f:
@@ -95,7 +95,7 @@ class ModelInterrogator:
             return False
     
     def load_possession_sample(self, n_samples: int = 1000):
-        """Load a sample of possession data for analysis."""
+        """Load a sample of possessions (TruePossessions, lineups and points resolved) for analysis."""
         if not self.conn:
             return False
             
@@ -106,18 +106,18 @@ class ModelInterrogator:
                 g.game_date,
                 g.home_team_id,
                 g.away_team_id
-            FROM Possessions p
+            FROM TruePossessions p
             JOIN Games g ON p.game_id = g.game_id
-            WHERE p.home_player_1_id IS NOT NULL 
-              AND p.home_player_2_id IS NOT NULL 
-              AND p.home_player_3_id IS NOT NULL 
-              AND p.home_player_4_id IS NOT NULL 
-              AND p.home_player_5_id IS NOT NULL 
-              AND p.away_player_1_id IS NOT NULL 
-              AND p.away_player_2_id IS NOT NULL 
-              AND p.away_player_3_id IS NOT NULL 
-              AND p.away_player_4_id IS NOT NULL 
-              AND p.away_player_5_id IS NOT NULL
+            WHERE p.off_player_1_id IS NOT NULL 
+              AND p.off_player_2_id IS NOT NULL 
+              AND p.off_player_3_id IS NOT NULL 
+              AND p.off_player_4_id IS NOT NULL 
+              AND p.off_player_5_id IS NOT NULL 
+              AND p.def_player_1_id IS NOT NULL 
+              AND p.def_player_2_id IS NOT NULL 
+              AND p.def_player_3_id IS NOT NULL 
+              AND p.def_player_4_id IS NOT NULL 
+              AND p.def_player_5_id IS NOT NULL
             ORDER BY RANDOM()
             LIMIT {n_samples}
             """
@@ -214,18 +214,18 @@ class PossessionModelingPipeline:
         try:
             conn = sqlite3.connect(self.db_path)
             
-            # Check possession lineup completeness
+            # Check possession lineup completeness (TruePossessions is the modelling input)
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT 
                     COUNT(*) as total_possessions,
-                    SUM(CASE WHEN home_player_1_id IS NOT NULL AND home_player_2_id IS NOT NULL 
-                             AND home_player_3_id IS NOT NULL AND home_player_4_id IS NOT NULL 
-                             AND home_player_5_id IS NOT NULL AND away_player_1_id IS NOT NULL 
-                             AND away_player_2_id IS NOT NULL AND away_player_3_id IS NOT NULL 
-                             AND away_player_4_id IS NOT NULL AND away_player_5_id IS NOT NULL 
+                    SUM(CASE WHEN off_player_1_id IS NOT NULL AND off_player_2_id IS NOT NULL 
+                             AND off_player_3_id IS NOT NULL AND off_player_4_id IS NOT NULL 
+                             AND off_player_5_id IS NOT NULL AND def_player_1_id IS NOT NULL 
+                             AND def_player_2_id IS NOT NULL AND def_player_3_id IS NOT NULL 
+                             AND def_player_4_id IS NOT NULL AND def_player_5_id IS NOT NULL 
                              THEN 1 ELSE 0 END) as complete_lineups
-                FROM Possessions
+                FROM TruePossessions
             """)
             total_poss, complete_lineups = cursor.fetchone()
             lineup_completeness = complete_lineups / total_poss if total_poss > 0 else 0
@@ -52,32 +52,32 @@ def collect_archetype_lineups(archetype_maps):
         logging.info(f"Processing {season}...")
         archetype_map = archetype_maps[season]
         
+        # One row per possession (TruePossessions), offensive and defensive lineups resolved
         cursor = conn.execute("""
-            SELECT p.home_player_1_id, p.home_player_2_id, p.home_player_3_id, 
-                   p.home_player_4_id, p.home_player_5_id,
-                   p.away_player_1_id, p.away_player_2_id, p.away_player_3_id,
-                   p.away_player_4_id, p.away_player_5_id
-            FROM Possessions p
-            JOIN Games g ON p.game_id = g.game_id
-            WHERE g.season = ?
+            SELECT off_player_1_id, off_player_2_id, off_player_3_id,
+                   off_player_4_id, off_player_5_id,
+                   def_player_1_id, def_player_2_id, def_player_3_id,
+                   def_player_4_id, def_player_5_id
+            FROM TruePossessions
+            WHERE season = ?
             LIMIT 50000
         """, (season,))
         
         for row in cursor:
             # Extract players
-            home_players = [row[i] for i in range(5)]
-            away_players = [row[i] for i in range(5, 10)]
+            off_players = [row[i] for i in range(5)]
+            def_players = [row[i] for i in range(5, 10)]
             
             # Convert to archetypes (keeping 1-8 for key generation)
-            home_arch = sorted([archetype_map.get(p) for p in home_players if p in archetype_map])
-            away_arch = sorted([archetype_map.get(p) for p in away_players if p in archetype_map])
+            off_arch = sorted([archetype_map.get(p) for p in off_players if p in archetype_map])
+            def_arch = sorted([archetype_map.get(p) for p in def_players if p in archetype_map])
             
             # Only add if both lineups have all 5 archetypes
-            if len(home_arch) == 5 and len(away_arch) == 5:
-                home_key = '_'.join(map(str, home_arch))
-                away_key = '_'.join(map(str, away_arch))
-                unique_lineups.add(home_key)
-                unique_lineups.add(away_key)
+            if len(off_arch) == 5 and len(def_arch) == 5:
+                off_key = '_'.join(map(str, off_arch))
+                def_key = '_'.join(map(str, def_arch))
+                unique_lineups.add(off_key)
+                unique_lineups.add(def_key)
     
     conn.close()
     logging.info(f"Found {len(unique_lineups)} unique archetype lineup combinations")
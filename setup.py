@@ -10,6 +10,11 @@ setup(
         "pandas>=2.1.0",
         "numpy>=1.24.0",
     ],
+    extras_require={
+        # Parquet possessions export (db/possessions_parquet) and the DuckDB analytics engine (db/analytics)
+        "parquet": ["pyarrow>=14.0.0"],
+        "duckdb": ["duckdb>=0.10.0"],
+    },
     python_requires=">=3.8",
     author="Harris Gordon",
     author_email="harrisgordon@example.com",
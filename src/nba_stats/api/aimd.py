@@ -0,0 +1,328 @@
+"""Adaptive request rate and concurrency control for stats.nba.com.
+
+``AIMDController`` replaces the fixed inter-request sleeps. Every success nudges the
+request rate up by a constant and, once a full window of requests has succeeded, allows
+one more request in flight. 429s, 5xx responses, timeouts and latency inflation cut
+both multiplicatively. Only one decrease is applied per cooldown, so a burst of failures
+from requests that were already in flight counts as one congestion signal and the rate
+does not collapse.
+
+The last known-good rate and concurrency are persisted to a small JSON file, so the next
+run starts where the previous one converged. Periodic snapshots (rate, concurrency,
+observed throughput, latency, failure counts) are appended to a JSON Lines metrics log.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AIMDState:
+    """Steady state persisted between runs."""
+    requests_per_minute: float
+    concurrency: int
+    updated_at: float
+
+
+class AIMDController:
+    """
+    Additive-increase/multiplicative-decrease controller over request rate and concurrency.
+
+    Thread-safe. Callers reserve a slot with ``start()`` (or poll ``try_start()`` from async
+    code), call ``finish()`` when the request completes, and report the outcome with
+    ``record_success(latency)``, ``record_throttle(retry_after)``, ``record_server_error()``
+    or ``record_timeout()``.
+    """
+
+    def __init__(
+        self,
+        initial_rate: float = 10.0,
+        min_rate: float = 2.0,
+        max_rate: float = 120.0,
+        initial_concurrency: int = 1,
+        max_concurrency: int = 4,
+        additive_increase: float = 0.5,
+        decrease_factor: float = 0.5,
+        soft_decrease_factor: float = 0.8,
+        latency_threshold: float = 2.5,
+        decrease_cooldown: float = 5.0,
+        state_path: Optional[Union[str, Path]] = None,
+        metrics_path: Optional[Union[str, Path]] = None,
+        metrics_interval: float = 60.0,
+        persist_interval: float = 30.0,
+    ):
+        """
+        Args:
+            initial_rate: Starting requests per minute when no persisted state exists
+            min_rate: Floor for the request rate
+            max_rate: Ceiling for the request rate
+            initial_concurrency: Starting requests in flight when no persisted state exists
+            max_concurrency: Ceiling for requests in flight
+            additive_increase: Requests per minute added after each success
+            decrease_factor: Multiplier applied on 429s
+            soft_decrease_factor: Multiplier applied on 5xx, timeouts and latency inflation
+            latency_threshold: Latency EWMA over the best observed latency that counts as congestion
+            decrease_cooldown: Minimum seconds between two decreases
+            state_path: JSON file for the last known-good state (None disables persistence)
+            metrics_path: JSON Lines metrics log (None disables the log)
+            metrics_interval: Seconds between metrics snapshots
+            persist_interval: Seconds between state saves
+        """
+        if not 0 < min_rate <= max_rate:
+            raise ValueError("Expected 0 < min_rate <= max_rate")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max_rate)
+        self.max_concurrency = int(max_concurrency)
+        self.additive_increase = additive_increase
+        self.decrease_factor = decrease_factor
+        self.soft_decrease_factor = soft_decrease_factor
+        self.latency_threshold = latency_threshold
+        self.decrease_cooldown = decrease_cooldown
+        self.state_path = Path(state_path) if state_path else None
+        self.metrics_path = Path(metrics_path) if metrics_path else None
+        self.metrics_interval = metrics_interval
+        self.persist_interval = persist_interval
+
+        self._lock = threading.Condition()
+        self.rate = self._clamp_rate(initial_rate)
+        self.concurrency = self._clamp_concurrency(initial_concurrency)
+        self._load_state()
+        self._good_rate = self.rate
+        self._good_concurrency = self.concurrency
+
+        self._in_flight = 0
+        self._next_start = 0.0
+        self._pause_until = 0.0
+        self._last_decrease = 0.0
+        self._window_successes = 0
+        self._latency_ewma: Optional[float] = None
+        self._best_latency: Optional[float] = None
+        self._latency_samples = 0
+
+        self.counters = {"requests": 0, "successes": 0, "throttles": 0, "server_errors": 0,
+                         "timeouts": 0, "latency_backoffs": 0}
+        self._window_started = time.time()
+        self._window_counters = dict(self.counters)
+        self._last_persist = time.time()
+
+    # --- bounds and persistence -------------------------------------------------------
+
+    def _clamp_rate(self, rate: float) -> float:
+        return min(self.max_rate, max(self.min_rate, float(rate)))
+
+    def _clamp_concurrency(self, concurrency: int) -> int:
+        return min(self.max_concurrency, max(1, int(concurrency)))
+
+    def _load_state(self) -> None:
+        if self.state_path is None or not self.state_path.exists():
+            return
+        try:
+            with open(self.state_path, 'r') as f:
+                state = AIMDState(**json.load(f))
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable AIMD state {self.state_path}: {e}")
+            return
+        self.rate = self._clamp_rate(state.requests_per_minute)
+        self.concurrency = self._clamp_concurrency(state.concurrency)
+        logger.info(f"Resuming at last known-good rate {self.rate:.1f} rpm, concurrency {self.concurrency}")
+
+    def _save_state_locked(self) -> None:
+        self._last_persist = time.time()
+        if self.state_path is None:
+            return
+        state = AIMDState(requests_per_minute=self._good_rate, concurrency=self._good_concurrency,
+                          updated_at=self._last_persist)
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.state_path.with_suffix(self.state_path.suffix + ".tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump(asdict(state), f)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            logger.warning(f"Could not persist AIMD state to {self.state_path}: {e}")
+
+    def _snapshot_locked(self, now: float) -> Dict[str, Any]:
+        elapsed = max(now - self._window_started, 1e-9)
+        window = {k: self.counters[k] - self._window_counters[k] for k in self.counters}
+        return {
+            "timestamp": now,
+            "window_seconds": round(elapsed, 3),
+            "rate_rpm": round(self.rate, 3),
+            "concurrency": self.concurrency,
+            "in_flight": self._in_flight,
+            "throughput_rpm": round(window["successes"] * 60.0 / elapsed, 3),
+            "latency_ewma_ms": round(self._latency_ewma * 1000.0, 1) if self._latency_ewma is not None else None,
+            "best_latency_ms": round(self._best_latency * 1000.0, 1) if self._best_latency is not None else None,
+            **window,
+        }
+
+    def _maybe_flush_locked(self, now: float, force: bool = False) -> None:
+        if force or now - self._last_persist >= self.persist_interval:
+            self._save_state_locked()
+        if self.metrics_path is None or self.counters == self._window_counters:
+            return
+        if not force and now - self._window_started < self.metrics_interval:
+            return
+        snapshot = self._snapshot_locked(now)
+        try:
+            self.metrics_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.metrics_path, 'a') as f:
+                f.write(json.dumps(snapshot) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write AIMD metrics to {self.metrics_path}: {e}")
+        self._window_started = now
+        self._window_counters = dict(self.counters)
+
+    def flush(self) -> None:
+        """Persist the steady state and write a final metrics snapshot."""
+        with self._lock:
+            self._maybe_flush_locked(time.time(), force=True)
+
+    # --- admission ---------------------------------------------------------------------
+
+    @property
+    def interval(self) -> float:
+        """Seconds between request starts at the current rate."""
+        return 60.0 / self.rate
+
+    def try_start(self) -> float:
+        """
+        Reserve a request slot if one is available.
+
+        Returns:
+            0.0 if the caller may send its request now (call ``finish()`` afterwards),
+            otherwise the number of seconds to wait before trying again.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._pause_until:
+                return self._pause_until - now
+            if self._in_flight >= self.concurrency:
+                return min(self.interval, 0.05)
+            if now < self._next_start:
+                return self._next_start - now
+            self._in_flight += 1
+            self._next_start = max(now, self._next_start) + self.interval
+            self.counters["requests"] += 1
+            return 0.0
+
+    def start(self) -> float:
+        """Block until a request slot is reserved; returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            wait = self.try_start()
+            if wait <= 0:
+                return waited
+            with self._lock:
+                # finish() notifies, so freed concurrency is picked up without a full sleep
+                self._lock.wait(timeout=wait)
+            waited += wait
+
+    def finish(self) -> None:
+        """Release a slot reserved by ``start()``/``try_start()``."""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._lock.notify_all()
+
+    # --- feedback ----------------------------------------------------------------------
+
+    def _decrease_locked(self, factor: float, reason: str) -> bool:
+        now = time.monotonic()
+        if now - self._last_decrease < self.decrease_cooldown:
+            return False
+        self._last_decrease = now
+        self.rate = self._clamp_rate(self.rate * factor)
+        self.concurrency = self._clamp_concurrency(self.concurrency * factor)
+        self._window_successes = 0
+        # Re-space from now at the lower rate instead of honouring slots handed out earlier
+        self._next_start = max(self._next_start, now + self.interval)
+        logger.warning(f"AIMD backoff ({reason}): rate={self.rate:.1f} rpm, concurrency={self.concurrency}")
+        return True
+
+    def record_success(self, latency: Optional[float] = None) -> None:
+        """Additive increase after a successful request; ``latency`` is in seconds."""
+        with self._lock:
+            self.counters["successes"] += 1
+            congested = False
+            if latency is not None:
+                self._latency_samples += 1
+                self._latency_ewma = latency if self._latency_ewma is None else 0.8 * self._latency_ewma + 0.2 * latency
+                self._best_latency = latency if self._best_latency is None else min(self._best_latency, latency)
+                congested = (self._latency_samples >= 10
+                             and self._latency_ewma > self.latency_threshold * self._best_latency)
+            if congested:
+                if self._decrease_locked(self.soft_decrease_factor, "latency"):
+                    self.counters["latency_backoffs"] += 1
+            else:
+                self.rate = self._clamp_rate(self.rate + self.additive_increase)
+                self._window_successes += 1
+                if self._window_successes >= self.concurrency:
+                    self._window_successes = 0
+                    self.concurrency = self._clamp_concurrency(self.concurrency + 1)
+                self._good_rate = self.rate
+                self._good_concurrency = self.concurrency
+            self._maybe_flush_locked(time.time())
+
+    def record_throttle(self, retry_after: Optional[float] = None) -> None:
+        """Multiplicative decrease after a 429; honours Retry-After for every caller."""
+        with self._lock:
+            self.counters["throttles"] += 1
+            self._decrease_locked(self.decrease_factor, "429")
+            if retry_after:
+                self._pause_until = max(self._pause_until, time.monotonic() + float(retry_after))
+            self._maybe_flush_locked(time.time())
+
+    def record_server_error(self) -> None:
+        """Multiplicative decrease after a 5xx response."""
+        with self._lock:
+            self.counters["server_errors"] += 1
+            self._decrease_locked(self.soft_decrease_factor, "5xx")
+            self._maybe_flush_locked(time.time())
+
+    def record_timeout(self) -> None:
+        """Multiplicative decrease after a request timed out."""
+        with self._lock:
+            self.counters["timeouts"] += 1
+            self._decrease_locked(self.soft_decrease_factor, "timeout")
+            self._maybe_flush_locked(time.time())
+
+    def stats(self) -> Dict[str, Any]:
+        """Current rate, concurrency and counters since the last metrics snapshot."""
+        with self._lock:
+            return self._snapshot_locked(time.time())
+
+
+_controllers: Dict[str, AIMDController] = {}
+_controllers_lock = threading.Lock()
+
+
+def get_aimd_controller(
+    state_path: Optional[Union[str, Path]] = None,
+    metrics_path: Optional[Union[str, Path]] = None,
+    **kwargs,
+) -> AIMDController:
+    """
+    Return the process-wide controller for ``state_path``, creating it on first use.
+
+    Every client in the process shares it, so concurrency limits apply across worker
+    threads. The state and a final metrics snapshot are flushed at interpreter exit.
+    """
+    key = str(Path(state_path).resolve()) if state_path else ""
+    with _controllers_lock:
+        controller = _controllers.get(key)
+        if controller is None:
+            controller = AIMDController(state_path=state_path, metrics_path=metrics_path, **kwargs)
+            atexit.register(controller.flush)
+            _controllers[key] = controller
+        return controller
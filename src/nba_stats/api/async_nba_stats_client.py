@@ -0,0 +1,324 @@
+"""Asyncio client for the NBA Stats API with bounded request concurrency."""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+import aiohttp
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, before_sleep_log
+
+from .nba_stats_client import NBAStatsClient, EmptyResponseError
+from .rate_limiter import SharedRateLimiter
+from .aimd import AIMDController
+from .cache_store import CacheBackend
+from .single_flight import AsyncSingleFlight
+from .cassette import CassetteRecorder
+from .result_set import loads
+
+logger = logging.getLogger(__name__)
+
+# Endpoint helpers on NBAStatsClient that post-process the response instead of
+# returning make_request() directly. They run on a synchronous client in a worker
+# thread so callers can still await them.
+SYNC_ONLY_METHODS = (
+    "get_teams",
+    "get_schedule",
+    "get_team_dashboard",
+    "get_all_teams",
+    "get_players_with_stats",
+    "get_player_info",
+    "get_player_opponent_shooting_stats",
+)
+
+
+class AsyncNBAStatsClient(NBAStatsClient):
+    """
+    Asyncio variant of NBAStatsClient.
+
+    Endpoint methods are inherited from NBAStatsClient, so ``await client.get_play_by_play(game_id)``
+    builds exactly the same params (and therefore the same cache key) as the synchronous client.
+    At most ``max_in_flight`` requests are kept open at once. Within that cap the AIMD
+    controller sets the actual concurrency and start rate, and tasks wait for a slot
+    without blocking the event loop.
+
+    Usage:
+        async with AsyncNBAStatsClient(max_in_flight=8) as client:
+            responses = await asyncio.gather(*(client.get_play_by_play(g) for g in game_ids))
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 4,
+        requests_per_minute: Optional[int] = None,
+        rate_limiter: Optional[SharedRateLimiter] = None,
+        cache: Optional[CacheBackend] = None,
+        recorder: Optional[CassetteRecorder] = None,
+        controller: Optional[AIMDController] = None
+    ):
+        """
+        Initialize the async client.
+
+        Args:
+            max_in_flight: Maximum number of concurrent upstream requests
+            requests_per_minute: Optional fixed request start rate. Gives this client its own
+                controller pinned to that rate and max_in_flight (no persisted state)
+            rate_limiter: Optional shared limiter (see NBAStatsClient)
+            cache: Optional response cache backend (see NBAStatsClient)
+            recorder: Optional cassette recorder (see NBAStatsClient)
+            controller: Optional AIMD controller (see NBAStatsClient)
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        if controller is None and requests_per_minute:
+            controller = AIMDController(
+                initial_rate=requests_per_minute, min_rate=requests_per_minute, max_rate=requests_per_minute,
+                initial_concurrency=max_in_flight, max_concurrency=max_in_flight
+            )
+        super().__init__(rate_limiter=rate_limiter, cache=cache, recorder=recorder, controller=controller)
+        self.max_in_flight = max_in_flight
+
+        self._aio_session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._sync_client: Optional[NBAStatsClient] = None
+        self._revalidating = set()
+        # Loop of the latest make_request; cache reads run in worker threads and hop back to it
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight = AsyncSingleFlight()
+        self._background_tasks = set()
+
+    async def __aenter__(self) -> "AsyncNBAStatsClient":
+        self._ensure_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def _run_sync_method(self, name: str, *args, **kwargs):
+        """Run a post-processing endpoint helper on a synchronous client in a worker thread."""
+        if self._sync_client is None:
+            self._sync_client = NBAStatsClient(rate_limiter=self.rate_limiter, cache=self.cache,
+                                               recorder=self.recorder, controller=self.controller)
+        method = getattr(self._sync_client, name)
+        return await asyncio.to_thread(method, *args, **kwargs)
+
+    def _schedule_revalidation(self, cache_key: str, endpoint: str, params: Optional[Dict]) -> None:
+        """Refresh a stale cache entry as a task on the client's event loop."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Called from the worker thread of a cache read
+            self._loop.call_soon_threadsafe(self._schedule_revalidation, cache_key, endpoint, params)
+            return
+        if cache_key in self._revalidating:
+            return
+        self._revalidating.add(cache_key)
+        request_params = dict(params) if params is not None else None
+
+        async def _refresh():
+            try:
+                await self.make_request(endpoint, request_params, force_refresh=True)
+            except Exception as e:
+                logger.warning(f"Background refresh of {endpoint} failed: {e}")
+            finally:
+                self._revalidating.discard(cache_key)
+
+        task = asyncio.get_running_loop().create_task(_refresh())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def coalescing_stats(self) -> Dict[str, int]:
+        """Single-flight counters for this client's event loop (see NBAStatsClient.coalescing_stats)."""
+        return self._inflight.stats()
+
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        """Create the aiohttp session and concurrency primitives inside the running loop."""
+        if self._aio_session is None or self._aio_session.closed:
+            self._aio_session = aiohttp.ClientSession(
+                headers=dict(self.session.headers),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=self.max_in_flight),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self._aio_session
+
+    async def close(self) -> None:
+        """Wait for background cache refreshes, then close the underlying aiohttp session."""
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        if self._aio_session is not None and not self._aio_session.closed:
+            await self._aio_session.close()
+        self._aio_session = None
+        if self._sync_client is not None:
+            self._sync_client.session.close()
+            self._sync_client = None
+
+    async def _wait_for_rate_limit_async(self) -> None:
+        """
+        Async counterpart of _wait_for_rate_limit; only the waiting task sleeps.
+
+        The caller must release the controller slot with ``self.controller.finish()``.
+        """
+        while True:
+            wait = self.controller.try_start()
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+        if self.rate_limiter is not None:
+            try:
+                while True:
+                    wait = await asyncio.to_thread(self.rate_limiter.try_acquire)
+                    if wait <= 0:
+                        break
+                    await asyncio.sleep(wait)
+            except BaseException:
+                self.controller.finish()
+                raise
+        self.last_request_time = time.time()
+
+    async def _handle_rate_limit_async(self, status: int, headers) -> None:
+        """
+        Async counterpart of _handle_rate_limit. Records the throttle or server error with the
+        controller and the shared limiter off the event loop; the pause itself is applied by
+        the controller when the next request asks for a slot.
+        """
+        if status == 429:
+            retry_after = int(headers.get("Retry-After", 30))
+            self.consecutive_failures += 1
+            logger.warning(f"Rate limited (429). Pausing new requests for {retry_after} seconds...")
+            await asyncio.to_thread(self.controller.record_throttle, retry_after)
+            if self.rate_limiter is not None:
+                await asyncio.to_thread(self.rate_limiter.record_throttle, retry_after)
+        elif status >= 500:
+            self.consecutive_failures += 1
+            await asyncio.to_thread(self.controller.record_server_error)
+            if self.rate_limiter is not None:
+                await asyncio.to_thread(self.rate_limiter.record_server_error)
+
+    @retry(
+        stop=stop_after_attempt(5),
+        wait=wait_exponential(multiplier=1, min=2, max=30),
+        retry=retry_if_exception_type((aiohttp.ClientError, asyncio.TimeoutError, EmptyResponseError)),
+        before_sleep=before_sleep_log(logger, logging.WARNING)
+    )
+    async def make_request(self, endpoint: str, params: Optional[Dict] = None, force_refresh: bool = False,
+                           allow_empty: bool = False) -> Optional[Dict]:
+        """
+        Make a request to the NBA Stats API without blocking the event loop.
+
+        Shares the on-disk cache and the _assert_response_has_data contract with NBAStatsClient.
+        Cache reads and writes and the limiter bookkeeping run in worker threads.
+
+        Args:
+            endpoint: The API endpoint to call
+            params: Optional query parameters
+            force_refresh: Skip the cache lookup and always fetch from upstream
+            allow_empty: An answer without rows is valid and is not retried
+
+        Returns:
+            Dict containing the API response or None if the request failed.
+            Raises tenacity.RetryError once throttling/server/empty-response retries are exhausted.
+        """
+        cache_key = self._get_cache_key(endpoint, params)
+        self._loop = asyncio.get_running_loop()
+        if not force_refresh:
+            cached_data = await asyncio.to_thread(self._read_from_cache, cache_key, endpoint, params)
+            self.telemetry.record_request(endpoint, cache_hit=bool(cached_data))
+            if cached_data:
+                self._record_interaction(endpoint, params, cached_data)
+                return cached_data
+        else:
+            self.telemetry.record_request(endpoint)
+
+        data = await self._inflight.do(
+            cache_key, lambda: self._fetch_from_upstream_async(cache_key, endpoint, params, allow_empty)
+        )
+        if data:
+            self._record_interaction(endpoint, params, data)
+        return data
+
+    async def _fetch_from_upstream_async(self, cache_key: str, endpoint: str, params: Optional[Dict],
+                                         allow_empty: bool = False) -> Optional[Dict]:
+        """Issue the HTTP request for make_request and cache a valid response."""
+        url = f"{self.base_url.rstrip('/')}/{endpoint.lstrip('/')}"
+        session = self._ensure_session()
+
+        if params is None:
+            params = {}
+        if 'LeagueID' not in params:
+            params['LeagueID'] = '00'
+        # aiohttp only accepts str/int/float query values
+        query = {k: ("" if v is None else v) for k, v in params.items()}
+
+        async with self._semaphore:
+            wait_started = time.monotonic()
+            try:
+                await self._wait_for_rate_limit_async()
+            finally:
+                self.telemetry.record_phase(endpoint, "sleep", time.monotonic() - wait_started)
+
+            body = b""
+            succeeded = False
+            try:
+                logger.info(f"Making async request to {url} with params: {params}")
+                started = time.monotonic()
+                try:
+                    async with session.get(url, params=query, allow_redirects=True) as response:
+                        logger.info(f"Received response with status code: {response.status}")
+                        await self._handle_rate_limit_async(response.status, response.headers)
+                        if response.status == 429:
+                            self.telemetry.record_retry(endpoint, "throttle")
+                        elif response.status >= 500:
+                            self.telemetry.record_retry(endpoint, "server_error")
+                        response.raise_for_status()
+                        body = await response.read()
+                finally:
+                    latency = time.monotonic() - started
+                    self.telemetry.record_phase(endpoint, "network", latency)
+
+                parse_started = time.monotonic()
+                try:
+                    data = loads(body)
+                    self._assert_response_has_data(data, endpoint, allow_empty)
+                except EmptyResponseError:
+                    self.telemetry.record_retry(endpoint, "empty_response")
+                    raise
+                finally:
+                    self.telemetry.record_phase(endpoint, "parse", time.monotonic() - parse_started)
+
+                await asyncio.to_thread(self._update_request_success, latency)
+                succeeded = True
+                await asyncio.to_thread(self._write_to_cache, cache_key, data, endpoint, params)
+                return data
+
+            except asyncio.TimeoutError:
+                self.consecutive_failures += 1
+                self.telemetry.record_retry(endpoint, "timeout")
+                await asyncio.to_thread(self.controller.record_timeout)
+                raise
+            except aiohttp.ClientResponseError as e:
+                self.consecutive_failures += 1
+                if e.status == 429 or e.status >= 500:
+                    # Let tenacity retry throttling and server errors
+                    raise
+                logger.error(f"Failed to make request to {endpoint}: {e}")
+                return None
+            except aiohttp.ClientConnectionError:
+                self.consecutive_failures += 1
+                self.telemetry.record_retry(endpoint, "connection")
+                raise
+            finally:
+                self.telemetry.record_upstream(endpoint, len(body), failed=not succeeded)
+                self.controller.finish()
+
+
+def _make_sync_delegate(name: str):
+    async def _delegate(self, *args, **kwargs):
+        return await self._run_sync_method(name, *args, **kwargs)
+    _delegate.__name__ = name
+    _delegate.__doc__ = getattr(NBAStatsClient, name).__doc__
+    return _delegate
+
+
+for _method_name in SYNC_ONLY_METHODS:
+    setattr(AsyncNBAStatsClient, _method_name, _make_sync_delegate(_method_name))
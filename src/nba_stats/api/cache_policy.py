@@ -0,0 +1,159 @@
+"""Per-endpoint cache TTL policy for NBAStatsClient.
+
+Data for a finished game or a completed season never changes, so those responses are
+cached forever. Everything else gets an endpoint-specific TTL plus a stale-while-revalidate
+window during which a stale entry is served immediately and refreshed in the background.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    Freshness rules for one class of cached responses.
+
+    Attributes:
+        ttl: How long an entry is fresh. None means it never expires.
+        stale_while_revalidate: How long past ``ttl`` a stale entry may still be served
+            while a background refresh runs. Zero disables stale serving.
+    """
+    ttl: Optional[timedelta]
+    stale_while_revalidate: timedelta = timedelta(0)
+
+
+NEVER_EXPIRES = CachePolicy(ttl=None)
+DEFAULT_LIVE_POLICY = CachePolicy(ttl=timedelta(days=1), stale_while_revalidate=timedelta(days=1))
+
+# endpoint -> (policy once the game/season is final, policy while it is still in progress)
+CACHE_TTL_POLICIES: Dict[str, Dict[str, CachePolicy]] = {
+    "playbyplayv2": {
+        "final": NEVER_EXPIRES,
+        "live": CachePolicy(ttl=timedelta(minutes=15), stale_while_revalidate=timedelta(hours=1)),
+    },
+    "shotchartdetail": {
+        "final": NEVER_EXPIRES,
+        "live": CachePolicy(ttl=timedelta(hours=12), stale_while_revalidate=timedelta(days=1)),
+    },
+    "leaguegamelog": {
+        "final": NEVER_EXPIRES,
+        "live": CachePolicy(ttl=timedelta(hours=3), stale_while_revalidate=timedelta(hours=12)),
+    },
+    "commonallplayers": {
+        "final": NEVER_EXPIRES,
+        "live": CachePolicy(ttl=timedelta(days=1), stale_while_revalidate=timedelta(days=2)),
+    },
+    "commonplayerinfo": {
+        "final": CachePolicy(ttl=timedelta(weeks=1), stale_while_revalidate=timedelta(weeks=1)),
+        "live": CachePolicy(ttl=timedelta(weeks=1), stale_while_revalidate=timedelta(weeks=1)),
+    },
+    "draftcombineplayeranthro": {"final": NEVER_EXPIRES, "live": NEVER_EXPIRES},
+    "draftcombinestats": {"final": NEVER_EXPIRES, "live": NEVER_EXPIRES},
+}
+
+# League/team/player dashboards share one rule: immutable for completed seasons,
+# a few hours for the current season.
+DASHBOARD_PREFIXES = ("leaguedash", "leaguehustle", "playerdash", "teamdash")
+DASHBOARD_POLICIES = {
+    "final": NEVER_EXPIRES,
+    "live": CachePolicy(ttl=timedelta(hours=6), stale_while_revalidate=timedelta(days=1)),
+}
+
+# EVENTMSGTYPE for "end of period" in playbyplayv2
+END_OF_PERIOD_EVENT = 13
+
+
+def normalize_endpoint(endpoint: str) -> str:
+    return endpoint.strip("/").lower()
+
+
+def season_is_final(season: str, today: Optional[date] = None) -> bool:
+    """A 'YYYY-YY' season is final once the following July has started (after the Finals)."""
+    try:
+        start_year = int(season[:4])
+    except (TypeError, ValueError):
+        return False
+    today = today or date.today()
+    return today >= date(start_year + 1, 7, 1)
+
+
+def season_from_game_id(game_id: str) -> Optional[str]:
+    """Derive 'YYYY-YY' from a stats.nba.com GameID such as '0022300001'."""
+    game_id = str(game_id)
+    if len(game_id) < 5 or not game_id[3:5].isdigit():
+        return None
+    start_year = 2000 + int(game_id[3:5])
+    return f"{start_year}-{str(start_year + 1)[-2:]}"
+
+
+def _last_score_margin(headers, rows) -> Optional[str]:
+    """The most recent non-empty SCOREMARGIN in a play-by-play row set (only scoring events carry one)."""
+    if "SCOREMARGIN" not in headers:
+        return None
+    column = headers.index("SCOREMARGIN")
+    for row in reversed(rows):
+        margin = row[column]
+        if margin not in (None, ""):
+            return str(margin).strip().upper()
+    return None
+
+
+def _pbp_is_final(data: Optional[Dict[str, Any]]) -> bool:
+    """
+    A play-by-play payload is final when its last event ends the 4th period or an overtime
+    and the score is not tied at that point; a tie means another overtime follows.
+    """
+    try:
+        result_set = data["resultSets"][0]
+        headers = result_set["headers"]
+        rows = result_set["rowSet"]
+        last_event = rows[-1]
+        event_type = last_event[headers.index("EVENTMSGTYPE")]
+        period = last_event[headers.index("PERIOD")]
+    except (KeyError, IndexError, TypeError, ValueError):
+        return False
+    if event_type != END_OF_PERIOD_EVENT or period < 4:
+        return False
+    margin = _last_score_margin(headers, rows)
+    return margin is not None and margin not in ("TIE", "0")
+
+
+def is_final(endpoint: str, params: Optional[Dict[str, Any]], data: Optional[Dict[str, Any]] = None,
+             today: Optional[date] = None) -> bool:
+    """Whether the response for ``endpoint``/``params`` can no longer change upstream."""
+    params = params or {}
+    season = params.get("Season") or params.get("SeasonYear")
+    game_id = params.get("GameID")
+    if not season and game_id:
+        season = season_from_game_id(game_id)
+    if season and season_is_final(str(season), today):
+        return True
+    if game_id and normalize_endpoint(endpoint) == "playbyplayv2":
+        return _pbp_is_final(data)
+    return False
+
+
+def policy_for(endpoint: str, params: Optional[Dict[str, Any]], data: Optional[Dict[str, Any]] = None,
+               today: Optional[date] = None) -> CachePolicy:
+    """Look up the cache policy for a request, given the cached payload if available."""
+    name = normalize_endpoint(endpoint)
+    policies = CACHE_TTL_POLICIES.get(name)
+    if policies is None and name.startswith(DASHBOARD_PREFIXES):
+        policies = DASHBOARD_POLICIES
+    if policies is None:
+        return NEVER_EXPIRES if is_final(endpoint, params, data, today) else DEFAULT_LIVE_POLICY
+    return policies["final"] if is_final(endpoint, params, data, today) else policies["live"]
+
+
+def classify_entry(policy: CachePolicy, fetched_at: datetime, now: Optional[datetime] = None) -> str:
+    """Classify a cached entry as 'fresh', 'stale' (serve and revalidate) or 'expired'."""
+    if policy.ttl is None:
+        return "fresh"
+    age = (now or datetime.now()) - fetched_at
+    if age < policy.ttl:
+        return "fresh"
+    if age < policy.ttl + policy.stale_while_revalidate:
+        return "stale"
+    return "expired"
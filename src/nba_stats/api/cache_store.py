@@ -0,0 +1,370 @@
+"""Pluggable response cache backends for NBAStatsClient.
+
+Two backends share one interface, keyed by the md5 request hash the client has always used:
+
+* ``FileCacheBackend`` — the original layout, one ``<hash>.json`` file per request.
+* ``SQLiteCacheBackend`` — a single SQLite file holding zlib-compressed payloads with
+  endpoint/params/fetched_at/size metadata, LRU eviction under a byte budget and
+  persisted hit/miss counters.
+
+Because both use the same key, ``SQLiteCacheBackend.import_file_cache`` can migrate an
+existing ``.cache`` directory without re-fetching anything.
+"""
+
+import atexit
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from ..config import settings
+from .result_set import loads
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """A cached API payload and when it was fetched (epoch seconds)."""
+    data: Dict[str, Any]
+    fetched_at: float
+    endpoint: Optional[str] = None
+
+
+class CacheBackend(ABC):
+    """Interface implemented by every response cache backend."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        ...
+
+    @abstractmethod
+    def put(self, key: str, data: Dict[str, Any], endpoint: Optional[str] = None,
+            params: Optional[Dict] = None) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class FileCacheBackend(CacheBackend):
+    """One JSON file per request under ``cache_dir`` (the legacy layout)."""
+
+    def __init__(self, cache_dir: Union[str, Path]):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        path = self._path(key)
+        try:
+            fetched_at = path.stat().st_mtime
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CacheEntry(data=data, fetched_at=fetched_at)
+
+    def put(self, key: str, data: Dict[str, Any], endpoint: Optional[str] = None,
+            params: Optional[Dict] = None) -> None:
+        with open(self._path(key), 'w') as f:
+            json.dump(data, f)
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        files = list(self.cache_dir.glob("*.json"))
+        lookups = self.hits + self.misses
+        return {
+            "backend": "file",
+            "location": str(self.cache_dir),
+            "entries": len(files),
+            "payload_bytes": sum(f.stat().st_size for f in files),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Single-file, compressed, size-bounded cache store.
+
+    Payloads are stored zlib-compressed. Hits refresh ``last_accessed`` and the hit/miss
+    counters in memory; they are written back in one transaction once
+    ``access_flush_entries`` keys are pending or ``access_flush_seconds`` have passed, and
+    before every write, eviction, stats() and close(), so a lookup is a single read. Every
+    write evicts least-recently-used entries until the compressed total fits ``max_bytes``.
+    Triggers keep that total in ApiCacheCounters, so the budget check is a key lookup rather
+    than a scan. The connection is shared across threads behind a lock; WAL mode and a busy
+    timeout let several ingestion processes use the same store.
+    """
+
+    def __init__(self, db_path: Union[str, Path], max_bytes: Optional[int] = None,
+                 compression_level: int = 6,
+                 access_flush_entries: int = settings.CACHE_ACCESS_FLUSH_ENTRIES,
+                 access_flush_seconds: float = settings.CACHE_ACCESS_FLUSH_SECONDS):
+        self.db_path = Path(db_path)
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+        self.access_flush_entries = max(1, access_flush_entries)
+        self.access_flush_seconds = access_flush_seconds
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # Hits not written back yet: last access per key, and counter increments
+        self._accessed: Dict[str, float] = {}
+        self._counts: Dict[str, int] = {}
+        self._last_flush = time.monotonic()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS ApiCache (
+                cache_key TEXT PRIMARY KEY,
+                endpoint TEXT,
+                params TEXT,
+                fetched_at REAL NOT NULL,
+                last_accessed REAL NOT NULL,
+                size INTEGER NOT NULL,
+                raw_size INTEGER NOT NULL,
+                payload BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_api_cache_last_accessed ON ApiCache(last_accessed);
+            CREATE INDEX IF NOT EXISTS idx_api_cache_endpoint ON ApiCache(endpoint);
+            CREATE TABLE IF NOT EXISTS ApiCacheCounters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL DEFAULT 0
+            );
+        """)
+        # Running payload total; seeded in the transaction that adds the triggers, so a store
+        # created before they existed is summed exactly once
+        self._conn.executescript("""
+            BEGIN IMMEDIATE;
+            INSERT OR IGNORE INTO ApiCacheCounters (name, value)
+                SELECT 'payload_bytes', COALESCE(SUM(size), 0) FROM ApiCache;
+            CREATE TRIGGER IF NOT EXISTS api_cache_size_insert AFTER INSERT ON ApiCache BEGIN
+                UPDATE ApiCacheCounters SET value = value + NEW.size WHERE name = 'payload_bytes';
+            END;
+            CREATE TRIGGER IF NOT EXISTS api_cache_size_update AFTER UPDATE OF size ON ApiCache BEGIN
+                UPDATE ApiCacheCounters SET value = value + NEW.size - OLD.size WHERE name = 'payload_bytes';
+            END;
+            CREATE TRIGGER IF NOT EXISTS api_cache_size_delete AFTER DELETE ON ApiCache BEGIN
+                UPDATE ApiCacheCounters SET value = value - OLD.size WHERE name = 'payload_bytes';
+            END;
+            COMMIT;
+        """)
+        atexit.register(self.flush)
+
+    def _bump(self, name: str) -> None:
+        self._counts[name] = self._counts.get(name, 0) + 1
+
+    def _flush_locked(self) -> None:
+        if self._accessed:
+            # A put may have refreshed the entry since; never move last_accessed backwards
+            self._conn.executemany(
+                "UPDATE ApiCache SET last_accessed = MAX(last_accessed, ?) WHERE cache_key = ?",
+                [(accessed, key) for key, accessed in self._accessed.items()]
+            )
+        self._conn.executemany(
+            "INSERT INTO ApiCacheCounters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", list(self._counts.items())
+        )
+        self._accessed.clear()
+        self._counts.clear()
+        self._last_flush = time.monotonic()
+
+    def flush(self) -> None:
+        """Write pending access times and hit/miss counts back to the store."""
+        with self._lock:
+            self._flush_locked()
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, fetched_at, endpoint FROM ApiCache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._bump("misses")
+            else:
+                self._accessed[key] = time.time()
+                self._bump("hits")
+            if len(self._accessed) >= self.access_flush_entries \
+                    or time.monotonic() - self._last_flush >= self.access_flush_seconds:
+                self._flush_locked()
+                self._conn.commit()
+        if row is None:
+            return None
+        payload, fetched_at, endpoint = row
+        return CacheEntry(data=loads(zlib.decompress(payload)), fetched_at=fetched_at, endpoint=endpoint)
+
+    def put(self, key: str, data: Dict[str, Any], endpoint: Optional[str] = None,
+            params: Optional[Dict] = None, fetched_at: Optional[float] = None) -> None:
+        raw = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        payload = zlib.compress(raw, self.compression_level)
+        now = time.time()
+        with self._lock:
+            self._flush_locked()
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete would skip the size trigger
+            self._conn.execute(
+                "INSERT INTO ApiCache "
+                "(cache_key, endpoint, params, fetched_at, last_accessed, size, raw_size, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(cache_key) DO UPDATE SET endpoint = excluded.endpoint, params = excluded.params, "
+                "fetched_at = excluded.fetched_at, last_accessed = excluded.last_accessed, size = excluded.size, "
+                "raw_size = excluded.raw_size, payload = excluded.payload",
+                (key, endpoint, json.dumps(params, sort_keys=True) if params is not None else None,
+                 fetched_at if fetched_at is not None else now, now, len(payload), len(raw), payload)
+            )
+            if self.max_bytes is not None:
+                self._evict_locked(self.max_bytes)
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM ApiCache WHERE cache_key = ?", (key,))
+            self._conn.commit()
+
+    def _evict_locked(self, max_bytes: int) -> int:
+        total = self._conn.execute("SELECT value FROM ApiCacheCounters WHERE name = 'payload_bytes'").fetchone()[0]
+        if total <= max_bytes:
+            return 0
+        evicted = 0
+        cursor = self._conn.execute("SELECT cache_key, size FROM ApiCache ORDER BY last_accessed ASC")
+        victims = []
+        for cache_key, size in cursor:
+            if total <= max_bytes:
+                break
+            victims.append((cache_key,))
+            total -= size
+            evicted += 1
+        self._conn.executemany("DELETE FROM ApiCache WHERE cache_key = ?", victims)
+        if evicted:
+            self._conn.execute(
+                "INSERT INTO ApiCacheCounters (name, value) VALUES ('evictions', ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", (evicted,)
+            )
+            logger.info(f"Evicted {evicted} cache entries to stay under {max_bytes} bytes")
+        return evicted
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """Evict LRU entries until the store fits ``max_bytes`` (defaults to the configured budget)."""
+        budget = max_bytes if max_bytes is not None else self.max_bytes
+        if budget is None:
+            return 0
+        with self._lock:
+            self._flush_locked()
+            evicted = self._evict_locked(budget)
+            self._conn.commit()
+        return evicted
+
+    def vacuum(self) -> None:
+        """Reclaim free pages after evictions."""
+        with self._lock:
+            self._conn.execute("VACUUM")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._flush_locked()
+            self._conn.commit()
+            entries, size, raw_size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(raw_size), 0) FROM ApiCache"
+            ).fetchone()
+            counters = dict(self._conn.execute("SELECT name, value FROM ApiCacheCounters").fetchall())
+            by_endpoint = self._conn.execute(
+                "SELECT COALESCE(endpoint, '(imported)'), COUNT(*), SUM(size) FROM ApiCache "
+                "GROUP BY endpoint ORDER BY SUM(size) DESC"
+            ).fetchall()
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        lookups = hits + misses
+        return {
+            "backend": "sqlite",
+            "location": str(self.db_path),
+            "entries": entries,
+            "payload_bytes": size,
+            "uncompressed_bytes": raw_size,
+            "file_bytes": self.db_path.stat().st_size if self.db_path.exists() else 0,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "evictions": counters.get("evictions", 0),
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "by_endpoint": [
+                {"endpoint": endpoint, "entries": count, "payload_bytes": total}
+                for endpoint, count, total in by_endpoint
+            ],
+        }
+
+    def import_file_cache(self, cache_dir: Union[str, Path], delete_files: bool = False) -> int:
+        """
+        Import a legacy ``<hash>.json`` cache directory.
+
+        The file stem is already the request hash, so imported entries are found by the same
+        lookups. The file mtime becomes ``fetched_at`` so expiry keeps working.
+
+        Returns:
+            Number of entries imported.
+        """
+        imported = 0
+        for path in sorted(Path(cache_dir).glob("*.json")):
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Skipping unreadable cache file {path}: {e}")
+                continue
+            self.put(path.stem, data, fetched_at=path.stat().st_mtime)
+            imported += 1
+            if delete_files:
+                path.unlink()
+        logger.info(f"Imported {imported} cache files from {cache_dir} into {self.db_path}")
+        return imported
+
+    def close(self) -> None:
+        atexit.unregister(self.flush)
+        with self._lock:
+            self._flush_locked()
+            self._conn.commit()
+            self._conn.close()
+
+
+_backends: Dict[str, CacheBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_cache_backend(kind: str, location: Union[str, Path], max_bytes: Optional[int] = None) -> CacheBackend:
+    """Return the process-wide cache backend of ``kind`` ('sqlite' or 'file') at ``location``."""
+    key = f"{kind}:{Path(location).resolve()}"
+    with _backends_lock:
+        backend = _backends.get(key)
+        if backend is None:
+            if kind == "sqlite":
+                backend = SQLiteCacheBackend(location, max_bytes=max_bytes)
+            elif kind == "file":
+                backend = FileCacheBackend(location)
+            else:
+                raise ValueError(f"Unknown cache backend: {kind}")
+            _backends[key] = backend
+        return backend
@@ -0,0 +1,81 @@
+"""HTTP cassettes: recorded (endpoint, params) -> response pairs for offline replay.
+
+A cassette is a gzip-compressed JSON Lines file. NBAStatsClient appends one line per
+response while recording; the stand-in server (``standin_server.py``) loads the file and
+replays the responses, so ingestion can be benchmarked without stats.nba.com.
+"""
+
+import gzip
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+def canonical_request(endpoint: str, params: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+    """
+    Normalize a request the way it appears on the wire.
+
+    requests drops None-valued params and sends everything else as strings, so a
+    recorded request and the query string the server receives map to the same key.
+    """
+    name = endpoint.strip("/").lower()
+    query = {str(k): str(v) for k, v in (params or {}).items() if v is not None}
+    return name, json.dumps(query, sort_keys=True)
+
+
+class CassetteRecorder:
+    """Appends responses to a cassette file; safe to share between threads."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._seen = set()
+        self.recorded = 0
+
+    def record(self, endpoint: str, params: Optional[Dict[str, Any]], response: Dict[str, Any],
+               status: int = 200) -> None:
+        key = canonical_request(endpoint, params)
+        with self._lock:
+            if key in self._seen:
+                return
+            self._seen.add(key)
+            line = json.dumps({
+                "endpoint": key[0],
+                "params": json.loads(key[1]),
+                "status": status,
+                "response": response,
+            }, separators=(',', ':'))
+            # Each append is a separate gzip member; gzip readers concatenate them
+            with gzip.open(self.path, 'at', encoding='utf-8') as f:
+                f.write(line + "\n")
+            self.recorded += 1
+
+
+class Cassette:
+    """In-memory view of a cassette file for replay."""
+
+    def __init__(self, interactions: Dict[Tuple[str, str], Dict[str, Any]]):
+        self.interactions = interactions
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "Cassette":
+        interactions = {}
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                interactions[canonical_request(entry["endpoint"], entry["params"])] = entry
+        logger.info(f"Loaded {len(interactions)} interactions from cassette {path}")
+        return cls(interactions)
+
+    def lookup(self, endpoint: str, params: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        return self.interactions.get(canonical_request(endpoint, params))
+
+    def __len__(self) -> int:
+        return len(self.interactions)
@@ -11,8 +11,20 @@ from urllib3.util.retry import Retry
 import hashlib
 import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 
+from ..config import settings
+from .rate_limiter import SharedRateLimiter, get_shared_rate_limiter
+from .aimd import AIMDController, get_aimd_controller
+from .cache_store import CacheBackend, get_cache_backend
+from .cache_policy import policy_for, classify_entry
+from .single_flight import SingleFlight
+from .cassette import CassetteRecorder
+from .telemetry import ClientTelemetry, get_client_telemetry
+
 # Add tenacity for advanced retry logic
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, before_sleep_log
 
@@ -29,15 +41,73 @@ class UpstreamDataMissingError(Exception):
 logger = logging.getLogger(__name__)
 
 CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache"
-CACHE_EXPIRATION = timedelta(days=1)
+CACHE_EXPIRATION = timedelta(days=1)  # Default TTL for in-progress data; see cache_policy
+
+# Background refreshes for stale-while-revalidate cache hits, shared by all clients
+_revalidation_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-revalidate")
+_revalidating_keys = set()
+_revalidating_lock = threading.Lock()
+
+# Concurrent cache misses for the same request share one upstream call across all clients
+_inflight_requests = SingleFlight()
+
+_cassette_recorders: Dict[str, CassetteRecorder] = {}
+_cassette_recorders_lock = threading.Lock()
+
+# Cached in-progress data fetched before this time (epoch seconds) is a miss for every client;
+# see refetch_live_data_since
+_live_data_cutoff: Optional[float] = None
+
+
+@contextmanager
+def refetch_live_data_since(cutoff: float):
+    """
+    Within the block, cached responses that can still change upstream (anything whose
+    policy has a TTL) are only served when fetched at or after ``cutoff``; older ones are
+    refetched instead of being served fresh or stale. Final data is unaffected, and an
+    entry refetched inside the block is then served normally.
+    """
+    global _live_data_cutoff
+    previous, _live_data_cutoff = _live_data_cutoff, cutoff
+    try:
+        yield
+    finally:
+        _live_data_cutoff = previous
+
+
+def _get_cassette_recorder(path: str) -> CassetteRecorder:
+    """Return the process-wide recorder for a cassette path."""
+    with _cassette_recorders_lock:
+        if path not in _cassette_recorders:
+            _cassette_recorders[path] = CassetteRecorder(path)
+        return _cassette_recorders[path]
 
 
 class NBAStatsClient:
     """Client for making requests to the NBA Stats API."""
     
-    def __init__(self):
-        """Initialize the NBA Stats API client."""
-        self.base_url = "https://stats.nba.com/stats"
+    def __init__(
+        self,
+        rate_limiter: Optional[SharedRateLimiter] = None,
+        cache: Optional[CacheBackend] = None,
+        recorder: Optional[CassetteRecorder] = None,
+        controller: Optional[AIMDController] = None
+    ):
+        """
+        Initialize the NBA Stats API client.
+
+        Args:
+            rate_limiter: Optional limiter shared with other clients. When omitted and
+                settings.USE_SHARED_RATE_LIMITER is set, the host-wide limiter is used so
+                every client and process draws from one requests-per-minute budget.
+            cache: Optional response cache backend. Defaults to the backend selected by
+                settings.CACHE_BACKEND ("sqlite" store or legacy "file" directory).
+            recorder: Optional cassette recorder. Defaults to one writing to
+                settings.RECORD_CASSETTE_PATH when that is set.
+            controller: Optional AIMD controller pacing request starts and concurrency.
+                Defaults to the process-wide controller configured by settings.AIMD_*.
+        """
+        self.base_url = settings.API_BASE_URL
         self.session = requests.Session()
         
         # Configure retry strategy with exponential backoff and jitter
@@ -72,26 +142,50 @@ class NBAStatsClient:
             'sec-ch-ua-platform': '"macOS"'
         })
         
-        # Rate limiting parameters
-        self.requests_per_minute = 100
-        self.request_interval = 60.0 / self.requests_per_minute
+        # Request bookkeeping; pacing itself is done by the AIMD controller
         self.last_request_time = 0.0
-        self.min_request_interval = 5.0  # Minimum time between requests in seconds
-
-        # Adaptive rate limiting state
         self.consecutive_failures = 0
-        self.consecutive_rate_limits = 0
         self.last_successful_request = time.time()
-        self.adaptive_mode = False
 
         # Global timeout for all requests
         self.timeout = 60 # Sensible default timeout
 
-        # Ensure cache directory exists
-        CACHE_DIR.mkdir(exist_ok=True)
+        if rate_limiter is None and settings.USE_SHARED_RATE_LIMITER:
+            rate_limiter = get_shared_rate_limiter(
+                settings.RATE_LIMITER_DB_PATH,
+                requests_per_minute=settings.SHARED_REQUESTS_PER_MINUTE,
+                burst=settings.SHARED_RATE_LIMITER_BURST
+            )
+        self.rate_limiter = rate_limiter
+
+        if controller is None:
+            controller = get_aimd_controller(
+                state_path=settings.AIMD_STATE_PATH,
+                metrics_path=settings.AIMD_METRICS_LOG_PATH,
+                initial_rate=settings.AIMD_INITIAL_REQUESTS_PER_MINUTE,
+                min_rate=settings.AIMD_MIN_REQUESTS_PER_MINUTE,
+                max_rate=settings.AIMD_MAX_REQUESTS_PER_MINUTE,
+                max_concurrency=settings.AIMD_MAX_CONCURRENCY
+            )
+        self.controller = controller
+
+        if cache is None:
+            if settings.CACHE_BACKEND == "file":
+                cache = get_cache_backend("file", CACHE_DIR)
+            else:
+                cache = get_cache_backend(settings.CACHE_BACKEND, settings.CACHE_DB_PATH,
+                                          max_bytes=settings.CACHE_MAX_BYTES)
+        self.cache = cache
+
+        if recorder is None and settings.RECORD_CASSETTE_PATH:
+            recorder = _get_cassette_recorder(settings.RECORD_CASSETTE_PATH)
+        self.recorder = recorder
+
+        # Process-wide, so the many short-lived clients created by populators add up
+        self.telemetry: ClientTelemetry = get_client_telemetry()
     
-    def _get_cache_path(self, endpoint: str, params: Optional[Dict]) -> Path:
-        """Generate a unique file path for caching based on endpoint and params."""
+    def _get_cache_key(self, endpoint: str, params: Optional[Dict]) -> str:
+        """Generate a unique cache key based on endpoint and params."""
         hasher = hashlib.md5()
         # Use a consistent representation of params for hashing
         if params:
@@ -101,50 +195,111 @@ class NBAStatsClient:
         # Include endpoint in the hash to avoid collisions for same params on different endpoints
         hasher.update(endpoint.encode('utf-8'))
         
-        return CACHE_DIR / f"{hasher.hexdigest()}.json"
-
-    def _read_from_cache(self, cache_path: Path) -> Optional[Dict]:
-        """Read data from cache if it exists and is not expired."""
-        if cache_path.exists():
-            modified_time = datetime.fromtimestamp(cache_path.stat().st_mtime)
-            if datetime.now() - modified_time < CACHE_EXPIRATION:
-                logger.info(f"Cache hit. Reading from {cache_path}")
-                with open(cache_path, 'r') as f:
-                    return json.load(f)
-        logger.info(f"Cache miss for {cache_path}")
+        return hasher.hexdigest()
+
+    def _get_cache_path(self, endpoint: str, params: Optional[Dict]) -> Path:
+        """Path of the legacy one-file-per-request cache entry for endpoint and params."""
+        return CACHE_DIR / f"{self._get_cache_key(endpoint, params)}.json"
+
+    def _read_from_cache(self, cache_key: str, endpoint: Optional[str] = None,
+                         params: Optional[Dict] = None, revalidate: bool = True) -> Optional[Dict]:
+        """
+        Read data from cache if it is still usable under the endpoint's TTL policy.
+
+        Fresh entries are returned as-is. Stale entries inside the policy's
+        stale-while-revalidate window are returned immediately and refreshed in the
+        background (when ``revalidate`` is set). Anything older is a miss, as is
+        in-progress data fetched before a ``refetch_live_data_since`` cutoff.
+        """
+        entry = self.cache.get(cache_key)
+        if entry is not None:
+            # Finality describes the payload, so judge it as of the day it was fetched.
+            fetched_at = datetime.fromtimestamp(entry.fetched_at)
+            policy = policy_for(endpoint if endpoint is not None else entry.endpoint or "",
+                                params, entry.data, today=fetched_at.date())
+            state = classify_entry(policy, fetched_at)
+            if policy.ttl is not None and _live_data_cutoff is not None and entry.fetched_at < _live_data_cutoff:
+                state = "expired"
+            if state == "fresh":
+                logger.info(f"Cache hit for {cache_key}")
+                return entry.data
+            if state == "stale" and revalidate and endpoint is not None:
+                logger.info(f"Stale cache hit for {cache_key}; refreshing in background")
+                self._schedule_revalidation(cache_key, endpoint, params)
+                return entry.data
+        logger.info(f"Cache miss for {cache_key}")
         return None
 
-    def _write_to_cache(self, cache_path: Path, data: Dict):
+    def _schedule_revalidation(self, cache_key: str, endpoint: str, params: Optional[Dict]) -> None:
+        """Refresh a stale cache entry on a background thread, at most once per key at a time."""
+        with _revalidating_lock:
+            if cache_key in _revalidating_keys:
+                return
+            _revalidating_keys.add(cache_key)
+
+        request_params = dict(params) if params is not None else None
+
+        def _refresh():
+            try:
+                self.make_request(endpoint, request_params, force_refresh=True)
+            except Exception as e:
+                logger.warning(f"Background refresh of {endpoint} failed: {e}")
+            finally:
+                with _revalidating_lock:
+                    _revalidating_keys.discard(cache_key)
+
+        _revalidation_executor.submit(_refresh)
+
+    def _write_to_cache(self, cache_key: str, data: Dict, endpoint: Optional[str] = None,
+                        params: Optional[Dict] = None):
         """Write data to the cache."""
-        logger.info(f"Writing to cache: {cache_path}")
-        with open(cache_path, 'w') as f:
-            json.dump(data, f)
+        logger.info(f"Writing to cache: {cache_key}")
+        self.cache.put(cache_key, data, endpoint=endpoint, params=params)
             
+    def coalescing_stats(self) -> Dict[str, int]:
+        """
+        Counters for single-flight request coalescing in this process.
+
+        ``upstream_calls`` are cache misses that went to the network; ``coalesced_calls``
+        are misses that waited on an identical in-flight request instead (calls saved).
+        """
+        return _inflight_requests.stats()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of client telemetry for every endpoint called in this process.
+
+        Includes per-endpoint request/cache/upstream counts, retries by cause, payload
+        bytes and sleep/network/parse latency histograms, plus the request coalescing
+        counters and the AIMD controller's current rate.
+        """
+        snapshot = self.telemetry.snapshot()
+        snapshot["coalescing"] = self.coalescing_stats()
+        snapshot["rate_controller"] = self.controller.stats()
+        return snapshot
+
     def _setup_session(self):
         """Set up the session with required headers and retry strategy."""
         self.session.headers.update(self.session.headers)
     
     def _wait_for_rate_limit(self):
-        """Ensure we don't exceed rate limits by waiting between requests."""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-
-        # Adaptive rate limiting based on recent failures
-        if self.adaptive_mode:
-            adaptive_interval = self.min_request_interval * (2 ** min(self.consecutive_failures, 3))
-            min_interval = max(adaptive_interval, self.min_request_interval)
-        else:
-            min_interval = self.min_request_interval
-
-        if time_since_last_request < min_interval:
-            sleep_time = min_interval - time_since_last_request
-            logger.debug(f"Adaptive rate limiting: waiting {sleep_time:.1f}s (consecutive failures: {self.consecutive_failures})")
-            time.sleep(sleep_time)
-
-        # Add a random jitter to the request interval
-        jitter = random.uniform(0.5, 1.5)
-        time.sleep(jitter)
+        """
+        Reserve a request slot from the AIMD controller, then a token from the shared limiter.
 
+        The controller paces this process at its current rate and concurrency; the shared
+        token bucket (when enabled) keeps the host-wide ceiling across processes. On return
+        the caller must release the slot with ``self.controller.finish()``; if the limiter
+        raises (e.g. TimeoutError), the slot has already been released.
+        """
+        waited = self.controller.start()
+        if waited > 0:
+            logger.debug(f"AIMD pacing: waited {waited:.2f}s (rate={self.controller.rate:.1f} rpm)")
+        if self.rate_limiter is not None:
+            try:
+                self.rate_limiter.acquire()
+            except BaseException:
+                self.controller.finish()
+                raise
         self.last_request_time = time.time()
     
     def _get_headers(self) -> Dict[str, str]:
@@ -171,34 +326,25 @@ class NBAStatsClient:
         """Handle rate limiting by waiting for the specified time."""
         if response.status_code == 429:  # Too Many Requests
             retry_after = int(response.headers.get("Retry-After", 30))
-            self.consecutive_rate_limits += 1
             self.consecutive_failures += 1
-
-            # Enable adaptive mode after multiple rate limits
-            if self.consecutive_rate_limits >= 3:
-                self.adaptive_mode = True
-                logger.warning(f"Multiple rate limits detected ({self.consecutive_rate_limits}). Enabling adaptive mode.")
-
-            logging.warning(f"Rate limited (429). Waiting {retry_after} seconds...")
-            time.sleep(retry_after)
+            logger.warning(f"Rate limited (429). Pausing new requests for {retry_after} seconds...")
+            # The next slot from the controller (and the shared limiter) waits out Retry-After
+            self.controller.record_throttle(retry_after)
+            if self.rate_limiter is not None:
+                self.rate_limiter.record_throttle(retry_after)
         elif response.status_code >= 500:  # Server errors
             self.consecutive_failures += 1
-            if self.consecutive_failures >= 5:
-                self.adaptive_mode = True
-                logger.warning(f"Multiple server errors detected ({self.consecutive_failures}). Enabling adaptive mode.")
-        else:
-            # Reset counters on successful request
-            self.consecutive_failures = 0
-            self.consecutive_rate_limits = 0
-            self.adaptive_mode = False
-            self.last_successful_request = time.time()
-
-    def _update_request_success(self):
-        """Update state after a successful request."""
+            self.controller.record_server_error()
+            if self.rate_limiter is not None:
+                self.rate_limiter.record_server_error()
+
+    def _update_request_success(self, latency: Optional[float] = None):
+        """Update state after a successful request; ``latency`` feeds the AIMD controller."""
         self.consecutive_failures = 0
-        self.consecutive_rate_limits = 0
-        self.adaptive_mode = False
         self.last_successful_request = time.time()
+        self.controller.record_success(latency)
+        if self.rate_limiter is not None:
+            self.rate_limiter.record_success()
     
     def _calculate_backoff(self, attempt: int) -> float:
         """Calculate exponential backoff time."""
@@ -207,13 +353,15 @@ class NBAStatsClient:
         backoff = min(base_delay * (2 ** attempt), max_delay)
         return backoff + random.uniform(0, 1)
     
-    def _assert_response_has_data(self, response_data: Dict[str, Any], endpoint: str) -> None:
+    def _assert_response_has_data(self, response_data: Dict[str, Any], endpoint: str,
+                                  allow_empty: bool = False) -> None:
         """
         Post-fetch assertion layer to detect silent API failures.
         
         Args:
             response_data: The parsed JSON response from the API
             endpoint: The endpoint that was called (for error messages)
+            allow_empty: Accept result sets without rows (the structure is still checked)
             
         Raises:
             EmptyResponseError: If the response has no actual data despite 200 OK status
@@ -227,6 +375,8 @@ class NBAStatsClient:
         result_sets = response_data['resultSets']
         if not result_sets or not isinstance(result_sets, list):
             raise EmptyResponseError(f"Empty or invalid 'resultSets' from {endpoint}")
+        if allow_empty:
+            return
         
         # Check if any result set has actual data
         has_data = False
@@ -246,27 +396,77 @@ class NBAStatsClient:
         retry=retry_if_exception_type((requests.exceptions.RequestException, requests.exceptions.Timeout, EmptyResponseError)),
         before_sleep=before_sleep_log(logger, logging.WARNING)
     )
-    def make_request(self, endpoint: str, params: Optional[Dict] = None) -> Optional[Dict]:
+    def make_request(self, endpoint: str, params: Optional[Dict] = None, force_refresh: bool = False,
+                     allow_empty: bool = False) -> Optional[Dict]:
         """
         Make a request to the NBA Stats API with retry logic and error handling.
         
         Args:
             endpoint: The API endpoint to call
             params: Optional query parameters
+            force_refresh: Skip the cache lookup and always fetch from upstream
+            allow_empty: An answer without rows is valid (e.g. a date range with no games)
+                and is returned and cached instead of retried as an EmptyResponseError
             
         Returns:
             Dict containing the API response or None if the request failed
         """
-        cache_path = self._get_cache_path(endpoint, params)
-        cached_data = self._read_from_cache(cache_path)
-        if cached_data:
-            return cached_data
+        cache_key = self._get_cache_key(endpoint, params)
+        if not force_refresh:
+            cached_data = self._read_from_cache(cache_key, endpoint, params)
+            self.telemetry.record_request(endpoint, cache_hit=bool(cached_data))
+            if cached_data:
+                self._record_interaction(endpoint, params, cached_data)
+                return cached_data
+        else:
+            self.telemetry.record_request(endpoint)
+
+        data = _inflight_requests.do(
+            cache_key, lambda: self._fetch_from_upstream(cache_key, endpoint, params, allow_empty)
+        )
+        if data:
+            self._record_interaction(endpoint, params, data)
+        return data
+
+    def _record_interaction(self, endpoint: str, params: Optional[Dict], data: Dict) -> None:
+        """Append a response to the cassette when recording, keyed by the params as sent."""
+        if self.recorder is None:
+            return
+        wire_params = dict(params or {})
+        wire_params.setdefault('LeagueID', '00')
+        self.recorder.record(endpoint, wire_params, data)
 
+    def _record_adapter_retries(self, endpoint: str, response: requests.Response) -> None:
+        """Count the retries urllib3's Retry adapter made before handing us this response."""
+        retries = getattr(getattr(response, 'raw', None), 'retries', None)
+        history = getattr(retries, 'history', None)
+        if not isinstance(history, tuple):
+            return
+        for attempt in history:
+            if attempt.status == 429:
+                self.telemetry.record_retry(endpoint, "throttle")
+            elif attempt.status is not None and attempt.status >= 500:
+                self.telemetry.record_retry(endpoint, "server_error")
+            elif attempt.error is not None:
+                self.telemetry.record_retry(endpoint, "connection")
+
+    def _fetch_from_upstream(self, cache_key: str, endpoint: str, params: Optional[Dict],
+                             allow_empty: bool = False) -> Optional[Dict]:
+        """Issue the HTTP request for make_request and cache a valid response."""
         url = f"{self.base_url.rstrip('/')}/{endpoint.lstrip('/')}"
         
+        wait_started = time.monotonic()
         try:
             self._wait_for_rate_limit()
-            
+        except TimeoutError as e:
+            logger.error(f"Gave up waiting for a request slot for {endpoint}: {e}")
+            return None
+        finally:
+            self.telemetry.record_phase(endpoint, "sleep", time.monotonic() - wait_started)
+
+        bytes_received = 0
+        succeeded = False
+        try:
             # Ensure params is a dictionary
             if params is None:
                 params = {}
@@ -276,47 +476,76 @@ class NBAStatsClient:
                 params['LeagueID'] = '00'
             
             logger.info(f"Making request to {url} with params: {params}")
-            response = self.session.get(
-                url,
-                params=params,
-                timeout=self.timeout,
-                allow_redirects=True
-            )
+            started = time.monotonic()
+            try:
+                response = self.session.get(
+                    url,
+                    params=params,
+                    timeout=self.timeout,
+                    allow_redirects=True
+                )
+            finally:
+                network_time = time.monotonic() - started
+                self.telemetry.record_phase(endpoint, "network", network_time)
+            bytes_received = len(response.content or b"")
+            self._record_adapter_retries(endpoint, response)
             
             logger.info(f"Received response with status code: {response.status_code}")
             logger.debug(f"Response headers: {response.headers}")
 
             # Handle rate limiting and server errors
             self._handle_rate_limit(response)
+            if response.status_code == 429:
+                self.telemetry.record_retry(endpoint, "throttle")
+            elif response.status_code >= 500:
+                self.telemetry.record_retry(endpoint, "server_error")
 
             response.raise_for_status()
 
+            parse_started = time.monotonic()
             data = response.json()
 
             # Post-fetch assertion layer: detect silent API failures
-            self._assert_response_has_data(data, endpoint)
+            try:
+                self._assert_response_has_data(data, endpoint, allow_empty)
+            except EmptyResponseError:
+                self.telemetry.record_retry(endpoint, "empty_response")
+                raise
+            finally:
+                self.telemetry.record_phase(endpoint, "parse", time.monotonic() - parse_started)
 
             # Update success state
-            self._update_request_success()
+            self._update_request_success(network_time)
+            succeeded = True
 
-            self._write_to_cache(cache_path, data)
+            self._write_to_cache(cache_key, data, endpoint, params)
             return data
             
+        except requests.exceptions.Timeout as e:
+            self.consecutive_failures += 1
+            self.telemetry.record_retry(endpoint, "timeout")
+            self.controller.record_timeout()
+            logger.error(f"Request to {endpoint} timed out: {e}")
+            return None
         except requests.exceptions.RequestException as e:
             # Update failure state
             self.consecutive_failures += 1
-            if "429" in str(e) or "rate limit" in str(e).lower():
-                self.consecutive_rate_limits += 1
-                if self.consecutive_rate_limits >= 3:
-                    self.adaptive_mode = True
-                    logger.warning(f"Multiple rate limits detected ({self.consecutive_rate_limits}). Enabling adaptive mode.")
-            elif e.response and e.response.status_code >= 500:
-                if self.consecutive_failures >= 5:
-                    self.adaptive_mode = True
-                    logger.warning(f"Multiple server errors detected ({self.consecutive_failures}). Enabling adaptive mode.")
+            # HTTP status failures were already reported by _handle_rate_limit
+            if e.response is None:
+                if "429" in str(e) or "rate limit" in str(e).lower():
+                    # urllib3 exhausted its own 429 retries before we saw a response
+                    self.controller.record_throttle()
+                    if self.rate_limiter is not None:
+                        self.rate_limiter.record_throttle()
+                else:
+                    self.telemetry.record_retry(endpoint, "connection")
+                    self.controller.record_server_error()
 
             logger.error(f"Failed to make request to {endpoint} after multiple retries: {e}")
             return None
+        finally:
+            self.telemetry.record_upstream(endpoint, bytes_received, failed=not succeeded)
+            self.controller.finish()
     
     def get_teams(self) -> List[Dict[str, Any]]:
         """Get list of all NBA teams.
@@ -353,11 +582,12 @@ class NBAStatsClient:
         
         return teams
     
-    def get_schedule(self, season: str) -> List[Dict[str, Any]]:
+    def get_schedule(self, season: str, date_from: str = "") -> List[Dict[str, Any]]:
         """Get the NBA schedule for a given season.
         
         Args:
             season: Season in YYYY-YY format (e.g., "2023-24")
+            date_from: Optional first game date (MM/DD/YYYY) for incremental refreshes
             
         Returns:
             List of game dictionaries containing schedule information
@@ -365,7 +595,7 @@ class NBAStatsClient:
         endpoint = "leaguegamelog"
         params = {
             "Counter": 0,
-            "DateFrom": "",
+            "DateFrom": date_from,
             "DateTo": "",
             "Direction": "DESC",
             "LeagueID": "00",
@@ -384,6 +614,7 @@ class NBAStatsClient:
                 "teamId": row[1],
                 "seasonStartDate": f"{season[:4]}-10-01",  # NBA season typically starts in October
                 "gameDate": row[5],
+                "matchup": row[6],
                 "season": season
             })
         
@@ -923,17 +1154,23 @@ class NBAStatsClient:
         team_id: int, # Team ID is required for shotchartdetail
         season: str,
         season_type: str = "Regular Season",
-        context_measure: str = "FGA" # Can be FGA, PTS, etc.
+        context_measure: str = "FGA", # Can be FGA, PTS, etc.
+        date_from: str = "",
+        date_to: str = "",
+        allow_empty: bool = False
     ) -> Optional[Dict[str, Any]]:
         """
-        Get shot chart details for a player.
+        Get shot chart details for a player, a whole team or the whole league.
 
         Args:
-            player_id: NBA player ID
-            team_id: NBA team ID for the player during the season/game
+            player_id: NBA player ID, or 0 for every player (team- or league-wide pull)
+            team_id: NBA team ID for the player during the season/game, or 0 for every team
             season: Season ID (e.g., "2023-24")
             season_type: Type of season ("Regular Season", "Playoffs")
             context_measure: The measure for the shot chart (FGA, FG_PCT, etc.)
+            date_from: Optional start date (MM/DD/YYYY), used to chunk league-wide pulls
+            date_to: Optional end date (MM/DD/YYYY)
+            allow_empty: Return a response without shots instead of retrying it
 
         Returns:
             Optional[Dict[str, Any]]: Shot chart data or None if request fails
@@ -946,8 +1183,8 @@ class NBAStatsClient:
             "SeasonType": season_type,
             "LeagueID": "00",
             "ContextMeasure": context_measure,
-            "DateFrom": "",
-            "DateTo": "",
+            "DateFrom": date_from,
+            "DateTo": date_to,
             "GameID": "",
             "GameSegment": "",
             "LastNGames": 0,
@@ -965,7 +1202,7 @@ class NBAStatsClient:
         }
         # Clean out empty string params as stats.nba.com can be sensitive
         final_params = {k: v for k, v in params.items() if v != ""}
-        return self.make_request(endpoint, final_params)
+        return self.make_request(endpoint, final_params, allow_empty=allow_empty)
 
     def get_player_pass_stats(
         self,
@@ -1280,9 +1517,10 @@ class NBAStatsClient:
         self,
         game_id: str,
         start_period: int = 0, # 0 for all periods
-        end_period: int = 0   # 0 for all periods
+        end_period: int = 0,  # 0 for all periods
+        force_refresh: bool = False
     ) -> Optional[Dict[str, Any]]:
-        """Fetch play-by-play data for a specific game."""
+        """Fetch play-by-play data for a specific game; ``force_refresh`` skips the cache."""
         # playbyplayv2 is common, playbyplayv3 is newer but might have different params/structure
         endpoint = "/playbyplayv2" 
         params = {
@@ -1293,7 +1531,7 @@ class NBAStatsClient:
         }
         # PBP doesn't usually take as many filtering params as dashboards
         # Clean out 0s if the API prefers them absent (depends on specific endpoint)
-        return self.make_request(endpoint, params)
+        return self.make_request(endpoint, params, force_refresh=force_refresh)
 
     def get_league_hustle_stats(
         self,
@@ -1388,25 +1626,34 @@ class NBAStatsClient:
         }
         
         # This endpoint returns resultSets as a dict, not a list, so we need to handle it specially
-        cache_path = self._get_cache_path(endpoint, params)
-        cached_data = self._read_from_cache(cache_path)
+        cache_key = self._get_cache_key(endpoint, params)
+        # Stale entries are not revalidated through make_request: its resultSets shape differs
+        cached_data = self._read_from_cache(cache_key, endpoint, params, revalidate=False)
         if cached_data:
+            self._record_interaction(endpoint, params, cached_data)
             return cached_data
 
         url = f"{self.base_url.rstrip('/')}/{endpoint.lstrip('/')}"
         
         try:
             self._wait_for_rate_limit()
-            
+        except TimeoutError as e:
+            logger.error(f"Gave up waiting for a request slot for {endpoint}: {e}")
+            return None
+
+        try:
             logger.info(f"Making request to {url} with params: {params}")
+            started = time.monotonic()
             response = self.session.get(
                 url,
                 params=params,
                 timeout=self.timeout,
                 allow_redirects=True
             )
+            latency = time.monotonic() - started
             
             logger.info(f"Received response with status code: {response.status_code}")
+            self._handle_rate_limit(response)
             response.raise_for_status()
             
             data = response.json()
@@ -1423,12 +1670,25 @@ class NBAStatsClient:
             if not row_set or not isinstance(row_set, list) or len(row_set) == 0:
                 raise EmptyResponseError(f"Empty or invalid 'rowSet' from {endpoint}")
             
-            self._write_to_cache(cache_path, data)
+            self._update_request_success(latency)
+            self._write_to_cache(cache_key, data, endpoint, params)
+            self._record_interaction(endpoint, params, data)
             return data
             
+        except requests.exceptions.Timeout as e:
+            self.consecutive_failures += 1
+            self.controller.record_timeout()
+            logger.error(f"Request to {endpoint} timed out: {e}")
+            return None
         except requests.exceptions.RequestException as e:
+            self.consecutive_failures += 1
+            # HTTP status failures were already reported by _handle_rate_limit
+            if e.response is None:
+                self.controller.record_server_error()
             logger.error(f"Failed to make request to {endpoint}: {e}")
             return None
+        finally:
+            self.controller.finish()
 
     def get_league_player_advanced_stats(self, season: str, season_type: str = "Regular Season") -> Optional[Dict[str, Any]]:
         """
@@ -0,0 +1,234 @@
+"""Token-bucket rate limiter shared by every NBAStatsClient on the host.
+
+The bucket and the AIMD backoff state live in a small SQLite file. Each update runs
+inside ``BEGIN IMMEDIATE``, which takes SQLite's write lock and therefore serializes
+clients across threads *and* processes. Parallel season backfills then draw from one
+requests-per-minute budget and back off together when any of them is throttled.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RateLimiterState:
+    """Snapshot of the shared limiter row."""
+    tokens: float
+    updated_at: float
+    rate_multiplier: float
+    consecutive_failures: int
+    backoff_until: float
+
+    def effective_rate(self, requests_per_minute: float) -> float:
+        return requests_per_minute * self.rate_multiplier
+
+
+class SharedRateLimiter:
+    """
+    Cross-process token bucket with shared additive-increase/multiplicative-decrease backoff.
+
+    ``requests_per_minute`` is the host-wide ceiling. Throttling or server errors reported
+    by any client halve the shared rate multiplier (down to ``min_multiplier``); each success
+    adds ``additive_increase`` back until the full ceiling is reached again.
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        requests_per_minute: float = 10.0,
+        burst: float = 1.0,
+        name: str = "stats.nba.com",
+        additive_increase: float = 0.05,
+        decrease_factor: float = 0.5,
+        min_multiplier: float = 0.125,
+        lock_timeout: float = 30.0,
+    ):
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        self.db_path = Path(db_path)
+        self.requests_per_minute = float(requests_per_minute)
+        self.burst = max(float(burst), 1.0)
+        self.name = name
+        self.additive_increase = additive_increase
+        self.decrease_factor = decrease_factor
+        self.min_multiplier = min_multiplier
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=lock_timeout,
+                                     isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS RateLimiterState (
+                name TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                rate_multiplier REAL NOT NULL DEFAULT 1.0,
+                consecutive_failures INTEGER NOT NULL DEFAULT 0,
+                backoff_until REAL NOT NULL DEFAULT 0
+            )
+        """)
+        self._conn.execute(
+            "INSERT OR IGNORE INTO RateLimiterState (name, tokens, updated_at) VALUES (?, ?, ?)",
+            (self.name, self.burst, time.time())
+        )
+
+    def _read_state(self) -> RateLimiterState:
+        row = self._conn.execute(
+            "SELECT tokens, updated_at, rate_multiplier, consecutive_failures, backoff_until "
+            "FROM RateLimiterState WHERE name = ?", (self.name,)
+        ).fetchone()
+        return RateLimiterState(*row)
+
+    def _write_state(self, state: RateLimiterState) -> None:
+        self._conn.execute(
+            "UPDATE RateLimiterState SET tokens = ?, updated_at = ?, rate_multiplier = ?, "
+            "consecutive_failures = ?, backoff_until = ? WHERE name = ?",
+            (state.tokens, state.updated_at, state.rate_multiplier,
+             state.consecutive_failures, state.backoff_until, self.name)
+        )
+
+    def _refill(self, state: RateLimiterState, now: float) -> None:
+        elapsed = max(now - state.updated_at, 0.0)
+        rate_per_second = state.effective_rate(self.requests_per_minute) / 60.0
+        state.tokens = min(self.burst, state.tokens + elapsed * rate_per_second)
+        state.updated_at = now
+
+    def _transaction(self, mutate):
+        """Run ``mutate(state, now)`` under the cross-process write lock and persist the result."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                state = self._read_state()
+                now = time.time()
+                result = mutate(state, now)
+                self._write_state(state)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def try_acquire(self) -> float:
+        """
+        Take one token if available.
+
+        Returns:
+            0.0 if a token was taken, otherwise the number of seconds to wait before retrying.
+        """
+        def _take(state: RateLimiterState, now: float) -> float:
+            self._refill(state, now)
+            if now < state.backoff_until:
+                return state.backoff_until - now
+            if state.tokens >= 1.0:
+                state.tokens -= 1.0
+                return 0.0
+            rate_per_second = state.effective_rate(self.requests_per_minute) / 60.0
+            return (1.0 - state.tokens) / rate_per_second
+
+        return self._transaction(_take)
+
+    def acquire(self, max_wait: Optional[float] = None) -> float:
+        """
+        Block until a token is available.
+
+        Args:
+            max_wait: Optional upper bound on the total time spent waiting
+
+        Returns:
+            Total seconds spent waiting.
+
+        Raises:
+            TimeoutError: If max_wait elapses before a token becomes available.
+        """
+        waited = 0.0
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return waited
+            if max_wait is not None and waited + wait > max_wait:
+                raise TimeoutError(f"Rate limiter '{self.name}' could not grant a request within {max_wait}s")
+            logger.debug(f"Shared rate limiter: waiting {wait:.2f}s")
+            time.sleep(wait)
+            waited += wait
+
+    def record_success(self) -> None:
+        """Additive increase of the shared rate after a successful request."""
+        def _success(state: RateLimiterState, now: float) -> None:
+            self._refill(state, now)
+            state.consecutive_failures = 0
+            state.rate_multiplier = min(1.0, state.rate_multiplier + self.additive_increase)
+
+        self._transaction(_success)
+
+    def record_throttle(self, retry_after: Optional[float] = None) -> None:
+        """Multiplicative decrease plus a host-wide pause after a 429 from upstream."""
+        def _throttle(state: RateLimiterState, now: float) -> None:
+            self._refill(state, now)
+            state.consecutive_failures += 1
+            state.rate_multiplier = max(self.min_multiplier, state.rate_multiplier * self.decrease_factor)
+            pause = retry_after if retry_after is not None else 60.0 / state.effective_rate(self.requests_per_minute)
+            state.backoff_until = max(state.backoff_until, now + pause)
+            state.tokens = min(state.tokens, 0.0)
+            logger.warning(f"Shared rate limiter throttled: multiplier={state.rate_multiplier:.3f}, pausing all clients for {pause:.1f}s")
+
+        self._transaction(_throttle)
+
+    def record_server_error(self) -> None:
+        """Multiplicative decrease after repeated upstream 5xx responses."""
+        def _server_error(state: RateLimiterState, now: float) -> None:
+            self._refill(state, now)
+            state.consecutive_failures += 1
+            if state.consecutive_failures >= 3:
+                state.rate_multiplier = max(self.min_multiplier, state.rate_multiplier * self.decrease_factor)
+
+        self._transaction(_server_error)
+
+    def state(self) -> RateLimiterState:
+        """Return the current shared state (after refill) without consuming a token."""
+        def _peek(state: RateLimiterState, now: float) -> RateLimiterState:
+            self._refill(state, now)
+            return RateLimiterState(**vars(state))
+
+        return self._transaction(_peek)
+
+    def reset(self) -> None:
+        """Restore a full bucket and clear any shared backoff."""
+        def _reset(state: RateLimiterState, now: float) -> None:
+            state.tokens = self.burst
+            state.updated_at = now
+            state.rate_multiplier = 1.0
+            state.consecutive_failures = 0
+            state.backoff_until = 0.0
+
+        self._transaction(_reset)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_shared_limiters = {}
+_shared_limiters_lock = threading.Lock()
+
+
+def get_shared_rate_limiter(
+    db_path: Union[str, Path],
+    requests_per_minute: float,
+    burst: float = 1.0,
+) -> SharedRateLimiter:
+    """Return the process-wide SharedRateLimiter for ``db_path``, creating it on first use."""
+    key = str(Path(db_path).resolve())
+    with _shared_limiters_lock:
+        limiter = _shared_limiters.get(key)
+        if limiter is None:
+            limiter = SharedRateLimiter(db_path, requests_per_minute=requests_per_minute, burst=burst)
+            _shared_limiters[key] = limiter
+        return limiter
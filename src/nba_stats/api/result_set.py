@@ -0,0 +1,144 @@
+"""Columnar decoding of stats.nba.com ``resultSets``.
+
+The API returns each result set as ``headers`` plus a row-major ``rowSet`` of Python lists.
+``decode_result_set`` transposes it once into typed NumPy arrays (or an Arrow table), with
+optional column projection, so populators can work on whole columns instead of building a
+dict per row.
+"""
+
+import json
+from typing import Any, Dict, Iterable, Optional, Union
+
+import numpy as np
+
+try:
+    import orjson as _fast_json
+except ImportError:  # orjson is an optional speedup
+    _fast_json = None
+
+try:
+    import pyarrow as pa
+    ARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    ARROW_AVAILABLE = False
+
+
+class ResultSetNotFoundError(KeyError):
+    """Raised when the requested result set is not present in the response."""
+    pass
+
+
+def loads(payload: Union[bytes, str]) -> Dict[str, Any]:
+    """Parse a JSON payload with orjson when available, falling back to the stdlib."""
+    if _fast_json is not None:
+        return _fast_json.loads(payload)
+    return json.loads(payload)
+
+
+def _select_result_set(response: Dict[str, Any], name: Optional[Union[str, int]]) -> Dict[str, Any]:
+    result_sets = response.get("resultSets", response.get("resultSet"))
+    if result_sets is None:
+        raise ResultSetNotFoundError("Response has no 'resultSets'")
+    # A few endpoints (e.g. leaguedashplayershotlocations) return a single dict
+    if isinstance(result_sets, dict):
+        result_sets = [result_sets]
+    if name is None:
+        name = 0
+    if isinstance(name, int):
+        try:
+            return result_sets[name]
+        except IndexError:
+            raise ResultSetNotFoundError(f"Response has no result set at index {name}") from None
+    for result_set in result_sets:
+        if result_set.get("name") == name:
+            return result_set
+    raise ResultSetNotFoundError(f"Response has no result set named '{name}'")
+
+
+def _flatten_headers(headers) -> list:
+    # Multi-level headers arrive as [{"name": "SHOT_CATEGORY", "columnNames": [...]}, {..., "columnNames": [...]}]
+    if headers and isinstance(headers[0], dict):
+        return list(headers[-1].get("columnNames", []))
+    return list(headers)
+
+
+def _to_array(values: tuple, dtype: Optional[Any], int_null: int) -> np.ndarray:
+    if dtype is None:
+        # Only all-numeric columns are inferred: NumPy would turn [1, 'y'] into ['1', 'y']
+        if all(isinstance(v, (int, float)) for v in values):
+            return np.array(values)
+        return np.array(values, dtype=object)
+    dtype = np.dtype(dtype)
+    if dtype.kind in "iu":
+        return np.array([int_null if v is None else v for v in values], dtype=dtype)
+    if dtype.kind == "f":
+        return np.array([np.nan if v is None else v for v in values], dtype=dtype)
+    if dtype.kind == "b":
+        return np.array([bool(v) for v in values], dtype=dtype)
+    return np.array(values, dtype=dtype)
+
+
+def decode_result_set(
+    response: Union[Dict[str, Any], bytes, str],
+    name: Optional[Union[str, int]] = None,
+    columns: Optional[Iterable[str]] = None,
+    dtypes: Optional[Dict[str, Any]] = None,
+    int_null: int = 0,
+    as_arrow: bool = False,
+):
+    """
+    Decode one result set into columns.
+
+    Args:
+        response: Parsed API response, or the raw JSON payload (parsed with orjson if installed)
+        name: Result set name (e.g. "PlayByPlay") or index; defaults to the first
+        columns: Optional projection; only these headers are decoded, in this order
+        dtypes: Optional header -> NumPy dtype map. Nulls become ``int_null`` in integer
+            columns and NaN in float columns. Untyped columns are inferred; columns that
+            contain nulls or mixed types come back as object arrays.
+        int_null: Fill value for nulls in integer columns (stats.nba.com uses 0 for "no player")
+        as_arrow: Return a ``pyarrow.Table`` (nulls preserved) instead of a dict of arrays
+
+    Returns:
+        Dict of header -> np.ndarray (insertion ordered), or a pyarrow.Table.
+
+    Raises:
+        ResultSetNotFoundError: If the result set is missing.
+        KeyError: If a projected column is not in the headers.
+    """
+    if isinstance(response, (bytes, str)):
+        response = loads(response)
+    result_set = _select_result_set(response, name)
+    headers = _flatten_headers(result_set.get("headers", []))
+    rows = result_set.get("rowSet") or []
+    dtypes = dtypes or {}
+
+    selected = list(columns) if columns is not None else headers
+    index = {header: i for i, header in enumerate(headers)}
+    missing = [c for c in selected if c not in index]
+    if missing:
+        raise KeyError(f"Columns not in result set: {missing}")
+    positions = [index[c] for c in selected]
+
+    # One transpose of the row-major payload; projected columns only
+    if rows:
+        transposed = list(zip(*rows))
+        column_values = [transposed[i] for i in positions]
+    else:
+        column_values = [() for _ in positions]
+
+    if as_arrow:
+        if not ARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for as_arrow=True (pip install pyarrow)")
+        arrays = []
+        for column, values in zip(selected, column_values):
+            dtype = dtypes.get(column)
+            arrow_type = pa.from_numpy_dtype(np.dtype(dtype)) if dtype is not None else None
+            arrays.append(pa.array(list(values), type=arrow_type))
+        return pa.table(arrays, names=selected)
+
+    return {
+        column: _to_array(values, dtypes.get(column), int_null)
+        for column, values in zip(selected, column_values)
+    }
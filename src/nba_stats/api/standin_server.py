@@ -0,0 +1,178 @@
+"""Local stand-in for stats.nba.com that replays a recorded cassette.
+
+Point the clients at it with ``NBA_STATS_BASE_URL=http://127.0.0.1:8765/stats`` to run the
+whole ingestion stack — rate limiter, retries and backoff included — without the network.
+Latency, server errors and 429 throttling are injected according to ``ChaosConfig``.
+
+Usage:
+    python -m src.nba_stats.api.standin_server --cassette pbp_2023_24.jsonl.gz \
+        --latency-ms 250 --error-rate 0.02 --throttle-rate 0.01 --max-rpm 120
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from aiohttp import web
+
+from .cassette import Cassette
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ChaosConfig:
+    """Failure and latency injection for the stand-in server."""
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0  # Fraction of requests answered with a 500
+    throttle_rate: float = 0.0  # Fraction of requests answered with a 429
+    retry_after: int = 1  # Retry-After seconds sent with 429s
+    max_requests_per_minute: Optional[float] = None  # 429 once this sliding-window rate is exceeded
+    seed: Optional[int] = None
+
+
+@dataclass
+class StandInStats:
+    requests: int = 0
+    replayed: int = 0
+    not_found: int = 0
+    errors_injected: int = 0
+    throttled: int = 0
+    by_endpoint: Dict[str, int] = field(default_factory=dict)
+
+
+class StandInServer:
+    """aiohttp application replaying cassette responses with injected chaos."""
+
+    def __init__(self, cassette: Cassette, chaos: Optional[ChaosConfig] = None):
+        self.cassette = cassette
+        self.chaos = chaos or ChaosConfig()
+        self.stats = StandInStats()
+        self._random = random.Random(self.chaos.seed)
+        self._recent = deque()
+
+    def _over_rate_ceiling(self, now: float) -> bool:
+        ceiling = self.chaos.max_requests_per_minute
+        if not ceiling:
+            return False
+        while self._recent and now - self._recent[0] > 60.0:
+            self._recent.popleft()
+        if len(self._recent) >= ceiling:
+            return True
+        self._recent.append(now)
+        return False
+
+    async def handle(self, request: web.Request) -> web.Response:
+        endpoint = request.match_info["endpoint"]
+        self.stats.requests += 1
+        self.stats.by_endpoint[endpoint] = self.stats.by_endpoint.get(endpoint, 0) + 1
+
+        chaos = self.chaos
+        if chaos.latency_ms or chaos.latency_jitter_ms:
+            delay = chaos.latency_ms + self._random.uniform(-chaos.latency_jitter_ms, chaos.latency_jitter_ms)
+            await asyncio.sleep(max(delay, 0.0) / 1000.0)
+
+        if self._over_rate_ceiling(time.monotonic()) or self._random.random() < chaos.throttle_rate:
+            self.stats.throttled += 1
+            return web.json_response({"message": "Too Many Requests"}, status=429,
+                                     headers={"Retry-After": str(chaos.retry_after)})
+        if self._random.random() < chaos.error_rate:
+            self.stats.errors_injected += 1
+            return web.json_response({"message": "Injected server error"}, status=500)
+
+        entry = self.cassette.lookup(endpoint, dict(request.query))
+        if entry is None:
+            self.stats.not_found += 1
+            return web.json_response({"message": f"No recorded response for {endpoint}"}, status=404)
+
+        self.stats.replayed += 1
+        return web.json_response(entry["response"], status=entry.get("status", 200))
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(vars(self.stats))
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/__standin__/stats", self.handle_stats)
+        app.router.add_get("/stats/{endpoint}", self.handle)
+        return app
+
+
+class BackgroundStandInServer:
+    """Runs a StandInServer on its own event loop thread (for benchmarks and tests)."""
+
+    def __init__(self, server: StandInServer, host: str = "127.0.0.1", port: int = 0):
+        self.server = server
+        self.host = host
+        self.port = port
+        self._loop = asyncio.new_event_loop()
+        self._runner: Optional[web.AppRunner] = None
+        self._thread = threading.Thread(target=self._loop.run_forever, name="standin-server", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/stats"
+
+    async def _start(self) -> None:
+        self._runner = web.AppRunner(self.server.make_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    def start(self) -> "BackgroundStandInServer":
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result(timeout=10)
+        logger.info(f"Stand-in NBA Stats server listening on {self.base_url}")
+        return self
+
+    def stop(self) -> None:
+        if self._runner is not None:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(timeout=10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+
+    def __enter__(self) -> "BackgroundStandInServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a recorded cassette as a local stats.nba.com stand-in.")
+    parser.add_argument("--cassette", required=True, help="Path to a cassette recorded with NBA_STATS_RECORD_CASSETTE.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean added latency per request.")
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0, help="Uniform +/- jitter on the latency.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429.")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds for injected 429s.")
+    parser.add_argument("--max-rpm", type=float, default=None, help="Answer 429 above this requests-per-minute.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible chaos.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    chaos = ChaosConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        max_requests_per_minute=args.max_rpm,
+        seed=args.seed,
+    )
+    server = StandInServer(Cassette.load(args.cassette), chaos)
+    web.run_app(server.make_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Per-endpoint telemetry for the NBA Stats clients.
+
+Populators create a fresh client per call, so counters live in one process-wide
+``ClientTelemetry`` registry and every client reports into it. ``NBAStatsClient.stats()``
+returns a JSON-serializable snapshot. Each endpoint gets request, cache hit/miss and
+upstream call counts, retries by cause, payload bytes, and latency histograms split
+into time spent waiting for a request slot ("sleep"), on the wire ("network") and
+decoding JSON ("parse").
+"""
+
+import bisect
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Upper bucket bounds in milliseconds; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+PHASES = ("sleep", "network", "parse")
+RETRY_CAUSES = ("throttle", "server_error", "timeout", "connection", "empty_response")
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (not thread-safe; guarded by ClientTelemetry's lock)."""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        ms = max(seconds, 0.0) * 1000.0
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (max for the open bucket)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return float(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"le_{b}" for b in LATENCY_BUCKETS_MS] + ["gt_%d" % LATENCY_BUCKETS_MS[-1]]
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+
+class EndpointTelemetry:
+    """Counters for one endpoint."""
+
+    def __init__(self):
+        self.requests = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.upstream_calls = 0
+        self.failures = 0
+        self.bytes_received = 0
+        self.retries = {cause: 0 for cause in RETRY_CAUSES}
+        self.latency = {phase: LatencyHistogram() for phase in PHASES}
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_ratio": round(self.cache_hits / lookups, 4) if lookups else None,
+            "upstream_calls": self.upstream_calls,
+            "failures": self.failures,
+            "retries": dict(self.retries),
+            "bytes_received": self.bytes_received,
+            "latency": {phase: hist.snapshot() for phase, hist in self.latency.items()},
+        }
+
+
+def _endpoint_name(endpoint: str) -> str:
+    return endpoint.strip("/").lower()
+
+
+class ClientTelemetry:
+    """Thread-safe per-endpoint registry shared by every client in the process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, EndpointTelemetry] = {}
+        self.started_at = time.time()
+
+    def _get(self, endpoint: str) -> EndpointTelemetry:
+        name = _endpoint_name(endpoint)
+        telemetry = self._endpoints.get(name)
+        if telemetry is None:
+            telemetry = self._endpoints[name] = EndpointTelemetry()
+        return telemetry
+
+    def record_request(self, endpoint: str, cache_hit: Optional[bool] = None) -> None:
+        """Count a make_request call and, when the cache was consulted, its outcome."""
+        with self._lock:
+            telemetry = self._get(endpoint)
+            telemetry.requests += 1
+            if cache_hit is True:
+                telemetry.cache_hits += 1
+            elif cache_hit is False:
+                telemetry.cache_misses += 1
+
+    def record_upstream(self, endpoint: str, bytes_received: int = 0, failed: bool = False) -> None:
+        with self._lock:
+            telemetry = self._get(endpoint)
+            telemetry.upstream_calls += 1
+            telemetry.bytes_received += bytes_received
+            if failed:
+                telemetry.failures += 1
+
+    def record_phase(self, endpoint: str, phase: str, seconds: float) -> None:
+        with self._lock:
+            self._get(endpoint).latency[phase].observe(seconds)
+
+    def record_retry(self, endpoint: str, cause: str, count: int = 1) -> None:
+        with self._lock:
+            retries = self._get(endpoint).retries
+            retries[cause] = retries.get(cause, 0) + count
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            endpoints = {name: t.snapshot() for name, t in sorted(self._endpoints.items())}
+        totals = {
+            key: sum(e[key] for e in endpoints.values())
+            for key in ("requests", "cache_hits", "cache_misses", "upstream_calls", "failures", "bytes_received")
+        }
+        lookups = totals["cache_hits"] + totals["cache_misses"]
+        totals["cache_hit_ratio"] = round(totals["cache_hits"] / lookups, 4) if lookups else None
+        totals["retries"] = {cause: sum(e["retries"].get(cause, 0) for e in endpoints.values()) for cause in RETRY_CAUSES}
+        totals["time_ms"] = {
+            phase: round(sum(e["latency"][phase]["total_ms"] for e in endpoints.values()), 3) for phase in PHASES
+        }
+        return {
+            "since": datetime.fromtimestamp(self.started_at).isoformat(),
+            "totals": totals,
+            "endpoints": endpoints,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+            self.started_at = time.time()
+
+
+_client_telemetry = ClientTelemetry()
+
+
+def get_client_telemetry() -> ClientTelemetry:
+    """Return the process-wide telemetry registry."""
+    return _client_telemetry
+
+
+def write_telemetry(snapshot: Dict[str, Any], path: Union[str, Path] = "pipeline_results.json",
+                    key: str = "client_telemetry") -> None:
+    """Store ``snapshot`` under ``key`` in a JSON results file, keeping the file's other keys."""
+    path = Path(path)
+    results: Dict[str, Any] = {}
+    if path.exists():
+        try:
+            with open(path, 'r') as f:
+                loaded = json.load(f)
+            if isinstance(loaded, dict):
+                results = loaded
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Overwriting unreadable results file {path}: {e}")
+    results[key] = snapshot
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, default=str)
+    logger.info(f"Client telemetry written to {path}")
@@ -15,6 +15,7 @@ MIN_MINUTES_THRESHOLD = 1000
 MAX_WORKERS = 2
 MAX_RETRIES = 12
 API_TIMEOUT = 120
+MAX_IN_FLIGHT_REQUESTS = 4  # Concurrent upstream requests for AsyncNBAStatsClient
 
 # Delay/Backoff Configuration
 MIN_SLEEP = 3.0
@@ -23,9 +24,63 @@ RETRY_BACKOFF_BASE = 2
 RETRY_BACKOFF_FACTOR = 1.2
 MAX_BACKOFF_SLEEP = 300
 
+# Shared (cross-process) rate limiter for stats.nba.com
+CACHE_DIR = os.path.join(PROJECT_ROOT, "src", "nba_stats", ".cache")
+USE_SHARED_RATE_LIMITER = os.getenv("NBA_STATS_SHARED_RATE_LIMITER", "true").lower() == "true"
+SHARED_REQUESTS_PER_MINUTE = float(os.getenv("NBA_STATS_REQUESTS_PER_MINUTE", "10"))
+SHARED_RATE_LIMITER_BURST = float(os.getenv("NBA_STATS_RATE_LIMITER_BURST", "1"))
+RATE_LIMITER_DB_PATH = os.getenv("NBA_STATS_RATE_LIMITER_DB", os.path.join(CACHE_DIR, "rate_limiter.db"))
+
+# Adaptive (AIMD) request rate and concurrency control; see api/aimd.py
+AIMD_INITIAL_REQUESTS_PER_MINUTE = float(os.getenv("NBA_STATS_AIMD_INITIAL_RPM", "10"))
+AIMD_MIN_REQUESTS_PER_MINUTE = float(os.getenv("NBA_STATS_AIMD_MIN_RPM", "2"))
+AIMD_MAX_REQUESTS_PER_MINUTE = float(os.getenv("NBA_STATS_AIMD_MAX_RPM", "120"))
+AIMD_MAX_CONCURRENCY = int(os.getenv("NBA_STATS_AIMD_MAX_CONCURRENCY", str(MAX_IN_FLIGHT_REQUESTS)))
+# Last known-good rate/concurrency, so the next run starts where this one converged
+AIMD_STATE_PATH = os.getenv("NBA_STATS_AIMD_STATE", os.path.join(CACHE_DIR, "aimd_state.json"))
+AIMD_METRICS_LOG_PATH = os.getenv("NBA_STATS_AIMD_METRICS_LOG", os.path.join(PROJECT_ROOT, "logs", "aimd_metrics.jsonl"))
+
+# API response cache ("sqlite" single-file store or legacy "file" directory)
+CACHE_BACKEND = os.getenv("NBA_STATS_CACHE_BACKEND", "sqlite")
+CACHE_DB_PATH = os.getenv("NBA_STATS_CACHE_DB", os.path.join(CACHE_DIR, "api_cache.db"))
+CACHE_MAX_BYTES = int(os.getenv("NBA_STATS_CACHE_MAX_BYTES", str(4 * 1024 ** 3)))
+# Cache hits are recorded in memory and written back in batches of this many keys, or this often
+CACHE_ACCESS_FLUSH_ENTRIES = int(os.getenv("NBA_STATS_CACHE_ACCESS_FLUSH_ENTRIES", "256"))
+CACHE_ACCESS_FLUSH_SECONDS = float(os.getenv("NBA_STATS_CACHE_ACCESS_FLUSH_SECONDS", "5"))
+
+# Shared SQLite connection factory (db/connection.py): every connection gets the same PRAGMAs
+DB_POOL_MAX_IDLE = int(os.getenv("NBA_STATS_DB_POOL_MAX_IDLE", "4"))  # Idle connections kept per database
+DB_BUSY_TIMEOUT_MS = int(os.getenv("NBA_STATS_DB_BUSY_TIMEOUT_MS", "30000"))
+DB_CACHE_SIZE_KIB = int(os.getenv("NBA_STATS_DB_CACHE_KIB", str(64 * 1024)))
+DB_MMAP_SIZE = int(os.getenv("NBA_STATS_DB_MMAP_BYTES", str(256 * 1024 ** 2)))
+DB_JOURNAL_MODE = os.getenv("NBA_STATS_DB_JOURNAL_MODE", "WAL")
+
 # Database Writer Configuration
 BATCH_SIZE = 50
+DB_WRITER_CHUNK_ROWS = int(os.getenv("NBA_STATS_DB_WRITER_CHUNK_ROWS", "5000"))  # Rows per executemany in DatabaseWriter.write_bulk
 SENTINEL = object()  # Signal for the writer thread to stop
+# Write-behind queue (services/write_behind.py): populators keep fetching while one thread writes
+WRITE_BEHIND_MAX_PENDING_BATCHES = int(os.getenv("NBA_STATS_WRITE_BEHIND_MAX_BATCHES", "64"))  # submit() blocks beyond this
+WRITE_BEHIND_MAX_TRANSACTION_ROWS = int(os.getenv("NBA_STATS_WRITE_BEHIND_MAX_TXN_ROWS", "50000"))
+
+# Play-by-play ingestion (populate_possessions): fetch workers feed one SQLite writer thread
+POSSESSIONS_FETCH_WORKERS = int(os.getenv("NBA_STATS_POSSESSIONS_WORKERS", str(MAX_IN_FLIGHT_REQUESTS)))
+POSSESSIONS_GAMES_PER_TRANSACTION = int(os.getenv("NBA_STATS_POSSESSIONS_GAMES_PER_TXN", "10"))
+POSSESSIONS_BULK_GAMES_PER_TRANSACTION = int(os.getenv("NBA_STATS_POSSESSIONS_BULK_GAMES_PER_TXN", "200"))
+
+# Bulk-load mode (db/bulk_load.py) for historical backfills
+BULK_LOAD_CACHE_SIZE_KIB = int(os.getenv("NBA_STATS_BULK_CACHE_KIB", str(256 * 1024)))
+BULK_LOAD_MMAP_SIZE = int(os.getenv("NBA_STATS_BULK_MMAP_BYTES", str(1024 ** 3)))
+
+# Season-partitioned Parquet copy of TruePossessions (db/possessions_parquet.py), read by the modelling scripts
+POSSESSIONS_PARQUET_DIR = os.getenv("NBA_STATS_POSSESSIONS_PARQUET_DIR", os.path.join(PROJECT_ROOT, "data", "parquet", "true_possessions"))
+
+# Memory-mapped possession arrays built from TruePossessions (db/possession_matrix.py), one directory per season
+POSSESSION_MATRIX_DIR = os.getenv("NBA_STATS_POSSESSION_MATRIX_DIR", os.path.join(os.path.dirname(DB_PATH), "possession_matrix"))
+
+# Engine for the audit aggregates and training-data joins (db/analytics.py): "sqlite" or "duckdb"
+ANALYTICS_ENGINE = os.getenv("NBA_STATS_ANALYTICS_ENGINE", "sqlite")
+ANALYTICS_THREADS = int(os.getenv("NBA_STATS_ANALYTICS_THREADS", "0"))  # 0 lets DuckDB use every core
 
 # User Agents for API requests
 USER_AGENTS: List[str] = [
@@ -59,7 +114,10 @@ LOG_FILE = "nba_stats.log"
 LOG_LEVEL = "INFO"
 
 # API Endpoints
-API_BASE_URL = "https://stats.nba.com/stats"
+# Override to point the clients at a local stand-in server (see api/standin_server.py)
+API_BASE_URL = os.getenv("NBA_STATS_BASE_URL", "https://stats.nba.com/stats")
+# When set, every response the client returns is appended to this cassette file
+RECORD_CASSETTE_PATH = os.getenv("NBA_STATS_RECORD_CASSETTE")
 ENDPOINTS = {
     "player_stats": "/leaguedashplayerstats",
     "player_dashboard": "/playerdashboardbygeneralsplits",
@@ -0,0 +1,322 @@
+"""
+Analytics engine for the audit aggregates and the training-data joins.
+
+``connect_analytics`` returns a read-only connection to the SQLite store, either SQLite
+itself or an in-memory DuckDB database that attaches the SQLite file through DuckDB's
+sqlite extension and exposes every table and view under its own name. DuckDB runs the
+GROUP BYs and joins vectorized on every core. Both connections answer
+``conn.execute(sql, params).fetchone()/fetchall()`` and take ``?`` placeholders, so the
+checks below, and scripts written against sqlite3, run unchanged on either engine.
+
+When the sqlite extension cannot be loaded (it is downloaded on first use), the tables are
+copied into DuckDB instead, which costs one full read of the file. With ``parquet_dir``
+set, ``TruePossessions`` is read from the Parquet export (see db/possessions_parquet).
+
+duckdb is optional. Without it, only the "sqlite" engine is available.
+
+    python -m src.nba_stats.db.analytics --seasons 2018-19 2020-21 2021-22
+"""
+
+import argparse
+import logging
+import sqlite3
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from ..config import settings
+from ..utils.true_possessions import DEFENSE_LINEUP_COLUMNS, OFFENSE_LINEUP_COLUMNS
+from .connection import connect, connection
+from .possessions_parquet import ID_COLUMNS, OUTCOME_COLUMN, exported_seasons
+
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    duckdb = None
+    DUCKDB_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ("sqlite", "duckdb")
+LINEUP_COLUMNS = [f"{side}_player_{n}_id" for side in ("home", "away") for n in range(1, 6)]
+COPY_CHUNK_ROWS = 500_000
+
+
+def _require_duckdb() -> None:
+    if not DUCKDB_AVAILABLE:
+        raise ImportError("duckdb is required for the DuckDB analytics engine (pip install duckdb)")
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _sqlite_objects(db_path: str) -> List[str]:
+    with connection(db_path, read_only=True, detect_types=0) as source:
+        return [row[0] for row in source.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+
+
+def _duckdb_type(declared: str, dtype: Any) -> str:
+    """DuckDB type for a copied column: SQLite's declared affinity, else what pandas read."""
+    declared = (declared or "").upper()
+    if "INT" in declared:
+        return "BIGINT"
+    if any(token in declared for token in ("CHAR", "CLOB", "TEXT")):
+        return "VARCHAR"
+    if any(token in declared for token in ("REAL", "FLOA", "DOUB")):
+        return "DOUBLE"
+    if pd.api.types.is_bool_dtype(dtype):
+        return "BOOLEAN"
+    if pd.api.types.is_integer_dtype(dtype):
+        return "BIGINT"
+    if pd.api.types.is_float_dtype(dtype):
+        return "DOUBLE"
+    return "VARCHAR"
+
+
+def _copy_sqlite(conn: "duckdb.DuckDBPyConnection", db_path: str, names: Sequence[str]) -> None:
+    """Copies each table and view into DuckDB, in chunks. Tables that do not convert are skipped."""
+    with connection(db_path, read_only=True, detect_types=0) as source:
+        for name in names:
+            declared = {row[1]: row[2] for row in source.execute(f"PRAGMA table_info({_quote(name)})")}
+            created = False
+            try:
+                for chunk in pd.read_sql_query(f"SELECT * FROM {_quote(name)}", source, chunksize=COPY_CHUNK_ROWS):
+                    if not created:
+                        columns = ", ".join(f"{_quote(column)} {_duckdb_type(declared.get(column), chunk[column].dtype)}"
+                                            for column in chunk.columns)
+                        conn.execute(f"CREATE TABLE {_quote(name)} ({columns})")
+                        created = True
+                    conn.register("_chunk", chunk)
+                    conn.execute(f"INSERT INTO {_quote(name)} SELECT * FROM _chunk")
+                    conn.unregister("_chunk")
+                if not created:
+                    columns = ", ".join(f"{_quote(column)} {_duckdb_type(declared_type, None)}"
+                                        for column, declared_type in declared.items())
+                    conn.execute(f"CREATE TABLE {_quote(name)} ({columns})")
+            except (duckdb.Error, sqlite3.Error) as e:
+                logger.warning(f"Could not copy {name} into DuckDB: {e}")
+                conn.execute(f"DROP TABLE IF EXISTS {_quote(name)}")
+
+
+def _connect_duckdb(db_path: str, parquet_dir: Optional[str], threads: int) -> "duckdb.DuckDBPyConnection":
+    _require_duckdb()
+    conn = duckdb.connect(config={"threads": threads} if threads > 0 else {})
+    names = _sqlite_objects(db_path)
+    kind = "VIEW"
+    try:
+        conn.execute("LOAD sqlite")
+        conn.execute(f"ATTACH '{db_path.replace(chr(39), chr(39) * 2)}' AS nba (TYPE SQLITE, READ_ONLY)")
+        for name in names:
+            conn.execute(f"CREATE VIEW {_quote(name)} AS SELECT * FROM nba.{_quote(name)}")
+    except duckdb.Error as e:
+        logger.warning(f"DuckDB could not attach {db_path} ({e}); copying its tables instead.")
+        _copy_sqlite(conn, db_path, [name for name in names if name != "TruePossessions" or not parquet_dir])
+        kind = "TABLE"
+
+    if parquet_dir and exported_seasons(parquet_dir):
+        source = f"{parquet_dir.rstrip('/')}/season=*/*.parquet".replace("'", "''")
+        conn.execute(f"DROP {kind} IF EXISTS TruePossessions")
+        conn.execute(f"CREATE VIEW TruePossessions AS SELECT * FROM read_parquet('{source}', hive_partitioning = true)")
+    return conn
+
+
+def connect_analytics(db_path: Optional[str] = None, engine: Optional[str] = None, parquet_dir: Optional[str] = None,
+                      threads: Optional[int] = None) -> Any:
+    """
+    Opens a read-only analytics connection to the database.
+
+    Args:
+        engine: "sqlite" (a pooled read-only connection) or "duckdb"; defaults to
+            NBA_STATS_ANALYTICS_ENGINE.
+        parquet_dir: DuckDB only. Read TruePossessions from this Parquet export.
+        threads: DuckDB worker threads; 0 uses every core.
+    """
+    db_path = str(db_path or settings.DB_PATH)
+    engine = engine or settings.ANALYTICS_ENGINE
+    if engine == "sqlite":
+        return connect(db_path, read_only=True, detect_types=0)
+    if engine == "duckdb":
+        return _connect_duckdb(db_path, parquet_dir, settings.ANALYTICS_THREADS if threads is None else threads)
+    raise ValueError(f"Unknown analytics engine {engine!r}; expected one of {', '.join(ENGINES)}")
+
+
+def read_frame(conn: Any, sql: str, params: Sequence = ()) -> pd.DataFrame:
+    """Query results as a DataFrame on either engine."""
+    if isinstance(conn, sqlite3.Connection):
+        return pd.read_sql_query(sql, conn, params=list(params))
+    return conn.execute(sql, list(params)).df()
+
+
+def possessions_by_season(conn: Any, seasons: Sequence[str]) -> Dict[str, int]:
+    """Play-by-play rows per season, in one pass over Possessions."""
+    placeholders = ", ".join("?" for _ in seasons)
+    rows = conn.execute(f"""
+        SELECT g.season, COUNT(*)
+        FROM Possessions p
+        JOIN Games g ON p.game_id = g.game_id
+        WHERE g.season IN ({placeholders})
+        GROUP BY g.season
+    """, list(seasons)).fetchall()
+    counts = {season: 0 for season in seasons}
+    counts.update({season: int(count) for season, count in rows})
+    return counts
+
+
+def lineup_rating_coverage(conn: Any, season: str, archetype_table: str, sample: Optional[int] = None) -> Dict[str, Any]:
+    """
+    How many of a season's play-by-play rows have all ten players on court rated in
+    PlayerSeasonSkill for that season and assigned an archetype in ``archetype_table``.
+
+    Args:
+        sample: Check this many random rows instead of the whole season.
+
+    Returns:
+        ``join_success`` and ``total`` rows, and ``failures``, which maps each
+        (players, rated, with archetype) count seen on failing rows to the number of rows.
+    """
+    limit = "ORDER BY RANDOM() LIMIT ?" if sample is not None else ""
+    on_court = " UNION ALL ".join(f"SELECT game_id, event_num, {column} AS player_id FROM rows"
+                                  for column in LINEUP_COLUMNS)
+    params: List[Any] = [season] + ([int(sample)] if sample is not None else []) + [season]
+    groups = conn.execute(f"""
+        WITH rows AS (
+            SELECT p.game_id, p.event_num, {', '.join(f'p.{column}' for column in LINEUP_COLUMNS)}
+            FROM Possessions p
+            JOIN Games g ON p.game_id = g.game_id
+            WHERE g.season = ?
+            {limit}
+        ),
+        on_court AS ({on_court}),
+        per_row AS (
+            SELECT o.game_id, o.event_num,
+                   COUNT(o.player_id) AS players, COUNT(d.player_id) AS rated, COUNT(a.player_id) AS with_archetype
+            FROM on_court o
+            LEFT JOIN (SELECT DISTINCT player_id FROM PlayerSeasonSkill WHERE season = ?) d ON d.player_id = o.player_id
+            LEFT JOIN (SELECT DISTINCT player_id FROM {archetype_table}) a ON a.player_id = o.player_id
+            GROUP BY o.game_id, o.event_num
+        )
+        SELECT players, rated, with_archetype, COUNT(*) FROM per_row
+        GROUP BY players, rated, with_archetype
+    """, params).fetchall()
+
+    result: Dict[str, Any] = {"join_success": 0, "total": 0, "failures": {}}
+    for players, rated, with_archetype, count in groups:
+        result["total"] += int(count)
+        if players == rated == with_archetype == 10:
+            result["join_success"] += int(count)
+        else:
+            result["failures"][(int(players), int(rated), int(with_archetype))] = int(count)
+    return result
+
+
+def season_player_overlap(conn: Any, season: str) -> Dict[str, int]:
+    """Distinct players on court in a season, how many of them are rated, and how many are rated in all."""
+    on_court = " UNION ".join(f"SELECT {column} AS player_id FROM rows" for column in LINEUP_COLUMNS)
+    players, rated = conn.execute(f"""
+        WITH rows AS (
+            SELECT {', '.join(f'p.{column}' for column in LINEUP_COLUMNS)}
+            FROM Possessions p
+            JOIN Games g ON p.game_id = g.game_id
+            WHERE g.season = ?
+        ),
+        on_court AS ({on_court})
+        SELECT COUNT(*), COUNT(d.player_id)
+        FROM on_court o
+        LEFT JOIN (SELECT DISTINCT player_id FROM PlayerSeasonSkill WHERE season = ?) d ON d.player_id = o.player_id
+        WHERE o.player_id IS NOT NULL
+    """, [season, season]).fetchone()
+    darko_players = conn.execute("SELECT COUNT(DISTINCT player_id) FROM PlayerSeasonSkill WHERE season = ?",
+                                 [season]).fetchone()[0]
+    return {"players": int(players), "rated": int(rated), "darko_players": int(darko_players)}
+
+
+def rated_possessions(conn: Any, season: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    The training-data join: a season's TruePossessions rows whose ten players are all
+    rated in PlayerSeasonSkill for that season, in game order.
+    """
+    columns = list(columns) if columns is not None else ID_COLUMNS + [OUTCOME_COLUMN]
+    rated = " AND ".join(f"t.{column} IN (SELECT player_id FROM rated)"
+                         for column in (*OFFENSE_LINEUP_COLUMNS, *DEFENSE_LINEUP_COLUMNS))
+    return read_frame(conn, f"""
+        WITH rated AS (SELECT DISTINCT player_id FROM PlayerSeasonSkill WHERE season = ?)
+        SELECT {', '.join(f't.{column}' for column in columns)}
+        FROM TruePossessions t
+        WHERE t.season = ? AND {rated}
+        ORDER BY t.game_id, t.possession_num
+    """, [season, season])
+
+
+CHECKS: Dict[str, Callable[[Any, str], Any]] = {
+    "lineup_rating_coverage": lambda conn, season: lineup_rating_coverage(
+        conn, season, f"PlayerArchetypeFeatures_{season.replace('-', '_')}"),
+    "season_player_overlap": season_player_overlap,
+    "possessions_by_season": lambda conn, season: possessions_by_season(conn, [season]),
+    "rated_possessions": rated_possessions,
+}
+
+
+def _comparable(result: Any) -> Any:
+    if isinstance(result, pd.DataFrame):
+        return result.astype("float64").to_numpy().tolist()
+    return result
+
+
+def benchmark(db_path: Optional[str] = None, seasons: Sequence[str] = (), engines: Sequence[str] = ENGINES,
+              parquet_dir: Optional[str] = None, threads: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Runs every check for every season on each engine.
+
+    Returns:
+        One record per engine, check and season, with the wall-clock seconds, whether the
+        result matched the first engine's, and the error if the check failed. Opening the
+        connection is recorded as the "connect" check.
+    """
+    records: List[Dict[str, Any]] = []
+    baseline: Dict[tuple, Any] = {}
+    for engine in engines:
+        start = time.perf_counter()
+        conn = connect_analytics(db_path, engine=engine, parquet_dir=parquet_dir, threads=threads)
+        records.append({"engine": engine, "check": "connect", "season": "", "seconds": time.perf_counter() - start,
+                        "matches": True, "error": None})
+        try:
+            for name, check in CHECKS.items():
+                for season in seasons:
+                    record = {"engine": engine, "check": name, "season": season, "matches": None, "error": None}
+                    start = time.perf_counter()
+                    try:
+                        result = _comparable(check(conn, season))
+                    except Exception as e:  # sqlite3 and duckdb raise unrelated error types
+                        record["error"] = str(e)
+                    else:
+                        record["matches"] = baseline.setdefault((name, season), result) == result
+                    record["seconds"] = time.perf_counter() - start
+                    records.append(record)
+        finally:
+            conn.close()
+    return records
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time the audit aggregates and training joins on SQLite and DuckDB.")
+    parser.add_argument("--db", default=settings.DB_PATH, help="Database to query.")
+    parser.add_argument("--seasons", nargs="+", default=["2018-19", "2020-21", "2021-22"], help="Seasons to check.")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES,
+                        default=list(ENGINES) if DUCKDB_AVAILABLE else ["sqlite"], help="Engines to compare.")
+    parser.add_argument("--parquet-dir", default=None, help="DuckDB reads TruePossessions from this Parquet export.")
+    parser.add_argument("--threads", type=int, default=None, help="DuckDB worker threads (0 = every core).")
+    args = parser.parse_args()
+
+    records = benchmark(args.db, args.seasons, args.engines, args.parquet_dir, args.threads)
+    print(f"{'engine':8} {'check':24} {'season':8} {'seconds':>9}  result")
+    for record in records:
+        status = record["error"] or ("same" if record["matches"] else "DIFFERENT")
+        print(f"{record['engine']:8} {record['check']:24} {record['season']:8} {record['seconds']:9.3f}  {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Bulk-load mode for large SQLite backfills (e.g. a multi-season Possessions load)."""
+
+import logging
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def get_secondary_indexes(conn: sqlite3.Connection, table: str) -> List[Tuple[str, str]]:
+    """Explicitly created indexes on ``table`` as (name, CREATE statement) pairs.
+
+    Automatic indexes backing PRIMARY KEY / UNIQUE constraints have no SQL and are skipped,
+    since they cannot be dropped.
+    """
+    rows = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL ORDER BY name",
+        (table,),
+    ).fetchall()
+    return [(name, sql) for name, sql in rows]
+
+
+@contextmanager
+def bulk_load(conn: sqlite3.Connection, table: Optional[str] = None, drop_indexes: bool = False,
+              cache_size_kib: int = settings.BULK_LOAD_CACHE_SIZE_KIB,
+              mmap_size: int = settings.BULK_LOAD_MMAP_SIZE) -> Iterator[sqlite3.Connection]:
+    """
+    Tunes ``conn`` for a large write and restores its settings afterwards.
+
+    Switches the database to WAL with ``synchronous=NORMAL`` (commits no longer fsync the
+    main file) and enlarges the page cache and memory map. With ``drop_indexes``, the
+    secondary indexes on ``table`` are dropped for the load and rebuilt from their original
+    SQL on exit, which is cheaper than maintaining them row by row.
+
+    WAL is left enabled: it is persistent, harmless for readers and cannot be switched off
+    while other connections are open. Must be entered outside a transaction.
+    """
+    previous = {
+        pragma: conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+        for pragma in ("synchronous", "cache_size", "mmap_size")
+    }
+    journal_mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+    if journal_mode.lower() != "wal":
+        logger.warning(f"Could not enable WAL (journal_mode={journal_mode}); continuing without it.")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    # Negative cache_size is in KiB rather than pages
+    conn.execute(f"PRAGMA cache_size = -{int(cache_size_kib)}")
+    conn.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+
+    dropped: List[Tuple[str, str]] = []
+    if drop_indexes and table:
+        dropped = get_secondary_indexes(conn, table)
+        for name, _ in dropped:
+            conn.execute(f'DROP INDEX IF EXISTS "{name}"')
+        if dropped:
+            conn.commit()
+            logger.info(f"Dropped {len(dropped)} indexes on {table} for bulk load: {', '.join(n for n, _ in dropped)}")
+
+    try:
+        yield conn
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        for name, sql in dropped:
+            conn.execute(sql)
+        if dropped:
+            conn.commit()
+            logger.info(f"Rebuilt {len(dropped)} indexes on {table}.")
+        for pragma, value in previous.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
@@ -1,23 +1,260 @@
-"""Database connection management for NBA stats application."""
+"""
+Database connection management for NBA stats application.
 
-import sqlite3
+Every connection to a database file comes from one ConnectionFactory, which applies the
+same PRAGMAs (WAL, synchronous, cache_size, mmap_size, temp_store, busy_timeout and
+foreign keys) and keeps a small thread-safe pool of idle connections. Pooled connections
+are ordinary ``sqlite3.Connection`` objects whose ``close()`` hands them back to the pool,
+so existing ``conn = get_db_connection(); ...; conn.close()`` call sites pool for free.
+Read-only connections (``read_only=True``) open the file with ``mode=ro`` and
+``query_only``, for dashboards and reports that must never write.
+
+``pool_stats()`` reports checkouts, pool hits and checkout latency per factory.
+"""
+
+import atexit
 import logging
-from typing import Optional
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from ..api.telemetry import LatencyHistogram
+from ..config import settings
 from ..config.settings import DB_PATH
 
+logger = logging.getLogger(__name__)
+
+
 def register_datetime_adapters():
     """Register adapters for datetime objects to be stored as ISO 8601 strings."""
     def adapt_datetime(ts):
         return ts.isoformat()
     
     def convert_timestamp(val):
-        """Convert ISO 8601 string to datetime object."""
-        return datetime.fromisoformat(val.decode('utf-8'))
+        """Convert ISO 8601 string to datetime object (None if it is not one)."""
+        try:
+            return datetime.fromisoformat(val.decode('utf-8'))
+        except (AttributeError, ValueError):
+            return None
 
     sqlite3.register_adapter(datetime, adapt_datetime)
     sqlite3.register_converter("timestamp", convert_timestamp)
 
+
+register_datetime_adapters()
+
+
+class PooledConnection(sqlite3.Connection):
+    """A connection whose close() returns it to its ConnectionFactory instead of closing it."""
+
+    _factory: Optional["ConnectionFactory"] = None
+    _pooled = False
+    _file_id: Optional[Tuple[int, int]] = None
+
+    def close(self) -> None:
+        if self._pooled:
+            return  # Already back in the pool (e.g. closed twice)
+        factory, self._factory = self._factory, None
+        if factory is None:
+            super().close()
+        else:
+            factory._release(self)
+
+    def _close(self) -> None:
+        self._factory, self._pooled = None, False
+        super().close()
+
+
+class ConnectionFactory:
+    """
+    Opens tuned connections to one database file and pools the idle ones.
+
+    Checkouts never block: when the pool is empty a new connection is opened, and at most
+    ``max_idle`` returned connections are kept. A returned connection is rolled back and
+    reset (row_factory, isolation_level) before reuse. Connections may be checked out on
+    a different thread from the one that opened them, but must be used by one thread at
+    a time.
+    """
+
+    def __init__(self, db_path: Union[str, Path], read_only: bool = False,
+                 detect_types: int = sqlite3.PARSE_DECLTYPES, max_idle: int = settings.DB_POOL_MAX_IDLE):
+        self.db_path = str(db_path)
+        self.read_only = read_only
+        self.detect_types = detect_types
+        self.max_idle = max(0, max_idle)
+        self._idle: List[PooledConnection] = []
+        self._lock = threading.Lock()
+        self._latency = LatencyHistogram()
+        self._checkouts = 0
+        self._opened = 0
+        self._open_now = 0
+
+    def _open(self) -> PooledConnection:
+        if self.read_only:
+            target = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            conn = sqlite3.connect(target, uri=True, detect_types=self.detect_types,
+                                   check_same_thread=False, factory=PooledConnection)
+        else:
+            conn = sqlite3.connect(self.db_path, detect_types=self.detect_types,
+                                   check_same_thread=False, factory=PooledConnection)
+        try:
+            conn.execute(f"PRAGMA busy_timeout = {int(settings.DB_BUSY_TIMEOUT_MS)}")
+            if not self.read_only and self.db_path != ":memory:":
+                # WAL is persistent, so this is a no-op after the first connection to the file
+                journal_mode = conn.execute(f"PRAGMA journal_mode = {settings.DB_JOURNAL_MODE}").fetchone()[0]
+                if journal_mode.lower() == "wal":
+                    conn.execute("PRAGMA synchronous = NORMAL")
+            # Negative cache_size is in KiB rather than pages
+            conn.execute(f"PRAGMA cache_size = -{int(settings.DB_CACHE_SIZE_KIB)}")
+            conn.execute(f"PRAGMA mmap_size = {int(settings.DB_MMAP_SIZE)}")
+            conn.execute("PRAGMA temp_store = MEMORY")
+            conn.execute("PRAGMA foreign_keys = ON")
+            if self.read_only:
+                conn.execute("PRAGMA query_only = ON")
+        except sqlite3.Error:
+            conn.close()
+            raise
+        conn._file_id = self._file_id()
+        with self._lock:
+            self._opened += 1
+        return conn
+
+    def _file_id(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.db_path)
+        except OSError:
+            return None
+        return stat.st_dev, stat.st_ino
+
+    def checkout(self, row_factory: Any = None) -> sqlite3.Connection:
+        """A ready connection; call close() on it (or use connection()) to return it."""
+        start = time.perf_counter()
+        conn = None
+        while conn is None:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn = self._idle.pop()
+            conn._pooled = False
+            try:
+                conn.total_changes  # Raises if the connection was closed behind the pool's back
+            except sqlite3.ProgrammingError:
+                conn = None
+                continue
+            if conn._file_id != self._file_id():
+                # The file was replaced (e.g. restored from a backup) or deleted since this was opened
+                conn._close()
+                conn = None
+        if conn is None:
+            conn = self._open()
+        conn._factory = self
+        conn.row_factory = row_factory
+        with self._lock:
+            self._checkouts += 1
+            self._open_now += 1
+            self._latency.observe(time.perf_counter() - start)
+        return conn
+
+    @contextmanager
+    def connection(self, row_factory: Any = None) -> Iterator[sqlite3.Connection]:
+        """Like ``with sqlite3.connect(...)``: commits on success, rolls back on error, then returns the connection."""
+        conn = self.checkout(row_factory=row_factory)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _release(self, conn: PooledConnection) -> None:
+        with self._lock:
+            self._open_now -= 1
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+            conn.isolation_level = ""
+        except sqlite3.Error as e:
+            logger.warning(f"Discarding a pooled connection to {self.db_path} that could not be reset: {e}")
+            conn._close()
+            return
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                conn._pooled = True
+                self._idle.append(conn)
+                return
+        conn._close()
+
+    def close_all(self) -> None:
+        """Closes the idle connections; checked-out ones close when they are returned."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn._close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "db_path": self.db_path,
+                "read_only": self.read_only,
+                "checkouts": self._checkouts,
+                "connections_opened": self._opened,
+                "pool_hits": self._checkouts - self._opened,
+                "checked_out": self._open_now,
+                "idle": len(self._idle),
+                "checkout_latency": self._latency.snapshot(),
+            }
+
+
+_factories: Dict[Tuple[str, bool, int], ConnectionFactory] = {}
+_factories_lock = threading.Lock()
+
+
+def get_connection_factory(db_path: Optional[Union[str, Path]] = None, read_only: bool = False,
+                           detect_types: int = sqlite3.PARSE_DECLTYPES) -> ConnectionFactory:
+    """The process-wide factory for a database file (DB_PATH by default) and mode."""
+    path = str(db_path or DB_PATH)
+    key = (path if path == ":memory:" else str(Path(path).resolve()), read_only, detect_types)
+    with _factories_lock:
+        factory = _factories.get(key)
+        if factory is None:
+            # An in-memory database exists only inside its connection, so it is never pooled
+            factory = _factories[key] = ConnectionFactory(path, read_only=read_only, detect_types=detect_types,
+                                                          max_idle=0 if path == ":memory:" else settings.DB_POOL_MAX_IDLE)
+        return factory
+
+
+def connect(db_path: Optional[Union[str, Path]] = None, read_only: bool = False, row_factory: Any = None,
+            detect_types: int = sqlite3.PARSE_DECLTYPES) -> sqlite3.Connection:
+    """Checks out a pooled, tuned connection; close() returns it to the pool."""
+    return get_connection_factory(db_path, read_only, detect_types).checkout(row_factory=row_factory)
+
+
+def connection(db_path: Optional[Union[str, Path]] = None, read_only: bool = False, row_factory: Any = None,
+               detect_types: int = sqlite3.PARSE_DECLTYPES):
+    """Context manager over a pooled connection: commits on success, rolls back on error, returns it to the pool."""
+    return get_connection_factory(db_path, read_only, detect_types).connection(row_factory=row_factory)
+
+
+def pool_stats() -> List[Dict[str, Any]]:
+    """Checkout counts, pool hits and checkout latency for every factory in this process."""
+    with _factories_lock:
+        factories = list(_factories.values())
+    return [factory.stats() for factory in factories]
+
+
+@atexit.register
+def close_all_pools() -> None:
+    with _factories_lock:
+        factories = list(_factories.values())
+    for factory in factories:
+        factory.close_all()
+
+
 class DatabaseConnection:
     """Manages database connections and provides common database operations."""
     
@@ -43,14 +280,7 @@ class DatabaseConnection:
         """
         if self.connection is None:
             try:
-                self.connection = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES)
-                self.connection.row_factory = sqlite3.Row
-                register_datetime_adapters()
-                # Enforce referential integrity for all connections
-                try:
-                    self.connection.execute("PRAGMA foreign_keys = ON;")
-                except sqlite3.Error as e:
-                    logging.error(f"Failed to enable SQLite foreign key enforcement: {e}")
+                self.connection = connect(self.db_path, row_factory=sqlite3.Row)
                 logging.info("Database connection established successfully.")
             except sqlite3.Error as e:
                 logging.error(f"Database connection error: {e}")
@@ -151,21 +381,14 @@ class DatabaseConnection:
         """Context manager exit."""
         self.close()
 
-def get_db_connection() -> Optional[sqlite3.Connection]:
+def get_db_connection(db_path: Optional[str] = None, read_only: bool = False) -> Optional[sqlite3.Connection]:
     """
     Provides a direct database connection.
     This is a helper function to avoid changing all call sites that expect
     a direct connection object rather than a manager class.
     """
     try:
-        register_datetime_adapters()
-        conn = sqlite3.connect(DB_PATH, detect_types=sqlite3.PARSE_DECLTYPES)
-        conn.row_factory = sqlite3.Row
-        try:
-            conn.execute("PRAGMA foreign_keys = ON;")
-        except sqlite3.Error as e:
-            logging.error(f"Failed to enable SQLite foreign key enforcement: {e}")
-        return conn
+        return connect(db_path, read_only=read_only, row_factory=sqlite3.Row)
     except sqlite3.Error as e:
         logging.error(f"Failed to get database connection: {e}")
-        return None 
\ No newline at end of file
+        return None
@@ -6,6 +6,7 @@ import pandas as pd
 import logging
 from typing import Optional, List, Dict, Any
 from src.nba_stats.config.settings import DB_PATH
+from src.nba_stats.db.connection import connect
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -18,14 +19,10 @@ class DatabaseConnection:
             db_path: Path to the SQLite database file
         """
         self.db_path = db_path
-        self._connection = sqlite3.connect(db_path)
-        self._connection.row_factory = sqlite3.Row
+        # Pooled connection with the shared PRAGMAs (WAL, synchronous=NORMAL, ...)
+        self._connection = connect(db_path, row_factory=sqlite3.Row, detect_types=0)
         self._cursor = self._connection.cursor()
         
-        # Enable WAL mode for better concurrency
-        self._connection.execute("PRAGMA journal_mode=WAL")
-        self._connection.execute("PRAGMA synchronous=NORMAL")
-        
         logging.info("Database connection established successfully.")
     
     def execute(self, query: str, params: Optional[tuple] = None) -> None:
@@ -69,7 +66,7 @@ class DatabaseConnection:
 def get_db_connection():
     """Establishes a connection to the SQLite database."""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = connect(DB_PATH, detect_types=0)
         logging.info(f"Successfully connected to the database at {DB_PATH}.")
         return conn
     except sqlite3.Error as e:
@@ -0,0 +1,261 @@
+"""
+Index advisor for the hot query paths.
+
+Runs ``EXPLAIN QUERY PLAN`` over the ``db_mapping`` query templates and the season-filtered
+reads of the training scripts, flags every full scan, and names the covering index from
+``HOT_QUERY_INDEXES`` that would turn it into a search. ``migrate_db`` creates those indexes
+through ``create_hot_query_indexes``.
+
+    python -m src.nba_stats.db.index_advisor              # report scans and the migration SQL
+    python -m src.nba_stats.db.index_advisor --apply      # create the indexes, timing each query before and after
+"""
+
+import argparse
+import logging
+import re
+import sqlite3
+import time
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..config import settings
+from ..db_mapping import db_mapping
+
+logger = logging.getLogger(__name__)
+
+_PLAN_SCAN = re.compile(r"^SCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?")
+_TABLE_REFERENCE = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_NOT_ALIASES = {"WHERE", "JOIN", "LEFT", "INNER", "CROSS", "ON", "USING", "GROUP", "ORDER", "LIMIT"}
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """A secondary index; the leading columns serve the filter and the rest make it covering."""
+    name: str
+    table: str
+    columns: Tuple[str, ...]
+
+    @property
+    def sql(self) -> str:
+        return f"CREATE INDEX IF NOT EXISTS {self.name} ON {self.table}({', '.join(self.columns)})"
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    """A query run on every training or evaluation pass, and the indexes meant to serve it."""
+    name: str
+    sql: str
+    params: Tuple = ()
+    source: str = ""
+    indexes: Tuple[str, ...] = ()
+
+
+@dataclass
+class PlanFinding:
+    """A full table (or full index) scan in a hot query's plan."""
+    query: str
+    table: str
+    detail: str
+    index: Optional[IndexSpec] = None
+
+
+HOT_QUERY_INDEXES: Dict[str, IndexSpec] = {spec.name: spec for spec in (
+    # Games by season, covering the game_id the possession joins need
+    IndexSpec("idx_games_season", "Games", ("season", "game_id")),
+    # Per-season DARKO lookups of the Bayesian data scripts and ModelEvaluator
+    IndexSpec("idx_player_season_skill_season", "PlayerSeasonSkill",
+              ("season", "player_id", "offensive_darko", "defensive_darko")),
+    IndexSpec("idx_player_season_archetypes_season", "PlayerSeasonArchetypes",
+              ("season", "player_id", "archetype_id")),
+)}
+
+SAMPLE_SEASON = settings.SEASON_ID
+
+# Training-script reads that are not db_mapping templates
+TRAINING_QUERIES = [
+    HotQuery(
+        "season_possessions",
+        """
+        SELECT p.game_id, p.event_num, p.home_player_1_id, p.away_player_1_id, p.offensive_team_id
+        FROM Possessions p
+        JOIN Games g ON p.game_id = g.game_id
+        WHERE g.season = ?
+        """,
+        (SAMPLE_SEASON,), "db/analytics.py audit checks (lineup_rating_coverage, season_player_overlap)",
+        ("idx_games_season",),
+    ),
+    HotQuery(
+        "season_darko",
+        "SELECT player_id, offensive_darko, defensive_darko FROM PlayerSeasonSkill WHERE season = ?",
+        (SAMPLE_SEASON,), "generate_multi_season_bayesian_data.py, generate_matchup_specific_bayesian_data.py",
+        ("idx_player_season_skill_season",),
+    ),
+    HotQuery(
+        "season_archetypes",
+        "SELECT player_id, archetype_id FROM PlayerSeasonArchetypes WHERE season = ?",
+        (SAMPLE_SEASON,), "create_stratified_sample.py, create_production_sample.py",
+        ("idx_player_season_archetypes_season",),
+    ),
+    HotQuery(
+        "season_true_possessions",
+        "SELECT * FROM TruePossessions WHERE season = ? ORDER BY game_id, possession_num",
+        (SAMPLE_SEASON,), "possessions_store.read_true_possessions",
+        ("idx_true_possessions_season",),
+    ),
+]
+
+# Which HOT_QUERY_INDEXES serve each db_mapping template
+TEMPLATE_INDEXES = {
+    "get_player_skills": ("idx_player_season_skill_season",),
+    "get_player_archetypes": ("idx_player_season_archetypes_season",),
+    "get_games": ("idx_games_season",),
+}
+
+
+def hot_queries(season: str = SAMPLE_SEASON) -> List[HotQuery]:
+    """The db_mapping query templates followed by TRAINING_QUERIES, bound to ``season``."""
+    queries = []
+    for name in db_mapping.get_mapping_summary()["query_templates"]:
+        sql = db_mapping.get_query_template(name)
+        queries.append(HotQuery(name, sql, (season,) * sql.count("?"), "db_mapping",
+                                TEMPLATE_INDEXES.get(name, ())))
+    return queries + [replace(query, params=(season,) * len(query.params)) for query in TRAINING_QUERIES]
+
+
+def _table_aliases(sql: str) -> Dict[str, str]:
+    aliases = {}
+    for table, alias in _TABLE_REFERENCE.findall(sql):
+        aliases[table] = table
+        if alias and alias.upper() not in _NOT_ALIASES:
+            aliases[alias] = table
+    return aliases
+
+
+def existing_indexes(conn: sqlite3.Connection) -> set:
+    return {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+def existing_tables(conn: sqlite3.Connection) -> set:
+    return {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def query_plan(conn: sqlite3.Connection, query: HotQuery) -> List[str]:
+    """The detail column of EXPLAIN QUERY PLAN, one string per step."""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query.sql}", query.params)]
+
+
+def advise(conn: sqlite3.Connection, queries: Optional[Sequence[HotQuery]] = None) -> List[PlanFinding]:
+    """
+    Full scans in the plans of ``queries`` (hot_queries() by default).
+
+    A finding carries the index that would serve it when the query names one for the scanned
+    table and it does not exist yet. A scan of a table the query names no index for (the
+    possessions side of a season join) gets the query's missing index on the other table:
+    with it the planner searches that table first and probes the scanned one by primary
+    key. Scans left without a suggestion read the whole table by design. Queries against
+    tables this database does not have are skipped.
+    """
+    findings = []
+    indexes = existing_indexes(conn)
+    views = dict(conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'view'").fetchall())
+    for query in queries if queries is not None else hot_queries():
+        try:
+            plan = query_plan(conn, query)
+        except sqlite3.OperationalError as e:
+            logger.info(f"Skipping hot query '{query.name}': {e}")
+            continue
+        aliases = _table_aliases(query.sql)
+        for view in set(aliases.values()) & views.keys():
+            # Scans inside a view are reported under the view's own aliases
+            aliases = {**_table_aliases(views[view]), **aliases}
+        for detail in plan:
+            match = _PLAN_SCAN.match(detail)
+            if not match:
+                continue
+            table = aliases.get(match.group(1), match.group(1))
+            specs = [HOT_QUERY_INDEXES[name] for name in query.indexes if name in HOT_QUERY_INDEXES]
+            candidates = [spec for spec in specs if spec.table == table] or specs
+            missing = next((spec for spec in candidates if spec.name not in indexes), None)
+            findings.append(PlanFinding(query.name, table, detail, missing))
+    return findings
+
+
+def migration_sql(findings: Sequence[PlanFinding]) -> List[str]:
+    """CREATE INDEX statements for the indexes the findings are missing, once each."""
+    specs = {finding.index.name: finding.index for finding in findings if finding.index is not None}
+    return [spec.sql for spec in specs.values()]
+
+
+def create_hot_query_indexes(conn: sqlite3.Connection, specs: Optional[Sequence[IndexSpec]] = None) -> List[str]:
+    """
+    Creates the missing HOT_QUERY_INDEXES (or ``specs``) on the tables that exist and returns
+    their names. Does not commit.
+    """
+    tables, indexes = existing_tables(conn), existing_indexes(conn)
+    created = []
+    for spec in specs if specs is not None else HOT_QUERY_INDEXES.values():
+        if spec.table in tables and spec.name not in indexes:
+            conn.execute(spec.sql)
+            created.append(spec.name)
+    return created
+
+
+def time_query(conn: sqlite3.Connection, query: HotQuery, repeat: int = 3) -> float:
+    """Best of ``repeat`` wall-clock runs of the query, fetching every row, in seconds."""
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        conn.execute(query.sql, query.params).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _timings(conn: sqlite3.Connection, queries: Sequence[HotQuery], repeat: int) -> Dict[str, float]:
+    timings = {}
+    for query in queries:
+        try:
+            timings[query.name] = time_query(conn, query, repeat)
+        except sqlite3.OperationalError:
+            continue
+    return timings
+
+
+def main() -> None:
+    from .connection import connect
+
+    parser = argparse.ArgumentParser(description="Flag full scans in the hot queries and suggest covering indexes.")
+    parser.add_argument("--db", default=settings.DB_PATH, help="Database to inspect.")
+    parser.add_argument("--apply", action="store_true", help="Create the missing indexes and time each query before and after.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per query when timing (the best is reported).")
+    parser.add_argument("--season", default=SAMPLE_SEASON, help="Season the queries are bound to; time one the database holds.")
+    args = parser.parse_args()
+
+    conn = connect(args.db, read_only=not args.apply, detect_types=0)
+    try:
+        queries = hot_queries(args.season)
+        findings = advise(conn, queries)
+        for finding in findings:
+            suggestion = f" -> {finding.index.name}" if finding.index else ""
+            print(f"{finding.query:28} {finding.table:24} {finding.detail}{suggestion}")
+        statements = migration_sql(findings)
+        if not statements:
+            print("No missing indexes for the hot queries.")
+            return
+        print("\n" + ";\n".join(statements) + ";")
+        if not args.apply:
+            return
+
+        before = _timings(conn, queries, args.repeat)
+        created = create_hot_query_indexes(conn)
+        conn.commit()
+        after = _timings(conn, queries, args.repeat)
+        print(f"\nCreated {', '.join(created)}\n")
+        print(f"{'query':28} {'before ms':>10} {'after ms':>10}")
+        for name, seconds in before.items():
+            print(f"{name:28} {seconds * 1000:10.2f} {after.get(name, float('nan')) * 1000:10.2f}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
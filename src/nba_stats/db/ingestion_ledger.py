@@ -0,0 +1,171 @@
+"""
+IngestionLedger: one row per ingested unit of work (a game or a season of an endpoint).
+
+Loaders write their ledger row in the same transaction as the data it describes, so the
+ledger never claims data that was rolled back. Resumption and progress reporting read the
+ledger (an indexed lookup per season) instead of scanning the data tables, and the stored
+payload hash lets a refresh skip rewriting games whose data has not changed. Derived stages
+also store the payload hash of the input they were built from (source_hash), so they can tell
+which units are stale while payload_hash still describes their own output.
+"""
+
+import hashlib
+import logging
+import sqlite3
+from typing import Dict, Iterable, Optional, Set
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SUCCESS = "success"
+FAILED = "failed"
+STATUSES = (SUCCESS, FAILED)
+
+
+def create_ingestion_ledger_table(conn: sqlite3.Connection) -> None:
+    """Create the IngestionLedger table."""
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS IngestionLedger (
+            source TEXT NOT NULL,
+            endpoint TEXT NOT NULL,
+            entity_key TEXT NOT NULL,
+            season TEXT,
+            status TEXT NOT NULL CHECK (status IN {STATUSES!r}),
+            row_count INTEGER NOT NULL DEFAULT 0,
+            payload_hash TEXT,
+            source_hash TEXT,
+            fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            duration_seconds REAL,
+            attempts INTEGER NOT NULL DEFAULT 1,
+            error TEXT,
+            PRIMARY KEY (source, endpoint, entity_key)
+        ) WITHOUT ROWID
+    """)
+    # Ledgers created before source_hash existed
+    if "source_hash" not in {row[1] for row in cursor.execute("PRAGMA table_info(IngestionLedger)")}:
+        cursor.execute("ALTER TABLE IngestionLedger ADD COLUMN source_hash TEXT")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_ingestion_ledger_season
+        ON IngestionLedger(source, endpoint, season, status)
+    """)
+    logger.info("IngestionLedger table checked/created.")
+
+
+def payload_hash(df: pd.DataFrame) -> str:
+    """Stable content hash of a DataFrame (column names and values, not the index)."""
+    digest = hashlib.sha256("\x1f".join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def record(conn: sqlite3.Connection, source: str, endpoint: str, entity_key: str, status: str,
+           row_count: int = 0, payload_hash: Optional[str] = None, duration_seconds: Optional[float] = None,
+           season: Optional[str] = None, error: Optional[str] = None, source_hash: Optional[str] = None) -> None:
+    """
+    Upserts the ledger row for one unit of work. Does not commit: call it inside the
+    transaction that writes the data. A failure keeps the last successful payload and
+    source hashes.
+    """
+    conn.execute("""
+        INSERT INTO IngestionLedger
+            (source, endpoint, entity_key, season, status, row_count, payload_hash, source_hash,
+             duration_seconds, error)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (source, endpoint, entity_key) DO UPDATE SET
+            season = COALESCE(excluded.season, season),
+            status = excluded.status,
+            row_count = CASE WHEN excluded.status = 'success' THEN excluded.row_count ELSE row_count END,
+            payload_hash = CASE WHEN excluded.status = 'success' THEN excluded.payload_hash ELSE payload_hash END,
+            source_hash = CASE WHEN excluded.status = 'success' THEN excluded.source_hash ELSE source_hash END,
+            fetched_at = CURRENT_TIMESTAMP,
+            duration_seconds = excluded.duration_seconds,
+            attempts = attempts + 1,
+            error = excluded.error
+    """, (source, endpoint, str(entity_key), season, status, row_count, payload_hash, source_hash, duration_seconds,
+          error))
+
+
+def completed(conn: sqlite3.Connection, source: str, endpoint: str, season: Optional[str] = None) -> Set[str]:
+    """Entity keys recorded as successfully ingested (for one season, if given)."""
+    query = "SELECT entity_key FROM IngestionLedger WHERE source = ? AND endpoint = ? AND status = 'success'"
+    params: tuple = (source, endpoint)
+    if season is not None:
+        query += " AND season = ?"
+        params += (season,)
+    return {key for (key,) in conn.execute(query, params)}
+
+
+def updated_since(conn: sqlite3.Connection, source: str, endpoint: str, since: str,
+                  season: Optional[str] = None) -> Set[str]:
+    """Entity keys successfully ingested at or after ``since`` (a CURRENT_TIMESTAMP value)."""
+    query = ("SELECT entity_key FROM IngestionLedger "
+             "WHERE source = ? AND endpoint = ? AND status = 'success' AND fetched_at >= ?")
+    params: tuple = (source, endpoint, since)
+    if season is not None:
+        query += " AND season = ?"
+        params += (season,)
+    return {key for (key,) in conn.execute(query, params)}
+
+
+def stored_hash(conn: sqlite3.Connection, source: str, endpoint: str, entity_key: str) -> Optional[str]:
+    """Payload hash of the last successful ingest of ``entity_key``, if any."""
+    row = conn.execute(
+        "SELECT payload_hash FROM IngestionLedger WHERE source = ? AND endpoint = ? AND entity_key = ? AND status = 'success'",
+        (source, endpoint, str(entity_key)),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def progress(conn: sqlite3.Connection, source: str, endpoint: str, season: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """Per-status counts, row totals and mean duration, e.g. {'success': {'count': 1200, 'rows': ..., ...}}."""
+    query = """
+        SELECT status, COUNT(*), COALESCE(SUM(row_count), 0), AVG(duration_seconds)
+        FROM IngestionLedger WHERE source = ? AND endpoint = ?
+    """
+    params: tuple = (source, endpoint)
+    if season is not None:
+        query += " AND season = ?"
+        params += (season,)
+    return {
+        status: {"count": count, "rows": rows, "mean_duration_seconds": round(mean or 0.0, 3)}
+        for status, count, rows, mean in conn.execute(query + " GROUP BY status", params)
+    }
+
+
+def version(conn: sqlite3.Connection, source: str, endpoint: str, season: Optional[str] = None) -> str:
+    """
+    Content version of the successful work (for one season, if given): a hash of every
+    entity key, row count and payload hash. It changes whenever a unit is added, rewritten
+    with a different payload, or fails, so derived artefacts can be invalidated by it.
+    """
+    query = ("SELECT entity_key, row_count, payload_hash FROM IngestionLedger "
+             "WHERE source = ? AND endpoint = ? AND status = 'success'")
+    params: tuple = (source, endpoint)
+    if season is not None:
+        query += " AND season = ?"
+        params += (season,)
+    digest = hashlib.sha256()
+    for key, row_count, payload in conn.execute(query + " ORDER BY entity_key", params):
+        digest.update(f"{key}\x1f{row_count}\x1f{payload}\x1e".encode())
+    return digest.hexdigest()
+
+
+def has_entries(conn: sqlite3.Connection, source: str, endpoint: str) -> bool:
+    row = conn.execute("SELECT 1 FROM IngestionLedger WHERE source = ? AND endpoint = ? LIMIT 1",
+                       (source, endpoint)).fetchone()
+    return row is not None
+
+
+def seed(conn: sqlite3.Connection, source: str, endpoint: str,
+         entries: Iterable[tuple]) -> int:
+    """
+    Records already-ingested work as successful, for data loaded before the ledger existed.
+    ``entries`` are (entity_key, season, row_count) tuples; existing ledger rows are kept.
+    """
+    cursor = conn.executemany("""
+        INSERT OR IGNORE INTO IngestionLedger (source, endpoint, entity_key, season, status, row_count)
+        VALUES (?, ?, ?, ?, 'success', ?)
+    """, ((source, endpoint, str(key), season, row_count) for key, season, row_count in entries))
+    return cursor.rowcount
@@ -6,6 +6,7 @@ from pathlib import Path
 
 from ..config.settings import DB_PATH
 from ..scripts.create_tables import create_all_tables
+from .connection import connect
 
 
 def init_database(db_path: str = DB_PATH) -> None:
@@ -20,18 +21,12 @@ def init_database(db_path: str = DB_PATH) -> None:
         db_path = Path(db_path)
         db_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Connect to the database
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Enable foreign keys
-        cursor.execute("PRAGMA foreign_keys = ON")
-        
-        # Enable WAL mode for better concurrency
-        cursor.execute("PRAGMA journal_mode = WAL")
+        # Connect to the database (foreign keys and WAL are set by the connection factory)
+        conn = connect(db_path)
         
         # Create all tables
         create_all_tables(conn)
+        conn.commit()
         
         logging.info("Database initialized successfully.")
         
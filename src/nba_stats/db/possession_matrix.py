@@ -0,0 +1,170 @@
+"""
+Memory-mapped possession matrix: a season of TruePossessions as fixed-width NumPy arrays.
+
+``build_matrix`` writes one directory per season under POSSESSION_MATRIX_DIR, with one raw
+little-endian file per array and a small ``header.json`` giving each array's dtype and
+shape, the row count and the ledger version it was built from:
+
+    game_index      int32  (n,)    row of ``games`` holding the possession's game key
+    games           int64  (g,)    integer game keys (see possessions_store.game_key)
+    off_players     int32  (n, 5)  offensive lineup
+    def_players     int32  (n, 5)  defensive lineup
+    offensive_team  int32  (n,)
+    defensive_team  int32  (n,)
+    period          int16  (n,)
+    points          int16  (n,)    outcome
+
+Only possessions with all ten players known are stored, in game order. ``open_matrix``
+maps the files read-only with ``np.memmap``, so opening a season costs no reads, and worker
+processes that open (or unpickle) the same matrix share its pages. ``load_matrix`` rebuilds
+a season whose header no longer matches the TruePossessions ledger version.
+"""
+
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from ..config import settings
+from ..utils.true_possessions import DEFENSE_LINEUP_COLUMNS, LEDGER_ENDPOINT, LEDGER_SOURCE, OFFENSE_LINEUP_COLUMNS
+from . import ingestion_ledger as ledger
+from .possessions_store import game_key, read_true_possessions
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+HEADER_FILE = "header.json"
+# Array name -> (dtype, width); width None for a vector
+ARRAYS: Dict[str, Tuple[str, Optional[int]]] = {
+    "game_index": ("<i4", None),
+    "games": ("<i8", None),
+    "off_players": ("<i4", 5),
+    "def_players": ("<i4", 5),
+    "offensive_team": ("<i4", None),
+    "defensive_team": ("<i4", None),
+    "period": ("<i2", None),
+    "points": ("<i2", None),
+}
+
+
+def matrix_path(season: str, root: str = settings.POSSESSION_MATRIX_DIR) -> str:
+    return os.path.join(root, f"season={season}")
+
+
+def ledger_version(conn: sqlite3.Connection, season: str) -> str:
+    return ledger.version(conn, LEDGER_SOURCE, LEDGER_ENDPOINT, season)
+
+
+class PossessionMatrix:
+    """One season's arrays, mapped read-only. Pickles by path, so workers map the same pages."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, HEADER_FILE)) as f:
+            self.header = json.load(f)
+        for name, spec in self.header["arrays"].items():
+            shape = tuple(spec["shape"])
+            if 0 in shape:  # an empty file cannot be mapped
+                array = np.empty(shape, dtype=spec["dtype"])
+            else:
+                array = np.memmap(os.path.join(path, spec["file"]), dtype=spec["dtype"], mode="r", shape=shape)
+            setattr(self, name, array)
+
+    @property
+    def season(self) -> str:
+        return self.header["season"]
+
+    @property
+    def ledger_version(self) -> str:
+        return self.header["ledger_version"]
+
+    def game_ids(self) -> np.ndarray:
+        """Game key of every possession (one gather over ``games``)."""
+        return self.games[self.game_index]
+
+    def __len__(self) -> int:
+        return self.header["rows"]
+
+    def __reduce__(self):
+        return PossessionMatrix, (self.path,)
+
+
+def build_matrix(conn: sqlite3.Connection, season: str, root: str = settings.POSSESSION_MATRIX_DIR) -> int:
+    """
+    Rewrites one season's matrix from TruePossessions and returns its row count.
+
+    The files are written into a hidden staging directory and swapped in once the header is
+    written, so a reader never maps a half-written season. Readers that already mapped the
+    old files keep them until they close.
+    """
+    version = ledger_version(conn, season)
+    df = read_true_possessions(conn, season=season, complete_lineups=True, columns=[
+        "game_id", *OFFENSE_LINEUP_COLUMNS, *DEFENSE_LINEUP_COLUMNS,
+        "offensive_team_id", "defensive_team_id", "period", "points"])
+    game_index, game_ids = (df["game_id"].factorize(sort=True) if len(df)
+                            else (np.empty(0, dtype=np.int64), []))
+    arrays = {
+        "game_index": game_index,
+        "games": [game_key(game_id) for game_id in game_ids],
+        "off_players": df[OFFENSE_LINEUP_COLUMNS].to_numpy(),
+        "def_players": df[DEFENSE_LINEUP_COLUMNS].to_numpy(),
+        "offensive_team": df["offensive_team_id"].to_numpy(),
+        "defensive_team": df["defensive_team_id"].to_numpy(),
+        "period": df["period"].to_numpy(),
+        "points": df["points"].to_numpy(),
+    }
+
+    os.makedirs(root, exist_ok=True)
+    final = matrix_path(season, root)
+    staging = tempfile.mkdtemp(prefix=f".season={season}.", dir=root)
+    try:
+        header = {"format_version": FORMAT_VERSION, "season": season, "rows": len(df),
+                  "ledger_version": version, "arrays": {}}
+        for name, (dtype, width) in ARRAYS.items():
+            array = np.ascontiguousarray(arrays[name], dtype=dtype)
+            array = array.reshape(-1, width) if width else array.reshape(-1)
+            array.tofile(os.path.join(staging, f"{name}.bin"))
+            header["arrays"][name] = {"file": f"{name}.bin", "dtype": dtype, "shape": list(array.shape)}
+        with open(os.path.join(staging, HEADER_FILE), "w") as f:
+            json.dump(header, f, indent=2)
+
+        retired = None
+        if os.path.isdir(final):
+            retired = tempfile.mkdtemp(prefix=f".retired.season={season}.", dir=root)
+            os.replace(final, os.path.join(retired, "matrix"))
+        os.replace(staging, final)
+        if retired:
+            shutil.rmtree(retired, ignore_errors=True)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return len(df)
+
+
+def open_matrix(season: str, root: str = settings.POSSESSION_MATRIX_DIR) -> Optional[PossessionMatrix]:
+    """The season's matrix as written, or None if it was never built or has an older format."""
+    path = matrix_path(season, root)
+    try:
+        matrix = PossessionMatrix(path)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Could not open the possession matrix at {path}: {e}")
+        return None
+    if matrix.header.get("format_version") != FORMAT_VERSION:
+        return None
+    return matrix
+
+
+def load_matrix(conn: sqlite3.Connection, season: str, root: str = settings.POSSESSION_MATRIX_DIR) -> PossessionMatrix:
+    """The season's matrix, rebuilt first if it is missing or older than the TruePossessions ledger."""
+    matrix = open_matrix(season, root)
+    if matrix is not None and matrix.ledger_version == ledger_version(conn, season):
+        return matrix
+    logger.info(f"Possession matrix for {season} is missing or out of date; rebuilding it.")
+    build_matrix(conn, season, root)
+    return PossessionMatrix(matrix_path(season, root))
@@ -0,0 +1,202 @@
+"""
+Season-partitioned Parquet copy of TruePossessions for the modelling scripts.
+
+``export_season`` writes one hive partition per season (``season=2023-24/part-0.parquet``).
+Integer columns use the narrowest type that fits, and the end reason is dictionary-encoded.
+``read_possessions`` reads only the requested columns and pushes the season and row
+filters down to the Parquet reader, so a script that needs the ten lineup ids, the two
+team ids and the points never touches the rest. Each partition's file metadata records the
+TruePossessions ledger version it was exported from. ``load_possessions`` reads the dataset
+when every requested season is exported at the current ledger version, and reads SQLite
+otherwise.
+
+pyarrow is optional. Without it, the export is skipped and every load reads SQLite.
+"""
+
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+from typing import List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from ..config import settings
+from ..utils.true_possessions import BOX_SCORE_COLUMNS, DEFENSE_LINEUP_COLUMNS, OFFENSE_LINEUP_COLUMNS, POSSESSION_COLUMNS
+from .possession_matrix import ledger_version
+from .possessions_store import read_true_possessions
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    ARROW_AVAILABLE = True
+except ImportError:
+    pa = ds = pq = None
+    ARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# The columns most modelling scripts need: both lineups, both teams and the outcome
+ID_COLUMNS = [*OFFENSE_LINEUP_COLUMNS, *DEFENSE_LINEUP_COLUMNS, "offensive_team_id", "defensive_team_id"]
+OUTCOME_COLUMN = "points"
+FILE_COLUMNS = ["game_id", *POSSESSION_COLUMNS]
+EXPORT_CHUNK_ROWS = 200_000
+# File metadata key holding the ledger version a partition was exported from
+VERSION_KEY = b"ledger_version"
+
+
+def _require_arrow() -> None:
+    if not ARROW_AVAILABLE:
+        raise ImportError("pyarrow is required for the Parquet possessions dataset (pip install pyarrow)")
+
+
+def possession_schema() -> "pa.Schema":
+    """File schema of a season partition; season itself is the partition key."""
+    _require_arrow()
+    types = {column: pa.int8() for column in ("period", "points", *BOX_SCORE_COLUMNS)}
+    types.update({column: pa.int16() for column in ("possession_num", "start_event_num", "end_event_num")})
+    types.update({column: pa.int32() for column in ID_COLUMNS})
+    types.update({"game_id": pa.string(), "duration_seconds": pa.float32(),
+                  "end_reason": pa.dictionary(pa.int8(), pa.string())})
+    return pa.schema([(column, types[column]) for column in FILE_COLUMNS])
+
+
+def _partitioning() -> "ds.Partitioning":
+    return ds.partitioning(pa.schema([("season", pa.string())]), flavor="hive")
+
+
+def _dataset(root: str) -> "ds.Dataset":
+    schema = possession_schema().append(pa.field("season", pa.string()))
+    return ds.dataset(root, format="parquet", partitioning=_partitioning(), schema=schema)
+
+
+def exported_seasons(root: str = settings.POSSESSIONS_PARQUET_DIR) -> List[str]:
+    """Seasons with a partition under ``root``."""
+    if not os.path.isdir(root):
+        return []
+    return sorted(name.split("=", 1)[1] for name in os.listdir(root)
+                  if name.startswith("season=") and os.path.isdir(os.path.join(root, name)))
+
+
+def _partition_file(root: str, season: str) -> str:
+    return os.path.join(root, f"season={season}", "part-0.parquet")
+
+
+def partition_version(root: str, season: str) -> Optional[str]:
+    """Ledger version the season's partition was exported from, or None if it has none."""
+    _require_arrow()
+    path = _partition_file(root, season)
+    if not os.path.isfile(path):
+        return None
+    version = (pq.read_schema(path).metadata or {}).get(VERSION_KEY)
+    return version.decode() if version is not None else None
+
+
+def export_season(conn: sqlite3.Connection, season: str, root: str = settings.POSSESSIONS_PARQUET_DIR,
+                  chunk_rows: int = EXPORT_CHUNK_ROWS) -> int:
+    """
+    Rewrites one season's partition from TruePossessions and returns its row count.
+
+    Rows are streamed in chunks, so memory stays flat. The partition is written into a hidden
+    staging directory, which dataset discovery ignores, and then swapped in, so readers never
+    see a half-written season. A season with no rows loses its partition. The ledger version
+    is read before the rows, so a derivation that lands mid-export leaves the partition stale
+    rather than falsely current.
+    """
+    _require_arrow()
+    schema = possession_schema().with_metadata({VERSION_KEY: ledger_version(conn, season).encode()})
+    final = os.path.join(root, f"season={season}")
+    os.makedirs(root, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=f".season={season}.", dir=root)
+    rows = 0
+    try:
+        query = (f"SELECT {', '.join(FILE_COLUMNS)} FROM TruePossessions WHERE season = ? "
+                 f"ORDER BY game_id, possession_num")
+        with pq.ParquetWriter(os.path.join(staging, "part-0.parquet"), schema, compression="zstd") as writer:
+            for chunk in pd.read_sql_query(query, conn, params=(season,), chunksize=chunk_rows):
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                rows += len(chunk)
+
+        retired = None
+        if os.path.isdir(final):
+            retired = tempfile.mkdtemp(prefix=f".retired.season={season}.", dir=root)
+            os.replace(final, os.path.join(retired, "partition"))
+        if rows:
+            os.replace(staging, final)
+        if retired:
+            shutil.rmtree(retired, ignore_errors=True)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return rows
+
+
+def read_possessions(root: str = settings.POSSESSIONS_PARQUET_DIR, columns: Optional[Sequence[str]] = None,
+                     seasons: Optional[Sequence[str]] = None, filters: Optional[List[Tuple]] = None,
+                     complete_lineups: bool = False, limit: Optional[int] = None) -> pd.DataFrame:
+    """
+    Reads possessions from the Parquet dataset.
+
+    Args:
+        columns: Columns to read (all, plus season, by default).
+        seasons: Only these partitions are opened.
+        filters: Row predicates in pyarrow's DNF form, e.g. ``[("points", ">", 0)]``,
+            evaluated against row-group statistics before any data is decoded.
+        complete_lineups: Only possessions with all ten players known.
+        limit: Maximum number of rows.
+    """
+    _require_arrow()
+    conditions = []
+    if seasons is not None:
+        conditions.append(ds.field("season").isin(list(seasons)))
+    if filters:
+        conditions.append(pq.filters_to_expression(filters))
+    if complete_lineups:
+        conditions.extend(ds.field(column).is_valid() for column in (*OFFENSE_LINEUP_COLUMNS, *DEFENSE_LINEUP_COLUMNS))
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    scanner = _dataset(root).scanner(columns=list(columns) if columns is not None else None, filter=expression)
+    table = scanner.head(limit) if limit is not None else scanner.to_table()
+    return table.to_pandas()
+
+
+def _dataset_is_current(conn: sqlite3.Connection, root: str, seasons: Sequence[str]) -> bool:
+    """
+    Every season is exported from the TruePossessions ledger version it has now, and holds
+    as many rows as the table (which also catches rows changed outside the ledger).
+    """
+    if not set(seasons) <= set(exported_seasons(root)):
+        return False
+    dataset = _dataset(root)
+    for season in seasons:
+        stored = conn.execute("SELECT COUNT(*) FROM TruePossessions WHERE season = ?", (season,)).fetchone()[0]
+        if partition_version(root, season) != ledger_version(conn, season) \
+                or dataset.count_rows(filter=ds.field("season") == season) != stored:
+            logger.info(f"Parquet possessions for {season} are out of date; reading SQLite instead.")
+            return False
+    return True
+
+
+def load_possessions(conn: sqlite3.Connection, season: Optional[str] = None, columns: Optional[Sequence[str]] = None,
+                     complete_lineups: bool = True, limit: Optional[int] = None,
+                     root: str = settings.POSSESSIONS_PARQUET_DIR) -> pd.DataFrame:
+    """
+    TruePossessions rows for the modelling scripts. The Parquet dataset is read when pyarrow
+    is installed and the export is current for the season (or for every season when
+    ``season`` is None). Otherwise, or if the dataset cannot be read, the rows come from
+    SQLite through read_true_possessions. Both paths return the same rows, in game order
+    within each season.
+    """
+    if ARROW_AVAILABLE:
+        seasons = [season] if season is not None else [
+            row[0] for row in conn.execute("SELECT DISTINCT season FROM TruePossessions WHERE season IS NOT NULL")]
+        try:
+            if seasons and _dataset_is_current(conn, root, seasons):
+                return read_possessions(root, columns=columns, seasons=seasons,
+                                        complete_lineups=complete_lineups, limit=limit)
+        except (OSError, sqlite3.Error, pa.ArrowException) as e:
+            logger.warning(f"Could not read the Parquet possessions under {root}: {e}. Reading SQLite instead.")
+    return read_true_possessions(conn, season=season, limit=limit, complete_lineups=complete_lineups, columns=columns)
@@ -0,0 +1,182 @@
+"""Read and write helpers for the Possessions tables (see scripts/create_tables.create_possessions_table)."""
+
+import logging
+import sqlite3
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Short, highly repeated strings stored once in PossessionStrings and referenced by id
+DICTIONARY_COLUMNS = {
+    "wc_time_string": "wc_time_id",
+    "pc_time_string": "pc_time_id",
+    "score": "score_id",
+    "score_margin": "score_margin_id",
+}
+DESCRIPTION_COLUMNS = ["home_description", "neutral_description", "visitor_description"]
+EVENT_COLUMNS = [
+    "event_type", "event_action_type", "period",
+    "person1_type", "player1_id", "player1_team_id",
+    "person2_type", "player2_id", "player2_team_id",
+    "person3_type", "player3_id", "player3_team_id",
+    "home_player_1_id", "home_player_2_id", "home_player_3_id", "home_player_4_id", "home_player_5_id",
+    "away_player_1_id", "away_player_2_id", "away_player_3_id", "away_player_4_id", "away_player_5_id",
+    "offensive_team_id", "defensive_team_id",
+]
+
+
+def is_compact(conn: sqlite3.Connection) -> bool:
+    """True when the database uses the compact layout (Possessions is a view over PossessionEvents)."""
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'PossessionEvents'").fetchone()
+    return row is not None
+
+
+def game_key(game_id: str) -> int:
+    """Integer key for a 10-digit NBA game id ('0022300001' -> 22300001), for numeric arrays of games."""
+    text = str(game_id)
+    if len(text) != 10 or not text.isdigit():
+        raise ValueError(f"Not a 10-digit game id: {game_id!r}")
+    return int(text)
+
+
+def _text(values: List) -> List[Optional[str]]:
+    # Missing values arrive as None, NaN or pd.NA depending on the column dtype
+    return [None if value is None or value is pd.NA or value != value else str(value) for value in values]
+
+
+def _column(df: pd.DataFrame, col: str) -> List:
+    if col not in df.columns:
+        return [None] * len(df)
+    # SQLite binds NaN as NULL, and INTEGER affinity stores integral floats as integers
+    return df[col].tolist()
+
+
+class CompactPossessionsWriter:
+    """
+    Replaces one game at a time in the compact Possessions tables.
+
+    Writing through the view's INSTEAD OF trigger works but costs several lookups per row;
+    this keeps the PossessionStrings dictionary in memory and issues one executemany per
+    table instead. Callers own the transaction and must call reset() after rolling back,
+    since the cache may hold ids that were rolled back with it.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self._strings: Optional[Dict[str, int]] = None
+        self._known_players: set[int] = set()
+
+    def reset(self) -> None:
+        self._strings = None
+        self._known_players = set()
+
+    def _string_ids(self, values: List[Optional[str]]) -> List[Optional[int]]:
+        if self._strings is None:
+            self._strings = {value: string_id for string_id, value in
+                             self.conn.execute("SELECT string_id, value FROM PossessionStrings")}
+        strings = self._strings
+        for value in set(values) - strings.keys():
+            if value is not None:
+                strings[value] = self.conn.execute(
+                    "INSERT INTO PossessionStrings (value) VALUES (?)", (value,)).lastrowid
+        return [None if value is None else strings[value] for value in values]
+
+    def _record_player_names(self, df: pd.DataFrame) -> None:
+        names = {}
+        for n in (1, 2, 3):
+            if f"player{n}_name" not in df.columns:
+                continue
+            for player_id, name in zip(_column(df, f"player{n}_id"), _text(_column(df, f"player{n}_name"))):
+                if name is not None and player_id == player_id and player_id:
+                    names.setdefault(int(player_id), name)
+        new = [(player_id, name) for player_id, name in names.items() if player_id not in self._known_players]
+        if new:
+            self.conn.executemany("INSERT OR IGNORE INTO PossessionPlayers (player_id, player_name) VALUES (?, ?)", new)
+            self._known_players.update(player_id for player_id, _ in new)
+
+    def replace_game(self, game_id: str, df: pd.DataFrame) -> int:
+        """Deletes any existing rows for ``game_id`` and writes ``df``; returns the number of events written."""
+        key = str(game_id)
+        self.conn.execute("DELETE FROM PossessionDescriptions WHERE game_id = ?", (key,))
+        self.conn.execute("DELETE FROM PossessionEvents WHERE game_id = ?", (key,))
+        if df.empty:
+            return 0
+
+        event_nums = _column(df, "event_num")
+        self._record_player_names(df)
+
+        descriptions = [_text(_column(df, col)) for col in DESCRIPTION_COLUMNS]
+        self.conn.executemany(
+            f"INSERT INTO PossessionDescriptions (game_id, event_num, {', '.join(DESCRIPTION_COLUMNS)}) "
+            f"VALUES (?, ?, ?, ?, ?)",
+            ((key, event_num, *texts) for event_num, *texts in zip(event_nums, *descriptions)
+             if any(text is not None for text in texts)),
+        )
+
+        string_ids = [self._string_ids(_text(_column(df, col))) for col in DICTIONARY_COLUMNS]
+        columns = ["game_id", "event_num", *DICTIONARY_COLUMNS.values(), *EVENT_COLUMNS]
+        self.conn.executemany(
+            f"INSERT INTO PossessionEvents ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})",
+            zip([key] * len(df), event_nums, *string_ids, *(_column(df, col) for col in EVENT_COLUMNS)),
+        )
+        return len(df)
+
+
+def players_in_games(conn: sqlite3.Connection, game_ids: List[str]) -> List[int]:
+    """Every player who was on the court in the given games, read from either layout."""
+    if not game_ids:
+        return []
+    # Lineup slots only: player{n}_id also carries team ids for team events
+    lineup_columns = [f"{side}_player_{n}_id" for side in ("home", "away") for n in range(1, 6)]
+    table = "PossessionEvents" if is_compact(conn) else "Possessions"
+    keys = [str(game_id) for game_id in game_ids]
+    placeholders = ", ".join("?" * len(keys))
+    union = " UNION ".join(f"SELECT {col} AS player_id FROM {table} WHERE game_id IN ({placeholders})"
+                           for col in lineup_columns)
+    rows = conn.execute(f"SELECT player_id FROM ({union}) WHERE player_id IS NOT NULL",
+                        keys * len(lineup_columns)).fetchall()
+    return sorted(int(player_id) for (player_id,) in rows)
+
+
+def game_events(conn: sqlite3.Connection, game_id: str, columns: List[str]) -> pd.DataFrame:
+    """One game's events in event order, read from either layout with an indexed lookup."""
+    if not is_compact(conn):
+        return pd.read_sql_query(f"SELECT {', '.join(columns)} FROM Possessions WHERE game_id = ? ORDER BY event_num",
+                                 conn, params=(str(game_id),))
+    # Only join the string and description tables the requested columns need
+    strings = {text_column: id_column for text_column, id_column in DICTIONARY_COLUMNS.items() if text_column in columns}
+    select = [f"s_{col}.value AS {col}" if col in strings else f"d.{col}" if col in DESCRIPTION_COLUMNS else f"e.{col}"
+              for col in columns]
+    joins = "".join(f" LEFT JOIN PossessionStrings s_{col} ON s_{col}.string_id = e.{id_column}"
+                    for col, id_column in strings.items())
+    if any(col in DESCRIPTION_COLUMNS for col in columns):
+        joins += " LEFT JOIN PossessionDescriptions d ON d.game_id = e.game_id AND d.event_num = e.event_num"
+    return pd.read_sql_query(f"SELECT {', '.join(select)} FROM PossessionEvents e{joins} "
+                             f"WHERE e.game_id = ? ORDER BY e.event_num", conn, params=(str(game_id),))
+
+
+def read_true_possessions(conn: sqlite3.Connection, season: Optional[str] = None, limit: Optional[int] = None,
+                          complete_lineups: bool = True, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    TruePossessions rows (see scripts/populate_true_possessions), the modelling scripts' input.
+
+    Args:
+        season: Restrict to one season.
+        limit: Maximum number of rows.
+        complete_lineups: Only possessions with all ten players known.
+        columns: Columns to read (all by default).
+    """
+    select = ", ".join(columns) if columns is not None else "*"
+    query, params = f"SELECT {select} FROM TruePossessions WHERE 1 = 1", []
+    if season is not None:
+        query += " AND season = ?"
+        params.append(season)
+    if complete_lineups:
+        query += "".join(f" AND {side}_player_{n}_id IS NOT NULL" for side in ("off", "def") for n in range(1, 6))
+    query += " ORDER BY game_id, possession_num"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(int(limit))
+    return pd.read_sql_query(query, conn, params=params)
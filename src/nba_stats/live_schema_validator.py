@@ -8,12 +8,19 @@ Based on the post-mortem insights from the previous developer, this validator
 enforces the ground truth discovered through data archaeology.
 """
 
-import sqlite3
 import yaml
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 
+try:
+    from .db.connection import connect
+except ImportError:
+    # Handle direct execution
+    import sys
+    sys.path.append(str(Path(__file__).parent.parent))
+    from nba_stats.db.connection import connect
+
 
 @dataclass
 class ValidationResult:
@@ -97,7 +104,7 @@ class LiveSchemaValidator:
         results = []
         
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = connect(self.db_path, read_only=True, detect_types=0)
             conn.execute("SELECT 1")
             conn.close()
             results.append(ValidationResult(
@@ -222,7 +229,7 @@ class LiveSchemaValidator:
     def _check_table_exists(self, table_name: str) -> bool:
         """Check if a table exists in the database."""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = connect(self.db_path, read_only=True, detect_types=0)
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT name FROM sqlite_master 
@@ -237,7 +244,7 @@ class LiveSchemaValidator:
     def _check_column_exists(self, table_name: str, column_name: str) -> bool:
         """Check if a column exists in a table."""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = connect(self.db_path, read_only=True, detect_types=0)
             cursor = conn.cursor()
             cursor.execute(f"PRAGMA table_info({table_name})")
             columns = [row[1] for row in cursor.fetchall()]
@@ -249,7 +256,7 @@ class LiveSchemaValidator:
     def _get_table_row_count(self, table_name: str) -> int:
         """Get the row count for a table."""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = connect(self.db_path, read_only=True, detect_types=0)
             cursor = conn.cursor()
             cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
             count = cursor.fetchone()[0]
@@ -260,7 +267,7 @@ class LiveSchemaValidator:
     
     def _execute_validation_query(self, query: str) -> List[tuple]:
         """Execute a validation query and return results."""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path, read_only=True, detect_types=0)
         cursor = conn.cursor()
         cursor.execute(query)
         results = cursor.fetchall()
@@ -12,7 +12,6 @@ Key Design Principles:
 4. Single Source of Truth: All tools use this same logic
 """
 
-import sqlite3
 import pandas as pd
 import numpy as np
 from pathlib import Path
@@ -20,12 +19,15 @@ from typing import List, Dict, Optional, Tuple, Any
 from dataclasses import dataclass
 try:
     from .db_mapping import db_mapping
+    from .db.connection import connection
 except ImportError:
     # Handle direct execution
     import sys
     from pathlib import Path
     sys.path.append(str(Path(__file__).parent))
+    sys.path.append(str(Path(__file__).parent.parent))
     from db_mapping import db_mapping
+    from nba_stats.db.connection import connection
 
 
 @dataclass
@@ -108,7 +110,7 @@ class ModelEvaluator:
         This implements the critical insight: we must work with the intersection
         of skill and archetype data, not the union.
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with connection(self.db_path, read_only=True, detect_types=0) as conn:
             # Use the query template from db_mapping
             query = db_mapping.get_query_template("get_player_skills")
             skills_df = pd.read_sql_query(query, conn, params=[self.season])
@@ -6,6 +6,9 @@ from collections import defaultdict
 import numpy as np
 import pandas as pd
 
+from src.nba_stats.db.connection import connect
+from src.nba_stats.db.possessions_parquet import ID_COLUMNS, OUTCOME_COLUMN, load_possessions
+
 DB_PATH = "src/nba_stats/db/nba_stats.db"
 ARCHETYPES_CSV = "player_archetypes_k8_2022_23.csv"
 SUPERCLUSTER_MAP_PATH = "lineup_supercluster_results/supercluster_assignments.json"
@@ -29,7 +32,7 @@ def _load_darko(db_path: str) -> dict:
     ratings = {}
     con = None
     try:
-        con = sqlite3.connect(db_path)
+        con = connect(db_path, read_only=True, detect_types=0)
         try:
             df = pd.read_sql_query("SELECT player_id, offensive_darko, defensive_darko FROM PlayerSeasonSkill WHERE season='2022-23'", con)
         except Exception:
@@ -61,16 +64,6 @@ def _lineup_key(archetypes_list: list[int]) -> str:
 def _lookup_supercluster(archetypes_list: list[int], sc_map: dict) -> int:
     return int(sc_map.get(_lineup_key(archetypes_list), 0))
 
-def _calc_outcome(description: str) -> int:
-    if not isinstance(description, str):
-        return 0
-    t = description.lower()
-    if '(3 pts)' in t: return 3
-    if '(2 pts)' in t: return 2
-    if 'free throw' in t and 'miss' not in t: return 1
-    if 'turnover' in t or 'miss' in t: return 0
-    return 0
-
 def prepare_bayesian_data():
     logging.info("--- Preparing Bayesian dataset ---")
     archetypes = _load_archetypes(ARCHETYPES_CSV)
@@ -84,28 +77,20 @@ def prepare_bayesian_data():
     rows = []
     con = None
     try:
-        con = sqlite3.connect(DB_PATH)
-        query = "SELECT * FROM Possessions WHERE offensive_team_id IS NOT NULL"
-        for chunk in pd.read_sql_query(query, con, chunksize=BATCH_SIZE):
-            # Coalesce description fields
-            for c in ['home_description','visitor_description','neutral_description']:
-                if c not in chunk.columns:
-                    chunk[c] = ''
-            chunk['description'] = chunk['home_description'].fillna('') + chunk['visitor_description'].fillna('') + chunk['neutral_description'].fillna('')
-
+        con = connect(DB_PATH, read_only=True, detect_types=0)
+        # One row per possession, with points and both lineups already resolved; only the
+        # lineup, team and points columns are read, from Parquet when it has been exported
+        possessions = load_possessions(con, columns=ID_COLUMNS + [OUTCOME_COLUMN])
+        for start in range(0, len(possessions), BATCH_SIZE):
+            chunk = possessions.iloc[start:start + BATCH_SIZE]
             for _, r in chunk.iterrows():
                 try:
-                    home = [int(r[f'home_player_{i}_id']) for i in range(1,6)]
-                    away = [int(r[f'away_player_{i}_id']) for i in range(1,6)]
+                    off_players = [int(r[f'off_player_{i}_id']) for i in range(1,6)]
+                    def_players = [int(r[f'def_player_{i}_id']) for i in range(1,6)]
                 except Exception:
                     continue
-                if any(pd.isna(p) for p in home+away):
-                    continue
-                if not all(p in archetypes and p in darko for p in home+away):
+                if not all(p in archetypes and p in darko for p in off_players+def_players):
                     continue
-                off_team = r.get('offensive_team_id')
-                p1_team = r.get('player1_team_id')
-                off_players, def_players = (home, away) if p1_team == off_team else (away, home)
                 off_arch = [int(archetypes[p]) for p in off_players]
                 def_arch = [int(archetypes[p]) for p in def_players]
                 off_sc = _lookup_supercluster(off_arch, sc_map)
@@ -116,8 +101,7 @@ def prepare_bayesian_data():
                     z_off[off_arch[i]] += float(darko[p]['o_darko'])
                 for i,p in enumerate(def_players):
                     z_def[def_arch[i]] += float(darko[p]['d_darko'])
-                outc = _calc_outcome(r.get('description'))
-                rec = {'outcome': outc, 'matchup_id': f"{off_sc}_vs_{def_sc}"}
+                rec = {'outcome': int(r['points']), 'matchup_id': f"{off_sc}_vs_{def_sc}"}
                 for a in range(8):
                     rec[f'z_off_{a}'] = z_off.get(a, 0.0)
                     rec[f'z_def_{a}'] = z_def.get(a, 0.0)
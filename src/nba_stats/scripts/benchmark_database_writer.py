@@ -0,0 +1,125 @@
+"""
+Benchmarks DatabaseWriter throughput: the DTO path (write_player_season_raw_stats /
+write_player_season_advanced_stats, one model_dump per row and a full audit) against
+write_bulk fed DataFrames, pre-validated tuples and the same DTOs.
+
+Each run writes a league-wide dashboard (``--players`` players on 30 teams) to both
+player-season stat tables for every season into a fresh scratch database, twice, so the
+second pass measures updates of existing rows.
+
+    python -m src.nba_stats.scripts.benchmark_database_writer --players 550 --seasons 5
+"""
+import os
+import sqlite3
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from ..models.database_dtos import PlayerSeasonAdvancedStatsDTO, PlayerSeasonRawStatsDTO
+from ..services.database_writer import TIMESTAMP_COLUMNS, DatabaseWriter
+from ..utils.common_utils import logger
+from .create_tables import (
+    create_player_season_advanced_stats_table,
+    create_player_season_raw_stats_table,
+    create_players_table,
+    create_teams_table,
+)
+
+TABLES = {"PlayerSeasonRawStats": PlayerSeasonRawStatsDTO, "PlayerSeasonAdvancedStats": PlayerSeasonAdvancedStatsDTO}
+MODES = ["legacy", "bulk-dataframe", "bulk-tuples", "bulk-dtos"]
+
+
+def _dashboard(dto_class, players: int, season: str, seed: int) -> pd.DataFrame:
+    """A synthetic stat table with the DTO's columns: integers for int fields, floats otherwise."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"player_id": np.arange(1, players + 1), "season": season,
+                       "team_id": np.arange(players) % 30 + 1})
+    for name, field in dto_class.model_fields.items():
+        if name in df or name in TIMESTAMP_COLUMNS:
+            continue
+        if "int" in str(field.annotation):
+            df[name] = rng.integers(0, 100, players)
+        else:
+            df[name] = rng.random(players).round(3) * 100
+    return df
+
+
+def _create_database(db_path: str, players: int) -> None:
+    conn = sqlite3.connect(db_path)
+    create_teams_table(conn)
+    create_players_table(conn)
+    create_player_season_raw_stats_table(conn)
+    create_player_season_advanced_stats_table(conn)
+    conn.executemany("INSERT INTO Teams (team_id, team_name, team_abbreviation, team_code, team_city, "
+                     "team_conference, team_division) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                     [(t, f"Team {t}", f"T{t:02d}", f"team{t}", f"City {t}", "East", "Atlantic")
+                      for t in range(1, 31)])
+    conn.executemany("INSERT INTO Players (player_id, player_name) VALUES (?, ?)",
+                     [(p, f"Player {p}") for p in range(1, players + 1)])
+    conn.commit()
+    conn.close()
+
+
+def run_mode(db_path: str, mode: str, frames: List[tuple]) -> Dict[str, float]:
+    """Writes every (table, dto_class, frame) through ``mode`` twice and times it."""
+    _create_database(db_path, max(len(df) for _, _, df in frames))
+    if mode in ("legacy", "bulk-dtos"):
+        inputs = [(table, dto_class, [dto_class(**row) for row in df.to_dict("records")])
+                  for table, dto_class, df in frames]
+    elif mode == "bulk-tuples":
+        inputs = [(table, dto_class, (list(df.columns), list(df.itertuples(index=False, name=None))))
+                  for table, dto_class, df in frames]
+    else:
+        inputs = frames
+
+    writer = DatabaseWriter(db_path)
+    legacy = {"PlayerSeasonRawStats": writer.write_player_season_raw_stats,
+              "PlayerSeasonAdvancedStats": writer.write_player_season_advanced_stats}
+    rows = 0
+    start = time.perf_counter()
+    for _ in range(2):
+        for table, dto_class, data in inputs:
+            if mode == "legacy":
+                result = legacy[table](data)
+            elif mode == "bulk-tuples":
+                result = writer.write_bulk(table, data[1], columns=data[0])
+            else:
+                result = writer.write_bulk(table, data, dto_class=dto_class)
+            if not result.success:
+                raise RuntimeError(f"{mode} write to {table} failed: {result.error_message}")
+            rows += result.rows_affected
+    elapsed = time.perf_counter() - start
+    return {"rows": rows, "seconds": round(elapsed, 3), "rows_per_second": round(rows / elapsed, 1)}
+
+
+def main(players: int, seasons: int, modes: List[str]) -> Dict[str, Dict[str, float]]:
+    frames = [(table, dto_class, _dashboard(dto_class, players, f"{2024 - n}-{(25 - n) % 100:02d}", seed=n))
+              for n in range(seasons) for table, dto_class in TABLES.items()]
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in modes:
+            report[mode] = run_mode(os.path.join(tmp, f"{mode}.db"), mode, frames)
+            logger.info(f"{mode}: {report[mode]}")
+    return report
+
+
+if __name__ == '__main__':
+    import argparse
+    import logging
+
+    parser = argparse.ArgumentParser(description="Benchmark DatabaseWriter throughput (rows/sec).")
+    parser.add_argument("--players", type=int, default=550, help="Players per season dashboard.")
+    parser.add_argument("--seasons", type=int, default=5, help="Seasons to write per table.")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES, help="Write paths to benchmark.")
+    args = parser.parse_args()
+
+    # Per-write success lines would dominate the output
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("src.nba_stats.services.database_writer").setLevel(logging.WARNING)
+    report = main(args.players, args.seasons, args.modes)
+    for mode, result in report.items():
+        print(f"{mode:>15}: {result['rows']:>7,} rows in {result['seconds']:>6.2f}s "
+              f"({result['rows_per_second']:>9,.0f} rows/s)")
@@ -0,0 +1,190 @@
+"""
+Benchmarks Possessions write throughput: the original per-game loop ("legacy") against
+PossessionsWriter in its default and bulk-load modes.
+
+Synthetic games (see utils/lineup_tracker.synthetic_play_by_play) are enriched and renamed
+exactly as populate_possessions does, then replayed under fresh game ids through
+PossessionsWriter into a scratch database until the requested row count is reached.
+Each run also reports the database file size and the time of a lineup scan shaped like
+create_stratified_sample.py's, so the wide and compact layouts can be compared.
+
+    python -m src.nba_stats.scripts.benchmark_possessions_load --rows 1770051
+    python -m src.nba_stats.scripts.benchmark_possessions_load --modes bulk --layout wide compact
+"""
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+import pandas as pd
+
+from ..api.result_set import decode_result_set
+from ..config import settings
+from ..utils.common_utils import logger
+from ..utils.lineup_tracker import enrich_play_by_play, synthetic_play_by_play
+from .create_tables import create_possessions_table, create_wide_possessions_table
+from .populate_possessions import COLUMN_MAPPING, PossessionsWriter
+
+HOME, AWAY = 1610612747, 1610612743
+
+# Representative secondary indexes, so --drop-indexes has something to defer
+BENCHMARK_INDEXES = [
+    "CREATE INDEX idx_bench_possessions_player1 ON {table}(player1_id)",
+    "CREATE INDEX idx_bench_possessions_teams ON {table}(offensive_team_id, defensive_team_id)",
+]
+
+LAYOUTS = {"wide": create_wide_possessions_table, "compact": create_possessions_table}
+
+# The lineup read of create_stratified_sample.py, against whichever layout is loaded
+SCAN_QUERY = """
+    SELECT game_id, event_num,
+           home_player_1_id, home_player_2_id, home_player_3_id, home_player_4_id, home_player_5_id,
+           away_player_1_id, away_player_2_id, away_player_3_id, away_player_4_id, away_player_5_id,
+           offensive_team_id, defensive_team_id, score, score_margin
+    FROM Possessions
+    WHERE home_player_1_id IS NOT NULL AND away_player_1_id IS NOT NULL
+"""
+
+MODES = {
+    "legacy": None,  # the pre-writer per-game loop, kept here as the baseline
+    "default": dict(games_per_transaction=settings.POSSESSIONS_GAMES_PER_TRANSACTION),
+    "bulk": dict(bulk_load=True, games_per_transaction=settings.POSSESSIONS_BULK_GAMES_PER_TRANSACTION),
+    "bulk+drop-indexes": dict(bulk_load=True, drop_indexes=True,
+                              games_per_transaction=settings.POSSESSIONS_BULK_GAMES_PER_TRANSACTION),
+}
+
+
+def _template_games(count: int) -> List[pd.DataFrame]:
+    games = []
+    for seed in range(count):
+        pbp_df = pd.DataFrame(decode_result_set(synthetic_play_by_play(f"00299{seed:05d}", seed=seed), name=0))
+        enriched = enrich_play_by_play(pbp_df, HOME, AWAY)
+        games.append(enriched.drop_duplicates(subset=["GAME_ID", "EVENTNUM"]).rename(columns=COLUMN_MAPPING))
+    return games
+
+
+def _legacy_load(db_path: str, games) -> Dict[str, int]:
+    """The original per-game path: schema lookup, own transaction and to_records() for every game."""
+    conn = sqlite3.connect(db_path)
+    games_written = rows_written = 0
+    for game_id, pbp_df in games:
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA table_info(Possessions)")
+        table_columns = {info[1] for info in cursor.fetchall()}
+        df_to_insert = pbp_df[[col for col in pbp_df.columns if col in table_columns]]
+        cursor.execute("BEGIN")
+        cursor.execute("DELETE FROM Possessions WHERE game_id = ?", (game_id,))
+        cols = ', '.join(df_to_insert.columns)
+        placeholders = ', '.join(['?'] * len(df_to_insert.columns))
+        cursor.executemany(f"INSERT INTO Possessions ({cols}) VALUES ({placeholders})",
+                           df_to_insert.to_records(index=False).tolist())
+        conn.commit()
+        games_written += 1
+        rows_written += len(df_to_insert)
+    conn.close()
+    return {"rows": rows_written, "games": games_written, "transactions": games_written}
+
+
+def _replay(templates: List[pd.DataFrame], rows: int):
+    produced, n = 0, 0
+    while produced < rows:
+        template = templates[n % len(templates)]
+        game_id = f"0029{n:06d}"
+        yield game_id, template.assign(game_id=game_id)
+        produced += len(template)
+        n += 1
+
+
+def _measure_reads(db_path: str) -> Dict[str, float]:
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    start = time.perf_counter()
+    scanned = sum(1 for _ in conn.execute(SCAN_QUERY))
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return {"db_mb": round(os.path.getsize(db_path) / 2**20, 1), "scan_rows": scanned, "scan_seconds": round(elapsed, 2)}
+
+
+def run_load(db_path: str, templates: List[pd.DataFrame], rows: int, with_indexes: bool = True,
+             layout: str = "wide", **writer_options) -> Dict[str, float]:
+    """Loads ``rows`` possessions into a fresh Possessions store at ``db_path``, timing the writer and a read scan."""
+    conn = sqlite3.connect(db_path)
+    # The compact view resolves names and team text through these
+    conn.execute("CREATE TABLE Players (player_id INTEGER PRIMARY KEY, player_name TEXT)")
+    conn.execute("CREATE TABLE Teams (team_id INTEGER PRIMARY KEY, team_name TEXT, team_abbreviation TEXT, team_city TEXT)")
+    # The wide table's foreign key needs every replayed game, and the writer enforces it
+    conn.execute("CREATE TABLE Games (game_id TEXT PRIMARY KEY)")
+    conn.executemany("INSERT INTO Games VALUES (?)",
+                     ((f"0029{n:06d}",) for n in range(rows // min(len(t) for t in templates) + 1)))
+    LAYOUTS[layout](conn)
+    if with_indexes:
+        table = "PossessionEvents" if layout == "compact" else "Possessions"
+        for sql in BENCHMARK_INDEXES:
+            conn.execute(sql.format(table=table))
+    conn.commit()
+    conn.close()
+
+    if not writer_options:
+        start = time.perf_counter()
+        result = _legacy_load(db_path, _replay(templates, rows))
+        elapsed = time.perf_counter() - start
+        return {**result, "seconds": round(elapsed, 2), "rows_per_second": round(result["rows"] / elapsed, 1),
+                **_measure_reads(db_path)}
+
+    results: queue.Queue = queue.Queue(maxsize=64)
+
+    def produce() -> None:
+        for item in _replay(templates, rows):
+            results.put(item)
+        results.put(settings.SENTINEL)
+
+    writer = PossessionsWriter(results, db_path=db_path, **writer_options)
+    producer = threading.Thread(target=produce, daemon=True)
+    start = time.perf_counter()
+    producer.start()
+    writer.run()  # in this thread, so the timing covers index rebuilds and PRAGMA restore
+    elapsed = time.perf_counter() - start
+    producer.join()
+    return {"rows": writer.rows_written, "games": writer.games_written, "transactions": writer.transactions,
+            "seconds": round(elapsed, 2), "rows_per_second": round(writer.rows_written / elapsed, 1),
+            **_measure_reads(db_path)}
+
+
+def main(rows: int, modes: List[str], templates: int = 20, with_indexes: bool = True,
+         layouts: List[str] = ("wide",)) -> Dict[str, Dict[str, float]]:
+    game_templates = _template_games(templates)
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for layout in layouts:
+            for mode in modes:
+                name = mode if len(layouts) == 1 else f"{layout}/{mode}"
+                db_path = os.path.join(tmp, f"{layout}-{mode}.db")
+                report[name] = run_load(db_path, game_templates, rows, with_indexes=with_indexes, layout=layout,
+                                        **(MODES[mode] or {}))
+                logger.info(f"{name}: {report[name]}")
+    return report
+
+
+if __name__ == '__main__':
+    import argparse
+    import logging
+
+    parser = argparse.ArgumentParser(description="Benchmark Possessions load throughput (rows/sec).")
+    parser.add_argument("--rows", type=int, default=1_770_051, help="Rows to load per mode (default: the full multi-season dataset size).")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES), help="Modes to benchmark.")
+    parser.add_argument("--templates", type=int, default=20, help="Distinct synthetic games to replay.")
+    parser.add_argument("--no-indexes", action="store_true", help="Benchmark without secondary indexes on Possessions.")
+    parser.add_argument("--layout", nargs="+", choices=list(LAYOUTS), default=["wide"], help="Possessions storage layouts to benchmark.")
+    args = parser.parse_args()
+
+    # Per-game success lines would dominate the output
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("src.nba_stats.utils.lineup_tracker").setLevel(logging.ERROR)
+    report = main(args.rows, args.modes, args.templates, with_indexes=not args.no_indexes, layouts=args.layout)
+    for mode, result in report.items():
+        print(f"{mode:>26}: {result['rows']:>9,} rows in {result['seconds']:>7.2f}s "
+              f"({result['rows_per_second']:>10,.0f} rows/s, {result['transactions']} transactions), "
+              f"{result['db_mb']:,.1f} MB, scan {result['scan_seconds']:.2f}s")
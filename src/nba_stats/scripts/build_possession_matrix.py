@@ -0,0 +1,63 @@
+"""
+Builds the memory-mapped possession matrix (see db/possession_matrix) from TruePossessions.
+Runs after the true possessions are derived. A season whose matrix already matches the
+TruePossessions ledger is skipped unless --rebuild is given.
+
+    python -m src.nba_stats.scripts.build_possession_matrix --season 2023-24
+    python -m src.nba_stats.scripts.build_possession_matrix --all-seasons
+"""
+import sqlite3
+import time
+from typing import Dict, Optional
+
+from ..utils.common_utils import get_db_connection, logger
+from ..db.possession_matrix import build_matrix, ledger_version, open_matrix
+from ..config import settings
+
+
+def build_possession_matrix(season_to_load: Optional[str] = None, rebuild: bool = False,
+                            output_dir: str = settings.POSSESSION_MATRIX_DIR) -> Dict[str, int]:
+    """
+    Builds the matrix of one season, or of every season in TruePossessions.
+
+    Returns:
+        Rows written per season that was (re)built.
+    """
+    conn = get_db_connection(read_only=True)
+    written: Dict[str, int] = {}
+    try:
+        if season_to_load:
+            seasons = [season_to_load]
+        else:
+            seasons = [row[0] for row in conn.execute(
+                "SELECT DISTINCT season FROM TruePossessions WHERE season IS NOT NULL ORDER BY season")]
+        for season in seasons:
+            matrix = open_matrix(season, output_dir)
+            if not rebuild and matrix is not None and matrix.ledger_version == ledger_version(conn, season):
+                logger.info(f"Possession matrix for {season} is up to date ({len(matrix)} possessions).")
+                continue
+            start = time.time()
+            written[season] = build_matrix(conn, season, output_dir)
+            logger.info(f"Built the possession matrix for {season}: {written[season]} possessions "
+                        f"in {time.time() - start:.1f}s.")
+    except sqlite3.Error as e:
+        logger.error(f"Database error while building the possession matrix: {e}", exc_info=True)
+    finally:
+        conn.close()
+    return written
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the memory-mapped possession matrix from TruePossessions.")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--season", type=str, default=settings.SEASON_ID, help="The season to build (e.g., '2023-24').")
+    group.add_argument("--all-seasons", action="store_true", help="Build every season in TruePossessions.")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild even if the matrix is up to date.")
+    parser.add_argument("--output-dir", type=str, default=settings.POSSESSION_MATRIX_DIR,
+                        help="Directory holding one matrix per season.")
+    args = parser.parse_args()
+
+    build_possession_matrix(season_to_load=None if args.all_seasons else args.season, rebuild=args.rebuild,
+                            output_dir=args.output_dir)
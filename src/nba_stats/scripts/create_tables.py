@@ -2,7 +2,9 @@
 
 import sqlite3
 import logging
-from .common_utils import get_db_connection, logger
+from ..utils.common_utils import get_db_connection, logger
+from ..db.ingestion_ledger import create_ingestion_ledger_table
+from ..db.index_advisor import create_hot_query_indexes
 
 def create_teams_table(conn: sqlite3.Connection) -> None:
     """Create the Teams table."""
@@ -655,8 +657,8 @@ def create_player_season_skill_table(conn: sqlite3.Connection) -> None:
     """)
     logger.info("PlayerSeasonSkill table checked/created.")
 
-def create_possessions_table(conn: sqlite3.Connection) -> None:
-    """Create the Possessions table to store play-by-play data."""
+def create_wide_possessions_table(conn: sqlite3.Connection) -> None:
+    """Create the original wide Possessions table (one denormalized row per play-by-play event)."""
     cursor = conn.cursor()
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS Possessions (
@@ -713,6 +715,236 @@ def create_possessions_table(conn: sqlite3.Connection) -> None:
     """)
     logger.info("Possessions table checked/created.")
 
+
+def _player_slot_columns(n: int) -> str:
+    return f"""
+            CAST(e.person{n}_type AS TEXT) AS person{n}_type,
+            e.player{n}_id,
+            pp{n}.player_name AS player{n}_name,
+            e.player{n}_team_id,
+            t{n}.team_city AS player{n}_team_city,
+            t{n}.team_name AS player{n}_team_nickname,
+            t{n}.team_abbreviation AS player{n}_team_abbreviation,"""
+
+
+def _player_slot_joins(n: int) -> str:
+    return f"""
+        LEFT JOIN PossessionPlayers pp{n} ON pp{n}.player_id = e.player{n}_id
+        LEFT JOIN Teams t{n} ON t{n}.team_id = e.player{n}_team_id"""
+
+
+def create_possessions_table(conn: sqlite3.Connection) -> None:
+    """
+    Create the compact play-by-play store and its Possessions compatibility view.
+
+    PossessionEvents holds integer facts keyed by (game_id, event_num), with short repeated
+    strings stored as ids into PossessionStrings. Descriptions live in
+    PossessionDescriptions, player names as reported by the feed in PossessionPlayers, and
+    team text is resolved from Teams. The Possessions view exposes the original wide
+    columns, and INSTEAD OF triggers keep INSERT/DELETE against it working.
+
+    game_id keeps its 10-digit TEXT form and the view passes it through unchanged, so
+    filters and joins on Possessions.game_id still use the primary key.
+
+    A database that still has the wide Possessions table is left untouched;
+    ``migrate_db --compact-possessions`` converts it.
+    """
+    cursor = conn.cursor()
+    existing = cursor.execute("SELECT type FROM sqlite_master WHERE name = 'Possessions'").fetchone()
+    if existing and existing[0] == 'table':
+        logger.info("Wide Possessions table found; run migrate_db --compact-possessions to convert it to the compact layout.")
+        return
+
+    compact_tables = [
+        """
+        CREATE TABLE IF NOT EXISTS PossessionStrings (
+            string_id INTEGER PRIMARY KEY,
+            value TEXT NOT NULL UNIQUE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS PossessionPlayers (
+            player_id INTEGER PRIMARY KEY,
+            player_name TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS PossessionDescriptions (
+            game_id TEXT NOT NULL,
+            event_num INTEGER NOT NULL,
+            home_description TEXT,
+            neutral_description TEXT,
+            visitor_description TEXT,
+            PRIMARY KEY (game_id, event_num)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS PossessionEvents (
+            game_id TEXT NOT NULL,
+            event_num INTEGER NOT NULL,
+            event_type INTEGER,
+            event_action_type INTEGER,
+            period INTEGER,
+            wc_time_id INTEGER,
+            pc_time_id INTEGER,
+            score_id INTEGER,
+            score_margin_id INTEGER,
+            person1_type INTEGER,
+            player1_id INTEGER,
+            player1_team_id INTEGER,
+            person2_type INTEGER,
+            player2_id INTEGER,
+            player2_team_id INTEGER,
+            person3_type INTEGER,
+            player3_id INTEGER,
+            player3_team_id INTEGER,
+            home_player_1_id INTEGER,
+            home_player_2_id INTEGER,
+            home_player_3_id INTEGER,
+            home_player_4_id INTEGER,
+            home_player_5_id INTEGER,
+            away_player_1_id INTEGER,
+            away_player_2_id INTEGER,
+            away_player_3_id INTEGER,
+            away_player_4_id INTEGER,
+            away_player_5_id INTEGER,
+            offensive_team_id INTEGER,
+            defensive_team_id INTEGER,
+            created_at INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+            updated_at INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+            PRIMARY KEY (game_id, event_num)
+        ) WITHOUT ROWID
+        """,
+    ]
+    # Statement by statement rather than executescript(), which would commit a caller's open transaction
+    for ddl in compact_tables:
+        cursor.execute(ddl)
+
+    player_columns = "".join(_player_slot_columns(n) for n in (1, 2, 3))
+    player_joins = "".join(_player_slot_joins(n) for n in (1, 2, 3))
+    cursor.execute(f"""
+        CREATE VIEW IF NOT EXISTS Possessions AS
+        SELECT
+            e.game_id,
+            e.event_num,
+            CAST(e.event_type AS TEXT) AS event_type,
+            CAST(e.event_action_type AS TEXT) AS event_action_type,
+            e.period,
+            wc.value AS wc_time_string,
+            pc.value AS pc_time_string,
+            d.home_description,
+            d.neutral_description,
+            d.visitor_description,
+            sc.value AS score,
+            sm.value AS score_margin,{player_columns}
+            e.home_player_1_id, e.home_player_2_id, e.home_player_3_id, e.home_player_4_id, e.home_player_5_id,
+            e.away_player_1_id, e.away_player_2_id, e.away_player_3_id, e.away_player_4_id, e.away_player_5_id,
+            e.offensive_team_id,
+            e.defensive_team_id,
+            datetime(e.created_at, 'unixepoch') AS created_at,
+            datetime(e.updated_at, 'unixepoch') AS updated_at
+        FROM PossessionEvents e
+        LEFT JOIN PossessionStrings wc ON wc.string_id = e.wc_time_id
+        LEFT JOIN PossessionStrings pc ON pc.string_id = e.pc_time_id
+        LEFT JOIN PossessionStrings sc ON sc.string_id = e.score_id
+        LEFT JOIN PossessionStrings sm ON sm.string_id = e.score_margin_id
+        LEFT JOIN PossessionDescriptions d ON d.game_id = e.game_id AND d.event_num = e.event_num{player_joins}
+    """)
+
+    string_inserts = "".join(
+        f"\n            INSERT OR IGNORE INTO PossessionStrings (value) SELECT NEW.{col} WHERE NEW.{col} IS NOT NULL;"
+        for col in ("wc_time_string", "pc_time_string", "score", "score_margin")
+    )
+    name_inserts = "".join(
+        f"\n            INSERT OR IGNORE INTO PossessionPlayers (player_id, player_name) "
+        f"SELECT NEW.player{n}_id, NEW.player{n}_name WHERE NEW.player{n}_id IS NOT NULL AND NEW.player{n}_name IS NOT NULL;"
+        for n in (1, 2, 3)
+    )
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS possessions_insert
+        INSTEAD OF INSERT ON Possessions
+        BEGIN{string_inserts}{name_inserts}
+            INSERT INTO PossessionDescriptions (game_id, event_num, home_description, neutral_description, visitor_description)
+            SELECT NEW.game_id, NEW.event_num, NEW.home_description, NEW.neutral_description, NEW.visitor_description
+            WHERE COALESCE(NEW.home_description, NEW.neutral_description, NEW.visitor_description) IS NOT NULL;
+            INSERT INTO PossessionEvents (
+                game_id, event_num, event_type, event_action_type, period,
+                wc_time_id, pc_time_id, score_id, score_margin_id,
+                person1_type, player1_id, player1_team_id,
+                person2_type, player2_id, player2_team_id,
+                person3_type, player3_id, player3_team_id,
+                home_player_1_id, home_player_2_id, home_player_3_id, home_player_4_id, home_player_5_id,
+                away_player_1_id, away_player_2_id, away_player_3_id, away_player_4_id, away_player_5_id,
+                offensive_team_id, defensive_team_id
+            ) VALUES (
+                NEW.game_id, NEW.event_num, NEW.event_type, NEW.event_action_type, NEW.period,
+                (SELECT string_id FROM PossessionStrings WHERE value = NEW.wc_time_string),
+                (SELECT string_id FROM PossessionStrings WHERE value = NEW.pc_time_string),
+                (SELECT string_id FROM PossessionStrings WHERE value = NEW.score),
+                (SELECT string_id FROM PossessionStrings WHERE value = NEW.score_margin),
+                NEW.person1_type, NEW.player1_id, NEW.player1_team_id,
+                NEW.person2_type, NEW.player2_id, NEW.player2_team_id,
+                NEW.person3_type, NEW.player3_id, NEW.player3_team_id,
+                NEW.home_player_1_id, NEW.home_player_2_id, NEW.home_player_3_id, NEW.home_player_4_id, NEW.home_player_5_id,
+                NEW.away_player_1_id, NEW.away_player_2_id, NEW.away_player_3_id, NEW.away_player_4_id, NEW.away_player_5_id,
+                NEW.offensive_team_id, NEW.defensive_team_id
+            );
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS possessions_delete
+        INSTEAD OF DELETE ON Possessions
+        BEGIN
+            DELETE FROM PossessionDescriptions WHERE game_id = OLD.game_id AND event_num = OLD.event_num;
+            DELETE FROM PossessionEvents WHERE game_id = OLD.game_id AND event_num = OLD.event_num;
+        END
+    """)
+    logger.info("Compact Possessions tables and view checked/created.")
+
+
+def create_true_possessions_table(conn: sqlite3.Connection) -> None:
+    """
+    Create the TruePossessions table: one row per possession derived from the play-by-play
+    events (see scripts/populate_true_possessions), with both lineups and the points scored.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS TruePossessions (
+            game_id TEXT NOT NULL,
+            possession_num INTEGER NOT NULL,
+            season TEXT,
+            period INTEGER NOT NULL,
+            start_event_num INTEGER NOT NULL,
+            end_event_num INTEGER NOT NULL,
+            offensive_team_id INTEGER NOT NULL,
+            defensive_team_id INTEGER NOT NULL,
+            points INTEGER NOT NULL,
+            duration_seconds REAL,
+            end_reason TEXT,
+            field_goal_attempts INTEGER NOT NULL DEFAULT 0,
+            field_goals_made INTEGER NOT NULL DEFAULT 0,
+            three_point_attempts INTEGER NOT NULL DEFAULT 0,
+            three_pointers_made INTEGER NOT NULL DEFAULT 0,
+            free_throw_attempts INTEGER NOT NULL DEFAULT 0,
+            free_throws_made INTEGER NOT NULL DEFAULT 0,
+            turnovers INTEGER NOT NULL DEFAULT 0,
+            off_player_1_id INTEGER,
+            off_player_2_id INTEGER,
+            off_player_3_id INTEGER,
+            off_player_4_id INTEGER,
+            off_player_5_id INTEGER,
+            def_player_1_id INTEGER,
+            def_player_2_id INTEGER,
+            def_player_3_id INTEGER,
+            def_player_4_id INTEGER,
+            def_player_5_id INTEGER,
+            PRIMARY KEY (game_id, possession_num),
+            FOREIGN KEY (game_id) REFERENCES Games(game_id)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_true_possessions_season ON TruePossessions(season)")
+    logger.info("TruePossessions table checked/created.")
+
 def create_all_tables(conn: sqlite3.Connection):
     """Create all tables in the database."""
     create_teams_table(conn)
@@ -740,6 +972,9 @@ def create_all_tables(conn: sqlite3.Connection):
     create_player_shot_chart_table(conn)
     create_player_season_skill_table(conn)
     create_possessions_table(conn)
+    create_true_possessions_table(conn)
+    create_ingestion_ledger_table(conn)
+    create_hot_query_indexes(conn)
     conn.commit()
     logger.info("All tables checked/created successfully.")
 
@@ -0,0 +1,61 @@
+"""
+Exports TruePossessions to the season-partitioned Parquet dataset that the modelling scripts
+read (see db/possessions_parquet). Runs after the true possessions are derived, and rewrites
+whole season partitions, so re-running it after a refresh is always safe.
+
+    python -m src.nba_stats.scripts.export_possessions_parquet --season 2023-24
+    python -m src.nba_stats.scripts.export_possessions_parquet --all-seasons
+"""
+import sqlite3
+import time
+from typing import Dict, Optional
+
+from ..utils.common_utils import get_db_connection, logger
+from ..db.possessions_parquet import ARROW_AVAILABLE, export_season
+from ..config import settings
+
+
+def export_possessions_parquet(season_to_load: Optional[str] = None,
+                               output_dir: str = settings.POSSESSIONS_PARQUET_DIR) -> Dict[str, int]:
+    """
+    Writes the Parquet partition of one season, or of every season in TruePossessions.
+
+    Returns:
+        Rows written per season; empty when pyarrow is not installed.
+    """
+    if not ARROW_AVAILABLE:
+        logger.warning("pyarrow is not installed; skipping the Parquet possessions export (pip install pyarrow).")
+        return {}
+
+    conn = get_db_connection(read_only=True)
+    written: Dict[str, int] = {}
+    try:
+        if season_to_load:
+            seasons = [season_to_load]
+        else:
+            seasons = [row[0] for row in conn.execute(
+                "SELECT DISTINCT season FROM TruePossessions WHERE season IS NOT NULL ORDER BY season")]
+        for season in seasons:
+            start = time.time()
+            written[season] = export_season(conn, season, output_dir)
+            logger.info(f"Exported {written[season]} possessions for {season} to {output_dir} "
+                        f"in {time.time() - start:.1f}s.")
+    except sqlite3.Error as e:
+        logger.error(f"Database error while exporting possessions to Parquet: {e}", exc_info=True)
+    finally:
+        conn.close()
+    return written
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export TruePossessions to a season-partitioned Parquet dataset.")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--season", type=str, default=settings.SEASON_ID, help="The season to export (e.g., '2023-24').")
+    group.add_argument("--all-seasons", action="store_true", help="Export every season in TruePossessions.")
+    parser.add_argument("--output-dir", type=str, default=settings.POSSESSIONS_PARQUET_DIR,
+                        help="Root of the Parquet dataset.")
+    args = parser.parse_args()
+
+    export_possessions_parquet(season_to_load=None if args.all_seasons else args.season, output_dir=args.output_dir)
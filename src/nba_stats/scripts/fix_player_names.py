@@ -12,7 +12,6 @@ Usage:
 import os
 import sys
 import csv
-import sqlite3
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 import argparse
@@ -22,7 +21,7 @@ project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from ..api.client import NBAStatsClient
-from ..db.connection import get_db_connection
+from ..db.connection import connect, get_db_connection
 
 try:
     from rapidfuzz import fuzz, process
@@ -80,7 +79,7 @@ class PlayerReconciliationTool:
     
     def _get_existing_players(self) -> List[Tuple[str, int]]:
         """Get all existing players from the database."""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path, read_only=True, detect_types=0)
         try:
             cursor = conn.cursor()
             cursor.execute("SELECT player_name, player_id FROM Players ORDER BY player_name")
@@ -129,7 +128,7 @@ class PlayerReconciliationTool:
     def _create_new_player(self, player_data: Dict) -> bool:
         """Create a new player in the database."""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = connect(self.db_path, detect_types=0)
             try:
                 cursor = conn.cursor()
                 cursor.execute("""
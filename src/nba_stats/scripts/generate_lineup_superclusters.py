@@ -9,10 +9,12 @@ import joblib
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 
+from src.nba_stats.db.connection import connect
+
 def get_db_connection(db_path):
     """Establishes a connection to the SQLite database."""
     try:
-        conn = sqlite3.connect(db_path)
+        conn = connect(db_path, read_only=True, detect_types=0)
         return conn
     except sqlite3.Error as e:
         print(f"Error connecting to database: {e}")
@@ -0,0 +1,87 @@
+"""Inspect, trim and migrate the NBA Stats API response cache.
+
+Examples:
+    python -m src.nba_stats.scripts.manage_cache stats
+    python -m src.nba_stats.scripts.manage_cache migrate --delete-files
+    python -m src.nba_stats.scripts.manage_cache vacuum --max-bytes 1000000000
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent.parent))
+
+from src.nba_stats.api.cache_store import SQLiteCacheBackend
+from src.nba_stats.config import settings
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _format_bytes(num_bytes: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} TB"
+
+
+def print_stats(store: SQLiteCacheBackend, as_json: bool = False) -> None:
+    """Print entry counts, sizes and the persisted hit rate of the cache store."""
+    stats = store.stats()
+    if as_json:
+        print(json.dumps(stats, indent=2))
+        return
+
+    print(f"Cache store:        {stats['location']}")
+    print(f"Entries:            {stats['entries']}")
+    print(f"Compressed payload: {_format_bytes(stats['payload_bytes'])}")
+    print(f"Uncompressed:       {_format_bytes(stats['uncompressed_bytes'])}")
+    print(f"File size:          {_format_bytes(stats['file_bytes'])}")
+    if stats['max_bytes']:
+        print(f"Budget:             {_format_bytes(stats['max_bytes'])}")
+    print(f"Hits / misses:      {stats['hits']} / {stats['misses']} (hit rate {stats['hit_rate']:.1%})")
+    print(f"Evictions:          {stats['evictions']}")
+    print("\nBy endpoint:")
+    for row in stats['by_endpoint']:
+        print(f"  {row['endpoint']:<40} {row['entries']:>8} entries  {_format_bytes(row['payload_bytes']):>10}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the NBA Stats API response cache store.")
+    parser.add_argument("--db", type=str, default=settings.CACHE_DB_PATH, help="Path to the SQLite cache store.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    stats_parser = subparsers.add_parser("stats", help="Show size and hit-rate statistics.")
+    stats_parser.add_argument("--json", action="store_true", help="Print statistics as JSON.")
+
+    vacuum_parser = subparsers.add_parser("vacuum", help="Evict LRU entries over budget and reclaim disk space.")
+    vacuum_parser.add_argument("--max-bytes", type=int, default=settings.CACHE_MAX_BYTES,
+                               help="Byte budget for compressed payloads.")
+
+    migrate_parser = subparsers.add_parser("migrate", help="Import the legacy one-file-per-request cache directory.")
+    migrate_parser.add_argument("--cache-dir", type=str, default=settings.CACHE_DIR,
+                                help="Directory containing <hash>.json cache files.")
+    migrate_parser.add_argument("--delete-files", action="store_true", help="Delete JSON files once imported.")
+
+    args = parser.parse_args()
+    store = SQLiteCacheBackend(args.db, max_bytes=settings.CACHE_MAX_BYTES)
+    try:
+        if args.command == "stats":
+            print_stats(store, as_json=args.json)
+        elif args.command == "vacuum":
+            evicted = store.evict(args.max_bytes)
+            store.vacuum()
+            logger.info(f"Evicted {evicted} entries and vacuumed {args.db}")
+        elif args.command == "migrate":
+            imported = store.import_file_cache(args.cache_dir, delete_files=args.delete_files)
+            logger.info(f"Imported {imported} entries into {args.db}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,9 @@ Script for handling database schema migrations.
 import sqlite3
 import logging
 from typing import Dict
-from .common_utils import get_db_connection, logger
+from ..utils.common_utils import get_db_connection, logger
+from .create_tables import create_possessions_table
+from ..db.index_advisor import create_hot_query_indexes
 
 def get_existing_columns(conn: sqlite3.Connection, table_name: str) -> set:
     """Gets the set of existing column names for a table."""
@@ -62,6 +64,7 @@ def run_migrations(conn: sqlite3.Connection):
     # migrate_table(conn, "PlayerSeasonRawStats", stats_columns)
 
     migrate_salaries_and_skills(conn)
+    migrate_hot_query_indexes(conn)
 
     conn.commit()
     logger.info("All database migrations checked.")
@@ -112,6 +115,117 @@ def migrate_salaries_and_skills(conn: sqlite3.Connection):
         create_player_skills_table(cursor)
 
 
+def migrate_possessions_to_compact(conn: sqlite3.Connection) -> bool:
+    """
+    Converts a wide Possessions table to the compact layout (PossessionEvents plus the
+    Possessions view; see create_tables.create_possessions_table).
+
+    Follows the rename-and-recreate pattern: the wide table is renamed to Possessions_wide,
+    the compact tables are created and filled set-based in SQL, and the wide table is only
+    dropped once the row counts match. Runs inside a savepoint, so a failure leaves the wide
+    table in place. Returns True if a conversion happened.
+
+    Not part of run_migrations: the conversion drops the wide table, so it only runs when
+    asked for with ``migrate_db --compact-possessions``.
+    """
+    cursor = conn.cursor()
+    existing = cursor.execute("SELECT type FROM sqlite_master WHERE name = 'Possessions'").fetchone()
+    if not existing or existing[0] != 'table':
+        logger.info("Possessions is already compact (or not created yet).")
+        return False
+
+    logger.info("Wide 'Possessions' table found. Converting to the compact layout.")
+    dropped_indexes = [row[0] for row in cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'Possessions' AND sql IS NOT NULL")]
+    cursor.execute("SAVEPOINT migrate_possessions")
+    try:
+        cursor.execute("ALTER TABLE Possessions RENAME TO Possessions_wide")
+        create_possessions_table(conn)
+
+        cursor.execute("""
+            INSERT OR IGNORE INTO PossessionStrings (value)
+            SELECT wc_time_string FROM Possessions_wide WHERE wc_time_string IS NOT NULL
+            UNION SELECT pc_time_string FROM Possessions_wide WHERE pc_time_string IS NOT NULL
+            UNION SELECT score FROM Possessions_wide WHERE score IS NOT NULL
+            UNION SELECT score_margin FROM Possessions_wide WHERE score_margin IS NOT NULL
+        """)
+        cursor.execute("""
+            INSERT OR IGNORE INTO PossessionPlayers (player_id, player_name)
+            SELECT player_id, MIN(player_name) FROM (
+                SELECT player1_id AS player_id, player1_name AS player_name FROM Possessions_wide
+                UNION ALL SELECT player2_id, player2_name FROM Possessions_wide
+                UNION ALL SELECT player3_id, player3_name FROM Possessions_wide
+            )
+            WHERE player_id IS NOT NULL AND player_id != 0 AND player_name IS NOT NULL
+            GROUP BY player_id
+        """)
+        cursor.execute("""
+            INSERT INTO PossessionDescriptions
+                (game_id, event_num, home_description, neutral_description, visitor_description)
+            SELECT game_id, event_num, home_description, neutral_description, visitor_description
+            FROM Possessions_wide
+            WHERE COALESCE(home_description, neutral_description, visitor_description) IS NOT NULL
+        """)
+        cursor.execute("""
+            INSERT INTO PossessionEvents (
+                game_id, event_num, event_type, event_action_type, period,
+                wc_time_id, pc_time_id, score_id, score_margin_id,
+                person1_type, player1_id, player1_team_id,
+                person2_type, player2_id, player2_team_id,
+                person3_type, player3_id, player3_team_id,
+                home_player_1_id, home_player_2_id, home_player_3_id, home_player_4_id, home_player_5_id,
+                away_player_1_id, away_player_2_id, away_player_3_id, away_player_4_id, away_player_5_id,
+                offensive_team_id, defensive_team_id, created_at, updated_at
+            )
+            SELECT
+                w.game_id, w.event_num, w.event_type, w.event_action_type, w.period,
+                wc.string_id, pc.string_id, sc.string_id, sm.string_id,
+                w.person1_type, w.player1_id, w.player1_team_id,
+                w.person2_type, w.player2_id, w.player2_team_id,
+                w.person3_type, w.player3_id, w.player3_team_id,
+                w.home_player_1_id, w.home_player_2_id, w.home_player_3_id, w.home_player_4_id, w.home_player_5_id,
+                w.away_player_1_id, w.away_player_2_id, w.away_player_3_id, w.away_player_4_id, w.away_player_5_id,
+                w.offensive_team_id, w.defensive_team_id,
+                CAST(strftime('%s', w.created_at) AS INTEGER), CAST(strftime('%s', w.updated_at) AS INTEGER)
+            FROM Possessions_wide w
+            LEFT JOIN PossessionStrings wc ON wc.value = w.wc_time_string
+            LEFT JOIN PossessionStrings pc ON pc.value = w.pc_time_string
+            LEFT JOIN PossessionStrings sc ON sc.value = w.score
+            LEFT JOIN PossessionStrings sm ON sm.value = w.score_margin
+        """)
+
+        wide_rows = cursor.execute("SELECT COUNT(*) FROM Possessions_wide").fetchone()[0]
+        compact_rows = cursor.execute("SELECT COUNT(*) FROM PossessionEvents").fetchone()[0]
+        if wide_rows != compact_rows:
+            raise sqlite3.IntegrityError(f"Possessions conversion copied {compact_rows} of {wide_rows} rows")
+        cursor.execute("DROP TABLE Possessions_wide")
+        cursor.execute("RELEASE SAVEPOINT migrate_possessions")
+    except sqlite3.Error:
+        cursor.execute("ROLLBACK TO SAVEPOINT migrate_possessions")
+        cursor.execute("RELEASE SAVEPOINT migrate_possessions")
+        raise
+
+    logger.info(f"Converted {compact_rows} possessions to the compact layout.")
+    if dropped_indexes:
+        logger.info(f"Indexes dropped with the wide table: {', '.join(dropped_indexes)}. "
+                    f"Recreate any still needed on PossessionEvents.")
+    logger.info("Run VACUUM to return the space freed by the wide table to the filesystem.")
+    return True
+
+
+def migrate_hot_query_indexes(conn: sqlite3.Connection) -> None:
+    """
+    Creates the covering indexes for the season-filtered training and evaluation queries
+    (see db/index_advisor.HOT_QUERY_INDEXES). Idempotent; tables that do not exist yet are
+    skipped and get their indexes from create_tables.
+    """
+    created = create_hot_query_indexes(conn)
+    if created:
+        logger.info(f"Created hot-query indexes: {', '.join(created)}.")
+    else:
+        logger.info("Hot-query indexes are up-to-date.")
+
+
 def create_player_salaries_table(cursor: sqlite3.Cursor):
     """Creates the new PlayerSalaries table."""
     cursor.execute("""
@@ -144,10 +258,19 @@ def create_player_skills_table(cursor: sqlite3.Cursor):
  
 def main():
     """Main function to connect to DB and run migrations."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run pending schema migrations.")
+    parser.add_argument("--compact-possessions", action="store_true",
+                        help="Also convert a wide Possessions table to the compact layout (drops the wide table).")
+    args = parser.parse_args()
+
     conn = get_db_connection()
     if conn is not None:
         try:
             run_migrations(conn)
+            if args.compact_possessions and migrate_possessions_to_compact(conn):
+                conn.commit()
         except sqlite3.Error as e:
             logger.error(f"Database error during migration: {e}")
         finally:
@@ -2,63 +2,117 @@
 
 import logging
 from datetime import datetime
-from .common_utils import get_db_connection, get_nba_stats_client, logger
+from typing import List, Optional
+from ..utils.common_utils import get_db_connection, get_nba_stats_client, logger
 import sqlite3
 
-def populate_games_for_season(season: str) -> None:
+
+def latest_game_date(conn: sqlite3.Connection, season: str) -> Optional[str]:
+    """Latest game_date (YYYY-MM-DD) already in the Games table for a season, or None."""
+    row = conn.execute("SELECT MAX(game_date) FROM Games WHERE season = ?", (season,)).fetchone()
+    return row[0] if row else None
+
+
+def _home_and_away(team_rows: List[dict]) -> tuple:
     """
-    Populates the Games table with all games from the specified season.
-    
+    Home and away team ids from the two leaguegamelog rows of a game. The home team's
+    MATCHUP reads 'LAL vs. BOS', the away team's 'BOS @ LAL'; without a MATCHUP the rows
+    are taken in the order returned.
+    """
+    home = next((g.get('teamId') for g in team_rows if ' vs. ' in (g.get('matchup') or '')), None)
+    away = next((g.get('teamId') for g in team_rows if ' @ ' in (g.get('matchup') or '')), None)
+    if home is None or away is None:
+        team_ids = [g.get('teamId') for g in team_rows]
+        home, away = (team_ids + [None, None])[:2]
+    return home, away
+
+
+def populate_games(conn: sqlite3.Connection, season: str, since: Optional[str] = None) -> List[str]:
+    """
+    Inserts the season's games into the Games table and returns the ids of the games that
+    were not stored yet.
+
     Args:
+        conn: Open database connection.
         season: The season to fetch games for (e.g., "2024-25").
+        since: Latest already-ingested game date (YYYY-MM-DD). Only games from that date on
+            are requested, which keeps an in-season nightly refresh to a handful of games.
+            The date itself is requested again, since games on it may not all have been
+            stored yet.
+    """
+    client = get_nba_stats_client()
+    date_from = datetime.strptime(since, '%Y-%m-%d').strftime('%m/%d/%Y') if since else ""
+    schedule_data = client.get_schedule(season, date_from=date_from)
+
+    if not schedule_data:
+        logger.warning(f"No schedule data returned for season {season}.")
+        return []
+
+    # The API returns two entries per game, one for each team
+    team_rows_by_game = {}
+    for game in schedule_data:
+        game_id = game.get('gameId')
+        if game_id:
+            team_rows_by_game.setdefault(game_id, []).append(game)
+
+    stored = {row[0] for row in conn.execute("SELECT game_id FROM Games WHERE season = ?", (season,))}
+    games_to_insert = []
+    for game_id, team_rows in team_rows_by_game.items():
+        if game_id in stored:
+            continue
+        game_date = datetime.strptime(team_rows[0]['gameDate'], '%Y-%m-%d').strftime('%Y-%m-%d')
+        home_team_id, away_team_id = _home_and_away(team_rows)
+        games_to_insert.append((
+            game_id,
+            game_date,
+            season,
+            'Regular Season',  # Assuming regular season, as API doesn't specify
+            home_team_id,
+            away_team_id,
+        ))
+
+    cursor = conn.cursor()
+    for game_data in games_to_insert:
+        try:
+            cursor.execute("""
+                INSERT OR IGNORE INTO Games (
+                    game_id, game_date, season, season_type, home_team_id, away_team_id,
+                    created_at, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+            """, game_data)
+        except sqlite3.IntegrityError as e:
+            logger.warning(f"Could not insert game {game_data[0]} (likely already exists): {e}")
+        except sqlite3.Error as e:
+            logger.error(f"Database error inserting game {game_data[0]}: {e}")
+
+    conn.commit()
+    logger.info(f"Successfully inserted {len(games_to_insert)} new games for season {season}"
+                + (f" played on or after {since}" if since else ""))
+    return [game_data[0] for game_data in games_to_insert]
+
+
+def populate_games_for_season(season_to_load: str, since: Optional[str] = None) -> List[str]:
+    """
+    Populates the Games table with all games from the specified season.
+
+    Args:
+        season_to_load: The season to fetch games for (e.g., "2024-25").
+        since: If given, only games played on or after this date (YYYY-MM-DD) are fetched.
+
+    Returns:
+        The ids of the games that were not stored yet.
     """
-    logger.info(f"Starting game population for season {season}")
+    logger.info(f"Starting game population for season {season_to_load}")
     conn = get_db_connection()
     if not conn:
         logger.error("Could not get database connection. Aborting game population.")
-        return
-        
+        return []
+
     try:
-        client = get_nba_stats_client()
-        schedule_data = client.get_schedule(season)
-        
-        if not schedule_data:
-            logger.warning(f"No schedule data returned for season {season}.")
-            return
-
-        games_to_insert = []
-        for game in schedule_data:
-            game_id = game.get('gameId')
-            # The API returns two entries per game, one for each team. We only need one.
-            if game_id and not any(g[0] == game_id for g in games_to_insert):
-                games_to_insert.append((
-                    game_id,
-                    datetime.strptime(game['gameDate'], '%Y-%m-%d').strftime('%Y-%m-%d'),
-                    season,
-                    'Regular Season',  # Assuming regular season, as API doesn't specify
-                    game.get('home_team_id'),  # Assuming client provides this
-                    game.get('away_team_id')   # Assuming client provides this
-                ))
-        
-        cursor = conn.cursor()
-        for game_data in games_to_insert:
-            try:
-                cursor.execute("""
-                    INSERT OR IGNORE INTO Games (
-                        game_id, game_date, season, season_type, home_team_id, away_team_id,
-                        created_at, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                """, game_data)
-            except sqlite3.IntegrityError as e:
-                logger.warning(f"Could not insert game {game_data[0]} (likely already exists): {e}")
-            except sqlite3.Error as e:
-                logger.error(f"Database error inserting game {game_data[0]}: {e}")
-
-        conn.commit()
-        logger.info(f"Successfully inserted or ignored {len(games_to_insert)} games for season {season}")
-        
+        return populate_games(conn, season_to_load, since=since)
     except Exception as e:
-        logger.error(f"An unexpected error occurred during game population for season {season}: {e}", exc_info=True)
+        logger.error(f"An unexpected error occurred during game population for season {season_to_load}: {e}", exc_info=True)
+        return []
     finally:
         if conn:
             conn.close()
@@ -68,6 +122,12 @@ if __name__ == "__main__":
     from ..config import settings
     parser = argparse.ArgumentParser(description="Populate the Games table for a specific NBA season.")
     parser.add_argument("--season", type=str, default=settings.SEASON_ID, help="The season to populate games for (e.g., '2024-25').")
+    parser.add_argument("--incremental", action="store_true", help="Only fetch games played on or after the latest game_date already stored.")
     args = parser.parse_args()
-    
-    populate_games_for_season(season=args.season) 
\ No newline at end of file
+
+    since = None
+    if args.incremental:
+        conn = get_db_connection()
+        since = latest_game_date(conn, args.season)
+        conn.close()
+    populate_games_for_season(season_to_load=args.season, since=since)
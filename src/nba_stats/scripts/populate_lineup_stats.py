@@ -3,6 +3,8 @@ Fetches and stores lineup stats for a given season by aggregating multiple measu
 """
 import sqlite3
 from ..utils.common_utils import get_db_connection, get_nba_stats_client, logger, migrate_table
+from ..api.result_set import decode_result_set
+from ..config import settings
 import time
 import random
 import re
@@ -157,18 +159,22 @@ def _fetch_and_aggregate_lineup_stats(client, season: str) -> dict:
                 logger.warning(f"No data for measure type: {measure}")
                 continue
 
-            result_set = data["resultSets"][0]
-            headers = [h for h in result_set["headers"] if not h.endswith("_RANK")]
-            rows = result_set["rowSet"]
-
-            snake_case_headers = [_to_snake_case(h) for h in headers]
-            for row in rows:
-                row_dict = dict(zip(snake_case_headers, row))
-                group_id = row_dict.get('group_id')
-                if group_id:
-                    if group_id not in aggregated_stats:
-                        aggregated_stats[group_id] = {'season': season}
-                    aggregated_stats[group_id].update(row_dict)
+            headers = [h for h in data["resultSets"][0]["headers"] if not h.endswith("_RANK")]
+            columns = decode_result_set(data, name=0, columns=headers)
+            if 'GROUP_ID' not in columns:
+                logger.warning(f"No GROUP_ID column for measure type: {measure}")
+                continue
+
+            # Merge column by column; tolist() yields native Python values for sqlite3
+            group_ids = columns['GROUP_ID'].tolist()
+            for group_id in group_ids:
+                if group_id and group_id not in aggregated_stats:
+                    aggregated_stats[group_id] = {'season': season}
+            for header, values in columns.items():
+                snake_header = _to_snake_case(header)
+                for group_id, value in zip(group_ids, values.tolist()):
+                    if group_id:
+                        aggregated_stats[group_id][snake_header] = value
             
             time.sleep(random.uniform(settings.MIN_SLEEP, settings.MAX_SLEEP))
 
@@ -177,8 +183,16 @@ def _fetch_and_aggregate_lineup_stats(client, season: str) -> dict:
             
     return aggregated_stats
 
-def populate_lineup_stats(season_to_load: str):
-    """Orchestrates fetching, aggregating, and storing of lineup stats."""
+def _lineup_player_ids(group_id: str) -> set:
+    """Player ids in a lineup GROUP_ID such as '-201939-202691-203110-1626172-1628398-'."""
+    return {int(part) for part in str(group_id).split('-') if part.strip().isdigit()}
+
+
+def populate_lineup_stats(season_to_load: str, player_ids: list[int] | None = None):
+    """
+    Orchestrates fetching, aggregating, and storing of lineup stats.
+    If player_ids is provided, only lineups containing at least one of those players are upserted.
+    """
     logger.info(f"Starting lineup stats population for the {season_to_load} season.")
     conn = get_db_connection()
     if conn is None:
@@ -196,6 +210,12 @@ def populate_lineup_stats(season_to_load: str):
         client = get_nba_stats_client()
         aggregated_stats = _fetch_and_aggregate_lineup_stats(client, season_to_load)
 
+        if player_ids is not None:
+            wanted = set(player_ids)
+            aggregated_stats = {group_id: stats for group_id, stats in aggregated_stats.items()
+                                if _lineup_player_ids(group_id) & wanted}
+            logger.info(f"Incremental refresh: {len(aggregated_stats)} lineups include the {len(wanted)} affected players.")
+
         if not aggregated_stats:
             logger.info("No aggregated lineup stats to insert.")
             return
@@ -255,7 +275,6 @@ def populate_lineup_stats(season_to_load: str):
 
 if __name__ == '__main__':
     import argparse
-    from ..config import settings
 
     parser = argparse.ArgumentParser(description="Populate lineup stats for a given season.")
     parser.add_argument("--season", type=str, default=settings.SEASON_ID, help="The season to populate data for (e.g., '2023-24').")
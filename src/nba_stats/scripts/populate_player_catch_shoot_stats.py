@@ -6,11 +6,12 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
-from nba_stats.utils.common_utils import get_db_connection, get_nba_stats_client, logger
+from nba_stats.utils.common_utils import get_db_connection, get_nba_stats_client, logger, filter_rows_by_player
 
-def populate_player_catch_shoot_stats(season_to_load: str):
+def populate_player_catch_shoot_stats(season_to_load: str, player_ids: list[int] | None = None):
     """
     Fetches and stores all player catch & shoot stats for a given season.
+    If player_ids is provided, only those players' rows are upserted.
     """
     logger.info(f"Starting player catch & shoot stats population for season {season_to_load}.")
     client = get_nba_stats_client()
@@ -33,6 +34,8 @@ def populate_player_catch_shoot_stats(season_to_load: str):
         result_data = catch_shoot_data['resultSets'][0]
         headers = result_data.get('headers', [])
         rows = result_data.get('rowSet', [])
+        # Incremental refreshes upsert only the players who appeared in new games
+        rows = filter_rows_by_player(headers, rows, player_ids)
         
         if not rows or not headers:
             logger.info(f"No player catch & shoot data to process for season {season_to_load}.")
@@ -57,8 +57,11 @@ def _fetch_drive_stats_task(player_info: Tuple[int, str], season: str) -> Dict:
         logger.error(f"Exception in thread for player {player_id} drive stats: {e}")
         return {}
 
-def populate_player_drive_stats(season_to_load: str):
-    """Fetches and stores drive stats for all players using parallel requests."""
+def populate_player_drive_stats(season_to_load: str, player_ids: list[int] | None = None):
+    """
+    Fetches and stores drive stats for all players using parallel requests.
+    If player_ids is provided, only those players are fetched.
+    """
     logger.info(f"Starting player drive stats fetch for season {season_to_load}.")
     conn = get_db_connection()
     if conn is None:
@@ -74,6 +77,9 @@ def populate_player_drive_stats(season_to_load: str):
             WHERE rs.season = ? AND rs.minutes_played >= 100
         """, (season_to_load,))
         players_to_process = cursor.fetchall()
+        if player_ids is not None:
+            wanted = set(player_ids)
+            players_to_process = [player for player in players_to_process if player[0] in wanted]
 
         if not players_to_process:
             logger.warning("No players in DB to fetch drive stats for.")
@@ -5,7 +5,7 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
-from nba_stats.utils.common_utils import get_db_connection, get_nba_stats_client, logger
+from nba_stats.utils.common_utils import get_db_connection, get_nba_stats_client, logger, filter_rows_by_player
 
 def _insert_hustle_stats(conn: sqlite3.Connection, season: str, stats_data: dict):
     """Inserts a single player's hustle stats for a season."""
@@ -31,8 +31,11 @@ def _insert_hustle_stats(conn: sqlite3.Connection, season: str, stats_data: dict
     except sqlite3.Error as e:
         logger.error(f"DB error for player {stats_data.get('PLAYER_ID')} hustle stats: {e}")
 
-def populate_player_hustle_stats(season_to_load: str):
-    """Fetches and stores league-wide hustle stats for a given season."""
+def populate_player_hustle_stats(season_to_load: str, player_ids: list[int] | None = None):
+    """
+    Fetches and stores league-wide hustle stats for a given season.
+    If player_ids is provided, only those players' rows are upserted.
+    """
     logger.info(f"Starting league hustle stats fetch for season {season_to_load}")
     conn = get_db_connection()
     if conn is None:
@@ -60,7 +63,7 @@ def populate_player_hustle_stats(season_to_load: str):
             return
 
         processed_count = 0
-        for row in row_set:
+        for row in filter_rows_by_player(headers, row_set, player_ids):
             stats_data = dict(zip(headers, row))
             if stats_data.get('PLAYER_ID'):
                 _insert_hustle_stats(conn, season_to_load, stats_data)
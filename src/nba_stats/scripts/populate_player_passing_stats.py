@@ -5,11 +5,12 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
-from nba_stats.utils.common_utils import get_db_connection, get_nba_stats_client, logger
+from nba_stats.utils.common_utils import get_db_connection, get_nba_stats_client, logger, filter_rows_by_player
 
-def populate_player_passing_stats(season: str):
+def populate_player_passing_stats(season: str, player_ids: list[int] | None = None):
     """
     Fetches league-wide player passing stats and stores them in the database.
+    If player_ids is provided, only those players' rows are upserted.
     """
     logger.info(f"Fetching passing stats for season: {season}")
     conn = get_db_connection()
@@ -30,6 +31,8 @@ def populate_player_passing_stats(season: str):
         result_data = passing_data['resultSets'][0]
         headers = result_data.get('headers', [])
         rows = result_data.get('rowSet', [])
+        # Incremental refreshes upsert only the players who appeared in new games
+        rows = filter_rows_by_player(headers, rows, player_ids)
         
         if not headers or not rows:
             logger.info(f"No player passing data to process for season {season}.")
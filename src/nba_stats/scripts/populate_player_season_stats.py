@@ -1,7 +1,6 @@
 """Script to populate the PlayerSeasonRawStats and PlayerSeasonAdvancedStats tables."""
 
 # Standard libs
-import sqlite3
 import time
 import random
 from typing import Dict, Tuple
@@ -14,56 +13,40 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
 # Local imports (after path fix)
 from nba_stats.utils.common_utils import get_db_connection, get_nba_stats_client, logger
-
-def _insert_stats(conn: sqlite3.Connection, player_id: int, season: str, team_id: int, stats: Dict):
-    """Inserts both raw and advanced stats for a player for a given season."""
-    # This can be expanded or split if schemas diverge significantly
-    try:
-        raw_cursor = conn.cursor()
-        raw_cursor.execute("""
-            INSERT OR REPLACE INTO PlayerSeasonRawStats (
-                player_id, season, team_id, games_played, minutes_played, field_goal_percentage,
-                three_point_percentage, free_throw_percentage,
-                field_goals_made, field_goals_attempted,
-                three_pointers_made, three_pointers_attempted,
-                free_throws_made, free_throws_attempted,
-                offensive_rebounds, defensive_rebounds, total_rebounds,
-                assists, steals, blocks, turnovers, personal_fouls,
-                points, plus_minus
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            player_id, season, team_id,
-            stats.get('GP'),
-            stats.get('MIN'),
-            stats.get('FG_PCT'),
-            stats.get('FG3_PCT'),
-            stats.get('FT_PCT'),
-            stats.get('FGM'), stats.get('FGA'),
-            stats.get('FG3M'), stats.get('FG3A'),
-            stats.get('FTM'), stats.get('FTA'),
-            stats.get('OREB'), stats.get('DREB'), stats.get('REB'),
-            stats.get('AST'), stats.get('STL'), stats.get('BLK'),
-            stats.get('TOV'), stats.get('PF'),
-            stats.get('PTS'), stats.get('PLUS_MINUS')
-        ))
-
-        adv_cursor = conn.cursor()
-        adv_cursor.execute("""
-            INSERT OR REPLACE INTO PlayerSeasonAdvancedStats (
-                player_id, season, team_id, offensive_rating, defensive_rating, net_rating,
-                assist_percentage, offensive_rebound_percentage, defensive_rebound_percentage,
-                rebound_percentage, turnover_percentage, effective_field_goal_percentage,
-                true_shooting_percentage, usage_percentage, pace, pie
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            player_id, season, team_id, stats.get('OFF_RATING'), stats.get('DEF_RATING'),
-            stats.get('NET_RATING'), stats.get('AST_PCT'), stats.get('OREB_PCT'),
-            stats.get('DREB_PCT'), stats.get('REB_PCT'), stats.get('TM_TOV_PCT'),
-            stats.get('E_FG_PCT'), stats.get('TS_PCT'), stats.get('USG_PCT'),
-            stats.get('PACE'), stats.get('PIE')
-        ))
-    except sqlite3.Error as e:
-        logger.error(f"DB error for player {player_id} in season {season}: {e}")
+from nba_stats.services.write_behind import WriteBehindWriter
+
+# (table column, API header) pairs; player_id, season and team_id lead every row
+RAW_STATS_COLUMNS = [
+    ('games_played', 'GP'), ('minutes_played', 'MIN'), ('field_goal_percentage', 'FG_PCT'),
+    ('three_point_percentage', 'FG3_PCT'), ('free_throw_percentage', 'FT_PCT'),
+    ('field_goals_made', 'FGM'), ('field_goals_attempted', 'FGA'),
+    ('three_pointers_made', 'FG3M'), ('three_pointers_attempted', 'FG3A'),
+    ('free_throws_made', 'FTM'), ('free_throws_attempted', 'FTA'),
+    ('offensive_rebounds', 'OREB'), ('defensive_rebounds', 'DREB'), ('total_rebounds', 'REB'),
+    ('assists', 'AST'), ('steals', 'STL'), ('blocks', 'BLK'),
+    ('turnovers', 'TOV'), ('personal_fouls', 'PF'),
+    ('points', 'PTS'), ('plus_minus', 'PLUS_MINUS'),
+]
+ADVANCED_STATS_COLUMNS = [
+    ('offensive_rating', 'OFF_RATING'), ('defensive_rating', 'DEF_RATING'), ('net_rating', 'NET_RATING'),
+    ('assist_percentage', 'AST_PCT'), ('offensive_rebound_percentage', 'OREB_PCT'),
+    ('defensive_rebound_percentage', 'DREB_PCT'), ('rebound_percentage', 'REB_PCT'),
+    ('turnover_percentage', 'TM_TOV_PCT'), ('effective_field_goal_percentage', 'E_FG_PCT'),
+    ('true_shooting_percentage', 'TS_PCT'), ('usage_percentage', 'USG_PCT'), ('pace', 'PACE'), ('pie', 'PIE'),
+]
+KEY_COLUMNS = ['player_id', 'season', 'team_id']
+
+
+def _submit_stats(writer: WriteBehindWriter, player_id: int, season: str, team_id: int, stats: Dict):
+    """Queues both raw and advanced stats for a player for a given season."""
+    key = (player_id, season, team_id)
+    for table_name, columns in (("PlayerSeasonRawStats", RAW_STATS_COLUMNS),
+                                ("PlayerSeasonAdvancedStats", ADVANCED_STATS_COLUMNS)):
+        writer.submit(
+            table_name,
+            [key + tuple(stats.get(header) for _, header in columns)],
+            columns=KEY_COLUMNS + [column for column, _ in columns]
+        )
 
 def _fetch_player_stats_task(player_info: Tuple[int, str], season: str) -> Dict:
     """Task to fetch all stats for a single player, designed for concurrent execution."""
@@ -196,20 +179,21 @@ def populate_player_season_stats(season_to_load: str, player_ids: list[int] | No
 
         logger.info(f"Processing {len(players_to_process)} players for season {season_to_load}.")
         
-        with ThreadPoolExecutor(max_workers=5) as executor:
+        # Rows are written behind the fetches, coalesced into a few large transactions
+        with ThreadPoolExecutor(max_workers=5) as executor, WriteBehindWriter() as writer:
             future_to_player = {executor.submit(_fetch_player_stats_task, player, season_to_load): player for player in players_to_process}
             
             processed_count = 0
             for future in as_completed(future_to_player):
                 stats = future.result()
                 if stats and stats.get('team_id'):
-                    _insert_stats(conn, stats['player_id'], stats['season'], stats['team_id'], stats)
+                    _submit_stats(writer, stats['player_id'], stats['season'], stats['team_id'], stats)
                     processed_count += 1
                 else:
                     player_name = future_to_player[future][1]
                     logger.warning(f"Skipping stats for {player_name} due to missing data from API.")
             
-            conn.commit()
+            writer.flush()
             logger.info(f"Finished processing. Stored stats for {processed_count} players.")
 
     except Exception as e:
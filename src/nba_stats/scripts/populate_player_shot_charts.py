@@ -1,19 +1,34 @@
 """
 This script populates the PlayerShotChart table with granular shot data for each player.
 """
+import calendar
 import sqlite3
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
 import time
 import random
 import sys
 from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
 from nba_stats.utils.common_utils import get_db_connection, get_nba_stats_client, logger
 from nba_stats.config import settings
+from nba_stats.api.result_set import decode_result_set
+from nba_stats.services.write_behind import WriteBehindWriter
 
-def _fetch_shot_chart_task(player_info: tuple, season: str) -> list:
-    """Task to fetch shot chart data for a single player."""
+# Shot_Chart_Detail columns stored in PlayerShotChart, in insert order (season is added separately)
+SHOT_COLUMNS = [
+    'PLAYER_ID', 'TEAM_ID', 'GAME_ID', 'ACTION_TYPE', 'EVENT_TYPE', 'SHOT_TYPE',
+    'SHOT_ZONE_BASIC', 'SHOT_ZONE_AREA', 'SHOT_ZONE_RANGE', 'SHOT_DISTANCE',
+    'LOC_X', 'LOC_Y', 'SHOT_MADE_FLAG'
+]
+
+def _fetch_shot_chart_task(player_info: tuple, season: str) -> dict:
+    """Task to fetch shot chart data for a single player as columns keyed by SHOT_COLUMNS."""
     player_id, team_id = player_info
     client = get_nba_stats_client()
     logger.info(f"Fetching shot chart for Player ID: {player_id}, Team ID: {team_id}")
@@ -25,54 +40,186 @@ def _fetch_shot_chart_task(player_info: tuple, season: str) -> list:
             season=season
         )
         if shot_data and 'resultSets' in shot_data and shot_data['resultSets']:
-            rows = shot_data['resultSets'][0]['rowSet']
-            headers = shot_data['resultSets'][0]['headers']
-            return [dict(zip(headers, row)) for row in rows]
+            return decode_result_set(shot_data, name=0, columns=SHOT_COLUMNS)
     except Exception as e:
         logger.error(f"Error fetching shot chart for player {player_id}: {e}", exc_info=True)
     
-    return []
+    return {}
 
-def _insert_shots_batch(conn: sqlite3.Connection, shots: list, season: str):
-    """Inserts a batch of shot chart data into the database."""
-    if not shots:
-        return
-        
-    shots_to_insert = []
-    for shot in shots:
-        shots_to_insert.append((
-            shot.get('PLAYER_ID'),
-            shot.get('TEAM_ID'),
-            shot.get('GAME_ID'),
-            season,
-            shot.get('ACTION_TYPE'),
-            shot.get('EVENT_TYPE'),
-            shot.get('SHOT_TYPE'),
-            shot.get('SHOT_ZONE_BASIC'),
-            shot.get('SHOT_ZONE_AREA'),
-            shot.get('SHOT_ZONE_RANGE'),
-            shot.get('SHOT_DISTANCE'),
-            shot.get('LOC_X'),
-            shot.get('LOC_Y'),
-            shot.get('SHOT_MADE_FLAG')
-        ))
-    
+# PlayerShotChart columns in insert order, matching SHOT_INSERT_SQL
+SHOT_TABLE_COLUMNS = [
+    'player_id', 'team_id', 'game_id', 'season', 'action_type', 'event_type',
+    'shot_type', 'shot_zone_basic', 'shot_zone_area', 'shot_zone_range',
+    'shot_distance', 'loc_x', 'loc_y', 'shot_made_flag'
+]
+
+def _shot_rows(shots: dict, season: str) -> list:
+    """Parameter tuples (SHOT_TABLE_COLUMNS order) for a batch of shot chart columns (see SHOT_COLUMNS)."""
+    # tolist() hands sqlite3 native Python values; zip builds the parameter tuples without per-row dicts
+    columns = [shots[c].tolist() for c in SHOT_COLUMNS]
+    seasons = [season] * len(columns[0])
+    return list(zip(*columns[:3], seasons, *columns[3:]))
+
+SHOT_INSERT_SQL = """
+    INSERT INTO PlayerShotChart (
+        player_id, team_id, game_id, season, action_type, event_type,
+        shot_type, shot_zone_basic, shot_zone_area, shot_zone_range,
+        shot_distance, loc_x, loc_y, shot_made_flag
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+def _season_month_ranges(conn: sqlite3.Connection, season: str) -> List[Tuple[str, str]]:
+    """
+    Returns (DateFrom, DateTo) pairs in MM/DD/YYYY form, one per calendar month from the
+    season's first to its last game in the Games table, so shortened or shifted seasons
+    (e.g. the 2020 bubble, played into October) are covered. Empty if no games are stored.
+    """
+    first, last = conn.execute("SELECT MIN(game_date), MAX(game_date) FROM Games WHERE season = ?",
+                               (season,)).fetchone()
+    if first is None:
+        return []
+    first, last = date.fromisoformat(first[:10]), date.fromisoformat(last[:10])
+    ranges = []
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        start = first if (year, month) == (first.year, first.month) else date(year, month, 1)
+        end = last if (year, month) == (last.year, last.month) else date(year, month, calendar.monthrange(year, month)[1])
+        ranges.append((start.strftime('%m/%d/%Y'), end.strftime('%m/%d/%Y')))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return ranges
+
+
+def _fetch_bulk_shot_chart_task(season: str, team_id: int = 0, date_from: str = "", date_to: str = "") -> dict:
+    """
+    Fetches every shot for a team (team_id) or the league (team_id=0), optionally within a
+    date range. A range without games is a valid empty answer, not a failure to retry.
+    """
+    client = get_nba_stats_client()
+    scope = f"team {team_id}" if team_id else f"league {date_from}-{date_to}"
+    logger.info(f"Fetching bulk shot chart for {scope}")
     try:
-        cursor = conn.cursor()
-        cursor.executemany("""
-            INSERT OR IGNORE INTO PlayerShotChart (
-                player_id, team_id, game_id, season, action_type, event_type,
-                shot_type, shot_zone_basic, shot_zone_area, shot_zone_range,
-                shot_distance, loc_x, loc_y, shot_made_flag
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, shots_to_insert)
-        conn.commit()
-        logger.info(f"Successfully inserted/ignored {len(shots_to_insert)} shots.")
+        shot_data = client.get_shot_chart_detail(
+            player_id=0,
+            team_id=team_id,
+            season=season,
+            date_from=date_from,
+            date_to=date_to,
+            allow_empty=True
+        )
+        if shot_data and 'resultSets' in shot_data and shot_data['resultSets']:
+            return decode_result_set(shot_data, name=0, columns=SHOT_COLUMNS)
+    except Exception as e:
+        logger.error(f"Error fetching bulk shot chart for {scope}: {e}", exc_info=True)
+    return {}
+
+
+def _filter_shots_by_players(shots: dict, player_ids: Optional[np.ndarray]) -> dict:
+    """Keeps only shots by the given players (the per-player mode's coverage), without a Python loop."""
+    if player_ids is None or not shots or len(shots['PLAYER_ID']) == 0:
+        return shots
+    mask = np.isin(shots['PLAYER_ID'].astype(np.int64), player_ids)
+    return {column: values[mask] for column, values in shots.items()}
+
+
+def _bulk_insert_shots(conn: sqlite3.Connection, shots: dict, season: str) -> int:
+    """
+    Replaces the shots for every (game, team) in the chunk in a single transaction.
+
+    Deleting the chunk's games first makes re-running a season idempotent, since
+    PlayerShotChart has no natural unique key for INSERT OR IGNORE to dedupe on.
+
+    Returns:
+        Number of shots inserted.
+    """
+    if not shots or len(shots['PLAYER_ID']) == 0:
+        return 0
+
+    rows = _shot_rows(shots, season)
+    game_teams = {(row[2], row[1]) for row in rows}
+
+    try:
+        with conn:
+            conn.executemany(
+                "DELETE FROM PlayerShotChart WHERE season = ? AND game_id = ? AND team_id = ?",
+                [(season, game_id, team_id) for game_id, team_id in game_teams]
+            )
+            conn.executemany(SHOT_INSERT_SQL, rows)
     except sqlite3.Error as e:
-        logger.error(f"Database error during shot chart batch insertion: {e}")
+        logger.error(f"Database error during bulk shot chart insertion: {e}")
+        return 0
+    return len(rows)
+
+
+def populate_shot_charts_bulk(season_to_load: str, mode: str = "team") -> int:
+    """
+    Populates PlayerShotChart with team-scoped (30 calls) or league-wide pulls chunked by
+    month over the season's game dates in Games.
+
+    Rows come back for every player in the scope and are split by player locally,
+    keeping only players with PlayerSeasonRawStats for the season (all players if none).
+
+    Args:
+        season_to_load: Season ID (e.g., "2023-24")
+        mode: "team" for one call per team, "league" for one call per month
+
+    Returns:
+        Number of shots inserted.
+    """
+    if mode not in ("team", "league"):
+        raise ValueError(f"Unknown bulk shot chart mode: {mode}")
+    logger.info(f"Starting {mode}-wide shot chart population for season {season_to_load}.")
+    conn = get_db_connection()
+    if not conn:
+        return 0
+
+    total = 0
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT player_id, team_id FROM PlayerSeasonRawStats WHERE season = ?", (season_to_load,))
+        players = cursor.fetchall()
+        player_ids = np.array(sorted({p for p, _ in players}), dtype=np.int64) if players else None
+
+        if mode == "team":
+            team_ids = sorted({t for _, t in players if t})
+            if not team_ids:
+                cursor.execute("SELECT team_id FROM Teams")
+                team_ids = [row[0] for row in cursor.fetchall()]
+            chunks = [dict(team_id=team_id) for team_id in team_ids]
+        else:
+            chunks = [dict(date_from=start, date_to=end) for start, end in _season_month_ranges(conn, season_to_load)]
+            if not chunks:
+                logger.warning(f"No games stored for season {season_to_load}; populate Games before league-wide shot charts.")
+                return 0
+        logger.info(f"Fetching {len(chunks)} {mode} shot chart chunks for season {season_to_load}.")
+
+        with ThreadPoolExecutor(max_workers=settings.MAX_WORKERS) as executor:
+            futures = [executor.submit(_fetch_bulk_shot_chart_task, season_to_load, **chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                shots = _filter_shots_by_players(future.result(), player_ids)
+                inserted = _bulk_insert_shots(conn, shots, season_to_load)
+                if inserted:
+                    logger.info(f"Inserted {inserted} shots for {len(np.unique(shots['PLAYER_ID']))} players.")
+                total += inserted
+
+        logger.info(f"Bulk shot chart population complete: {total} shots for season {season_to_load}.")
+    except Exception as e:
+        logger.error(f"An error occurred during bulk shot chart population: {e}", exc_info=True)
+    finally:
+        conn.close()
+    return total
+
+
+def populate_player_shot_charts(season_to_load: str, mode: str = "player"):
+    """
+    Fetches and stores shot chart data for all players in a season using parallel requests.
+
+    ``mode="player"`` issues one request per player-team combination; "team" and "league"
+    delegate to populate_shot_charts_bulk.
+    """
+    if mode != "player":
+        populate_shot_charts_bulk(season_to_load, mode=mode)
+        return
 
-def populate_player_shot_charts(season_to_load: str):
-    """Fetches and stores shot chart data for all players in a season using parallel requests."""
     logger.info(f"Starting shot chart population for season {season_to_load}.")
     conn = get_db_connection()
     if not conn:
@@ -84,7 +231,8 @@ def populate_player_shot_charts(season_to_load: str):
         players = cursor.fetchall()
         logger.info(f"Found {len(players)} player-team combinations for season {season_to_load}.")
 
-        with ThreadPoolExecutor(max_workers=settings.MAX_WORKERS) as executor:
+        # Shots are written behind the fetches instead of one commit per player
+        with ThreadPoolExecutor(max_workers=settings.MAX_WORKERS) as executor, WriteBehindWriter() as writer:
             future_to_player = {
                 executor.submit(_fetch_shot_chart_task, player, season_to_load): player 
                 for player in players
@@ -92,11 +240,13 @@ def populate_player_shot_charts(season_to_load: str):
             
             for future in as_completed(future_to_player):
                 shots = future.result()
-                if shots:
-                    _insert_shots_batch(conn, shots, season_to_load)
+                if shots and len(shots['PLAYER_ID']):
+                    writer.submit("PlayerShotChart", _shot_rows(shots, season_to_load), columns=SHOT_TABLE_COLUMNS)
                 
                 # A small delay to be respectful to the API endpoint
                 time.sleep(random.uniform(0.1, 0.3))
+            
+            writer.flush()
 
     except Exception as e:
         logger.error(f"An error occurred during shot chart population: {e}", exc_info=True)
@@ -110,6 +260,8 @@ if __name__ == "__main__":
     
     parser = argparse.ArgumentParser(description="Populate Player Shot Chart data for a given season.")
     parser.add_argument("--season", type=str, default=settings.SEASON_ID, help="The season to populate data for.")
+    parser.add_argument("--mode", choices=["player", "team", "league"], default="player",
+                        help="player: one call per player-team; team: one call per team; league: one call per month.")
     args = parser.parse_args()
 
-    populate_player_shot_charts(season_to_load=args.season) 
\ No newline at end of file
+    populate_player_shot_charts(season_to_load=args.season, mode=args.mode) 
\ No newline at end of file
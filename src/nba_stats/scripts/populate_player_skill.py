@@ -8,6 +8,8 @@ import sys
 import unicodedata
 from typing import Dict, Tuple
 
+from src.nba_stats.db.connection import connect
+
 # Correct database path, relative to the project root
 DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'db', 'nba_stats.db')
 CSV_PATH = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'data', 'darko_dpm_2024-25.csv')
@@ -48,12 +50,8 @@ def populate_player_skill_from_csv():
     print(f"Starting player skill population from CSV for season {SEASON_ID}...")
     
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = connect(DB_PATH, detect_types=0)
         cursor = conn.cursor()
-        try:
-            cursor.execute("PRAGMA foreign_keys = ON;")
-        except sqlite3.Error:
-            pass
 
         # 1. Get player name to ID mapping
         player_name_map = get_player_name_id_map(cursor)
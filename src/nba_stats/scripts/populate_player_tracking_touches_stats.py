@@ -3,17 +3,18 @@
 import sqlite3
 import time
 import random
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
-from nba_stats.utils.common_utils import get_db_connection, get_nba_stats_client, logger
+from nba_stats.utils.common_utils import get_db_connection, get_nba_stats_client, logger, filter_rows_by_player
 from nba_stats.config import settings
 
 PT_MEASURE_TYPES = ["Possessions", "ElbowTouch", "PaintTouch", "PostTouch"]
 
-def _fetch_tracking_data_for_type(client, season: str, measure_type: str) -> List[Dict]:
+def _fetch_tracking_data_for_type(client, season: str, measure_type: str,
+                                  player_ids: Optional[List[int]] = None) -> List[Dict]:
     """Fetches player tracking data for a single measure type."""
     logger.info(f"Fetching {measure_type} data for {season} season.")
     try:
@@ -23,17 +24,18 @@ def _fetch_tracking_data_for_type(client, season: str, measure_type: str) -> Lis
             headers = data.get("headers")
             rows = data.get("rowSet")
             if headers and rows:
+                rows = filter_rows_by_player(headers, rows, player_ids)
                 return [dict(zip(headers, row)) for row in rows]
     except Exception as e:
         logger.error(f"Failed to fetch {measure_type} data: {e}", exc_info=True)
     return []
 
-def _aggregate_all_touch_stats(client, season: str) -> Dict[int, Dict]:
+def _aggregate_all_touch_stats(client, season: str, player_ids: Optional[List[int]] = None) -> Dict[int, Dict]:
     """Fetches and aggregates all touch-related stats for all players."""
     aggregated_data = {}
 
     for measure_type in PT_MEASURE_TYPES:
-        data_rows = _fetch_tracking_data_for_type(client, season, measure_type)
+        data_rows = _fetch_tracking_data_for_type(client, season, measure_type, player_ids)
         for row in data_rows:
             player_id = row.get("PLAYER_ID")
             if not player_id:
@@ -97,8 +99,11 @@ def _insert_touch_stats_batch(conn: sqlite3.Connection, season: str, all_player_
     except sqlite3.Error as e:
         logger.error(f"Database error during touch stats batch insertion: {e}")
 
-def populate_player_tracking_touches_stats(season: str):
-    """Fetches, aggregates, and stores all player tracking touches stats for a season."""
+def populate_player_tracking_touches_stats(season: str, player_ids: list[int] | None = None):
+    """
+    Fetches, aggregates, and stores all player tracking touches stats for a season.
+    If player_ids is provided, only those players' rows are upserted.
+    """
     logger.info(f"Starting player tracking touches stats population for season: {season}")
     conn = get_db_connection()
     if conn is None:
@@ -106,7 +111,7 @@ def populate_player_tracking_touches_stats(season: str):
 
     try:
         client = get_nba_stats_client()
-        aggregated_stats = _aggregate_all_touch_stats(client, season)
+        aggregated_stats = _aggregate_all_touch_stats(client, season, player_ids)
         if aggregated_stats:
             _insert_touch_stats_batch(conn, season, aggregated_stats)
     except Exception as e:
@@ -1,12 +1,24 @@
 """
 Fetches and stores play-by-play data for all games in a given season, including full lineups for each event.
 """
+import asyncio
+import queue
 import sqlite3
-import pandas as pd
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from ..utils.common_utils import get_db_connection, get_nba_stats_client, logger
+import threading
 import time
-import random
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Optional
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from ..utils.common_utils import get_db_connection, get_nba_stats_client, get_async_nba_stats_client, logger
+from ..api.result_set import decode_result_set
+from ..utils.lineup_tracker import enrich_play_by_play
+from ..db.bulk_load import bulk_load
+from ..db.connection import connect
+from ..db.possessions_store import CompactPossessionsWriter, is_compact
+from ..db import ingestion_ledger as ledger
+from ..config import settings
 
 # Add a retry decorator
 from tenacity import retry, stop_after_attempt, wait_exponential, RetryError
@@ -20,64 +32,25 @@ except ImportError:
     logger.warning("tqdm not available. Progress bars will be disabled.")
 
 
-def _get_lineups_from_pbp(pbp_df: pd.DataFrame, home_team_id: int, away_team_id: int) -> tuple[set[int], set[int]]:
-    """
-    Infers the starting lineups by identifying the first 5 unique players for each team from the play-by-play data.
-    """
-    # Ensure events are processed in the order they happened
-    first_period_events = pbp_df[pbp_df['PERIOD'] == 1].sort_values(by='EVENTNUM')
-
-    # Create a comprehensive map of player IDs to their team IDs from the entire game's data,
-    # as first-period data might be sparse.
-    player_to_team_map = {}
-    for _, row in pbp_df.iterrows():
-        for i in range(1, 4):
-            player_id = row[f'PLAYER{i}_ID']
-            team_id = row[f'PLAYER{i}_TEAM_ID']
-            if pd.notna(player_id) and pd.notna(team_id) and player_id not in player_to_team_map:
-                player_to_team_map[int(player_id)] = int(team_id)
-
-    home_players = set()
-    away_players = set()
-
-    # Iterate through the first period chronologically to find the first 5 unique players for each team
-    for _, row in first_period_events.iterrows():
-        for i in range(1, 4):
-            player_id = row[f'PLAYER{i}_ID']
-            if pd.notna(player_id):
-                player_id = int(player_id)
-                team_id = player_to_team_map.get(player_id)
-                
-                if team_id == home_team_id and len(home_players) < 5:
-                    home_players.add(player_id)
-                elif team_id == away_team_id and len(away_players) < 5:
-                    away_players.add(player_id)
-        
-        # Once we have 5 players for both teams, we have the starting lineups.
-        if len(home_players) == 5 and len(away_players) == 5:
-            break
-
-    # Final contract enforcement: if we couldn't find exactly 5, fail safely.
-    if len(home_players) != 5 or len(away_players) != 5:
-        logger.warning(f"Could not reliably determine 5 starters for each team from PBP. Found: Home={len(home_players)}, Away={len(away_players)}. Game will be skipped.")
-        return set(), set()
-
-    return home_players, away_players
-
-
 @retry(
     stop=stop_after_attempt(8),
     wait=wait_exponential(multiplier=1, min=2, max=60, exp_base=2),
     retry=lambda retry_state: retry_state.outcome is None or retry_state.outcome.failed,
     before_sleep=lambda retry_state: logger.warning(f"Retry {retry_state.attempt_number} for game {game_id} after {retry_state.outcome.exception() if retry_state.outcome else 'unknown error'}")
 )
-def _fetch_pbp_for_game(game_id: str, home_team_id: int, away_team_id: int) -> pd.DataFrame:
-    """Fetches play-by-play data for a single game and enriches it with lineup information."""
+def _fetch_pbp_for_game(game_id: str, home_team_id: int, away_team_id: int,
+                        force_refresh: bool = False) -> pd.DataFrame:
+    """
+    Fetches play-by-play data for a single game and enriches it with lineup information.
+
+    With force_refresh the cached response is bypassed (final play-by-play never expires
+    from the cache), so upstream corrections are picked up.
+    """
     logger.info(f"Fetching play-by-play for game_id: {game_id}")
     try:
         # Use NBAStatsClient instead of direct API call for built-in rate limiting and retry logic
         client = get_nba_stats_client()
-        pbp_response = client.get_play_by_play(game_id)
+        pbp_response = client.get_play_by_play(game_id, force_refresh=force_refresh)
 
         if not pbp_response or 'resultSets' not in pbp_response:
             logger.warning(f"No data in response for game {game_id}")
@@ -95,80 +68,331 @@ def _fetch_pbp_for_game(game_id: str, home_team_id: int, away_team_id: int) -> p
             logger.warning(f"Empty rowSet for game {game_id}")
             return pd.DataFrame()
 
-        # Convert to DataFrame
-        headers = pbp_result_set['headers']
-        row_set = pbp_result_set['rowSet']
-        pbp_df = pd.DataFrame(row_set, columns=headers)
+        # Decode the row-major rowSet into columns once and build the DataFrame from them
+        pbp_df = pd.DataFrame(decode_result_set(pbp_response, name=0))
 
         if pbp_df.empty:
             logger.warning(f"PlayByPlay data for game {game_id} is empty. Skipping.")
             return pd.DataFrame()
             
-        # Infer lineups directly from Play-by-play data
-        home_players, away_players = _get_lineups_from_pbp(pbp_df, home_team_id, away_team_id)
-
-        if not home_players or not away_players:
+        # Reconstruct on-court lineups per stint (starters re-inferred every period)
+        enriched_df = enrich_play_by_play(pbp_df, home_team_id, away_team_id)
+        if enriched_df.empty:
             logger.warning(f"Could not determine lineups for game {game_id} from PBP data. Skipping.")
-            return pd.DataFrame()
-
-        enriched_rows = []
-
-        for _, row in pbp_df.iterrows():
-            # Determine offensive team. Simplified logic, may need refinement.
-            # Assumes the team of PLAYER1_ID is the offensive team.
-            offensive_team_id = row.get('PLAYER1_TEAM_ID')
-            if pd.isna(offensive_team_id) and row.get('HOMEDESCRIPTION') is not None:
-                 offensive_team_id = home_team_id
-            elif pd.isna(offensive_team_id) and row.get('VISITORDESCRIPTION') is not None:
-                offensive_team_id = away_team_id
-
-            defensive_team_id = home_team_id if offensive_team_id != home_team_id else away_team_id
-
-            row_data = row.to_dict()
-            row_data['home_player_1_id'], row_data['home_player_2_id'], row_data['home_player_3_id'], row_data['home_player_4_id'], row_data['home_player_5_id'] = sorted(list(home_players))
-            row_data['away_player_1_id'], row_data['away_player_2_id'], row_data['away_player_3_id'], row_data['away_player_4_id'], row_data['away_player_5_id'] = sorted(list(away_players))
-            row_data['offensive_team_id'] = offensive_team_id
-            row_data['defensive_team_id'] = defensive_team_id
-
-            enriched_rows.append(row_data)
-
-            # Handle substitutions
-            if row.get('EVENTMSGTYPE') == 8: # 8 is substitution
-                player_out_id = row.get('PLAYER1_ID')
-                player_in_id = row.get('PLAYER2_ID')
-
-                # --- START FIX V2: Defend against anomalous substitution data ---
-                sub_team_id = row.get('PLAYER1_TEAM_ID')
-
-                if sub_team_id == home_team_id:
-                    # ANOMALY CHECK: If the player subbing in is already on the court,
-                    # do nothing to prevent corrupting the player set to 4 members.
-                    if player_in_id in home_players:
-                        logger.warning(f"ANOMALY in Game {row.get('GAME_ID')} Event {row.get('EVENTNUM')}: Player {player_in_id} subbing in is already on court. Skipping substitution to maintain state integrity.")
-                    elif player_out_id in home_players:
-                        home_players.remove(player_out_id)
-                        home_players.add(player_in_id)
-
-                elif sub_team_id == away_team_id:
-                    # ANOMALY CHECK: If the player subbing in is already on the court,
-                    # do nothing to prevent corrupting the player set to 4 members.
-                    if player_in_id in away_players:
-                        logger.warning(f"ANOMALY in Game {row.get('GAME_ID')} Event {row.get('EVENTNUM')}: Player {player_in_id} subbing in is already on court. Skipping substitution to maintain state integrity.")
-                    elif player_out_id in away_players:
-                        away_players.remove(player_out_id)
-                        away_players.add(player_in_id)
-                # --- END FIX V2 ---
-
-        return pd.DataFrame(enriched_rows)
+        return enriched_df
 
     except Exception as e:
         logger.error(f"Error processing PBP for game {game_id}: {e}")
         raise # Reraise the exception to trigger the retry mechanism
 
 
-def populate_possessions(season_to_load: str) -> None:
+def prefetch_play_by_play(game_ids: list[str], max_in_flight: int, force_refresh: bool = False) -> int:
+    """
+    Warms the shared API cache for the given games with up to max_in_flight concurrent requests.
+
+    The fetch workers in populate_possessions then read play-by-play from the cache instead
+    of waiting on the synchronous client's rate controller. With force_refresh every game is
+    fetched from upstream and its cache entry replaced.
+
+    Returns:
+        Number of games whose play-by-play is now cached.
+    """
+    async def _prefetch() -> int:
+        async with get_async_nba_stats_client(max_in_flight=max_in_flight) as client:
+            results = await asyncio.gather(
+                *(client.get_play_by_play(game_id, force_refresh=force_refresh) for game_id in game_ids),
+                return_exceptions=True
+            )
+        fetched = 0
+        for game_id, result in zip(game_ids, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Prefetch failed for game {game_id}: {result}")
+            elif result:
+                fetched += 1
+        return fetched
+
+    logger.info(f"Prefetching play-by-play for {len(game_ids)} games with {max_in_flight} requests in flight.")
+    fetched = asyncio.run(_prefetch())
+    logger.info(f"Prefetched play-by-play for {fetched}/{len(game_ids)} games.")
+    return fetched
+
+
+# Play-by-play headers renamed to Possessions columns before insertion
+COLUMN_MAPPING = {
+    'GAME_ID': 'game_id', 'EVENTNUM': 'event_num', 'EVENTMSGTYPE': 'event_type',
+    'EVENTMSGACTIONTYPE': 'event_action_type', 'PERIOD': 'period', 'WCTIMESTRING': 'wc_time_string',
+    'PCTIMESTRING': 'pc_time_string', 'HOMEDESCRIPTION': 'home_description',
+    'NEUTRALDESCRIPTION': 'neutral_description', 'VISITORDESCRIPTION': 'visitor_description',
+    'SCORE': 'score', 'SCOREMARGIN': 'score_margin', 'PERSON1TYPE': 'person1_type',
+    'PLAYER1_ID': 'player1_id', 'PLAYER1_NAME': 'player1_name', 'PLAYER1_TEAM_ID': 'player1_team_id',
+    'PLAYER2_ID': 'player2_id', 'PLAYER2_NAME': 'player2_name', 'PLAYER2_TEAM_ID': 'player2_team_id',
+    'PLAYER3_ID': 'player3_id', 'PLAYER3_NAME': 'player3_name', 'PLAYER3_TEAM_ID': 'player3_team_id',
+}
+
+
+def _prepare_game_rows(game_id: str, home_team_id: int, away_team_id: int,
+                       force_refresh: bool = False) -> pd.DataFrame:
+    """
+    Fetches and transforms one game's play-by-play into Possessions-shaped rows.
+
+    Returns an empty DataFrame when the game has no usable data or every retry failed,
+    so a worker never dies on a single bad game.
+    """
+    try:
+        pbp_df = _fetch_pbp_for_game(game_id, home_team_id, away_team_id, force_refresh=force_refresh)
+    except RetryError as e:
+        logger.error(f"Failed to fetch PBP for game {game_id} after multiple retries: {e}")
+        return pd.DataFrame()
+    except Exception as e:
+        logger.error(f"Unexpected error for game {game_id}: {e}")
+        return pd.DataFrame()
+
+    if pbp_df.empty:
+        logger.warning(f"No data returned for game {game_id}. Skipping.")
+        return pbp_df
+
+    # The API can occasionally return duplicate events. We must remove them before insertion.
+    pbp_df = pbp_df.drop_duplicates(subset=['GAME_ID', 'EVENTNUM'], keep='first')
+    return pbp_df.rename(columns=COLUMN_MAPPING)
+
+
+# IngestionLedger key for this loader's rows
+LEDGER_SOURCE = "nba_stats"
+LEDGER_ENDPOINT = "playbyplayv2"
+
+
+@dataclass
+class FetchInfo:
+    """Ledger details a fetch worker passes to the writer alongside a game's rows."""
+    season: Optional[str] = None
+    duration_seconds: Optional[float] = None
+    payload_hash: Optional[str] = None
+
+
+def _fetch_worker(games: queue.Queue, results: queue.Queue, season: Optional[str] = None,
+                  force_refresh: bool = False) -> None:
+    """Drains the game queue, handing each transformed game to the writer via the bounded results queue."""
+    while True:
+        try:
+            game_id, home_team_id, away_team_id = games.get_nowait()
+        except queue.Empty:
+            return
+        start = time.perf_counter()
+        pbp_df = _prepare_game_rows(game_id, home_team_id, away_team_id, force_refresh=force_refresh)
+        info = FetchInfo(season=season, duration_seconds=round(time.perf_counter() - start, 3),
+                         payload_hash=ledger.payload_hash(pbp_df) if not pbp_df.empty else None)
+        # Blocks while the writer is behind, which bounds the number of games held in memory
+        results.put((game_id, pbp_df, info))
+
+
+class PossessionsWriter(threading.Thread):
+    """
+    Single writer thread for the Possessions table.
+
+    Owns the only SQLite connection used for writes and groups up to games_per_transaction
+    queued games into one transaction. Each game is written inside its own SAVEPOINT
+    (DELETE + INSERT), so a game that fails rolls back alone and is retried on the next run
+    while the rest of the batch still commits.
+
+    With bulk_load=True the connection runs in bulk-load mode (see db/bulk_load.py) for the
+    whole run, optionally with the table's secondary indexes dropped and rebuilt at the end.
+
+    On the compact layout (Possessions is a view) games are written straight to the
+    PossessionEvents tables through CompactPossessionsWriter instead of the view's trigger.
+
+    Queue items are (game_id, rows) or (game_id, rows, FetchInfo). When the database has an
+    IngestionLedger, each game's ledger row is written in the same transaction as its data,
+    and a game whose payload hash matches its last successful ingest is not rewritten.
+    """
+
+    def __init__(self, results: queue.Queue, games_per_transaction: int = settings.POSSESSIONS_GAMES_PER_TRANSACTION,
+                 progress=None, bulk_load: bool = False, drop_indexes: bool = False, db_path: Optional[str] = None):
+        super().__init__(name="possessions-writer", daemon=True)
+        self.results = results
+        self.games_per_transaction = max(1, games_per_transaction)
+        self.progress = progress
+        self.bulk_load = bulk_load
+        self.drop_indexes = drop_indexes
+        self.db_path = db_path
+        self.games_written = 0
+        self.rows_written = 0
+        self.failed_games: list[str] = []
+        self.unchanged_games = 0
+        self.transactions = 0
+        self._table_columns: set[str] = set()
+        self._insert_sql: dict[tuple, str] = {}
+        self._compact: Optional[CompactPossessionsWriter] = None
+        self._ledger = False
+        self._stopped = False
+
+    def run(self) -> None:
+        try:
+            conn = connect(self.db_path) if self.db_path else get_db_connection()
+        except Exception as e:
+            logger.error(f"Possessions writer could not open the database: {e}")
+            self._drain()
+            return
+        # Transactions are managed explicitly below
+        conn.isolation_level = None
+        try:
+            if is_compact(conn):
+                self._compact = CompactPossessionsWriter(conn)
+            table = "PossessionEvents" if self._compact else "Possessions"
+            tuning = bulk_load(conn, table, self.drop_indexes) if self.bulk_load else nullcontext(conn)
+            with tuning:
+                self._consume(conn)
+        except Exception as e:
+            logger.error(f"Possessions writer stopped: {e}", exc_info=True)
+            self._drain()
+        finally:
+            conn.close()
+
+    def _consume(self, conn: sqlite3.Connection) -> None:
+        # Column list is read once per run, not once per game
+        self._table_columns = {info[1] for info in conn.execute("PRAGMA table_info(Possessions)")}
+        self._ledger = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'IngestionLedger'").fetchone() is not None
+        while not self._stopped:
+            batch = []
+            item = self.results.get()
+            while True:
+                if item is settings.SENTINEL:
+                    self._stopped = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.games_per_transaction:
+                    break
+                # Only batch what is already waiting; never hold finished games back for a full batch
+                try:
+                    item = self.results.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._write_batch(conn, batch)
+
+    def _drain(self) -> None:
+        """Discards queued games until the sentinel so fetch workers never block on a dead writer."""
+        while not self._stopped:
+            item = self.results.get()
+            if item is settings.SENTINEL:
+                self._stopped = True
+            else:
+                self.failed_games.append(item[0])
+
+    def _insert_statement(self, columns: tuple) -> str:
+        sql = self._insert_sql.get(columns)
+        if sql is None:
+            placeholders = ', '.join(['?'] * len(columns))
+            sql = self._insert_sql[columns] = f"INSERT INTO Possessions ({', '.join(columns)}) VALUES ({placeholders})"
+        return sql
+
+    def _record(self, conn: sqlite3.Connection, game_id: str, info: Optional[FetchInfo], status: str,
+                row_count: int = 0, error: Optional[str] = None) -> None:
+        if self._ledger:
+            info = info or FetchInfo()
+            ledger.record(conn, LEDGER_SOURCE, LEDGER_ENDPOINT, game_id, status, row_count=row_count,
+                          payload_hash=info.payload_hash, duration_seconds=info.duration_seconds,
+                          season=info.season, error=error)
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: list[tuple]) -> None:
+        written = []
+        try:
+            conn.execute("BEGIN")
+            for game_id, pbp_df, *extra in batch:
+                info = extra[0] if extra else None
+                if pbp_df.empty:
+                    self._record(conn, game_id, info, ledger.FAILED, error="no play-by-play data or fetch failed")
+                    self.failed_games.append(game_id)
+                    continue
+                if (self._ledger and info is not None and info.payload_hash is not None and
+                        ledger.stored_hash(conn, LEDGER_SOURCE, LEDGER_ENDPOINT, game_id) == info.payload_hash):
+                    # Same data as the last successful ingest: refresh the ledger row only
+                    self._record(conn, game_id, info, ledger.SUCCESS, row_count=len(pbp_df))
+                    self.unchanged_games += 1
+                    continue
+                conn.execute("SAVEPOINT game")
+                try:
+                    if self._compact is not None:
+                        self._compact.replace_game(game_id, pbp_df)
+                    else:
+                        columns = tuple(col for col in pbp_df.columns if col in self._table_columns)
+                        # 1. Clean up any partial data from a previous failed run for this game
+                        conn.execute("DELETE FROM Possessions WHERE game_id = ?", (game_id,))
+                        # 2. Insert the new, complete data
+                        conn.executemany(self._insert_statement(columns),
+                                         zip(*(pbp_df[col].tolist() for col in columns)))
+                    self._record(conn, game_id, info, ledger.SUCCESS, row_count=len(pbp_df))
+                    conn.execute("RELEASE SAVEPOINT game")
+                    written.append((game_id, len(pbp_df)))
+                except (sqlite3.Error, ValueError) as e:
+                    conn.execute("ROLLBACK TO SAVEPOINT game")
+                    conn.execute("RELEASE SAVEPOINT game")
+                    if self._compact is not None:
+                        self._compact.reset()
+                    logger.error(f"Failed to write possessions for game {game_id}: {e}")
+                    self._record(conn, game_id, info, ledger.FAILED, error=str(e))
+                    self.failed_games.append(game_id)
+            conn.execute("COMMIT")
+            self.transactions += 1
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            if self._compact is not None:
+                self._compact.reset()
+            logger.error(f"Transaction for {len(batch)} games failed and was rolled back: {e}")
+            self.failed_games.extend(game_id for game_id, _ in written)
+            written = []
+
+        for game_id, row_count in written:
+            self.games_written += 1
+            self.rows_written += row_count
+            logger.info(f"Successfully inserted {row_count} plays for game {game_id}.")
+        if self.progress is not None:
+            self.progress.update(len(batch))
+
+
+def _seed_ledger_from_possessions(conn: sqlite3.Connection) -> None:
+    """One-time backfill of the ledger from games loaded before it existed (a single full scan)."""
+    if is_compact(conn):
+        source = "SELECT game_id, COUNT(*) AS plays FROM PossessionEvents GROUP BY game_id"
+    else:
+        source = "SELECT game_id, COUNT(*) AS plays FROM Possessions GROUP BY game_id"
+    try:
+        if conn.execute("SELECT 1 FROM Possessions LIMIT 1").fetchone() is None:
+            return
+        entries = conn.execute(f"SELECT p.game_id, g.season, p.plays FROM ({source}) p "
+                               f"LEFT JOIN Games g ON g.game_id = p.game_id").fetchall()
+    except sqlite3.OperationalError:  # Possessions table might not exist yet
+        return
+    seeded = ledger.seed(conn, LEDGER_SOURCE, LEDGER_ENDPOINT, entries)
+    logger.info(f"Seeded the ingestion ledger with {seeded} games already in the Possessions table.")
+
+
+def populate_possessions(season_to_load: str, prefetch_concurrency: int = 0,
+                         workers: int = settings.POSSESSIONS_FETCH_WORKERS,
+                         games_per_transaction: Optional[int] = None, bulk_load: bool = False,
+                         drop_indexes: bool = False, refresh: bool = False) -> None:
     """
     Fetches play-by-play data for each game in a season and populates the Possessions table.
+
+    Games are fetched and transformed by a pool of worker threads whose requests are paced by
+    the client's shared rate controller, and written by a single PossessionsWriter thread.
+
+    Args:
+        season_to_load: Season in YYYY-YY format
+        prefetch_concurrency: If > 0, warm the cache for all pending games with this many
+            concurrent async requests before processing them.
+        workers: Number of fetch+transform worker threads.
+        games_per_transaction: Maximum number of games committed per write transaction.
+            Defaults to POSSESSIONS_GAMES_PER_TRANSACTION, or POSSESSIONS_BULK_GAMES_PER_TRANSACTION
+            in bulk-load mode.
+        bulk_load: Write in bulk-load mode (WAL, synchronous=NORMAL, larger page cache and
+            mmap) for historical backfills.
+        drop_indexes: In bulk-load mode, drop the secondary indexes on Possessions for the
+            load and rebuild them afterwards.
+        refresh: Re-fetch every game of the season from upstream, bypassing the cache,
+            including completed ones, and rewrite only those whose payload hash differs
+            from the ledger.
     """
     logger.info(f"Starting to populate Possessions data for the {season_to_load} season.")
     conn = get_db_connection()
@@ -180,123 +404,82 @@ def populate_possessions(season_to_load: str) -> None:
         logger.info(f"Found {len(games_df)} games for season {season_to_load}.")
 
         # --- ARCHITECTURAL CHANGE FOR RESUMPTION ---
-        # 1. Get games already processed to make the script resumable
-        try:
-            processed_games_df = pd.read_sql_query("SELECT DISTINCT game_id FROM Possessions", conn)
-            processed_games_ids = set(processed_games_df['game_id'])
-            logger.info(f"Found {len(processed_games_ids)} games already processed in the Possessions table.")
-        except pd.io.sql.DatabaseError: # Possessions table might not exist yet
-            processed_games_ids = set()
-            logger.info("Possessions table does not exist yet. Starting fresh.")
-
-        # 2. Determine which games to process
-        all_game_ids = set(games_df['game_id'])
-        games_to_process_ids = all_game_ids - processed_games_ids
-        
-        if not games_to_process_ids:
-            logger.info("All games for this season have already been processed. Exiting.")
-            return
-
-        games_to_process_df = games_df[games_df['game_id'].isin(games_to_process_ids)]
-        logger.info(f"Processing {len(games_to_process_df)} new games.")
-
-        # --- REMOVED OLD ALL-OR-NOTHING LOGIC ---
-        # The logic to clear existing data is no longer needed with the resumable approach.
-
-        # Note: Running this without ThreadPoolExecutor for now to avoid rate-limiting issues with the API
-        # Add progress bar if tqdm is available
-        if TQDM_AVAILABLE:
-            game_iterator = tqdm(games_to_process_df.iterrows(), 
-                               total=len(games_to_process_df),
-                               desc="Processing games",
-                               unit="game")
-        else:
-            game_iterator = games_to_process_df.iterrows()
-            
-        for index, game in game_iterator:
-            try:
-                pbp_df = _fetch_pbp_for_game(game['game_id'], game['home_team_id'], game['away_team_id'])
-                if pbp_df.empty:
-                    logger.warning(f"No data returned for game {game['game_id']}. Skipping.")
-                    continue
-                
-                # --- START FINAL FIX V3: Deduplicate source data ---
-                # The API can occasionally return duplicate events. We must remove them before insertion.
-                pbp_df.drop_duplicates(subset=['GAME_ID', 'EVENTNUM'], keep='first', inplace=True)
-                # --- END FINAL FIX V3 ---
-
-                # Rename columns
-                column_mapping = {
-                    'GAME_ID': 'game_id', 'EVENTNUM': 'event_num', 'EVENTMSGTYPE': 'event_type',
-                    'EVENTMSGACTIONTYPE': 'event_action_type', 'PERIOD': 'period', 'WCTIMESTRING': 'wc_time_string',
-                    'PCTIMESTRING': 'pc_time_string', 'HOMEDESCRIPTION': 'home_description',
-                    'NEUTRALDESCRIPTION': 'neutral_description', 'VISITORDESCRIPTION': 'visitor_description',
-                    'SCORE': 'score', 'SCOREMARGIN': 'score_margin', 'PERSON1TYPE': 'person1_type',
-                    'PLAYER1_ID': 'player1_id', 'PLAYER1_NAME': 'player1_name', 'PLAYER1_TEAM_ID': 'player1_team_id',
-                    'PLAYER2_ID': 'player2_id', 'PLAYER2_NAME': 'player2_name', 'PLAYER2_TEAM_ID': 'player2_team_id',
-                    'PLAYER3_ID': 'player3_id', 'PLAYER3_NAME': 'player3_name', 'PLAYER3_TEAM_ID': 'player3_team_id',
-                }
-                pbp_df.rename(columns=column_mapping, inplace=True)
-                
-                # Get schema and filter DataFrame
-                cursor = conn.cursor()
-                cursor.execute("PRAGMA table_info(Possessions)")
-                table_columns = {info[1] for info in cursor.fetchall()}
-                df_to_insert = pbp_df[[col for col in pbp_df.columns if col in table_columns]]
-                
-                # --- START FINAL FIX V2: Manual INSERT ---
-                cursor = conn.cursor()
-                try:
-                    cursor.execute("BEGIN")
-                    # 1. Clean up any partial data from a previous failed run for this game
-                    cursor.execute("DELETE FROM Possessions WHERE game_id = ?", (game['game_id'],))
-                    
-                    # 2. Insert the new, complete data using executemany for true atomicity
-                    cols = ', '.join(df_to_insert.columns)
-                    placeholders = ', '.join(['?'] * len(df_to_insert.columns))
-                    sql = f"INSERT INTO Possessions ({cols}) VALUES ({placeholders})"
-                    cursor.executemany(sql, df_to_insert.to_records(index=False).tolist())
-                    
-                    conn.commit()
-                except Exception:
-                    conn.rollback()
-                    raise # Reraise the exception to be handled by the outer loop
-                # --- END FINAL FIX V2 ---
-                
-                logger.info(f"Successfully inserted {len(df_to_insert)} plays for game {game['game_id']}.")
-
-            except RetryError as e:
-                logger.error(f"Failed to fetch PBP for game {game['game_id']} after multiple retries: {e}")
-                # If we hit rate limits, wait longer before next attempt
-                if "429" in str(e) or "rate limit" in str(e).lower():
-                    logger.warning("Rate limit detected, increasing wait time for next game")
-                    time.sleep(random.uniform(10, 15))
-                else:
-                    time.sleep(random.uniform(2, 4))
-            except Exception as e:
-                logger.error(f"Unexpected error for game {game['game_id']}: {e}")
-                time.sleep(random.uniform(1, 2))
-
-            # Adaptive sleep between games - NBAStatsClient handles rate limiting, but we add extra buffer
-            # for the intensive possession data processing
-            sleep_time = random.uniform(1.5, 3.0)
-            logger.debug(f"Waiting {sleep_time:.1f}s before next game")
-            time.sleep(sleep_time)
-        
-        logger.info("Finished processing all new games for the season.")
-        
+        # 1. Get games already processed from the ingestion ledger (an indexed per-season
+        #    lookup), so startup cost does not grow with the Possessions table
+        ledger.create_ingestion_ledger_table(conn)
+        if not ledger.has_entries(conn, LEDGER_SOURCE, LEDGER_ENDPOINT):
+            _seed_ledger_from_possessions(conn)
+        conn.commit()
+        processed_games_ids = set() if refresh else ledger.completed(conn, LEDGER_SOURCE, LEDGER_ENDPOINT, season_to_load)
+        logger.info(f"Ingestion ledger for {season_to_load}: "
+                    f"{ledger.progress(conn, LEDGER_SOURCE, LEDGER_ENDPOINT, season_to_load) or 'no games yet'}.")
     except Exception as e:
         logger.error(f"An unexpected error occurred during possession population: {e}", exc_info=True)
+        return
     finally:
-        if conn:
-            conn.close()
+        conn.close()
+
+    # 2. Determine which games to process
+    all_game_ids = set(games_df['game_id'])
+    games_to_process_ids = all_game_ids - processed_games_ids
+
+    if not games_to_process_ids:
+        logger.info("All games for this season have already been processed. Exiting.")
+        return
+
+    games_to_process_df = games_df[games_df['game_id'].isin(games_to_process_ids)]
+    logger.info(f"Processing {len(games_to_process_df)} new games with {workers} fetch workers.")
+
+    # On refresh, a prefetch has already replaced the cached responses; the workers read those
+    force_refresh = refresh and prefetch_concurrency <= 0
+    if prefetch_concurrency > 0:
+        prefetch_play_by_play(games_to_process_df['game_id'].tolist(), prefetch_concurrency, force_refresh=refresh)
+
+    games: queue.Queue = queue.Queue()
+    for game in games_to_process_df.itertuples(index=False):
+        games.put((game.game_id, game.home_team_id, game.away_team_id))
+
+    workers = max(1, workers)
+    results: queue.Queue = queue.Queue(maxsize=workers * 2)
+    progress = tqdm(total=len(games_to_process_df), desc="Processing games", unit="game") if TQDM_AVAILABLE else None
+
+    if games_per_transaction is None:
+        games_per_transaction = (settings.POSSESSIONS_BULK_GAMES_PER_TRANSACTION if bulk_load
+                                 else settings.POSSESSIONS_GAMES_PER_TRANSACTION)
+    writer = PossessionsWriter(results, games_per_transaction=games_per_transaction, progress=progress,
+                               bulk_load=bulk_load, drop_indexes=drop_indexes)
+    writer.start()
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pbp-fetch") as executor:
+            for future in [executor.submit(_fetch_worker, games, results, season_to_load, force_refresh)
+                           for _ in range(workers)]:
+                future.result()
+    finally:
+        results.put(settings.SENTINEL)
+        writer.join()
+        if progress is not None:
+            progress.close()
+
+    logger.info(
+        f"Finished processing all new games for the season: {writer.games_written} games "
+        f"({writer.rows_written} plays) written in {writer.transactions} transactions, "
+        f"{writer.unchanged_games} unchanged, {len(writer.failed_games)} failed and left for the next run."
+    )
+
 
 if __name__ == '__main__':
     import argparse
-    from ..config import settings
 
     parser = argparse.ArgumentParser(description="Populate possessions data for a given season.")
     parser.add_argument("--season", type=str, default=settings.SEASON_ID, help="The season to populate data for (e.g., '2023-24').")
+    parser.add_argument("--prefetch-concurrency", type=int, default=0, help="Prefetch play-by-play with this many concurrent requests before processing (0 disables).")
+    parser.add_argument("--workers", type=int, default=settings.POSSESSIONS_FETCH_WORKERS, help="Number of concurrent fetch+transform workers.")
+    parser.add_argument("--games-per-transaction", type=int, default=None, help="Maximum number of games committed per write transaction.")
+    parser.add_argument("--bulk-load", action="store_true", help="Use bulk-load mode (WAL, synchronous=NORMAL, large cache) for historical backfills.")
+    parser.add_argument("--drop-indexes", action="store_true", help="With --bulk-load, drop secondary indexes during the load and rebuild them afterwards.")
+    parser.add_argument("--refresh", action="store_true", help="Re-fetch completed games from upstream too (bypassing the cache) and rewrite only those whose data changed.")
     args = parser.parse_args()
     
-    populate_possessions(season_to_load=args.season) 
\ No newline at end of file
+    populate_possessions(season_to_load=args.season, prefetch_concurrency=args.prefetch_concurrency,
+                         workers=args.workers, games_per_transaction=args.games_per_transaction,
+                         bulk_load=args.bulk_load, drop_indexes=args.drop_indexes, refresh=args.refresh) 
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""
+Derives the TruePossessions table from the play-by-play events in Possessions.
+
+Each game is segmented with array operations (see utils/true_possessions) and rewritten in
+its own savepoint. Work is driven by the ingestion ledger: a game is derived again only when
+its play-by-play ledger row has a payload hash the derived row was not built from, so a nightly
+run touches only the games that were just loaded or changed.
+"""
+import sqlite3
+import time
+from typing import List, Optional, Tuple
+
+from ..utils.common_utils import get_db_connection, logger
+from ..utils.true_possessions import (EVENT_COLUMNS, LEDGER_ENDPOINT, LEDGER_SOURCE, POSSESSION_COLUMNS,
+                                     segment_possessions)
+from ..db.possessions_store import game_events
+from ..db import ingestion_ledger as ledger
+from ..config import settings
+from .create_tables import create_true_possessions_table
+from .populate_possessions import LEDGER_ENDPOINT as PBP_ENDPOINT, LEDGER_SOURCE as PBP_SOURCE, _seed_ledger_from_possessions
+
+INSERT_SQL = (f"INSERT INTO TruePossessions (game_id, season, {', '.join(POSSESSION_COLUMNS)}) "
+              f"VALUES ({', '.join(['?'] * (len(POSSESSION_COLUMNS) + 2))})")
+
+
+def games_to_derive(conn: sqlite3.Connection, season: str, rebuild: bool = False) -> List[Tuple[str, int, int, Optional[str]]]:
+    """(game_id, home_team_id, away_team_id, play-by-play hash) of the season's games whose possessions are stale."""
+    query = """
+        SELECT g.game_id, g.home_team_id, g.away_team_id, pbp.payload_hash
+        FROM IngestionLedger pbp
+        JOIN Games g ON g.game_id = pbp.entity_key
+        LEFT JOIN IngestionLedger derived
+            ON derived.source = ? AND derived.endpoint = ? AND derived.entity_key = pbp.entity_key
+            AND derived.status = 'success'
+        WHERE pbp.source = ? AND pbp.endpoint = ? AND pbp.status = 'success' AND g.season = ?
+    """
+    if not rebuild:
+        query += " AND (derived.entity_key IS NULL OR derived.source_hash IS NOT pbp.payload_hash)"
+    params = (LEDGER_SOURCE, LEDGER_ENDPOINT, PBP_SOURCE, PBP_ENDPOINT, season)
+    return conn.execute(query + " ORDER BY g.game_id", params).fetchall()
+
+
+def derive_game(conn: sqlite3.Connection, game_id: str, season: str, home_team_id: int, away_team_id: int,
+                source_hash: Optional[str] = None) -> int:
+    """
+    Replaces one game's TruePossessions rows and records it in the ledger. Does not commit;
+    on failure the game's previous rows are kept and the ledger row is marked failed.
+
+    Returns:
+        The number of possessions written, or -1 if the game failed.
+    """
+    start = time.time()
+    conn.execute("SAVEPOINT true_possessions")
+    try:
+        possessions = segment_possessions(game_events(conn, game_id, EVENT_COLUMNS), home_team_id, away_team_id)
+        conn.execute("DELETE FROM TruePossessions WHERE game_id = ?", (game_id,))
+        conn.executemany(INSERT_SQL, zip([game_id] * len(possessions), [season] * len(possessions),
+                                         *(possessions[col].astype(object).where(possessions[col].notna(), None).tolist()
+                                           for col in POSSESSION_COLUMNS)))
+        ledger.record(conn, LEDGER_SOURCE, LEDGER_ENDPOINT, game_id, ledger.SUCCESS, row_count=len(possessions),
+                      payload_hash=ledger.payload_hash(possessions), source_hash=source_hash,
+                      duration_seconds=time.time() - start, season=season)
+        conn.execute("RELEASE SAVEPOINT true_possessions")
+        return len(possessions)
+    except Exception as e:
+        # Any malformed game (pandas/numpy errors included) fails alone; the batch carries on
+        conn.execute("ROLLBACK TO SAVEPOINT true_possessions")
+        conn.execute("RELEASE SAVEPOINT true_possessions")
+        logger.error(f"Failed to derive possessions for game {game_id}: {e}")
+        ledger.record(conn, LEDGER_SOURCE, LEDGER_ENDPOINT, game_id, ledger.FAILED,
+                      duration_seconds=time.time() - start, season=season, error=str(e))
+        return -1
+
+
+def populate_true_possessions(season_to_load: str, rebuild: bool = False,
+                              games_per_transaction: int = settings.POSSESSIONS_GAMES_PER_TRANSACTION) -> None:
+    """
+    Derives TruePossessions for every game of a season whose play-by-play is new or changed.
+
+    Args:
+        season_to_load: Season in YYYY-YY format
+        rebuild: Derive every loaded game of the season again, not only stale ones.
+        games_per_transaction: Maximum number of games committed per write transaction.
+    """
+    logger.info(f"Deriving true possessions for the {season_to_load} season.")
+    conn = get_db_connection()
+    if not conn:
+        return
+
+    try:
+        create_true_possessions_table(conn)
+        ledger.create_ingestion_ledger_table(conn)
+        if not ledger.has_entries(conn, PBP_SOURCE, PBP_ENDPOINT):
+            _seed_ledger_from_possessions(conn)
+        conn.commit()
+        # Transactions and per-game savepoints are managed explicitly below
+        conn.isolation_level = None
+
+        games = games_to_derive(conn, season_to_load, rebuild=rebuild)
+        if not games:
+            logger.info("True possessions are up to date for every loaded game of this season.")
+            return
+        logger.info(f"Deriving possessions for {len(games)} games.")
+
+        derived = failed = possessions = 0
+        games_per_transaction = max(1, games_per_transaction)
+        for offset in range(0, len(games), games_per_transaction):
+            conn.execute("BEGIN")
+            for game_id, home_team_id, away_team_id, source_hash in games[offset:offset + games_per_transaction]:
+                count = derive_game(conn, game_id, season_to_load, home_team_id, away_team_id, source_hash)
+                if count < 0:
+                    failed += 1
+                else:
+                    derived += 1
+                    possessions += count
+            conn.execute("COMMIT")
+
+        logger.info(f"Derived {possessions} possessions for {derived} games; {failed} games failed and are left for the next run.")
+    except sqlite3.Error as e:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        logger.error(f"Database error while deriving true possessions: {e}", exc_info=True)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Derive the TruePossessions table from play-by-play events.")
+    parser.add_argument("--season", type=str, default=settings.SEASON_ID, help="The season to derive possessions for (e.g., '2023-24').")
+    parser.add_argument("--rebuild", action="store_true", help="Derive every loaded game again, not only new or changed ones.")
+    parser.add_argument("--games-per-transaction", type=int, default=settings.POSSESSIONS_GAMES_PER_TRANSACTION,
+                        help="Maximum number of games committed per write transaction.")
+    args = parser.parse_args()
+
+    populate_true_possessions(season_to_load=args.season, rebuild=args.rebuild,
+                              games_per_transaction=args.games_per_transaction)
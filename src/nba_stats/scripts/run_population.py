@@ -14,10 +14,16 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 # Set up basic logging
 # logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-from .common_utils import get_db_connection, logger # Assuming logger and get_db_connection are in common_utils
+from ..utils.common_utils import get_db_connection, get_nba_stats_client, logger
+from ..api.telemetry import write_telemetry
+from ..api.nba_stats_client import refetch_live_data_since
 from ..db.init_db import init_database
 from ..config import settings
 from ..scripts.migrate_db import run_migrations
+from ..scripts.populate_games import latest_game_date
+from ..db.possessions_store import players_in_games
+from ..db import ingestion_ledger as ledger
+from ..scripts.populate_possessions import LEDGER_SOURCE, LEDGER_ENDPOINT
 
 def load_population_config() -> List[Dict]:
     """Loads the population config from the JSON file and resolves the module functions."""
@@ -201,7 +207,73 @@ def run_step(step_config: Dict, season: str, conn: sqlite3.Connection, force_run
     finally:
         logger.info(f"--- STEP {step_num} complete. ---")
 
-def main(season: str, force_run_all: bool = False):
+def _run_incremental_step(step_config: Dict[str, Any], *args, **kwargs) -> Any:
+    logger.info(f"--- STEP {step_config['step_num']}: {step_config['description']} (incremental) ---")
+    try:
+        return step_config["module"](*args, **kwargs)
+    except Exception as e:
+        logger.error(f"Error in {step_config['description']}: {e}", exc_info=True)
+        return None
+    finally:
+        logger.info(f"--- STEP {step_config['step_num']} complete. ---")
+
+
+def run_incremental(season: str, conn: sqlite3.Connection) -> Dict[str, Any]:
+    """
+    In-season nightly refresh: only games not yet stored, from the latest stored game_date
+    on, and only the player-season rows of players who appeared in games ingested this run.
+
+    Steps opt in through their "incremental" key in population_config.json:
+      - "games": fetches games from the latest game_date on and returns the ids of new ones
+      - "possessions": loads play-by-play for every game the ingestion ledger has not completed,
+        so games that failed on an earlier night are retried even when no new games arrive
+      - "players": season-to-date dashboards, called with player_ids= the players of the games
+        whose ledger row was written successfully during this run
+    Steps without the key are not run. Row-count skip thresholds do not apply. Cached
+    in-progress responses from earlier runs (season-to-date dashboards, the game log) are
+    refetched rather than served from the cache, even when still fresh or stale-servable.
+    """
+    start = time.time()
+    with refetch_live_data_since(start):
+        return _run_incremental(season, conn, start)
+
+
+def _run_incremental(season: str, conn: sqlite3.Connection, start: float) -> Dict[str, Any]:
+    ledger.create_ingestion_ledger_table(conn)
+    conn.commit()
+    run_started_at = conn.execute("SELECT CURRENT_TIMESTAMP").fetchone()[0]
+    steps = [step for step in POPULATION_CONFIG if step.get("incremental") and step.get("module")]
+    summary: Dict[str, Any] = {"season": season, "since": latest_game_date(conn, season),
+                               "new_games": 0, "ingested_games": 0, "affected_players": 0}
+    logger.info(f"Incremental refresh for {season}: games from {summary['since'] or 'the start of the season'} on.")
+
+    new_game_ids: List[str] = []
+    for step in (s for s in steps if s["incremental"] == "games"):
+        new_game_ids = _run_incremental_step(step, season, since=summary["since"]) or []
+    summary["new_games"] = len(new_game_ids)
+    if not new_game_ids:
+        logger.info("No new games since the last refresh; retrying any games the ledger has not completed.")
+
+    for step in (s for s in steps if s["incremental"] == "possessions"):
+        _run_incremental_step(step, season)
+
+    ingested_game_ids = sorted(ledger.updated_since(conn, LEDGER_SOURCE, LEDGER_ENDPOINT, run_started_at, season))
+    summary["ingested_games"] = len(ingested_game_ids)
+    affected = players_in_games(conn, ingested_game_ids)
+    summary["affected_players"] = len(affected)
+    if not affected:
+        logger.info("No games were ingested this run; skipping player-season refresh.")
+    else:
+        logger.info(f"{len(ingested_game_ids)} ingested games touched {len(affected)} players.")
+        for step in (s for s in steps if s["incremental"] == "players"):
+            _run_incremental_step(step, season, player_ids=affected)
+
+    summary["seconds"] = round(time.time() - start, 1)
+    logger.info(f"Incremental refresh complete: {summary}")
+    return summary
+
+
+def main(season: str, force_run_all: bool = False, incremental: bool = False):
     """
     Main orchestrator for populating all NBA stats data.
     """
@@ -221,6 +293,12 @@ def main(season: str, force_run_all: bool = False):
     run_migrations(conn)
     logger.info("--- STEP 0b complete. ---")
 
+    if incremental:
+        run_incremental(season, conn)
+        conn.close()
+        write_telemetry(get_nba_stats_client().stats(), "pipeline_results.json")
+        return
+
     for step_config in POPULATION_CONFIG:
         # Check if module was loaded successfully
         if step_config.get("module") is None:
@@ -232,6 +310,9 @@ def main(season: str, force_run_all: bool = False):
     verify_data_population(season)
     
     conn.close()
+
+    # Per-endpoint API telemetry (requests, cache hit ratio, retries, bytes, latency) for the run
+    write_telemetry(get_nba_stats_client().stats(), "pipeline_results.json")
     logger.info(f"Orchestration complete for season: {season}")
 
 def verify_data_population(season: str):
@@ -261,6 +342,7 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="NBA Stats Data Population Orchestrator")
     parser.add_argument("--season", type=str, default=settings.SEASON_ID, help="The season to populate data for (e.g., '2023-24').")
     parser.add_argument("--force-run-all", action="store_true", help="Force all population scripts to run, even if data exists.")
+    parser.add_argument("--incremental", action="store_true", help="In-season nightly refresh: only new games and the players who appeared in them.")
     args = parser.parse_args()
 
-    main(season=args.season, force_run_all=args.force_run_all)
\ No newline at end of file
+    main(season=args.season, force_run_all=args.force_run_all, incremental=args.incremental)
\ No newline at end of file
@@ -1,6 +1,8 @@
 import sqlite3
 import os
 
+from src.nba_stats.db.connection import connect
+
 def main():
     """Connects to the database and prints the row count for each table."""
     db_path = os.path.join(os.path.dirname(__file__), '..', 'db', 'nba_stats.db')
@@ -10,7 +12,7 @@ def main():
         print("Database file not found.")
         return
 
-    conn = sqlite3.connect(db_path)
+    conn = connect(db_path, read_only=True, detect_types=0)
     cursor = conn.cursor()
 
     try:
@@ -3,22 +3,45 @@ Database Writer Service
 
 This service provides a generic, robust interface for writing data to the database
 with comprehensive validation, atomic transactions, and pre-flight schema checks.
+
+``write_bulk`` is the high-throughput path for league-wide tables: it takes columnar input
+(a DataFrame or an Arrow table), pre-validated tuples or DTOs, upserts them on the table's
+primary key with chunked ``executemany`` in one transaction, and audits a sample of the
+written rows only when asked. Schema checks are cached per table and DTO for the life of
+the writer (``clear_schema_cache`` after a migration).
 """
 
+import random
 import sqlite3
 import logging
-from typing import List, Dict, Any, Optional, Type, Union
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Type, Union
 from pathlib import Path
 from datetime import datetime
 
+import pandas as pd
+from pydantic import BaseModel
+
+from ..config import settings
+from ..db.connection import connection
 from ..models.database_dtos import (
     PlayerSeasonRawStatsDTO, 
     PlayerSeasonAdvancedStatsDTO, 
     DatabaseWriteResult
 )
 
+try:
+    import pyarrow as pa
+    ARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    ARROW_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Columns every player-season row must have; the audits fail on NULLs here
+CRITICAL_COLUMNS = ["player_id", "season", "team_id"]
+TIMESTAMP_COLUMNS = ("created_at", "updated_at")
+
 
 class DatabaseWriter:
     """
@@ -29,6 +52,9 @@ class DatabaseWriter:
         """Initialize the database writer."""
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # PRAGMA table_info per table, and compatible (table, DTO) pairs, checked once
+        self._table_info: Dict[str, List[tuple]] = {}
+        self._schema_cache: Dict[Tuple[str, Any], Dict[str, Any]] = {}
         
     def write_player_season_raw_stats(self, stats: List[PlayerSeasonRawStatsDTO]) -> DatabaseWriteResult:
         """
@@ -113,6 +139,212 @@ class DatabaseWriter:
                 error_message=str(e)
             )
     
+    def write_bulk(
+        self,
+        table_name: str,
+        rows: Union[pd.DataFrame, "pa.Table", Sequence[tuple], Sequence[BaseModel]],
+        columns: Optional[Sequence[str]] = None,
+        dto_class: Optional[Type[BaseModel]] = None,
+        key_columns: Optional[Sequence[str]] = None,
+        chunk_size: int = settings.DB_WRITER_CHUNK_ROWS,
+        audit_sample: int = 0,
+    ) -> DatabaseWriteResult:
+        """
+        Upsert many rows in one atomic transaction.
+        
+        Rows that already exist are updated in place on the conflict key (unlike the
+        INSERT OR REPLACE of _write_data, columns not written keep their values), and
+        ``updated_at`` is refreshed when the input does not set it.
+        
+        Args:
+            table_name: Name of the target table
+            rows: A DataFrame or Arrow table (all of its columns are written), tuples in
+                ``columns`` order, or DTOs. Tuples are written as given, so validate them first
+            columns: Column order of tuple rows; defaults to the DTO fields for DTO rows,
+                less the timestamps, which are left to the table
+            dto_class: DTO the table must be compatible with (checked once per writer)
+            key_columns: Conflict target; defaults to the table's primary key. Without
+                one, rows are plainly inserted
+            chunk_size: Rows per executemany call
+            audit_sample: Read back this many randomly chosen written rows before
+                committing and check that their critical columns are set; 0 skips the audit
+            
+        Returns:
+            DatabaseWriteResult with operation details
+        """
+        try:
+            columns, values = self._bulk_rows(rows, columns, dto_class)
+            if not values:
+                return DatabaseWriteResult(
+                    success=True,
+                    rows_affected=0,
+                    table_name=table_name,
+                    error_message="No data to write"
+                )
+            
+            if dto_class is not None:
+                schema_validation = self._validate_schema_compatibility(table_name, dto_class)
+                if not schema_validation["compatible"]:
+                    return DatabaseWriteResult(
+                        success=False,
+                        rows_affected=0,
+                        table_name=table_name,
+                        error_message=f"Schema validation failed: {schema_validation['error']}"
+                    )
+            table_info = self._get_table_info(table_name)
+            table_columns = [row[1] for row in table_info]
+            missing_in_db = [column for column in columns if column not in table_columns]
+            if missing_in_db:
+                return DatabaseWriteResult(
+                    success=False,
+                    rows_affected=0,
+                    table_name=table_name,
+                    error_message=f"Schema validation failed: Database table '{table_name}' missing columns: {missing_in_db}"
+                )
+            if key_columns is None:
+                key_columns = [row[1] for row in sorted(table_info, key=lambda row: row[5]) if row[5]]
+            upsert_sql = self._upsert_sql(table_name, columns, list(key_columns), table_columns)
+            
+            with connection(self.db_path, detect_types=0) as conn:
+                conn.execute("BEGIN TRANSACTION")
+                try:
+                    rows_affected = 0
+                    for start in range(0, len(values), chunk_size):
+                        rows_affected += conn.executemany(upsert_sql, values[start:start + chunk_size]).rowcount
+                    
+                    if audit_sample:
+                        audit_result = self._audit_sample(conn, table_name, columns, list(key_columns),
+                                                          table_columns, values, audit_sample)
+                        if not audit_result["success"]:
+                            conn.execute("ROLLBACK")
+                            return DatabaseWriteResult(
+                                success=False,
+                                rows_affected=0,
+                                table_name=table_name,
+                                error_message=f"Write audit failed: {audit_result['error']}"
+                            )
+                    
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+            
+            logger.info(f"Successfully upserted {rows_affected} rows to {table_name}")
+            return DatabaseWriteResult(
+                success=True,
+                rows_affected=rows_affected,
+                table_name=table_name
+            )
+            
+        except Exception as e:
+            logger.error(f"Bulk write to {table_name} failed: {str(e)}")
+            return DatabaseWriteResult(
+                success=False,
+                rows_affected=0,
+                table_name=table_name,
+                error_message=str(e)
+            )
+    
+    @staticmethod
+    def _bulk_rows(
+        rows: Union[pd.DataFrame, "pa.Table", Sequence[tuple], Sequence[BaseModel]],
+        columns: Optional[Sequence[str]],
+        dto_class: Optional[Type[BaseModel]]
+    ) -> Tuple[List[str], List[tuple]]:
+        """Column names and row tuples of bulk input, with missing values (NaN, NA, NaT) as None."""
+        if isinstance(rows, pd.DataFrame):
+            column_values = []
+            for column in rows.columns:
+                series = rows[column]
+                if pd.api.types.is_datetime64_any_dtype(series):
+                    series = series.map(lambda ts: ts.isoformat(), na_action="ignore")
+                values = series.to_numpy(dtype=object)
+                values[pd.isna(values)] = None
+                column_values.append(values.tolist())
+            return list(rows.columns), list(zip(*column_values))
+        
+        if ARROW_AVAILABLE and isinstance(rows, (pa.Table, pa.RecordBatch)):
+            names = list(rows.schema.names)
+            return names, list(zip(*(rows.column(name).to_pylist() for name in names)))
+        
+        rows = list(rows)
+        if rows and isinstance(rows[0], BaseModel):
+            columns = list(columns or [field for field in (dto_class or type(rows[0])).model_fields
+                                       if field not in TIMESTAMP_COLUMNS])
+            return columns, [tuple(getattr(dto, column) for column in columns) for dto in rows]
+        
+        if columns is None:
+            raise ValueError("columns are required when writing tuples")
+        columns = list(columns)
+        if rows and len(rows[0]) != len(columns):
+            raise ValueError(f"Rows have {len(rows[0])} values but {len(columns)} columns were given")
+        return columns, [tuple(row) for row in rows]
+    
+    @staticmethod
+    def _upsert_sql(table_name: str, columns: List[str], key_columns: List[str], table_columns: List[str]) -> str:
+        """INSERT ... ON CONFLICT DO UPDATE on the key, or a plain INSERT when the key is not written."""
+        placeholders = ", ".join(["?" for _ in columns])
+        sql = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})"
+        if not key_columns or not set(key_columns) <= set(columns):
+            return sql
+        updates = [f"{column} = excluded.{column}" for column in columns
+                   if column not in key_columns and column != "created_at"]
+        if "updated_at" in table_columns and "updated_at" not in columns:
+            updates.append("updated_at = CURRENT_TIMESTAMP")
+        action = f"DO UPDATE SET {', '.join(updates)}" if updates else "DO NOTHING"
+        return f"{sql} ON CONFLICT ({', '.join(key_columns)}) {action}"
+    
+    def _audit_sample(
+        self,
+        conn: sqlite3.Connection,
+        table_name: str,
+        columns: List[str],
+        key_columns: List[str],
+        table_columns: List[str],
+        values: List[tuple],
+        sample: int
+    ) -> Dict[str, Any]:
+        """
+        Audit a bulk write by reading back a random sample of the written rows by key,
+        within the same transaction. Tables without a written key get _audit_write.
+        """
+        if not key_columns or not set(key_columns) <= set(columns):
+            return self._audit_write(conn, table_name, len(values))
+        try:
+            key_positions = [columns.index(column) for column in key_columns]
+            critical = [column for column in CRITICAL_COLUMNS if column in table_columns]
+            query = (f"SELECT {', '.join(critical) or '1'} FROM {table_name} "
+                     f"WHERE {' AND '.join(f'{column} = ?' for column in key_columns)}")
+            for row in random.sample(values, min(sample, len(values))):
+                key = [row[i] for i in key_positions]
+                found = conn.execute(query, key).fetchone()
+                if found is None:
+                    return {"success": False, "error": f"Row {key} not found after write operation"}
+                for column, value in zip(critical, found):
+                    if value is None:
+                        return {"success": False, "error": f"Critical column '{column}' is NULL in written data"}
+            return {"success": True, "error": None}
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Audit failed: {str(e)}"
+            }
+    
+    def _get_table_info(self, table_name: str) -> List[tuple]:
+        """PRAGMA table_info rows, cached per table once the table exists."""
+        info = self._table_info.get(table_name)
+        if info is None:
+            with connection(self.db_path, detect_types=0) as conn:
+                info = conn.execute(f"PRAGMA table_info({table_name})").fetchall()
+            if info:
+                self._table_info[table_name] = info
+        return info
+    
+    def clear_schema_cache(self) -> None:
+        """Forget cached table schemas and DTO checks, e.g. after a migration."""
+        self._table_info.clear()
+        self._schema_cache.clear()
+    
     def _validate_schema_compatibility(
         self, 
         table_name: str, 
@@ -126,34 +358,35 @@ class DatabaseWriter:
             dto_class: The DTO class to validate against
             
         Returns:
-            Dictionary with validation results
+            Dictionary with validation results (a compatible result is cached)
         """
+        cached = self._schema_cache.get((table_name, dto_class))
+        if cached is not None:
+            return cached
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                # Enable foreign key constraints
-                conn.execute("PRAGMA foreign_keys = ON")
-                # Get database schema
-                cursor = conn.execute(f"PRAGMA table_info({table_name})")
-                db_columns = {row[1]: row[2] for row in cursor.fetchall()}  # {column_name: data_type}
-                
-                # Get DTO schema
-                dto_fields = dto_class.model_fields
-                dto_columns = {field_name: field_info.annotation for field_name, field_info in dto_fields.items()}
-                
-                # Check for missing columns in database
-                missing_in_db = set(dto_columns.keys()) - set(db_columns.keys())
-                if missing_in_db:
-                    return {
-                        "compatible": False,
-                        "error": f"Database table '{table_name}' missing columns: {missing_in_db}"
-                    }
-                
-                # Check for extra columns in database (warn but don't fail)
-                extra_in_db = set(db_columns.keys()) - set(dto_columns.keys())
-                if extra_in_db:
-                    logger.warning(f"Database table '{table_name}' has extra columns: {extra_in_db}")
-                
-                return {"compatible": True, "error": None}
+            # Get database schema
+            db_columns = {row[1]: row[2] for row in self._get_table_info(table_name)}  # {column_name: data_type}
+            
+            # Get DTO schema
+            dto_fields = dto_class.model_fields
+            dto_columns = {field_name: field_info.annotation for field_name, field_info in dto_fields.items()}
+            
+            # Check for missing columns in database
+            missing_in_db = set(dto_columns.keys()) - set(db_columns.keys())
+            if missing_in_db:
+                return {
+                    "compatible": False,
+                    "error": f"Database table '{table_name}' missing columns: {missing_in_db}"
+                }
+            
+            # Check for extra columns in database (warn but don't fail)
+            extra_in_db = set(db_columns.keys()) - set(dto_columns.keys())
+            if extra_in_db:
+                logger.warning(f"Database table '{table_name}' has extra columns: {extra_in_db}")
+            
+            result = {"compatible": True, "error": None}
+            self._schema_cache[(table_name, dto_class)] = result
+            return result
                 
         except Exception as e:
             return {
@@ -173,9 +406,7 @@ class DatabaseWriter:
             DatabaseWriteResult with operation details
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                # Enable foreign key constraints
-                conn.execute("PRAGMA foreign_keys = ON")
+            with connection(self.db_path, detect_types=0) as conn:
                 conn.execute("BEGIN TRANSACTION")
                 
                 try:
@@ -264,16 +495,10 @@ class DatabaseWriter:
                 }
             
             # Check for NULL values in critical columns
-            critical_columns = ["player_id", "season", "team_id"]
+            column_names = [col[1] for col in conn.execute(f"PRAGMA table_info({table_name})").fetchall()]
             for row in sample_rows:
-                # Get column names
-                cursor = conn.execute(f"PRAGMA table_info({table_name})")
-                column_info = cursor.fetchall()
-                column_names = [col[1] for col in column_info]
-                
-                # Check critical columns
                 for i, col_name in enumerate(column_names):
-                    if col_name in critical_columns and row[i] is None:
+                    if col_name in CRITICAL_COLUMNS and row[i] is None:
                         return {
                             "success": False,
                             "error": f"Critical column '{col_name}' is NULL in written data"
@@ -298,9 +523,7 @@ class DatabaseWriter:
             Dictionary mapping column names to data types
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                # Enable foreign key constraints
-                conn.execute("PRAGMA foreign_keys = ON")
+            with connection(self.db_path, detect_types=0) as conn:
                 cursor = conn.execute(f"PRAGMA table_info({table_name})")
                 return {row[1]: row[2] for row in cursor.fetchall()}
         except Exception as e:
@@ -318,9 +541,7 @@ class DatabaseWriter:
             Dictionary with verification results
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                # Enable foreign key constraints
-                conn.execute("PRAGMA foreign_keys = ON")
+            with connection(self.db_path, detect_types=0) as conn:
                 # Count total rows
                 cursor = conn.execute(f"SELECT COUNT(*) FROM {table_name}")
                 total_rows = cursor.fetchone()[0]
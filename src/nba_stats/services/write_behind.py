@@ -0,0 +1,254 @@
+"""
+Write-Behind Queue for DatabaseWriter
+
+Populators spend most of their time waiting on the API, yet used to stop after every
+response to write and commit it. ``WriteBehindWriter`` lets them hand their rows over with
+``submit`` and go straight back to fetching, while a single writer thread does the writes:
+
+- Every batch already waiting is taken at once, and consecutive batches for the same table
+  and column list are coalesced into one ``DatabaseWriter.write_bulk`` call, i.e. one
+  transaction (capped at ``max_transaction_rows``). If a coalesced write fails, its batches
+  are retried one by one, so only the bad batch fails.
+- The queue holds at most ``max_pending_batches`` batches; ``submit`` blocks when it is
+  full, so fetching can never run unboundedly ahead of the database.
+- ``submit`` returns a Future per batch. The first failure is also re-raised in the
+  submitting step by its next ``submit``, ``flush`` or ``close``.
+- ``close`` (or leaving the ``with`` block) flushes and stops the thread; writers still open
+  at interpreter exit are flushed then.
+- ``metrics()`` reports each table's queue depth, rows written, transactions and the
+  latency from ``submit`` to commit.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+from pydantic import BaseModel
+
+from ..config import settings
+from .database_writer import DatabaseWriter
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindError(Exception):
+    """Raised in the submitting step when a queued batch could not be written."""
+    pass
+
+
+@dataclass
+class _Batch:
+    table_name: str
+    columns: List[str]
+    rows: List[tuple]
+    key_columns: Optional[tuple]
+    dto_class: Optional[Type[BaseModel]]
+    submitted: float
+    future: Future = field(default_factory=Future)
+
+    def signature(self) -> tuple:
+        return self.table_name, tuple(self.columns), self.key_columns, self.dto_class
+
+
+def _table_metrics() -> Dict[str, Any]:
+    return {"queue_depth": 0, "queued_rows": 0, "batches": 0, "rows_written": 0, "transactions": 0,
+            "failed_batches": 0, "latency_total_s": 0.0, "latency_max_s": 0.0, "blocked_s": 0.0}
+
+
+class WriteBehindWriter:
+    """
+    Background writer around DatabaseWriter.write_bulk; see the module docstring.
+
+    Use one per population step, as a context manager:
+
+        with WriteBehindWriter() as writer:
+            for response in fetches:
+                writer.submit("PlayerSeasonHustleStats", rows, columns=HUSTLE_COLUMNS)
+    """
+
+    def __init__(self, db_path: Optional[str] = None,
+                 max_pending_batches: int = settings.WRITE_BEHIND_MAX_PENDING_BATCHES,
+                 max_transaction_rows: int = settings.WRITE_BEHIND_MAX_TRANSACTION_ROWS,
+                 writer: Optional[DatabaseWriter] = None):
+        self.writer = writer or DatabaseWriter(db_path or settings.DB_PATH)
+        self.max_transaction_rows = max(1, max_transaction_rows)
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_pending_batches))
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+        self._error: Optional[WriteBehindError] = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __enter__(self) -> "WriteBehindWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        # Don't mask the step's own exception with a write error
+        self.close(raise_errors=exc_type is None)
+
+    def submit(self, table_name: str, rows: Any, columns: Optional[Sequence[str]] = None,
+               key_columns: Optional[Sequence[str]] = None,
+               dto_class: Optional[Type[BaseModel]] = None) -> Future:
+        """
+        Queue rows for ``write_bulk`` and return a Future for their rows_affected.
+
+        ``rows`` takes anything write_bulk does; it is converted to tuples here, so the caller
+        may reuse its DataFrame or lists once this returns. Blocks while the queue is full.
+
+        Raises:
+            WriteBehindError: an earlier batch failed and has not been reported yet
+        """
+        if self._closed:
+            raise RuntimeError("WriteBehindWriter is closed")
+        self._raise_error()
+        columns, values = DatabaseWriter._bulk_rows(rows, columns, dto_class)
+        batch = _Batch(table_name, columns, values, tuple(key_columns) if key_columns else None,
+                       dto_class, time.monotonic())
+        if not values:
+            batch.future.set_result(0)
+            return batch.future
+
+        with self._lock:
+            stats = self._metrics.setdefault(table_name, _table_metrics())
+            stats["queue_depth"] += 1
+            stats["queued_rows"] += len(values)
+        self._queue.put(batch)
+        blocked = time.monotonic() - batch.submitted
+        with self._lock:
+            stats["blocked_s"] += blocked
+        return batch.future
+
+    def flush(self) -> None:
+        """
+        Wait until every submitted batch has been written.
+
+        Raises:
+            WriteBehindError: a batch failed and has not been reported yet
+        """
+        self._queue.join()
+        self._raise_error()
+
+    def close(self, raise_errors: bool = True) -> None:
+        """Flush, stop the writer thread and log the per-table metrics."""
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        self._queue.put(settings.SENTINEL)
+        self._thread.join()
+        for table_name, stats in self.metrics().items():
+            logger.info(f"Write-behind {table_name}: {stats['rows_written']} rows in {stats['transactions']} "
+                        f"transactions from {stats['batches']} batches, latency avg {stats['latency_avg_s']:.3f}s "
+                        f"max {stats['latency_max_s']:.3f}s, submitters blocked {stats['blocked_s']:.2f}s")
+        if raise_errors:
+            self._raise_error()
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-table counters: queue_depth / queued_rows (submitted, not yet written), batches,
+        rows_written, transactions, failed_batches, submit-to-commit latency (avg, max) and
+        the time submitters spent blocked on a full queue.
+        """
+        with self._lock:
+            report = {}
+            for table_name, stats in self._metrics.items():
+                stats = dict(stats)
+                done = stats["batches"] + stats["failed_batches"]
+                stats["latency_avg_s"] = stats.pop("latency_total_s") / done if done else 0.0
+                report[table_name] = stats
+            return report
+
+    def _raise_error(self) -> None:
+        with self._lock:
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _run(self) -> None:
+        stopped = False
+        while not stopped:
+            items = [self._queue.get()]
+            rows = 0
+            # Only coalesce what is already waiting; never hold a batch back for more
+            while items[-1] is not settings.SENTINEL and rows < self.max_transaction_rows:
+                rows += len(items[-1].rows)
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopped = items[-1] is settings.SENTINEL
+            try:
+                self._write([item for item in items if item is not settings.SENTINEL])
+            except Exception as e:
+                logger.error(f"Write-behind writer failed: {e}", exc_info=True)
+                with self._lock:
+                    self._error = self._error or WriteBehindError(f"Write-behind writer failed: {e}")
+                for item in items:
+                    if item is not settings.SENTINEL and not item.future.done():
+                        item.future.set_exception(WriteBehindError(f"Write-behind writer failed: {e}"))
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+    def _write(self, batches: List[_Batch]) -> None:
+        # Consecutive batches with the same table and columns share a transaction; a batch with
+        # other columns starts a new group, so writes to one table keep their order
+        groups: List[List[_Batch]] = []
+        last_group: Dict[str, List[_Batch]] = {}
+        for batch in batches:
+            group = last_group.get(batch.table_name)
+            if group is not None and group[0].signature() == batch.signature() \
+                    and sum(len(b.rows) for b in group) + len(batch.rows) <= self.max_transaction_rows:
+                group.append(batch)
+            else:
+                group = [batch]
+                groups.append(group)
+                last_group[batch.table_name] = group
+
+        for group in groups:
+            result = self._write_group(group)
+            if not result.success and len(group) > 1:
+                logger.warning(f"Coalesced write to {group[0].table_name} failed ({result.error_message}); "
+                               f"retrying its {len(group)} batches one by one.")
+                for batch in group:
+                    self._finish([batch], self._write_group([batch]))
+            else:
+                self._finish(group, result)
+
+    def _write_group(self, group: List[_Batch]):
+        first = group[0]
+        rows = first.rows if len(group) == 1 else [row for batch in group for row in batch.rows]
+        return self.writer.write_bulk(first.table_name, rows, columns=first.columns,
+                                      dto_class=first.dto_class, key_columns=first.key_columns)
+
+    def _finish(self, group: List[_Batch], result) -> None:
+        now = time.monotonic()
+        table_name = group[0].table_name
+        with self._lock:
+            stats = self._metrics[table_name]
+            stats["transactions"] += 1 if result.success else 0
+            for batch in group:
+                latency = now - batch.submitted
+                stats["queue_depth"] -= 1
+                stats["queued_rows"] -= len(batch.rows)
+                stats["latency_total_s"] += latency
+                stats["latency_max_s"] = max(stats["latency_max_s"], latency)
+                if result.success:
+                    stats["batches"] += 1
+                    stats["rows_written"] += len(batch.rows)
+                else:
+                    stats["failed_batches"] += 1
+            if not result.success and self._error is None:
+                self._error = WriteBehindError(f"Write to {table_name} failed: {result.error_message}")
+        for batch in group:
+            if result.success:
+                batch.future.set_result(len(batch.rows) if len(group) > 1 else result.rows_affected)
+            else:
+                batch.future.set_exception(WriteBehindError(f"Write to {table_name} failed: {result.error_message}"))
@@ -7,8 +7,10 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from src.nba_stats.api.nba_stats_client import NBAStatsClient
+from src.nba_stats.api.async_nba_stats_client import AsyncNBAStatsClient
 from ..config import settings
-from typing import Dict
+from ..db.connection import connect
+from typing import Dict, Iterable, List, Optional
 
 # Configure logging
 logging.basicConfig(
@@ -35,17 +37,12 @@ def convert_datetime(val):
     except (AttributeError, ValueError):
         return None
 
-def get_db_connection():
-    """Establish and return a database connection."""
-    sqlite3.register_adapter(datetime, adapt_datetime)
-    sqlite3.register_converter("TIMESTAMP", convert_datetime)
-    conn = sqlite3.connect(DB_PATH, detect_types=sqlite3.PARSE_DECLTYPES)
-    # Enforce referential integrity for all connections
-    try:
-        conn.execute("PRAGMA foreign_keys = ON;")
-    except sqlite3.Error:
-        # If PRAGMA fails, still return connection but log for visibility
-        logger.error("Failed to enable SQLite foreign key enforcement (PRAGMA foreign_keys = ON)")
+def get_db_connection(read_only: bool = False):
+    """
+    Check out a pooled database connection (see db/connection.py); close() returns it to the pool.
+    Pass read_only=True for reports and dashboards that must never write.
+    """
+    conn = connect(DB_PATH, read_only=read_only)
     logger.info(f"Using database at {DB_PATH}")
     return conn
 
@@ -53,6 +50,10 @@ def get_nba_stats_client():
     """Return an instance of the NBAStatsClient."""
     return NBAStatsClient()
 
+def get_async_nba_stats_client(max_in_flight: int = settings.MAX_IN_FLIGHT_REQUESTS):
+    """Return an AsyncNBAStatsClient that keeps up to max_in_flight requests open."""
+    return AsyncNBAStatsClient(max_in_flight=max_in_flight)
+
 def add_column_if_not_exists(conn, table_name, column_name, column_def):
     """
     Adds a column to a table if it doesn't already exist.
@@ -81,4 +82,18 @@ def migrate_table(conn: sqlite3.Connection, table_name: str, schema: Dict[str, s
             add_column_if_not_exists(conn, table_name, column_name, column_def)
         logger.info(f"No new columns needed for '{table_name}'. Schema is up-to-date.")
     except Exception as e:
-        logger.error(f"Error migrating table {table_name}: {e}", exc_info=True) 
\ No newline at end of file
+        logger.error(f"Error migrating table {table_name}: {e}", exc_info=True) 
+
+def filter_rows_by_player(headers: List[str], rows: List[list], player_ids: Optional[Iterable[int]],
+                          id_header: str = "PLAYER_ID") -> List[list]:
+    """
+    Keeps only the rowSet rows for player_ids (all rows when player_ids is None).
+
+    Lets league-wide populators upsert just the player-season rows touched by an
+    incremental refresh while still fetching the dashboard in a single request.
+    """
+    if player_ids is None or id_header not in headers:
+        return rows
+    wanted = {int(player_id) for player_id in player_ids}
+    idx = headers.index(id_header)
+    return [row for row in rows if row[idx] is not None and int(row[idx]) in wanted]
@@ -0,0 +1,363 @@
+"""
+Vectorized on-court lineup reconstruction for play-by-play data.
+
+Substitutions are the only events that change who is on the floor, so the game is split
+into stints at each substitution (and, by default, at each period boundary). The lineup
+state is computed once per stint and broadcast to every event of the stint with array
+indexing, instead of walking every event with ``iterrows``.
+
+Starters are inferred per period: a player is on the floor at the start of a period when
+his first appearance in that period is anything other than being subbed in. Lineup
+changes made between periods are never logged as substitutions, so carrying the previous
+period's lineup over (``per_period_starters=False``, the original behaviour) drifts for the
+rest of the game.
+
+Run ``python -m src.nba_stats.utils.lineup_tracker`` for an events/second benchmark on
+synthetic games.
+"""
+
+import logging
+import random
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SUBSTITUTION = 8
+LINEUP_SIZE = 5
+PLAYER_SLOTS = (1, 2, 3)
+
+HOME_LINEUP_COLUMNS = [f"home_player_{i}_id" for i in range(1, LINEUP_SIZE + 1)]
+AWAY_LINEUP_COLUMNS = [f"away_player_{i}_id" for i in range(1, LINEUP_SIZE + 1)]
+LINEUP_COLUMNS = HOME_LINEUP_COLUMNS + AWAY_LINEUP_COLUMNS + ["offensive_team_id", "defensive_team_id"]
+
+Columns = Mapping[str, Any]
+
+
+def _numeric(values: Any) -> np.ndarray:
+    """Float view of an id column, with None/NaN as NaN (NBA ids are exact in float64)."""
+    return pd.to_numeric(pd.Series(values, copy=False), errors="coerce").to_numpy(dtype=float)
+
+
+def _present(values: Any) -> np.ndarray:
+    """Mask of values that are not None (NaN counts as present, as in the row-wise original)."""
+    return np.asarray(values, dtype=object) != None  # noqa: E711 - elementwise identity test
+
+
+class _PlayByPlay:
+    """Numeric views over the PBP columns the tracker needs."""
+
+    def __init__(self, columns: Columns):
+        self.n = len(columns["EVENTNUM"])
+        self.event_num = _numeric(columns["EVENTNUM"])
+        self.period = _numeric(columns["PERIOD"])
+        self.msg_type = _numeric(columns["EVENTMSGTYPE"])
+        # (n, 3) player/team matrices; row-major order is the order events mention players
+        self.player_ids = np.column_stack([_numeric(columns[f"PLAYER{i}_ID"]) for i in PLAYER_SLOTS])
+        self.team_ids = np.column_stack([_numeric(columns[f"PLAYER{i}_TEAM_ID"]) for i in PLAYER_SLOTS])
+        self.game_ids = columns.get("GAME_ID")
+        self.home_description = columns.get("HOMEDESCRIPTION")
+        self.visitor_description = columns.get("VISITORDESCRIPTION")
+
+        # Player -> team from each player's first appearance anywhere in the game
+        flat_players, flat_teams = self.player_ids.ravel(), self.team_ids.ravel()
+        known = ~np.isnan(flat_players) & ~np.isnan(flat_teams)
+        self.map_players, first = np.unique(flat_players[known], return_index=True)
+        self.map_teams = flat_teams[known][first]
+
+    def team_of(self, player_ids: np.ndarray) -> np.ndarray:
+        if not len(self.map_players):
+            return np.full(player_ids.shape, np.nan)
+        idx = np.clip(np.searchsorted(self.map_players, player_ids), 0, len(self.map_players) - 1)
+        return np.where(self.map_players[idx] == player_ids, self.map_teams[idx], np.nan)
+
+
+def _first_seen(player_ids: np.ndarray, limit: int = LINEUP_SIZE) -> List[int]:
+    """Distinct ids in order of first occurrence, at most ``limit`` of them."""
+    unique, first = np.unique(player_ids, return_index=True)
+    return [int(p) for p in unique[np.argsort(first, kind="stable")][:limit]]
+
+
+def _period_candidates(pbp: _PlayByPlay, period: float, exclude_subbed_in: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """Players mentioned in ``period`` (by EVENTNUM order, row-major) and their teams."""
+    rows = np.flatnonzero(pbp.period == period)
+    rows = rows[np.argsort(pbp.event_num[rows], kind="stable")]
+    players = pbp.player_ids[rows].ravel()
+    mentioned = ~np.isnan(players)
+    if exclude_subbed_in:
+        # Drop players whose first mention in the period is coming off the bench (PLAYER2 of a sub)
+        subbed_in = np.zeros((len(rows), len(PLAYER_SLOTS)), dtype=bool)
+        subbed_in[:, 1] = pbp.msg_type[rows] == SUBSTITUTION
+        subbed_in = subbed_in.ravel()[mentioned]
+        players = players[mentioned]
+        unique, first = np.unique(players, return_index=True)
+        entered = unique[subbed_in[first]]
+        keep = ~np.isin(players, entered)
+        players = players[keep]
+    else:
+        players = players[mentioned]
+    return players, pbp.team_of(players)
+
+
+def infer_period_starters(pbp: Union[_PlayByPlay, Columns], home_team_id: int, away_team_id: int,
+                          period: int = 1, exclude_subbed_in: bool = True) -> Tuple[List[int], List[int]]:
+    """
+    Infers who started ``period`` for each team.
+
+    Returns the first (up to) five qualifying players seen for each team, in order of
+    appearance. With ``exclude_subbed_in=False`` this is the original first-five-seen
+    heuristic, which counts players who enter the period as substitutes.
+    """
+    if not isinstance(pbp, _PlayByPlay):
+        pbp = _PlayByPlay(pbp)
+    players, teams = _period_candidates(pbp, period, exclude_subbed_in)
+    return (_first_seen(players[teams == home_team_id]), _first_seen(players[teams == away_team_id]))
+
+
+def _fill_from_previous(starters: List[int], previous: List[int], excluded: set) -> List[int]:
+    """Tops up a partial period lineup with players still on the floor from the previous period."""
+    filled = list(starters)
+    for player_id in previous:
+        if len(filled) == LINEUP_SIZE:
+            break
+        if player_id not in filled and player_id not in excluded:
+            filled.append(player_id)
+    return filled
+
+
+def _apply_substitution(lineup: List[int], player_out: float, player_in: float, game_id: Any, event_num: Any) -> None:
+    # Defend against anomalous substitution data: if the player subbing in is already on court,
+    # do nothing to prevent corrupting the lineup to 4 members.
+    if player_in in lineup:
+        logger.warning(f"ANOMALY in Game {game_id} Event {event_num}: Player {int(player_in)} subbing in is already on court. Skipping substitution to maintain state integrity.")
+    elif player_out in lineup and not np.isnan(player_in):
+        lineup[lineup.index(player_out)] = int(player_in)
+
+
+def _reset_for_period(pbp: _PlayByPlay, period: float, lineups: Tuple[Tuple[List[int], int], ...]) -> None:
+    """Replaces each team's lineup with the inferred starters of ``period`` when they can be found."""
+    players, teams = _period_candidates(pbp, period, exclude_subbed_in=True)
+    mentioned, _ = _period_candidates(pbp, period, exclude_subbed_in=False)
+    entered = set(mentioned.tolist()) - set(players.tolist())
+    for lineup, team_id in lineups:
+        starters = _first_seen(players[teams == team_id])
+        if len(starters) < LINEUP_SIZE:
+            # Players who never show up in the period are assumed to have stayed on from the last one
+            starters = _fill_from_previous(starters, lineup, entered)
+        if len(starters) == LINEUP_SIZE:
+            lineup[:] = starters
+        else:
+            logger.debug(f"Could not infer period {int(period)} starters for team {team_id}; keeping previous lineup.")
+
+
+def track_lineups(columns: Columns, home_team_id: int, away_team_id: int,
+                  per_period_starters: bool = True) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Reconstructs the on-court lineups and offensive/defensive team for every event.
+
+    Args:
+        columns: PBP columns (e.g. from ``decode_result_set``) or a DataFrame, in event order.
+        home_team_id: Home team id.
+        away_team_id: Away team id.
+        per_period_starters: Re-infer the lineup at the start of every period. When False the
+            period-1 lineup is carried through the whole game, like the row-wise original.
+
+    Returns:
+        Dict of ``LINEUP_COLUMNS`` to arrays aligned with the events, or None when the
+        game's starters cannot be determined.
+    """
+    pbp = _PlayByPlay(columns)
+    n = pbp.n
+    if n == 0:
+        return None
+
+    home_team_id, away_team_id = int(home_team_id), int(away_team_id)
+    exclude = per_period_starters
+    home, away = infer_period_starters(pbp, home_team_id, away_team_id, period=1, exclude_subbed_in=exclude)
+    if len(home) != LINEUP_SIZE or len(away) != LINEUP_SIZE:
+        logger.warning(f"Could not reliably determine 5 starters for each team from PBP. Found: Home={len(home)}, Away={len(away)}. Game will be skipped.")
+        return None
+
+    # Stint boundaries: the event after each substitution, plus the first event of each later period
+    substitutions = np.flatnonzero(pbp.msg_type == SUBSTITUTION)
+    period_starts = np.flatnonzero(np.diff(pbp.period) != 0) + 1 if per_period_starters else np.empty(0, dtype=int)
+    resets = {int(i): pbp.period[i] for i in period_starts if not np.isnan(pbp.period[i])}
+    change_points = sorted(p for p in set((substitutions + 1).tolist()) | set(resets) if p < n)
+
+    sub_team = pbp.team_ids[:, 0]
+    stint_starts, home_stints, away_stints = [0], [sorted(home)], [sorted(away)]
+    next_sub = 0
+    for start in change_points:
+        # Apply the substitution that ends the previous stint (if any)
+        while next_sub < len(substitutions) and substitutions[next_sub] < start:
+            i = substitutions[next_sub]
+            next_sub += 1
+            lineup = home if sub_team[i] == home_team_id else away if sub_team[i] == away_team_id else None
+            if lineup is not None:
+                game_id = pbp.game_ids[i] if pbp.game_ids is not None else None
+                event_num = int(pbp.event_num[i]) if not np.isnan(pbp.event_num[i]) else None
+                _apply_substitution(lineup, pbp.player_ids[i, 0], pbp.player_ids[i, 1], game_id, event_num)
+        if start in resets:
+            _reset_for_period(pbp, resets[start], ((home, home_team_id), (away, away_team_id)))
+        stint_starts.append(start)
+        home_stints.append(sorted(home))
+        away_stints.append(sorted(away))
+
+    stint_of_event = np.searchsorted(np.asarray(stint_starts), np.arange(n), side="right") - 1
+    home_lineups = np.asarray(home_stints, dtype=np.int64)[stint_of_event]
+    away_lineups = np.asarray(away_stints, dtype=np.int64)[stint_of_event]
+
+    # Offensive team: PLAYER1's team, else the side whose description is present.
+    # Simplified logic, may need refinement.
+    offense = sub_team.copy()
+    unknown = np.isnan(offense)
+    if pbp.home_description is not None:
+        home_side = unknown & _present(pbp.home_description)
+        offense[home_side] = home_team_id
+        unknown &= ~home_side
+    if pbp.visitor_description is not None:
+        offense[unknown & _present(pbp.visitor_description)] = away_team_id
+    defense = np.where(offense != home_team_id, home_team_id, away_team_id).astype(np.int64)
+    if not np.isnan(offense).any():
+        offense = offense.astype(np.int64)
+
+    result = {column: home_lineups[:, k] for k, column in enumerate(HOME_LINEUP_COLUMNS)}
+    result.update({column: away_lineups[:, k] for k, column in enumerate(AWAY_LINEUP_COLUMNS)})
+    result["offensive_team_id"] = offense
+    result["defensive_team_id"] = defense
+    return result
+
+
+def enrich_play_by_play(pbp_df: pd.DataFrame, home_team_id: int, away_team_id: int,
+                        per_period_starters: bool = True) -> pd.DataFrame:
+    """Returns ``pbp_df`` with ``LINEUP_COLUMNS`` added, or an empty DataFrame if lineups are unknown."""
+    lineups = track_lineups(pbp_df, home_team_id, away_team_id, per_period_starters=per_period_starters)
+    if lineups is None:
+        return pd.DataFrame()
+    enriched = pbp_df.reset_index(drop=True).assign(**lineups)
+    # Match the dtypes pandas infers when the frame is built from per-event records
+    return enriched.infer_objects()
+
+
+# --- Synthetic games and benchmark -------------------------------------------------------
+
+PBP_HEADERS = [
+    "GAME_ID", "EVENTNUM", "EVENTMSGTYPE", "EVENTMSGACTIONTYPE", "PERIOD", "WCTIMESTRING", "PCTIMESTRING",
+    "HOMEDESCRIPTION", "NEUTRALDESCRIPTION", "VISITORDESCRIPTION", "SCORE", "SCOREMARGIN",
+    "PERSON1TYPE", "PLAYER1_ID", "PLAYER1_NAME", "PLAYER1_TEAM_ID",
+    "PERSON2TYPE", "PLAYER2_ID", "PLAYER2_NAME", "PLAYER2_TEAM_ID",
+    "PERSON3TYPE", "PLAYER3_ID", "PLAYER3_NAME", "PLAYER3_TEAM_ID",
+]
+
+
+def synthetic_play_by_play(game_id: str = "0022300001", seed: int = 0, periods: int = 4,
+                           events_per_period: int = 120, home_team_id: int = 1610612747,
+                           away_team_id: int = 1610612743, lineup_changes_between_periods: bool = False,
+                           anomaly_rate: float = 0.02) -> Dict[str, Any]:
+    """
+    Builds a playbyplayv2-shaped response with realistic substitution patterns.
+
+    Each period opens with every on-court player touching the ball before any substitute
+    appears, so starters are unambiguous. ``lineup_changes_between_periods`` swaps players
+    at period breaks without logging a substitution, as the real feed does.
+    """
+    rng = random.Random(seed)
+    rosters = {
+        team_id: [team_id % 10000 * 100 + k for k in range(13)] for team_id in (home_team_id, away_team_id)
+    }
+    on_court = {team_id: roster[:LINEUP_SIZE] for team_id, roster in rosters.items()}
+    rows: List[list] = []
+    event_num = 0
+
+    def add(msg_type, period, players=(), home_side=None, action=0):
+        nonlocal event_num
+        event_num += 1
+        slots = []
+        for k in range(len(PLAYER_SLOTS)):
+            if k < len(players) and players[k] is not None:
+                player_id, team_id = players[k]
+                person_type = 4 if team_id == home_team_id else 5
+                slots.append([person_type, player_id, f"Player {player_id}" if team_id else None, team_id])
+            else:
+                slots.append([0, 0, None, None])
+        text = f"Event {event_num}"
+        home_text = text if home_side is True else None
+        visitor_text = text if home_side is False else None
+        neutral_text = text if home_side is None else None
+        rows.append([game_id, event_num, msg_type, action, period, "7:00 PM", "12:00",
+                     home_text, neutral_text, visitor_text, None, None] + [v for slot in slots for v in slot])
+
+    for period in range(1, periods + 1):
+        if period > 1 and lineup_changes_between_periods:
+            for team_id, roster in rosters.items():
+                bench = [p for p in roster if p not in on_court[team_id]]
+                on_court[team_id][rng.randrange(LINEUP_SIZE)] = rng.choice(bench)
+        add(12, period)
+        # Everyone on the floor shows up before the first substitution of the period
+        for team_id in (home_team_id, away_team_id):
+            for player_id in on_court[team_id]:
+                add(rng.choice((1, 2, 4, 6)), period, [(player_id, team_id)], home_side=team_id == home_team_id)
+        for _ in range(events_per_period - 2 * LINEUP_SIZE - 2):
+            team_id = rng.choice((home_team_id, away_team_id))
+            home_side = team_id == home_team_id
+            roll = rng.random()
+            if roll < 0.12:
+                bench = [p for p in rosters[team_id] if p not in on_court[team_id]]
+                out_idx = rng.randrange(LINEUP_SIZE)
+                player_out = on_court[team_id][out_idx]
+                if rng.random() < anomaly_rate:
+                    # Feed glitch: the incoming player is already on the floor
+                    player_in = rng.choice([p for p in on_court[team_id] if p != player_out])
+                else:
+                    player_in = rng.choice(bench)
+                    on_court[team_id][out_idx] = player_in
+                add(SUBSTITUTION, period, [(player_out, team_id), (player_in, team_id)], home_side=home_side)
+            elif roll < 0.18:
+                # Team rebound: PLAYER1_ID is the team itself, with no team id
+                add(4, period, [(team_id, None)], home_side=home_side)
+            elif roll < 0.22:
+                add(9, period, [(0, None)], home_side=home_side)  # timeout
+            else:
+                shooter, passer = rng.sample(on_court[team_id], 2)
+                assisted = [(shooter, team_id), (passer, team_id)] if rng.random() < 0.5 else [(shooter, team_id)]
+                add(rng.choice((1, 2, 4, 5, 6)), period, assisted, home_side=home_side)
+        add(13, period)
+
+    return {"resource": "playbyplay", "parameters": {"GameID": game_id},
+            "resultSets": [{"name": "PlayByPlay", "headers": PBP_HEADERS, "rowSet": rows}]}
+
+
+def benchmark(games: int = 50, seed: int = 0, per_period_starters: bool = True, **game_kwargs) -> Dict[str, float]:
+    """Times ``track_lineups`` over synthetic games and reports events per second."""
+    from ..api.result_set import decode_result_set
+
+    frames = [
+        pd.DataFrame(decode_result_set(synthetic_play_by_play(f"00223{g:05d}", seed=seed + g, **game_kwargs), name=0))
+        for g in range(games)
+    ]
+    events = sum(len(frame) for frame in frames)
+    start = time.perf_counter()
+    for frame in frames:
+        enrich_play_by_play(frame, 1610612747, 1610612743, per_period_starters=per_period_starters)
+    elapsed = time.perf_counter() - start
+    return {"games": games, "events": events, "seconds": round(elapsed, 4),
+            "events_per_second": round(events / elapsed, 1) if elapsed else float("inf")}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark vectorized lineup reconstruction on synthetic games.")
+    parser.add_argument("--games", type=int, default=50, help="Number of synthetic games.")
+    parser.add_argument("--events-per-period", type=int, default=120, help="Events per period in each game.")
+    parser.add_argument("--carry-over", action="store_true", help="Carry period-1 starters through the game instead of re-inferring per period.")
+    args = parser.parse_args()
+
+    # Synthetic games include substitution anomalies; keep their warnings out of the report
+    logger.setLevel(logging.ERROR)
+    result = benchmark(args.games, per_period_starters=not args.carry_over, events_per_period=args.events_per_period)
+    print(f"{result['events']} events in {result['games']} games: {result['seconds']:.3f}s "
+          f"({result['events_per_second']:,.0f} events/s)")
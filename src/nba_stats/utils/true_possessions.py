@@ -0,0 +1,208 @@
+"""
+Vectorized segmentation of play-by-play events into true possessions.
+
+``Possessions`` holds one row per play-by-play event. A possession changes hands on a made
+field goal (unless an and-one free throw follows), a made last free throw of a trip, a
+defensive rebound, a turnover and the end of a period. Each event is flagged with array
+operations, the flags are turned into possession numbers with a cumulative sum, and the
+possessions are aggregated with a single groupby, so no event is visited in Python.
+
+Points come from changes in the running total of the SCORE column, so they do not depend
+on description strings or on the order of the two scores within SCORE. The descriptions
+are read once here, only to tell three-point attempts apart, so downstream scripts never
+have to parse them.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .lineup_tracker import AWAY_LINEUP_COLUMNS, HOME_LINEUP_COLUMNS, LINEUP_SIZE, SUBSTITUTION
+
+logger = logging.getLogger(__name__)
+
+MADE_SHOT, MISSED_SHOT, FREE_THROW, REBOUND, TURNOVER = 1, 2, 3, 4, 5
+TIMEOUT, START_OF_PERIOD, END_OF_PERIOD = 9, 12, 13
+# EVENTMSGACTIONTYPE of a free throw: 10 = 1 of 1, 11/12 = 1-2 of 2, 13-15 = 1-3 of 3
+TRIP_FREE_THROWS = (10, 11, 12, 13, 14, 15)
+LAST_FREE_THROWS = (10, 12, 15)
+AND_ONE_FREE_THROW = 10
+
+# IngestionLedger key for the TruePossessions rows written by populate_true_possessions:
+# payload_hash hashes the possessions written, source_hash is the play-by-play payload
+# hash they were derived from
+LEDGER_SOURCE = "derived"
+LEDGER_ENDPOINT = "true_possessions"
+
+REGULATION_PERIOD_SECONDS = 720
+OVERTIME_PERIOD_SECONDS = 300
+
+# Columns segment_possessions reads from a game's events
+EVENT_COLUMNS = ["event_num", "event_type", "event_action_type", "period", "pc_time_string", "score",
+                 "home_description", "visitor_description", "player1_id", "player1_team_id",
+                 *HOME_LINEUP_COLUMNS, *AWAY_LINEUP_COLUMNS]
+
+# Offensive team's counts per possession
+BOX_SCORE_COLUMNS = ["field_goal_attempts", "field_goals_made", "three_point_attempts", "three_pointers_made",
+                     "free_throw_attempts", "free_throws_made", "turnovers"]
+OFFENSE_LINEUP_COLUMNS = [f"off_player_{i}_id" for i in range(1, LINEUP_SIZE + 1)]
+DEFENSE_LINEUP_COLUMNS = [f"def_player_{i}_id" for i in range(1, LINEUP_SIZE + 1)]
+POSSESSION_COLUMNS = [
+    "possession_num", "period", "start_event_num", "end_event_num", "offensive_team_id",
+    "defensive_team_id", "points", "duration_seconds", "end_reason",
+    *BOX_SCORE_COLUMNS, *OFFENSE_LINEUP_COLUMNS, *DEFENSE_LINEUP_COLUMNS,
+]
+
+END_REASONS = {
+    1: "made_field_goal",
+    2: "free_throws",
+    3: "defensive_rebound",
+    4: "turnover",
+    5: "end_of_period",
+}
+
+
+def _numeric(values: pd.Series) -> np.ndarray:
+    return pd.to_numeric(values, errors="coerce").to_numpy(dtype=float, copy=True)
+
+
+def _clock_seconds(pc_time: pd.Series) -> np.ndarray:
+    """Seconds left in the period from PCTIMESTRING ('11:42')."""
+    parts = pc_time.astype("string").str.extract(r"^(\d+):(\d+(?:\.\d+)?)$")
+    return (pd.to_numeric(parts[0], errors="coerce") * 60 + pd.to_numeric(parts[1], errors="coerce")).to_numpy(dtype=float)
+
+
+def _points_per_event(score: pd.Series) -> np.ndarray:
+    """Points scored on each event: the change in the combined score (SCORE is only set on scoring plays)."""
+    parts = score.astype("string").str.extract(r"^\s*(\d+)\s*-\s*(\d+)\s*$")
+    total = pd.to_numeric(parts[0], errors="coerce") + pd.to_numeric(parts[1], errors="coerce")
+    running = total.ffill().fillna(0).to_numpy(dtype=float)
+    return np.clip(np.diff(running, prepend=0.0), 0, None)
+
+
+def _mentions_three(description: pd.Series) -> np.ndarray:
+    return description.astype("string").str.contains("3PT", regex=False).fillna(False).to_numpy(dtype=bool)
+
+
+def _period_seconds(period: np.ndarray) -> np.ndarray:
+    return np.where(period > 4, OVERTIME_PERIOD_SECONDS, REGULATION_PERIOD_SECONDS).astype(float)
+
+
+def segment_possessions(events: pd.DataFrame, home_team_id: int, away_team_id: int) -> pd.DataFrame:
+    """
+    Splits one game's events into possessions.
+
+    Args:
+        events: The game's ``Possessions`` rows (at least ``EVENT_COLUMNS``), in event order.
+        home_team_id: Home team id; the home_player_* columns are its lineup.
+        away_team_id: Away team id.
+
+    Returns:
+        One row per possession with ``POSSESSION_COLUMNS``. Lineups are those on the floor
+        at the first live event of the possession. Stretches with no offensive action (a
+        shot, trip free throw or turnover), such as the clock running out after a make,
+        are not possessions and are dropped.
+    """
+    if events.empty:
+        return pd.DataFrame(columns=POSSESSION_COLUMNS)
+
+    events = events.reset_index(drop=True)
+    n = len(events)
+    event_type = _numeric(events["event_type"])
+    action = _numeric(events["event_action_type"])
+    period = _numeric(events["period"])
+    points = _points_per_event(events["score"])
+    clock = _clock_seconds(events["pc_time_string"])
+
+    # Team rebounds and team turnovers carry the team id in PLAYER1_ID and no PLAYER1_TEAM_ID
+    team = _numeric(events["player1_team_id"])
+    team_event = np.isnan(team) & np.isin(event_type, (REBOUND, TURNOVER))
+    team[team_event] = _numeric(events["player1_id"])[team_event]
+    team[~np.isin(team, (home_team_id, away_team_id))] = np.nan
+
+    trip_free_throw = (event_type == FREE_THROW) & np.isin(action, TRIP_FREE_THROWS)
+    offensive_action = np.isin(event_type, (MADE_SHOT, MISSED_SHOT, TURNOVER)) | trip_free_throw
+    shooter = pd.Series(np.where(np.isin(event_type, (MADE_SHOT, MISSED_SHOT)) | trip_free_throw, team, np.nan)).ffill()
+    shooter = shooter.to_numpy(dtype=float)
+
+    # A made shot keeps the ball when the next live-ball event is the shooter's and-one free throw
+    significant = np.flatnonzero(np.isin(event_type, (MADE_SHOT, MISSED_SHOT, FREE_THROW, REBOUND, TURNOVER, END_OF_PERIOD)))
+    following = np.searchsorted(significant, np.arange(n), side="right")
+    has_next = following < len(significant)
+    next_event = significant[np.minimum(following, len(significant) - 1)]
+    and_one = (has_next & (event_type[next_event] == FREE_THROW) & (action[next_event] == AND_ONE_FREE_THROW)
+               & (team[next_event] == team))
+
+    reason = np.zeros(n, dtype=int)
+    reason[(event_type == MADE_SHOT) & ~and_one] = 1
+    reason[(event_type == FREE_THROW) & np.isin(action, LAST_FREE_THROWS) & (points > 0)] = 2
+    reason[(event_type == REBOUND) & ~np.isnan(team) & ~np.isnan(shooter) & (team != shooter)] = 3
+    reason[event_type == TURNOVER] = 4
+    period_ends = (event_type == END_OF_PERIOD) | np.append(period[1:] != period[:-1], True)
+    reason[period_ends & (reason == 0)] = 5
+
+    ends = reason > 0
+    possession = np.concatenate(([0], np.cumsum(ends)[:-1]))
+
+    # Clock at the start of each possession: the previous possession's end, or the period start
+    frame = pd.DataFrame({"possession": possession, "period": period, "clock": clock})
+    by_possession = frame.groupby("possession", sort=True)
+    end_index = by_possession.tail(1).index.to_numpy()
+    start_index = by_possession.head(1).index.to_numpy()
+    end_clock = pd.Series(clock[end_index]).ffill().to_numpy()
+    end_period = period[end_index]
+    start_clock = np.where(np.append(False, end_period[1:] == end_period[:-1]),
+                           np.roll(end_clock, 1), _period_seconds(end_period))
+    duration = np.clip(start_clock - end_clock, 0, None)
+
+    # Offense: the team of the possession's last offensive action (the missed shot for a defensive rebound)
+    offense = pd.Series(np.where(offensive_action, team, np.nan)).groupby(possession).last().to_numpy()
+    by_offense = team == offense[possession]
+    scored = np.bincount(possession, weights=np.where(by_offense, points, 0.0))
+    field_goal = np.isin(event_type, (MADE_SHOT, MISSED_SHOT))
+    three = field_goal & (_mentions_three(events["home_description"]) | _mentions_three(events["visitor_description"]))
+    counted = {
+        "field_goal_attempts": field_goal,
+        "field_goals_made": event_type == MADE_SHOT,
+        "three_point_attempts": three,
+        "three_pointers_made": three & (event_type == MADE_SHOT),
+        "free_throw_attempts": event_type == FREE_THROW,
+        "free_throws_made": (event_type == FREE_THROW) & (points > 0),
+        "turnovers": event_type == TURNOVER,
+    }
+    box_score = {column: np.bincount(possession, weights=(mask & by_offense).astype(float), minlength=len(offense))
+                 for column, mask in counted.items()}
+
+    # Lineups at the first event that is not a substitution, timeout or period start
+    live = ~np.isin(event_type, (SUBSTITUTION, TIMEOUT, START_OF_PERIOD))
+    first_live = pd.Series(np.where(live, np.arange(n), np.nan)).groupby(possession).min().to_numpy()
+    lineup_row = np.where(np.isnan(first_live), start_index, first_live).astype(int)
+    home_lineups = events[HOME_LINEUP_COLUMNS].to_numpy()[lineup_row]
+    away_lineups = events[AWAY_LINEUP_COLUMNS].to_numpy()[lineup_row]
+    home_offense = (offense == home_team_id)[:, None]
+
+    event_num = _numeric(events["event_num"])
+    result = pd.DataFrame({
+        "period": end_period,
+        "start_event_num": event_num[start_index],
+        "end_event_num": event_num[end_index],
+        "offensive_team_id": offense,
+        "defensive_team_id": np.where(offense == home_team_id, away_team_id, home_team_id),
+        "points": scored,
+        "duration_seconds": duration,
+        "end_reason": pd.Series(reason[end_index]).map(END_REASONS).fillna(END_REASONS[5]).to_numpy(),
+        **box_score,
+    })
+    result[OFFENSE_LINEUP_COLUMNS] = np.where(home_offense, home_lineups, away_lineups)
+    result[DEFENSE_LINEUP_COLUMNS] = np.where(home_offense, away_lineups, home_lineups)
+
+    result = result[~np.isnan(offense)].reset_index(drop=True)
+    result.insert(0, "possession_num", np.arange(1, len(result) + 1))
+    for column in ("period", "start_event_num", "end_event_num", "offensive_team_id", "defensive_team_id", "points",
+                   *BOX_SCORE_COLUMNS):
+        result[column] = result[column].astype("int64")
+    for column in OFFENSE_LINEUP_COLUMNS + DEFENSE_LINEUP_COLUMNS:
+        result[column] = pd.to_numeric(result[column], errors="coerce").astype("Int64")
+    return result[POSSESSION_COLUMNS]
+
@@ -31,4 +31,15 @@ MOCK_PLAYERS_RESPONSE = {
 def mock_nba_stats_client():
     mock_client = MagicMock()
     mock_client.get_all_players.return_value = MOCK_PLAYERS_RESPONSE
-    return mock_client 
\ No newline at end of file
+    return mock_client 
+
+
+@pytest.fixture(autouse=True)
+def isolated_client_state(tmp_path, monkeypatch):
+    """Keep clients created in tests away from the real cache, rate limiter, AIMD steady state and metrics log."""
+    from src.nba_stats.config import settings
+    monkeypatch.setattr(settings, "CACHE_DB_PATH", str(tmp_path / "api_cache.db"))
+    monkeypatch.setattr(settings, "RATE_LIMITER_DB_PATH", str(tmp_path / "rate_limiter.db"))
+    monkeypatch.setattr(settings, "USE_SHARED_RATE_LIMITER", False)
+    monkeypatch.setattr(settings, "AIMD_STATE_PATH", str(tmp_path / "aimd_state.json"))
+    monkeypatch.setattr(settings, "AIMD_METRICS_LOG_PATH", str(tmp_path / "aimd_metrics.jsonl"))
@@ -0,0 +1,135 @@
+import json
+import threading
+import time
+
+import pytest
+
+from src.nba_stats.api.aimd import AIMDController
+
+
+def _controller(tmp_path=None, **kwargs):
+    options = dict(initial_rate=60.0, min_rate=2.0, max_rate=600.0, initial_concurrency=2,
+                   max_concurrency=8, decrease_cooldown=0.0)
+    options.update(kwargs)
+    if tmp_path is not None:
+        options.setdefault("state_path", tmp_path / "aimd_state.json")
+        options.setdefault("metrics_path", tmp_path / "aimd_metrics.jsonl")
+    return AIMDController(**options)
+
+
+def test_successes_increase_rate_and_concurrency_additively():
+    controller = _controller(additive_increase=1.0)
+
+    for _ in range(4):
+        controller.record_success(0.1)
+
+    assert controller.rate == pytest.approx(64.0)
+    # One extra slot per full window of successes: 2 -> 3 after 2, 3 -> 4 needs 3 more
+    assert controller.concurrency == 3
+
+
+def test_throttle_halves_rate_and_pauses_admission():
+    controller = _controller()
+
+    controller.record_throttle(retry_after=0.2)
+
+    assert controller.rate == pytest.approx(30.0)
+    assert controller.concurrency == 1
+    assert controller.try_start() > 0.1
+
+
+def test_single_success_after_throttle_storm_does_not_restore_full_rate():
+    controller = _controller(additive_increase=0.5)
+    for _ in range(5):
+        controller.record_throttle()
+    throttled_rate = controller.rate
+
+    controller.record_success(0.1)
+
+    assert controller.rate == pytest.approx(throttled_rate + 0.5)
+    assert controller.rate < 60.0
+
+
+def test_cooldown_collapses_burst_of_failures_into_one_decrease():
+    controller = _controller(decrease_cooldown=60.0)
+
+    controller.record_server_error()
+    controller.record_server_error()
+    controller.record_timeout()
+
+    assert controller.rate == pytest.approx(60.0 * 0.8)
+    assert controller.counters["server_errors"] == 2
+    assert controller.counters["timeouts"] == 1
+
+
+def test_latency_inflation_backs_off():
+    controller = _controller(additive_increase=0.0, latency_threshold=2.0)
+    for _ in range(10):
+        controller.record_success(0.1)
+    assert controller.rate == pytest.approx(60.0)
+
+    for _ in range(5):
+        controller.record_success(1.0)
+
+    assert controller.rate < 60.0
+    assert controller.counters["latency_backoffs"] >= 1
+
+
+def test_try_start_respects_concurrency_and_spacing():
+    controller = _controller(initial_rate=600.0, initial_concurrency=1)
+
+    assert controller.try_start() == 0.0
+    assert controller.try_start() > 0  # the only slot is in flight
+    controller.finish()
+    wait = controller.try_start()
+    assert 0 < wait <= 0.1  # next start is spaced 100ms after the previous one
+    time.sleep(wait)
+    assert controller.try_start() == 0.0
+
+
+def test_start_blocks_until_slot_is_released():
+    controller = _controller(initial_rate=60000.0, initial_concurrency=1)
+    controller.start()
+    threading.Timer(0.05, controller.finish).start()
+
+    waited = controller.start()
+
+    assert waited > 0
+    controller.finish()
+
+
+def test_steady_state_persists_across_runs(tmp_path):
+    first = _controller(tmp_path, initial_rate=60.0)
+    first.record_throttle()
+    first.record_success(0.1)
+    first.flush()
+
+    state = json.loads((tmp_path / "aimd_state.json").read_text())
+    assert state["requests_per_minute"] == pytest.approx(first.rate)
+
+    second = _controller(tmp_path, initial_rate=60.0)
+    assert second.rate == pytest.approx(first.rate)
+    assert second.concurrency == first.concurrency
+
+
+def test_metrics_log_records_throughput(tmp_path):
+    controller = _controller(tmp_path, initial_rate=60000.0)
+    for _ in range(3):
+        controller.start()
+        controller.finish()
+        controller.record_success(0.05)
+    controller.record_throttle()
+    controller.flush()
+
+    lines = (tmp_path / "aimd_metrics.jsonl").read_text().splitlines()
+    snapshot = json.loads(lines[-1])
+    assert snapshot["successes"] == 3
+    assert snapshot["throttles"] == 1
+    assert snapshot["throughput_rpm"] > 0
+    assert snapshot["rate_rpm"] == pytest.approx(controller.rate)
+
+
+def test_corrupt_state_file_is_ignored(tmp_path):
+    (tmp_path / "aimd_state.json").write_text("{not json")
+    controller = _controller(tmp_path, initial_rate=42.0)
+    assert controller.rate == pytest.approx(42.0)
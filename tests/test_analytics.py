@@ -0,0 +1,68 @@
+import sqlite3
+
+import pytest
+
+from src.nba_stats.db import analytics
+from src.nba_stats.scripts.create_tables import (
+    create_games_table,
+    create_player_season_skill_table,
+    create_true_possessions_table,
+)
+from src.nba_stats.utils.true_possessions import POSSESSION_COLUMNS
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "analytics.db")
+    conn = sqlite3.connect(path)
+    create_games_table(conn)
+    create_player_season_skill_table(conn)
+    create_true_possessions_table(conn)
+    conn.execute(f"CREATE TABLE Possessions (game_id TEXT, event_num INTEGER, "
+                 f"{', '.join(f'{column} INTEGER' for column in analytics.LINEUP_COLUMNS)})")
+    conn.execute("CREATE TABLE PlayerArchetypeFeatures_2022_23 (player_id INTEGER, archetype_id INTEGER)")
+    conn.executemany("INSERT INTO Games (game_id, game_date, home_team_id, away_team_id, season, season_type) "
+                     "VALUES (?, '2023-01-01', 1, 2, ?, 'Regular Season')",
+                     [("0022200001", "2022-23"), ("0022100001", "2021-22")])
+    conn.executemany("INSERT INTO PlayerSeasonSkill (player_id, season) VALUES (?, '2022-23')",
+                     [(p,) for p in range(1, 11)])
+    conn.executemany("INSERT INTO PlayerArchetypeFeatures_2022_23 VALUES (?, ?)", [(p, p % 8) for p in range(1, 11)])
+
+    lineups = [list(range(1, 11)), list(range(1, 10)) + [11], list(range(1, 10)) + [None]]
+    conn.executemany(f"INSERT INTO Possessions VALUES ({', '.join('?' * 12)})",
+                     [("0022200001", n, *lineup) for n, lineup in enumerate(lineups, start=1)]
+                     + [("0022100001", 1, *range(1, 11))])
+    for n, lineup in enumerate(lineups[:2], start=1):
+        row = {column: 0 for column in POSSESSION_COLUMNS}
+        row.update({"season": "2022-23", "possession_num": n, "points": n, "end_reason": "turnover"})
+        row.update({f"off_player_{i}_id": lineup[i - 1] for i in range(1, 6)})
+        row.update({f"def_player_{i}_id": lineup[i + 4] for i in range(1, 6)})
+        conn.execute(f"INSERT INTO TruePossessions (game_id, {', '.join(row)}) VALUES ('0022200001', "
+                     f"{', '.join('?' * len(row))})", list(row.values()))
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_aggregate_checks_on_sqlite(db_path):
+    conn = analytics.connect_analytics(db_path, engine="sqlite")
+    try:
+        assert analytics.possessions_by_season(conn, ["2022-23", "2021-22", "2020-21"]) == {
+            "2022-23": 3, "2021-22": 1, "2020-21": 0}
+        assert analytics.lineup_rating_coverage(conn, "2022-23", "PlayerArchetypeFeatures_2022_23") == {
+            "join_success": 1, "total": 3, "failures": {(10, 9, 9): 1, (9, 9, 9): 1}}
+        assert analytics.season_player_overlap(conn, "2022-23") == {"players": 11, "rated": 10, "darko_players": 10}
+        assert analytics.rated_possessions(conn, "2022-23")["points"].tolist() == [1]
+    finally:
+        conn.close()
+
+    with pytest.raises(ValueError):
+        analytics.connect_analytics(db_path, engine="postgres")
+
+
+@pytest.mark.skipif(not analytics.DUCKDB_AVAILABLE, reason="duckdb not installed")
+def test_duckdb_returns_the_same_results_as_sqlite(db_path):
+    records = analytics.benchmark(db_path, ["2022-23"], engines=["sqlite", "duckdb"], threads=2)
+
+    assert [r for r in records if r["error"] or not r["matches"]] == []
+    assert {(r["engine"], r["check"]) for r in records} >= {("duckdb", check) for check in analytics.CHECKS}
@@ -0,0 +1,114 @@
+import asyncio
+import threading
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.nba_stats.api.cache_store import SQLiteCacheBackend
+from src.nba_stats.config import settings
+from src.nba_stats.api.async_nba_stats_client import AsyncNBAStatsClient
+from src.nba_stats.api.nba_stats_client import NBAStatsClient
+
+MOCK_PBP_RESPONSE = {
+    "resultSets": [
+        {
+            "name": "PlayByPlay",
+            "headers": ["GAME_ID", "EVENTNUM", "EVENTMSGTYPE"],
+            "rowSet": [["0022300001", 1, 12]]
+        }
+    ]
+}
+
+
+@pytest.fixture
+def temp_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "USE_SHARED_RATE_LIMITER", False)
+    store = SQLiteCacheBackend(tmp_path / "api_cache.db")
+    yield store
+    store.close()
+
+
+def _make_app(state):
+    async def handler(request):
+        state["calls"] += 1
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        await asyncio.sleep(0.05)
+        state["in_flight"] -= 1
+        return web.json_response(MOCK_PBP_RESPONSE)
+
+    app = web.Application()
+    app.router.add_get("/stats/playbyplayv2", handler)
+    return app
+
+
+def test_async_client_bounds_in_flight_requests(temp_cache):
+    state = {"calls": 0, "in_flight": 0, "max_in_flight": 0}
+
+    async def run():
+        async with TestServer(_make_app(state)) as server:
+            async with AsyncNBAStatsClient(max_in_flight=3, requests_per_minute=60000, cache=temp_cache) as client:
+                client.base_url = str(server.make_url("/stats"))
+                game_ids = [f"00223000{i:02d}" for i in range(10)]
+                return await asyncio.gather(*(client.get_play_by_play(g) for g in game_ids))
+
+    results = asyncio.run(run())
+
+    assert len(results) == 10
+    assert all(r == MOCK_PBP_RESPONSE for r in results)
+    assert state["calls"] == 10
+    assert 1 < state["max_in_flight"] <= 3
+
+
+def test_async_client_shares_cache_with_sync_client(temp_cache):
+    state = {"calls": 0, "in_flight": 0, "max_in_flight": 0}
+
+    async def run():
+        async with TestServer(_make_app(state)) as server:
+            async with AsyncNBAStatsClient(max_in_flight=2, requests_per_minute=60000, cache=temp_cache) as client:
+                client.base_url = str(server.make_url("/stats"))
+                return await client.get_play_by_play("0022300001")
+
+    assert asyncio.run(run()) == MOCK_PBP_RESPONSE
+    assert state["calls"] == 1
+
+    # The synchronous client must find the async client's payload under the same cache key
+    sync_client = NBAStatsClient(cache=temp_cache)
+    sync_client.base_url = "http://127.0.0.1:9/unreachable"
+    assert sync_client.get_play_by_play("0022300001") == MOCK_PBP_RESPONSE
+
+
+def test_cache_reads_run_off_the_loop_and_stale_hits_still_refresh(temp_cache, mocker):
+    state = {"calls": 0, "in_flight": 0, "max_in_flight": 0}
+    threads = []
+    get = temp_cache.get
+    mocker.patch.object(temp_cache, "get", side_effect=lambda key: threads.append(threading.get_ident()) or get(key))
+
+    async def run():
+        async with TestServer(_make_app(state)) as server:
+            async with AsyncNBAStatsClient(max_in_flight=2, requests_per_minute=60000, cache=temp_cache) as client:
+                client.base_url = str(server.make_url("/stats"))
+                await client.get_play_by_play("0022300001")
+                mocker.patch("src.nba_stats.api.nba_stats_client.classify_entry", return_value="stale")
+                return await client.get_play_by_play("0022300001"), threading.get_ident()
+
+    data, loop_thread = asyncio.run(run())
+
+    assert data == MOCK_PBP_RESPONSE
+    assert len(threads) == 2 and loop_thread not in threads
+    assert state["calls"] == 2  # the first miss, then the background refresh awaited by close()
+
+
+def test_a_failing_limiter_releases_the_async_slot(temp_cache, mocker):
+    limiter = mocker.Mock()
+    limiter.try_acquire.side_effect = OSError("limiter database is locked")
+
+    async def run():
+        async with AsyncNBAStatsClient(max_in_flight=2, requests_per_minute=60000, cache=temp_cache,
+                                       rate_limiter=limiter) as client:
+            with pytest.raises(OSError):
+                await client._fetch_from_upstream_async("key", "/playbyplayv2", {"GameID": "0022300001"})
+            return client.controller.stats()["in_flight"]
+
+    assert asyncio.run(run()) == 0
@@ -0,0 +1,54 @@
+import sqlite3
+
+import pytest
+
+from src.nba_stats.db.bulk_load import bulk_load, get_secondary_indexes
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(tmp_path / "bulk.db")
+    conn.executescript("""
+        CREATE TABLE Possessions (game_id TEXT NOT NULL, event_num INTEGER NOT NULL, player1_id INTEGER,
+                                  PRIMARY KEY (game_id, event_num));
+        CREATE INDEX idx_possessions_player1 ON Possessions(player1_id);
+    """)
+    yield conn
+    conn.close()
+
+
+def _pragma(conn, name):
+    return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def test_bulk_load_tunes_connection_and_restores_it(conn):
+    before = {name: _pragma(conn, name) for name in ("synchronous", "cache_size", "mmap_size")}
+
+    with bulk_load(conn, cache_size_kib=65536, mmap_size=1 << 26):
+        assert _pragma(conn, "journal_mode") == "wal"
+        assert _pragma(conn, "synchronous") == 1  # NORMAL
+        assert _pragma(conn, "cache_size") == -65536
+
+    assert {name: _pragma(conn, name) for name in before} == before
+    assert _pragma(conn, "journal_mode") == "wal"
+
+
+def test_drop_indexes_rebuilds_them_after_the_load(conn):
+    with bulk_load(conn, "Possessions", drop_indexes=True):
+        assert get_secondary_indexes(conn, "Possessions") == []
+        conn.executemany("INSERT INTO Possessions VALUES ('0022300001', ?, ?)", [(i, 2544) for i in range(100)])
+        conn.commit()
+
+    assert [name for name, _ in get_secondary_indexes(conn, "Possessions")] == ["idx_possessions_player1"]
+    plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM Possessions WHERE player1_id = 2544").fetchall()
+    assert "idx_possessions_player1" in plan[0][-1]
+
+
+def test_indexes_are_rebuilt_when_the_load_fails(conn):
+    with pytest.raises(RuntimeError):
+        with bulk_load(conn, "Possessions", drop_indexes=True):
+            conn.execute("INSERT INTO Possessions VALUES ('0022300001', 1, 2544)")
+            raise RuntimeError("fetch failed")
+
+    assert conn.execute("SELECT COUNT(*) FROM Possessions").fetchone()[0] == 0
+    assert len(get_secondary_indexes(conn, "Possessions")) == 1
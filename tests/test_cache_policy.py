@@ -0,0 +1,94 @@
+import time
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock
+
+from src.nba_stats.api.cache_policy import NEVER_EXPIRES, classify_entry, is_final, policy_for
+from src.nba_stats.api.cache_store import SQLiteCacheBackend
+from src.nba_stats.api.nba_stats_client import NBAStatsClient
+from src.nba_stats.config import settings
+
+TODAY = date(2024, 12, 15)
+
+
+def _pbp(last_event_type, period, margin="7"):
+    return {"resultSets": [{
+        "name": "PlayByPlay",
+        "headers": ["GAME_ID", "EVENTNUM", "EVENTMSGTYPE", "PERIOD", "SCOREMARGIN"],
+        "rowSet": [["0022400001", 1, 12, 1, None], ["0022400001", 2, 1, period, margin],
+                   ["0022400001", 3, last_event_type, period, None]],
+    }]}
+
+
+def test_completed_season_responses_never_expire():
+    assert policy_for("/playbyplayv2", {"GameID": "0021800001"}, today=TODAY) == NEVER_EXPIRES
+    assert policy_for("/leaguedashptstats", {"Season": "2018-19"}, today=TODAY) == NEVER_EXPIRES
+    assert policy_for("/shotchartdetail", {"Season": "2023-24"}, today=TODAY) == NEVER_EXPIRES
+
+
+def test_current_season_policies_depend_on_endpoint_and_game_state():
+    dashboard = policy_for("/leaguedashptstats", {"Season": "2024-25"}, today=TODAY)
+    assert dashboard.ttl == timedelta(hours=6)
+
+    assert policy_for("commonplayerinfo", {"PlayerID": 2544}, today=TODAY).ttl == timedelta(weeks=1)
+
+    in_progress = policy_for("/playbyplayv2", {"GameID": "0022400001"}, _pbp(1, 3), today=TODAY)
+    assert in_progress.ttl == timedelta(minutes=15)
+    assert is_final("/playbyplayv2", {"GameID": "0022400001"}, _pbp(13, 4), today=TODAY)
+
+
+def test_tied_end_of_regulation_is_not_final():
+    params = {"GameID": "0022400001"}
+    assert not is_final("/playbyplayv2", params, _pbp(13, 4, margin="TIE"), today=TODAY)
+    assert not is_final("/playbyplayv2", params, _pbp(13, 5, margin="TIE"), today=TODAY)
+    assert is_final("/playbyplayv2", params, _pbp(13, 5, margin="-3"), today=TODAY)
+    assert policy_for("/playbyplayv2", params, _pbp(13, 4, margin="TIE"), today=TODAY).ttl == timedelta(minutes=15)
+
+
+def test_classify_entry_windows():
+    policy = policy_for("/leaguedashptstats", {"Season": "2024-25"}, today=TODAY)
+    now = datetime(2024, 12, 15, 12, 0)
+    assert classify_entry(policy, now - timedelta(hours=1), now) == "fresh"
+    assert classify_entry(policy, now - timedelta(hours=10), now) == "stale"
+    assert classify_entry(policy, now - timedelta(days=3), now) == "expired"
+
+
+def test_stale_hit_is_served_and_refreshed_in_background(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "USE_SHARED_RATE_LIMITER", False)
+    store = SQLiteCacheBackend(tmp_path / "api_cache.db")
+    client = NBAStatsClient(cache=store)
+    monkeypatch.setattr(client, "_wait_for_rate_limit", lambda: None)
+
+    params = {"Season": "2099-00", "PtMeasureType": "Drives"}
+    key = client._get_cache_key("/leaguedashptstats", params)
+    stale_payload = {"resultSets": [{"name": "Old", "headers": ["A"], "rowSet": [[1]]}]}
+    fresh_payload = {"resultSets": [{"name": "New", "headers": ["A"], "rowSet": [[2]]}]}
+    store.put(key, stale_payload, endpoint="/leaguedashptstats",
+              fetched_at=time.time() - timedelta(hours=8).total_seconds())
+
+    response = MagicMock(status_code=200, headers={})
+    response.json.return_value = fresh_payload
+    client.session.get = MagicMock(return_value=response)
+
+    assert client.make_request("/leaguedashptstats", dict(params)) == stale_payload
+
+    deadline = time.time() + 5
+    while time.time() < deadline and store.get(key).data != fresh_payload:
+        time.sleep(0.05)
+    assert store.get(key).data == fresh_payload
+    assert client.session.get.call_count == 1
+    store.close()
+
+
+def test_mid_season_entry_stays_live_after_the_season_ends(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "USE_SHARED_RATE_LIMITER", False)
+    store = SQLiteCacheBackend(tmp_path / "api_cache.db")
+    client = NBAStatsClient(cache=store)
+
+    params = {"Season": "2024-25", "PtMeasureType": "Drives"}
+    key = client._get_cache_key("/leaguedashptstats", params)
+    mid_season = datetime(2025, 1, 15, 12, 0).timestamp()
+    store.put(key, {"resultSets": []}, endpoint="/leaguedashptstats", fetched_at=mid_season)
+
+    # Read long after the 2024-25 season is over: the January payload is still a mid-season one.
+    assert client._read_from_cache(key, "/leaguedashptstats", params, revalidate=False) is None
+    store.close()
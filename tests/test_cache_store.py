@@ -0,0 +1,121 @@
+import json
+import sqlite3
+import time
+
+import pytest
+
+from src.nba_stats.api.cache_store import CacheBackend, SQLiteCacheBackend
+from src.nba_stats.api.nba_stats_client import NBAStatsClient
+from src.nba_stats.config import settings
+
+PAYLOAD = {"resultSets": [{"name": "PlayByPlay", "headers": ["A"], "rowSet": [[i] for i in range(200)]}]}
+
+
+@pytest.fixture
+def store(tmp_path):
+    backend = SQLiteCacheBackend(tmp_path / "api_cache.db")
+    yield backend
+    backend.close()
+
+
+def test_round_trip_compresses_and_counts_hits(store):
+    store.put("abc", PAYLOAD, endpoint="/playbyplayv2", params={"GameID": "0022300001"})
+
+    entry = store.get("abc")
+    assert entry.data == PAYLOAD
+    assert entry.endpoint == "/playbyplayv2"
+    assert store.get("missing") is None
+
+    stats = store.stats()
+    assert stats["entries"] == 1
+    assert stats["payload_bytes"] < stats["uncompressed_bytes"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == pytest.approx(0.5)
+
+
+def test_lru_eviction_keeps_recently_used_entries(store):
+    for key in ("a", "b", "c"):
+        store.put(key, PAYLOAD)
+        time.sleep(0.01)
+    entry_size = store.stats()["payload_bytes"] // 3
+
+    store.get("a")  # "b" is now least recently used
+    store.evict(max_bytes=entry_size * 2)
+
+    assert store.get("b") is None
+    assert store.get("a") is not None
+    assert store.get("c") is not None
+    assert store.stats()["evictions"] == 1
+
+
+def test_import_file_cache_preserves_request_keys(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "USE_SHARED_RATE_LIMITER", False)
+    legacy_dir = tmp_path / "legacy"
+    legacy_dir.mkdir()
+    client = NBAStatsClient(cache=store)
+    key = client._get_cache_key("/playbyplayv2", {"GameID": "0022300001"})
+    with open(legacy_dir / f"{key}.json", "w") as f:
+        json.dump(PAYLOAD, f)
+
+    assert store.import_file_cache(legacy_dir, delete_files=True) == 1
+    assert not list(legacy_dir.glob("*.json"))
+    assert client._read_from_cache(key) == PAYLOAD
+
+
+def test_hits_are_written_back_in_batches(tmp_path):
+    store = SQLiteCacheBackend(tmp_path / "api_cache.db", access_flush_entries=2, access_flush_seconds=3600)
+    store.put("a", PAYLOAD)
+    store.put("b", PAYLOAD)
+    reader = sqlite3.connect(tmp_path / "api_cache.db")
+
+    def persisted():
+        counters = dict(reader.execute("SELECT name, value FROM ApiCacheCounters WHERE name IN ('hits', 'misses')"))
+        touched = reader.execute("SELECT COUNT(*) FROM ApiCache WHERE last_accessed > fetched_at").fetchone()[0]
+        return counters, touched
+
+    store.get("a")
+    store.get("missing")
+    assert persisted() == ({}, 0)
+
+    store.get("b")  # the second pending key triggers the write-back
+    assert persisted() == ({"hits": 2, "misses": 1}, 2)
+
+    store.get("a")
+    store.close()
+    assert persisted()[0] == {"hits": 3, "misses": 1}
+    reader.close()
+
+
+def test_the_running_size_total_matches_the_table(store, tmp_path):
+    def total():
+        return store._conn.execute("SELECT value FROM ApiCacheCounters WHERE name = 'payload_bytes'").fetchone()[0]
+
+    def summed():
+        return store._conn.execute("SELECT SUM(size) FROM ApiCache").fetchone()[0] or 0
+
+    for key in ("a", "b", "c"):
+        store.put(key, PAYLOAD)
+    store.put("a", {"resultSets": []})
+    store.delete("b")
+    assert total() == summed() > 0
+    store.evict(max_bytes=0)
+    assert total() == summed() == 0
+
+    # A store written before the total existed is summed once when it is opened
+    store.put("d", PAYLOAD)
+    store._conn.executescript("DROP TRIGGER api_cache_size_insert; DROP TRIGGER api_cache_size_update; "
+                              "DROP TRIGGER api_cache_size_delete; DELETE FROM ApiCacheCounters;")
+    reopened = SQLiteCacheBackend(tmp_path / "api_cache.db")
+    assert reopened._conn.execute("SELECT value FROM ApiCacheCounters WHERE name = 'payload_bytes'").fetchone()[0] \
+        == summed() > 0
+    reopened.close()
+
+
+def test_backends_must_implement_the_interface():
+    class GetOnly(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnly()
@@ -0,0 +1,72 @@
+import os
+import sqlite3
+
+import pytest
+
+from src.nba_stats.db.connection import ConnectionFactory
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "pool.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE Teams (team_id INTEGER PRIMARY KEY, team_name TEXT)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def factory(db_path):
+    factory = ConnectionFactory(db_path, max_idle=2)
+    yield factory
+    factory.close_all()
+
+
+def test_connections_are_tuned_and_reused(factory):
+    conn = factory.checkout()
+    pragmas = {pragma: conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+               for pragma in ("journal_mode", "synchronous", "foreign_keys", "temp_store", "busy_timeout")}
+    conn.close()
+    conn.close()  # A second close is harmless
+
+    assert pragmas == {"journal_mode": "wal", "synchronous": 1, "foreign_keys": 1, "temp_store": 2,
+                       "busy_timeout": 30000}
+    assert factory.checkout() is conn
+    stats = factory.stats()
+    assert (stats["checkouts"], stats["connections_opened"], stats["pool_hits"]) == (2, 1, 1)
+    assert stats["checkout_latency"]["count"] == 2
+
+
+def test_returned_connections_are_rolled_back_and_reset(factory):
+    conn = factory.checkout(row_factory=sqlite3.Row)
+    conn.execute("INSERT INTO Teams VALUES (1, 'Lakers')")
+    conn.close()
+
+    conn = factory.checkout()
+    assert conn.row_factory is None
+    assert conn.execute("SELECT COUNT(*) FROM Teams").fetchone() == (0,)
+
+    with factory.connection() as conn:
+        conn.execute("INSERT INTO Teams VALUES (1, 'Lakers')")
+    assert factory.stats()["checked_out"] == 1
+
+
+def test_read_only_connections_reject_writes(db_path):
+    factory = ConnectionFactory(db_path, read_only=True)
+    with factory.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM Teams").fetchone() == (0,)
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO Teams VALUES (1, 'Lakers')")
+    factory.close_all()
+
+
+def test_idle_connections_to_a_replaced_file_are_discarded(factory, db_path):
+    factory.checkout().close()
+    replacement = db_path.with_name("replacement.db")
+    sqlite3.connect(replacement).close()
+    os.replace(replacement, db_path)
+
+    conn = factory.checkout()
+    assert conn.execute("SELECT name FROM sqlite_master").fetchall() == []
+    assert factory.stats()["connections_opened"] == 2
@@ -0,0 +1,167 @@
+import json
+import shutil
+import sqlite3
+import struct
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+import data_protection
+from data_protection import BackupError, DataProtection
+
+
+@pytest.fixture
+def protection(tmp_path, monkeypatch):
+    # The key and audit log live under the working directory
+    monkeypatch.chdir(tmp_path)
+    return DataProtection(config=None)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "live.db")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE Possessions (id INTEGER PRIMARY KEY, description TEXT)")
+    conn.executemany("INSERT INTO Possessions (description) VALUES (?)",
+                     [(f"LeBron James 26' 3PT Jump Shot {i}",) for i in range(5000)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _rows(path):
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT id, description FROM Possessions ORDER BY id").fetchall()
+    conn.close()
+    return rows
+
+
+def test_streaming_backup_round_trip(protection, db_path, tmp_path):
+    details = protection.create_secure_backup(db_path, str(tmp_path / "backups" / "full.enc"),
+                                              compress=True, chunk_size=16384, trace_memory=True)
+
+    assert details["kind"] == "full" and details["frames"] > 1
+    assert details["size"] < details["database_bytes"]
+    assert details["peak_traced_bytes"] > 0 and details["snapshot_seconds"] >= 0
+    assert b"LeBron" not in (tmp_path / "backups" / "full.enc").read_bytes()
+
+    restored = protection.restore_from_backup(str(tmp_path / "backups" / "full.enc"), str(tmp_path / "restored.db"))
+    assert restored["resumed_from"] is None
+    assert _rows(tmp_path / "restored.db") == _rows(db_path)
+
+
+def test_snapshot_is_private_and_outside_the_backup_directory(protection, db_path, tmp_path, monkeypatch):
+    snapshots = []
+    snapshot = DataProtection._snapshot
+
+    def spy(source_path, snapshot_path):
+        snapshots.append(Path(snapshot_path))
+        snapshot(source_path, snapshot_path)
+
+    monkeypatch.setattr(DataProtection, "_snapshot", staticmethod(spy))
+    backups = tmp_path / "backups"
+    protection.create_secure_backup(db_path, str(backups / "full.enc"), snapshot_dir=str(tmp_path))
+
+    (path,) = snapshots
+    assert backups not in path.parents
+    assert sorted(p.name for p in backups.iterdir()) == ["full.enc", "full.enc.pages"]
+    assert not path.parent.exists()
+
+
+def test_memory_tracing_is_opt_in(protection, db_path, tmp_path):
+    details = protection.create_secure_backup(db_path, str(tmp_path / "full.enc"))
+    assert "peak_traced_bytes" not in details and not tracemalloc.is_tracing()
+
+    # Tracing started elsewhere is reported on but left running
+    tracemalloc.start()
+    try:
+        details = protection.restore_from_backup(str(tmp_path / "full.enc"), str(tmp_path / "restored.db"),
+                                                 trace_memory=True)
+        assert details["peak_traced_bytes"] > 0 and tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_restore_authenticates_the_header_as_written(protection, db_path, tmp_path, monkeypatch):
+    # A writer that serializes its header differently (indented, unsorted) still restores
+    dumps = json.dumps
+    monkeypatch.setattr(json, "dumps", lambda obj, sort_keys=False, **kwargs: dumps(obj, indent=1, **kwargs))
+    backup = tmp_path / "full.enc"
+    protection.create_secure_backup(db_path, str(backup))
+    monkeypatch.undo()
+    protection.restore_from_backup(str(backup), str(tmp_path / "restored.db"), resume=False)
+    assert _rows(tmp_path / "restored.db") == _rows(db_path)
+
+    # Re-serializing the same header changes its bytes, which the frames are bound to
+    data = backup.read_bytes()
+    (length,) = struct.unpack(">I", data[8:12])
+    rewritten = json.dumps(json.loads(data[12:12 + length]), sort_keys=True).encode()
+    backup.write_bytes(data[:8] + struct.pack(">I", len(rewritten)) + rewritten + data[12 + length:])
+    with pytest.raises(BackupError, match="authentication"):
+        protection.restore_from_backup(str(backup), str(tmp_path / "restored.db"), resume=False)
+
+
+def test_missing_source_is_not_created(protection, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        protection.create_secure_backup(str(tmp_path / "typo.db"), str(tmp_path / "full.enc"))
+    assert not (tmp_path / "typo.db").exists() and not (tmp_path / "full.enc").exists()
+
+
+def test_incremental_backups_store_changed_pages(protection, db_path, tmp_path):
+    full = protection.create_secure_backup(db_path, str(tmp_path / "full.enc"))
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE Possessions SET description = 'Jokic Turnover' WHERE id = 10")
+    conn.executemany("INSERT INTO Possessions (description) VALUES (?)", [("Curry Free Throw",)] * 500)
+    conn.commit()
+    conn.close()
+
+    incremental = protection.create_secure_backup(db_path, str(tmp_path / "inc.enc"),
+                                                  incremental_from=str(tmp_path / "full.enc"), compress=True)
+    assert incremental["kind"] == "incremental"
+    assert 0 < incremental["pages_written"] < full["pages_written"] / 4
+
+    restored = protection.restore_from_backup(str(tmp_path / "inc.enc"), str(tmp_path / "restored.db"))
+    assert len(restored["chain"]) == 2
+    assert _rows(tmp_path / "restored.db") == _rows(db_path)
+
+
+def test_interrupted_restore_resumes(protection, db_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(data_protection, "RESTORE_CHECKPOINT_FRAMES", 2)
+    backup = tmp_path / "full.enc"
+    protection.create_secure_backup(db_path, str(backup), chunk_size=8192)
+    complete = backup.read_bytes()
+
+    # Cut the backup off halfway, as an interrupted copy would
+    backup.write_bytes(complete[:len(complete) // 2])
+    with pytest.raises(BackupError, match="truncated"):
+        protection.restore_from_backup(str(backup), str(tmp_path / "restored.db"))
+    assert not (tmp_path / "restored.db").exists()
+
+    backup.write_bytes(complete)
+    restored = protection.restore_from_backup(str(backup), str(tmp_path / "restored.db"))
+    assert restored["resumed_from"]["frame"] >= 2
+    assert _rows(tmp_path / "restored.db") == _rows(db_path)
+    assert not (tmp_path / "restored.db.restore.json").exists()
+
+
+def test_tampered_backup_is_rejected(protection, db_path, tmp_path):
+    backup = tmp_path / "full.enc"
+    protection.create_secure_backup(db_path, str(backup), chunk_size=8192)
+    data = bytearray(backup.read_bytes())
+    data[len(data) // 2] ^= 0x01
+    backup.write_bytes(bytes(data))
+
+    with pytest.raises(BackupError, match="authentication"):
+        protection.restore_from_backup(str(backup), str(tmp_path / "restored.db"), resume=False)
+    assert not (tmp_path / "restored.db").exists()
+
+
+def test_legacy_fernet_backup_still_restores(protection, db_path, tmp_path):
+    shutil.copy(db_path, tmp_path / "copy.db")
+    legacy = protection.cipher_suite.encrypt((tmp_path / "copy.db").read_bytes())
+    (tmp_path / "legacy.enc").write_bytes(legacy)
+
+    protection.restore_from_backup(str(tmp_path / "legacy.enc"), str(tmp_path / "restored.db"))
+    assert _rows(tmp_path / "restored.db") == _rows(db_path)
@@ -12,6 +12,8 @@ from pathlib import Path
 from datetime import datetime
 from typing import List
 
+import pandas as pd
+
 from src.nba_stats.services.database_writer import DatabaseWriter
 from src.nba_stats.models.database_dtos import (
     PlayerSeasonRawStatsDTO, 
@@ -432,6 +434,85 @@ class TestDatabaseWriterIntegration:
             points = cursor.fetchone()[0]
             assert points == 25
 
+    
+    def test_write_bulk_dataframe_upserts(self, temp_db):
+        """Test bulk upsert from a DataFrame, updating existing rows in place."""
+        writer = DatabaseWriter(temp_db)
+        df = pd.DataFrame({
+            "player_id": [1, 2],
+            "season": ["2024-25", "2024-25"],
+            "team_id": [1, 2],
+            "points": [20, None],  # float column with a NaN
+            "games_played": pd.array([82, None], dtype="Int64")
+        })
+        
+        result = writer.write_bulk("PlayerSeasonRawStats", df, chunk_size=1, audit_sample=2)
+        assert result.success is True
+        assert result.rows_affected == 2
+        
+        # Only the points column is written the second time; games_played keeps its value
+        update = df[["player_id", "season", "team_id"]].assign(points=[25, 30])
+        result = writer.write_bulk("PlayerSeasonRawStats", update)
+        assert result.success is True
+        
+        with sqlite3.connect(temp_db) as conn:
+            rows = conn.execute(
+                "SELECT player_id, points, games_played FROM PlayerSeasonRawStats ORDER BY player_id"
+            ).fetchall()
+        assert rows == [(1, 25, 82), (2, 30, None)]
+    
+    def test_write_bulk_tuples_and_dtos(self, temp_db, sample_raw_stats):
+        """Test bulk writes of pre-validated tuples and DTOs."""
+        writer = DatabaseWriter(temp_db)
+        
+        result = writer.write_bulk("PlayerSeasonRawStats", [(1, "2023-24", 1, 10)])
+        assert result.success is False
+        assert "columns are required" in result.error_message
+        
+        result = writer.write_bulk("PlayerSeasonRawStats", [(1, "2023-24", 1, 10)],
+                                   columns=["player_id", "season", "team_id", "points"])
+        assert result.success is True
+        
+        result = writer.write_bulk("PlayerSeasonRawStats", sample_raw_stats,
+                                   dto_class=PlayerSeasonRawStatsDTO, audit_sample=1)
+        assert result.success is True
+        assert result.rows_affected == 2
+        
+        with sqlite3.connect(temp_db) as conn:
+            count = conn.execute("SELECT COUNT(*) FROM PlayerSeasonRawStats WHERE created_at IS NOT NULL").fetchone()[0]
+        assert count == 3
+    
+    def test_write_bulk_rolls_back_and_rejects_unknown_columns(self, temp_db):
+        """Test that a failed bulk write leaves no rows and unknown columns fail the pre-flight check."""
+        writer = DatabaseWriter(temp_db)
+        
+        rows = [(1, "2024-25", 1, 20), (999, "2024-25", 1, 10)]  # player 999 does not exist
+        result = writer.write_bulk("PlayerSeasonRawStats", rows,
+                                   columns=["player_id", "season", "team_id", "points"], chunk_size=1)
+        assert result.success is False
+        assert "FOREIGN KEY constraint failed" in result.error_message
+        
+        result = writer.write_bulk("PlayerSeasonRawStats", pd.DataFrame({"player_id": [1], "rebounds": [5]}))
+        assert result.success is False
+        assert "rebounds" in result.error_message
+        
+        with sqlite3.connect(temp_db) as conn:
+            count = conn.execute("SELECT COUNT(*) FROM PlayerSeasonRawStats").fetchone()[0]
+        assert count == 0
+    
+    def test_schema_check_is_cached(self, temp_db, sample_raw_stats, mocker):
+        """Test that the schema is read once per table and DTO."""
+        writer = DatabaseWriter(temp_db)
+        table_info = mocker.spy(writer, "_get_table_info")
+        
+        for _ in range(3):
+            assert writer.write_player_season_raw_stats(sample_raw_stats).success is True
+        assert table_info.call_count == 1
+        
+        writer.clear_schema_cache()
+        assert writer.write_player_season_raw_stats(sample_raw_stats).success is True
+        assert table_info.call_count == 2
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
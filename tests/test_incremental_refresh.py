@@ -0,0 +1,181 @@
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.nba_stats.api.cache_policy import classify_entry, policy_for
+from src.nba_stats.api.cache_store import SQLiteCacheBackend
+from src.nba_stats.api.nba_stats_client import NBAStatsClient
+from src.nba_stats.db import ingestion_ledger as ledger
+from src.nba_stats.scripts import populate_games, populate_player_rebounding_stats as rebounding, run_population
+from src.nba_stats.scripts.populate_lineup_stats import _lineup_player_ids
+from src.nba_stats.utils.common_utils import filter_rows_by_player
+
+HOME, AWAY = 1610612747, 1610612743
+SCHEDULE = [
+    {"gameId": "0022400100", "gameDate": "2024-11-20", "teamId": HOME, "matchup": "LAL vs. DEN"},
+    {"gameId": "0022400100", "gameDate": "2024-11-20", "teamId": AWAY, "matchup": "DEN @ LAL"},
+    {"gameId": "0022400111", "gameDate": "2024-11-21", "teamId": HOME, "matchup": "LAL @ DEN"},
+    {"gameId": "0022400111", "gameDate": "2024-11-21", "teamId": AWAY, "matchup": "DEN vs. LAL"},
+]
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(tmp_path / "incremental.db")
+    conn.executescript("""
+        CREATE TABLE Games (game_id TEXT PRIMARY KEY, game_date TEXT, season TEXT, season_type TEXT,
+                            home_team_id INTEGER, away_team_id INTEGER, created_at TIMESTAMP, updated_at TIMESTAMP);
+        INSERT INTO Games (game_id, game_date, season) VALUES ('0022400099', '2024-11-20', '2024-25');
+        CREATE TABLE Possessions (game_id TEXT, event_num INTEGER,
+                                  home_player_1_id INTEGER, home_player_2_id INTEGER, home_player_3_id INTEGER,
+                                  home_player_4_id INTEGER, home_player_5_id INTEGER,
+                                  away_player_1_id INTEGER, away_player_2_id INTEGER, away_player_3_id INTEGER,
+                                  away_player_4_id INTEGER, away_player_5_id INTEGER);
+    """)
+    yield conn
+    conn.close()
+
+
+def test_games_from_the_latest_game_date_on_are_fetched_with_home_and_away(conn, mocker):
+    client = MagicMock()
+    client.get_schedule.return_value = [
+        {"gameId": "0022400099", "gameDate": "2024-11-20", "teamId": HOME, "matchup": "LAL vs. BOS"}] + SCHEDULE
+    mocker.patch.object(populate_games, "get_nba_stats_client", return_value=client)
+
+    since = populate_games.latest_game_date(conn, "2024-25")
+    new_games = populate_games.populate_games(conn, "2024-25", since=since)
+
+    assert since == "2024-11-20"
+    client.get_schedule.assert_called_once_with("2024-25", date_from="11/20/2024")
+    # 0022400100 shares the latest stored date but was not stored yet; 0022400099 was
+    assert new_games == ["0022400100", "0022400111"]
+    assert populate_games.populate_games(conn, "2024-25", since="2024-11-21") == []
+    assert conn.execute("SELECT home_team_id, away_team_id FROM Games WHERE game_id = '0022400111'").fetchone() == (AWAY, HOME)
+
+
+def test_league_rows_are_filtered_to_affected_players():
+    headers = ["PLAYER_ID", "TEAM_ID", "REB"]
+    rows = [[2544, HOME, 7.0], [203999, AWAY, 12.0], [None, AWAY, 0.0]]
+
+    assert filter_rows_by_player(headers, rows, None) == rows
+    assert filter_rows_by_player(headers, rows, [203999]) == [[203999, AWAY, 12.0]]
+    assert _lineup_player_ids("-2544-1626156-1629029-1630559-203076-") == {2544, 1626156, 1629029, 1630559, 203076}
+
+
+def test_league_wide_populator_upserts_only_the_given_players(tmp_path, mocker):
+    path = tmp_path / "rebounding.db"
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE PlayerSeasonReboundingStats (player_id INTEGER, season TEXT, team_id INTEGER, "
+               "rebounds_offensive REAL, rebounds_defensive REAL, rebounds_total REAL, rebound_chances_total REAL, "
+               "PRIMARY KEY (player_id, season))")
+    db.close()
+    client = MagicMock()
+    client.get_league_player_tracking_stats.return_value = {"resultSets": [{
+        "headers": ["PLAYER_ID", "TEAM_ID", "OREB", "DREB", "REB", "REB_CHANCES"],
+        "rowSet": [[2544, HOME, 1.0, 6.0, 7.0, 12.0], [203999, AWAY, 2.5, 10.0, 12.5, 20.0]],
+    }]}
+    mocker.patch.object(rebounding, "get_nba_stats_client", return_value=client)
+    mocker.patch.object(rebounding, "get_db_connection", side_effect=lambda: sqlite3.connect(path))
+
+    rebounding.populate_player_rebounding_stats("2024-25", player_ids=[203999])
+
+    db = sqlite3.connect(path)
+    assert db.execute("SELECT player_id FROM PlayerSeasonReboundingStats").fetchall() == [(203999,)]
+    db.close()
+
+
+def _step(step_num, kind, **kwargs):
+    return {"step_num": step_num, "description": f"step {step_num}", "incremental": kind,
+            "module": MagicMock(**kwargs)}
+
+
+def _ingest(conn, *game_ids):
+    """Stand-in for the possessions step: writes a successful ledger row per game."""
+    def load(season):
+        for game_id in game_ids:
+            ledger.record(conn, "nba_stats", "playbyplayv2", game_id, ledger.SUCCESS, row_count=2, season=season)
+        conn.commit()
+    return load
+
+
+def test_incremental_refresh_runs_only_new_games_and_affected_players(conn, mocker):
+    conn.execute("INSERT INTO Possessions VALUES ('0022400111', 1, 1, 2, 3, 4, 5, 11, 12, 13, 14, 15)")
+    conn.execute("INSERT INTO Possessions VALUES ('0022400111', 2, 1, 2, 3, 4, 6, 11, 12, 13, 14, 15)")
+    conn.execute("INSERT INTO Possessions VALUES ('0022400099', 1, 90, 91, 92, 93, 94, 95, 96, 97, 98, 99)")
+    ledger.create_ingestion_ledger_table(conn)
+    ledger.record(conn, "nba_stats", "playbyplayv2", "0022400099", ledger.SUCCESS, row_count=1, season="2024-25")
+    conn.execute("UPDATE IngestionLedger SET fetched_at = '2024-11-21 09:00:00'")
+    conn.commit()
+    games = _step(4, "games", return_value=["0022400111"])
+    possessions = _step(20, "possessions", side_effect=_ingest(conn, "0022400111"))
+    players = _step(7, "players")
+    full_only = {"step_num": 1, "description": "teams", "module": MagicMock()}
+    mocker.patch.object(run_population, "POPULATION_CONFIG", [full_only, games, players, possessions])
+
+    summary = run_population.run_incremental("2024-25", conn)
+
+    games["module"].assert_called_once_with("2024-25", since="2024-11-20")
+    possessions["module"].assert_called_once_with("2024-25")
+    players["module"].assert_called_once_with("2024-25", player_ids=[1, 2, 3, 4, 5, 6, 11, 12, 13, 14, 15])
+    full_only["module"].assert_not_called()
+    assert (summary["new_games"], summary["ingested_games"], summary["affected_players"]) == (1, 1, 11)
+
+
+def test_incremental_refresh_retries_failed_games_without_new_games(conn, mocker):
+    # 0022400099 is already in Games, but its play-by-play failed on an earlier night
+    conn.execute("INSERT INTO Possessions VALUES ('0022400099', 1, 90, 91, 92, 93, 94, 95, 96, 97, 98, 99)")
+    conn.commit()
+    games = _step(4, "games", return_value=[])
+    possessions = _step(20, "possessions", side_effect=_ingest(conn, "0022400099"))
+    players = _step(7, "players")
+    mocker.patch.object(run_population, "POPULATION_CONFIG", [games, possessions, players])
+
+    summary = run_population.run_incremental("2024-25", conn)
+
+    possessions["module"].assert_called_once_with("2024-25")
+    players["module"].assert_called_once_with("2024-25", player_ids=[90, 91, 92, 93, 94, 95, 96, 97, 98, 99])
+    assert (summary["new_games"], summary["ingested_games"]) == (0, 1)
+
+
+def test_incremental_refresh_skips_players_when_nothing_was_ingested(conn, mocker):
+    games, possessions, players = _step(4, "games", return_value=[]), _step(20, "possessions"), _step(7, "players")
+    mocker.patch.object(run_population, "POPULATION_CONFIG", [games, possessions, players])
+
+    assert run_population.run_incremental("2024-25", conn)["new_games"] == 0
+    possessions["module"].assert_called_once_with("2024-25")
+    players["module"].assert_not_called()
+
+
+def test_incremental_refresh_refetches_dashboards_cached_by_the_previous_run(conn, tmp_path, mocker):
+    store = SQLiteCacheBackend(tmp_path / "api_cache.db")
+    client = NBAStatsClient(cache=store)
+    mocker.patch.object(client, "_wait_for_rate_limit", lambda: None)
+    params = {"Season": "2099-00", "PtMeasureType": "Rebounding"}
+    key = client._get_cache_key("/leaguedashptstats", params)
+    yesterday = {"resultSets": [{"name": "Yesterday", "headers": ["A"], "rowSet": [[1]]}]}
+    today = {"resultSets": [{"name": "Today", "headers": ["A"], "rowSet": [[2]]}]}
+    fetched_at = time.time() - timedelta(hours=24).total_seconds()
+    store.put(key, yesterday, endpoint="/leaguedashptstats", fetched_at=fetched_at)
+    # Inside the stale-while-revalidate window, so outside a refresh it would be served as-is
+    assert classify_entry(policy_for("/leaguedashptstats", params), datetime.fromtimestamp(fetched_at)) == "stale"
+    response = MagicMock(status_code=200, headers={})
+    response.json.return_value = today
+    client.session.get = MagicMock(return_value=response)
+
+    served = []
+    players = _step(7, "players", side_effect=lambda season, player_ids: served.append(
+        client.make_request("/leaguedashptstats", dict(params))))
+    possessions = _step(20, "possessions", side_effect=_ingest(conn, "0022400099"))
+    conn.execute("INSERT INTO Possessions VALUES ('0022400099', 1, 90, 91, 92, 93, 94, 95, 96, 97, 98, 99)")
+    conn.commit()
+    mocker.patch.object(run_population, "POPULATION_CONFIG", [_step(4, "games", return_value=[]), possessions, players])
+
+    run_population.run_incremental("2024-25", conn)
+
+    assert served == [today]
+    assert client.session.get.call_count == 1
+    assert store.get(key).data == today
+    store.close()
@@ -0,0 +1,51 @@
+import sqlite3
+
+import pytest
+
+from src.nba_stats.db import index_advisor as advisor
+from src.nba_stats.scripts.create_tables import (
+    create_games_table,
+    create_player_season_skill_table,
+    create_possessions_table,
+)
+from src.nba_stats.scripts.migrate_db import migrate_hot_query_indexes
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE Teams (team_id INTEGER PRIMARY KEY, team_name TEXT, team_abbreviation TEXT, team_city TEXT)")
+    conn.execute("CREATE TABLE Players (player_id INTEGER PRIMARY KEY, player_name TEXT)")
+    create_games_table(conn)
+    create_player_season_skill_table(conn)
+    create_possessions_table(conn)
+    yield conn
+    conn.close()
+
+
+def test_full_scans_are_flagged_until_the_migration_creates_their_indexes(conn):
+    findings = {(f.query, f.table): f for f in advisor.advise(conn)}
+
+    assert findings[("season_darko", "PlayerSeasonSkill")].index.name == "idx_player_season_skill_season"
+    assert findings[("get_games", "Games")].index.name == "idx_games_season"
+    # The view's scan is reported against its base table, with nothing to suggest
+    assert findings[("get_possessions_with_lineups", "PossessionEvents")].index is None
+    # The season join scans every event until Games can be searched by season
+    assert findings[("season_possessions", "PossessionEvents")].index.name == "idx_games_season"
+    # PlayerSeasonArchetypes and TruePossessions do not exist here
+    assert not any(query in ("season_archetypes", "season_true_possessions") for query, _ in findings)
+    assert advisor.migration_sql(findings.values()) == [
+        advisor.HOT_QUERY_INDEXES["idx_player_season_skill_season"].sql,
+        advisor.HOT_QUERY_INDEXES["idx_games_season"].sql,
+    ]
+
+    migrate_hot_query_indexes(conn)
+    migrate_hot_query_indexes(conn)
+
+    assert advisor.migration_sql(advisor.advise(conn)) == []
+    darko = next(q for q in advisor.hot_queries() if q.name == "season_darko")
+    assert advisor.query_plan(conn, darko) == [
+        "SEARCH PlayerSeasonSkill USING COVERING INDEX idx_player_season_skill_season (season=?)"]
+    season_possessions = next(q for q in advisor.hot_queries() if q.name == "season_possessions")
+    assert advisor.query_plan(conn, season_possessions) == [
+        "SEARCH g USING COVERING INDEX idx_games_season (season=?)", "SEARCH e USING PRIMARY KEY (game_id=?)"]
@@ -0,0 +1,169 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from src.nba_stats.db import ingestion_ledger as ledger
+from src.nba_stats.scripts import populate_possessions as possessions
+from src.nba_stats.utils.lineup_tracker import synthetic_play_by_play
+
+GAME_IDS = [f"00223000{i:02d}" for i in range(1, 5)]
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    ledger.create_ingestion_ledger_table(conn)
+    yield conn
+    conn.close()
+
+
+def _row(conn, key):
+    return conn.execute("SELECT status, row_count, payload_hash, attempts, error FROM IngestionLedger "
+                        "WHERE entity_key = ?", (key,)).fetchone()
+
+
+def test_record_upserts_and_a_failure_keeps_the_last_good_hash(conn):
+    ledger.record(conn, "nba_stats", "playbyplayv2", "0022300001", ledger.SUCCESS, row_count=450,
+                  payload_hash="abc", duration_seconds=1.5, season="2023-24")
+    ledger.record(conn, "nba_stats", "playbyplayv2", "0022300001", ledger.FAILED, error="timeout")
+
+    assert _row(conn, "0022300001") == ("failed", 450, "abc", 2, "timeout")
+    assert ledger.completed(conn, "nba_stats", "playbyplayv2") == set()
+    assert ledger.stored_hash(conn, "nba_stats", "playbyplayv2", "0022300001") is None
+
+    ledger.record(conn, "nba_stats", "playbyplayv2", "0022300001", ledger.SUCCESS, row_count=451, payload_hash="def")
+    assert ledger.completed(conn, "nba_stats", "playbyplayv2", "2023-24") == {"0022300001"}
+    assert ledger.progress(conn, "nba_stats", "playbyplayv2", "2023-24")["success"]["rows"] == 451
+
+
+
+def test_an_older_ledger_gains_the_source_hash_column():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE IngestionLedger (source TEXT NOT NULL, endpoint TEXT NOT NULL, entity_key TEXT NOT NULL, "
+                 "season TEXT, status TEXT NOT NULL, row_count INTEGER NOT NULL DEFAULT 0, payload_hash TEXT, "
+                 "fetched_at TIMESTAMP, duration_seconds REAL, attempts INTEGER NOT NULL DEFAULT 1, error TEXT, "
+                 "PRIMARY KEY (source, endpoint, entity_key)) WITHOUT ROWID")
+    ledger.create_ingestion_ledger_table(conn)
+    ledger.create_ingestion_ledger_table(conn)
+
+    ledger.record(conn, "derived", "true_possessions", "0022300001", ledger.SUCCESS, payload_hash="out", source_hash="in")
+    ledger.record(conn, "derived", "true_possessions", "0022300001", ledger.FAILED, error="bad events")
+    assert conn.execute("SELECT payload_hash, source_hash FROM IngestionLedger").fetchone() == ("out", "in")
+    conn.close()
+
+def test_payload_hash_tracks_content_not_index():
+    df = pd.DataFrame({"event_num": [1, 2], "score": ["2 - 0", None]})
+
+    assert ledger.payload_hash(df) == ledger.payload_hash(df.set_axis([10, 11]))
+    assert ledger.payload_hash(df) != ledger.payload_hash(df.assign(score=["2 - 0", "2 - 2"]))
+
+
+def _pbp(game_id, margin=1):
+    return pd.DataFrame({"GAME_ID": [game_id] * 3, "EVENTNUM": [1, 2, 3], "EVENTMSGTYPE": [1, 1, 1],
+                         "PERIOD": [1, 1, 1], "home_player_1_id": [2544] * 3, "offensive_team_id": [margin] * 3})
+
+
+@pytest.fixture
+def db_path(tmp_path, mocker):
+    path = tmp_path / "possessions.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE Games (game_id TEXT PRIMARY KEY, season TEXT, home_team_id INTEGER, away_team_id INTEGER);
+        CREATE TABLE Possessions (
+            game_id TEXT NOT NULL, event_num INTEGER NOT NULL, event_type INTEGER CHECK (event_type < 100),
+            period INTEGER, home_player_1_id INTEGER, offensive_team_id INTEGER,
+            PRIMARY KEY (game_id, event_num)
+        );
+    """)
+    conn.executemany("INSERT INTO Games VALUES (?, '2023-24', 1610612747, 1610612743)", [(g,) for g in GAME_IDS])
+    conn.commit()
+    conn.close()
+    mocker.patch.object(possessions, "get_db_connection", side_effect=lambda: sqlite3.connect(path))
+    return path
+
+
+def _ledger(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = dict(conn.execute("SELECT entity_key, status FROM IngestionLedger"))
+    conn.close()
+    return rows
+
+
+def test_ledger_rows_commit_with_the_data_and_drive_resumption(db_path, mocker):
+    def fetch(game_id, home, away, force_refresh=False):
+        if game_id == GAME_IDS[1]:
+            return pd.DataFrame()
+        df = _pbp(game_id)
+        if game_id == GAME_IDS[2]:
+            df.loc[1, "EVENTMSGTYPE"] = 500  # violates the CHECK constraint, so the write rolls back
+        return df
+
+    mocker.patch.object(possessions, "_fetch_pbp_for_game", side_effect=fetch)
+    possessions.populate_possessions("2023-24", workers=2)
+
+    assert _ledger(db_path) == {GAME_IDS[0]: "success", GAME_IDS[1]: "failed",
+                                GAME_IDS[2]: "failed", GAME_IDS[3]: "success"}
+
+    # Resumption reads the ledger, not the data table
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM Possessions")
+    conn.commit()
+    conn.close()
+    retry = mocker.patch.object(possessions, "_fetch_pbp_for_game", side_effect=lambda g, h, a, **kwargs: _pbp(g))
+    possessions.populate_possessions("2023-24", workers=1)
+
+    assert sorted(c.args[0] for c in retry.call_args_list) == [GAME_IDS[1], GAME_IDS[2]]
+    assert set(_ledger(db_path).values()) == {"success"}
+
+
+def test_refresh_rewrites_only_games_whose_payload_changed(db_path, mocker):
+    mocker.patch.object(possessions, "_fetch_pbp_for_game", side_effect=lambda g, h, a, **kwargs: _pbp(g))
+    possessions.populate_possessions("2023-24", workers=1)
+
+    mocker.patch.object(possessions, "_fetch_pbp_for_game",
+                        side_effect=lambda g, h, a, **kwargs: _pbp(g, margin=2 if g == GAME_IDS[0] else 1))
+    writer_cls = mocker.spy(possessions, "PossessionsWriter")
+    possessions.populate_possessions("2023-24", workers=1, refresh=True)
+
+    writer = writer_cls.spy_return
+    assert (writer.games_written, writer.unchanged_games) == (1, 3)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT DISTINCT offensive_team_id FROM Possessions WHERE game_id = ?",
+                        (GAME_IDS[0],)).fetchall() == [(2,)]
+    assert conn.execute("SELECT SUM(attempts) FROM IngestionLedger").fetchone()[0] == 8
+    conn.close()
+
+
+def test_refresh_fetches_past_the_cache(db_path, mocker):
+    cached = {g: synthetic_play_by_play(g, seed=1) for g in GAME_IDS}
+    # Upstream corrected one game after it was cached; final play-by-play never expires
+    upstream = {**cached, GAME_IDS[0]: synthetic_play_by_play(GAME_IDS[0], seed=2)}
+    client = mocker.Mock()
+    client.get_play_by_play.side_effect = lambda g, force_refresh=False: (upstream if force_refresh else cached)[g]
+    mocker.patch.object(possessions, "get_nba_stats_client", return_value=client)
+    possessions.populate_possessions("2023-24", workers=1)
+
+    writer_cls = mocker.spy(possessions, "PossessionsWriter")
+    possessions.populate_possessions("2023-24", workers=1, refresh=True)
+
+    assert [c.kwargs["force_refresh"] for c in client.get_play_by_play.call_args_list] == [False] * 4 + [True] * 4
+    writer = writer_cls.spy_return
+    assert (writer.games_written, writer.unchanged_games) == (1, 3)
+
+
+def test_existing_possessions_seed_the_ledger_once(db_path, mocker):
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO Possessions (game_id, event_num) VALUES (?, ?)",
+                     [(GAME_IDS[0], n) for n in range(1, 4)])
+    conn.commit()
+    conn.close()
+    fetch = mocker.patch.object(possessions, "_fetch_pbp_for_game", side_effect=lambda g, h, a, **kwargs: _pbp(g))
+
+    possessions.populate_possessions("2023-24", workers=1)
+
+    assert GAME_IDS[0] not in [c.args[0] for c in fetch.call_args_list]
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT season, row_count FROM IngestionLedger WHERE entity_key = ?",
+                        (GAME_IDS[0],)).fetchone() == ("2023-24", 3)
+    conn.close()
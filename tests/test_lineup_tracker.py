@@ -0,0 +1,147 @@
+import pandas as pd
+import pytest
+
+from src.nba_stats.api.result_set import decode_result_set
+from src.nba_stats.utils import lineup_tracker
+from src.nba_stats.utils.lineup_tracker import enrich_play_by_play, infer_period_starters, synthetic_play_by_play
+
+HOME, AWAY = 1610612747, 1610612743
+
+
+def _reference_lineups(pbp_df, home_team_id, away_team_id):
+    """Row-wise starter inference that populate_possessions used before the vectorized tracker."""
+    first_period_events = pbp_df[pbp_df['PERIOD'] == 1].sort_values(by='EVENTNUM')
+    player_to_team_map = {}
+    for _, row in pbp_df.iterrows():
+        for i in range(1, 4):
+            player_id = row[f'PLAYER{i}_ID']
+            team_id = row[f'PLAYER{i}_TEAM_ID']
+            if pd.notna(player_id) and pd.notna(team_id) and player_id not in player_to_team_map:
+                player_to_team_map[int(player_id)] = int(team_id)
+    home_players, away_players = set(), set()
+    for _, row in first_period_events.iterrows():
+        for i in range(1, 4):
+            player_id = row[f'PLAYER{i}_ID']
+            if pd.notna(player_id):
+                player_id = int(player_id)
+                team_id = player_to_team_map.get(player_id)
+                if team_id == home_team_id and len(home_players) < 5:
+                    home_players.add(player_id)
+                elif team_id == away_team_id and len(away_players) < 5:
+                    away_players.add(player_id)
+        if len(home_players) == 5 and len(away_players) == 5:
+            break
+    if len(home_players) != 5 or len(away_players) != 5:
+        return set(), set()
+    return home_players, away_players
+
+
+def _reference_enrich(pbp_df, home_team_id, away_team_id):
+    """Row-wise enrichment loop that populate_possessions used before the vectorized tracker."""
+    home_players, away_players = _reference_lineups(pbp_df, home_team_id, away_team_id)
+    if not home_players or not away_players:
+        return pd.DataFrame()
+    enriched_rows = []
+    for _, row in pbp_df.iterrows():
+        offensive_team_id = row.get('PLAYER1_TEAM_ID')
+        if pd.isna(offensive_team_id) and row.get('HOMEDESCRIPTION') is not None:
+            offensive_team_id = home_team_id
+        elif pd.isna(offensive_team_id) and row.get('VISITORDESCRIPTION') is not None:
+            offensive_team_id = away_team_id
+        defensive_team_id = home_team_id if offensive_team_id != home_team_id else away_team_id
+        row_data = row.to_dict()
+        (row_data['home_player_1_id'], row_data['home_player_2_id'], row_data['home_player_3_id'],
+         row_data['home_player_4_id'], row_data['home_player_5_id']) = sorted(list(home_players))
+        (row_data['away_player_1_id'], row_data['away_player_2_id'], row_data['away_player_3_id'],
+         row_data['away_player_4_id'], row_data['away_player_5_id']) = sorted(list(away_players))
+        row_data['offensive_team_id'] = offensive_team_id
+        row_data['defensive_team_id'] = defensive_team_id
+        enriched_rows.append(row_data)
+        if row.get('EVENTMSGTYPE') == 8:
+            player_out_id, player_in_id = row.get('PLAYER1_ID'), row.get('PLAYER2_ID')
+            sub_team_id = row.get('PLAYER1_TEAM_ID')
+            for team_id, players in ((home_team_id, home_players), (away_team_id, away_players)):
+                if sub_team_id == team_id:
+                    if player_in_id not in players and player_out_id in players:
+                        players.remove(player_out_id)
+                        players.add(player_in_id)
+    return pd.DataFrame(enriched_rows)
+
+
+def _game(seed, **kwargs):
+    return pd.DataFrame(decode_result_set(synthetic_play_by_play(f"00223{seed:05d}", seed=seed, **kwargs), name=0))
+
+
+# Golden set: games whose lineups only change through logged substitutions, including feed anomalies
+GOLDEN_GAMES = [dict(seed=seed, anomaly_rate=rate) for seed, rate in ((1, 0.0), (2, 0.05), (3, 0.2))] + [
+    dict(seed=4, periods=5, events_per_period=60), dict(seed=5, periods=1, events_per_period=40),
+]
+
+
+@pytest.mark.parametrize("game", GOLDEN_GAMES)
+@pytest.mark.parametrize("per_period_starters", [False, True])
+def test_matches_row_wise_output_on_golden_games(game, per_period_starters):
+    pbp_df = _game(**game)
+
+    expected = _reference_enrich(pbp_df, HOME, AWAY)
+    actual = enrich_play_by_play(pbp_df, HOME, AWAY, per_period_starters=per_period_starters)
+
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_carry_over_mode_matches_row_wise_output_across_unlogged_lineup_changes():
+    pbp_df = _game(seed=6, lineup_changes_between_periods=True)
+
+    pd.testing.assert_frame_equal(enrich_play_by_play(pbp_df, HOME, AWAY, per_period_starters=False),
+                                  _reference_enrich(pbp_df, HOME, AWAY))
+
+
+def test_per_period_starters_follow_unlogged_lineup_changes():
+    pbp_df = _game(seed=6, lineup_changes_between_periods=True)
+    enriched = enrich_play_by_play(pbp_df, HOME, AWAY)
+
+    for period in range(2, 5):
+        first_event = enriched[enriched["PERIOD"] == period].iloc[0]
+        home, away = infer_period_starters(pbp_df, HOME, AWAY, period=period)
+        assert [first_event[c] for c in lineup_tracker.HOME_LINEUP_COLUMNS] == sorted(home)
+        assert [first_event[c] for c in lineup_tracker.AWAY_LINEUP_COLUMNS] == sorted(away)
+    # The carried-over lineup is wrong after the first break
+    stale = enrich_play_by_play(pbp_df, HOME, AWAY, per_period_starters=False)
+    assert not stale[lineup_tracker.HOME_LINEUP_COLUMNS + lineup_tracker.AWAY_LINEUP_COLUMNS].equals(
+        enriched[lineup_tracker.HOME_LINEUP_COLUMNS + lineup_tracker.AWAY_LINEUP_COLUMNS])
+
+
+def test_period_starters_exclude_players_who_enter_as_substitutes():
+    pbp = {
+        "EVENTNUM": [1, 2, 3, 4, 5, 6, 7],
+        "PERIOD": [2] * 7,
+        "EVENTMSGTYPE": [1, 8, 1, 1, 1, 2, 2],
+        "PLAYER1_ID": [11, 12, 16, 13, 14, 15, 21], "PLAYER1_TEAM_ID": [HOME] * 6 + [AWAY],
+        "PLAYER2_ID": [0, 16, 0, 0, 0, 0, 0], "PLAYER2_TEAM_ID": [None, HOME] + [None] * 5,
+        "PLAYER3_ID": [0] * 7, "PLAYER3_TEAM_ID": [None] * 7,
+    }
+
+    home, away = infer_period_starters(pbp, HOME, AWAY, period=2)
+    legacy_home, _ = infer_period_starters(pbp, HOME, AWAY, period=2, exclude_subbed_in=False)
+
+    assert home == [11, 12, 13, 14, 15]
+    assert legacy_home == [11, 12, 16, 13, 14]
+    assert away == [21]
+
+
+def test_game_without_five_starters_is_skipped():
+    pbp_df = pd.DataFrame({
+        "EVENTNUM": [1, 2, 3], "PERIOD": [1, 1, 1], "EVENTMSGTYPE": [1, 2, 1],
+        "PLAYER1_ID": [11, 12, 21], "PLAYER1_TEAM_ID": [HOME, HOME, AWAY],
+        "PLAYER2_ID": [0, 0, 0], "PLAYER2_TEAM_ID": [None] * 3, "PLAYER3_ID": [0, 0, 0], "PLAYER3_TEAM_ID": [None] * 3,
+    })
+
+    assert enrich_play_by_play(pbp_df, HOME, AWAY).empty
+    assert _reference_enrich(pbp_df, HOME, AWAY).empty
+
+
+def test_benchmark_reports_events_per_second():
+    result = lineup_tracker.benchmark(games=2, events_per_period=40)
+
+    assert result["events"] == 2 * 4 * 40
+    assert result["events_per_second"] > 0
@@ -0,0 +1,103 @@
+import sqlite3
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.nba_stats.scripts import populate_player_shot_charts as shot_charts
+
+LAKERS, NUGGETS = 1610612747, 1610612743
+
+
+def _shot(player_id, team_id, game_id, made=1):
+    return [player_id, team_id, game_id, "Jump Shot", "Made Shot" if made else "Missed Shot", "2PT Field Goal",
+            "Mid-Range", "Center(C)", "16-24 ft.", 18, 5, 180, made]
+
+
+def _response(rows):
+    return {"resultSets": [
+        {"name": "Shot_Chart_Detail", "headers": shot_charts.SHOT_COLUMNS, "rowSet": rows},
+        {"name": "LeagueAverages", "headers": ["GRID_TYPE"], "rowSet": []},
+    ]}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "shots.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE PlayerSeasonRawStats (player_id INTEGER, team_id INTEGER, season TEXT);
+        CREATE TABLE Teams (team_id INTEGER PRIMARY KEY);
+        CREATE TABLE PlayerShotChart (
+            shot_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            player_id INTEGER NOT NULL, team_id INTEGER NOT NULL, game_id TEXT NOT NULL, season TEXT NOT NULL,
+            action_type TEXT, event_type TEXT, shot_type TEXT, shot_zone_basic TEXT, shot_zone_area TEXT,
+            shot_zone_range TEXT, shot_distance INTEGER, loc_x INTEGER, loc_y INTEGER, shot_made_flag INTEGER
+        );
+    """)
+    conn.executemany("INSERT INTO PlayerSeasonRawStats VALUES (?, ?, '2023-24')",
+                     [(2544, LAKERS), (203076, LAKERS), (203999, NUGGETS)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def mock_client(db_path, mocker):
+    client = MagicMock()
+    by_team = {
+        LAKERS: _response([_shot(2544, LAKERS, "0022300001"), _shot(203076, LAKERS, "0022300001", made=0),
+                           _shot(1629060, LAKERS, "0022300001")]),  # not in PlayerSeasonRawStats
+        NUGGETS: _response([_shot(203999, NUGGETS, "0022300001")]),
+    }
+    client.get_shot_chart_detail.side_effect = lambda player_id, team_id, season, **kwargs: by_team[team_id]
+    mocker.patch.object(shot_charts, "get_nba_stats_client", return_value=client)
+    mocker.patch.object(shot_charts, "get_db_connection", side_effect=lambda: sqlite3.connect(db_path))
+    return client
+
+
+def test_team_mode_issues_one_call_per_team(db_path, mock_client):
+    inserted = shot_charts.populate_shot_charts_bulk("2023-24", mode="team")
+
+    assert inserted == 3
+    assert mock_client.get_shot_chart_detail.call_count == 2
+    assert all(call.kwargs["player_id"] == 0 for call in mock_client.get_shot_chart_detail.call_args_list)
+
+    conn = sqlite3.connect(db_path)
+    per_player = dict(conn.execute("SELECT player_id, COUNT(*) FROM PlayerShotChart GROUP BY player_id"))
+    assert per_player == {2544: 1, 203076: 1, 203999: 1}
+    conn.close()
+
+
+def test_bulk_rerun_replaces_instead_of_duplicating(db_path, mock_client):
+    shot_charts.populate_shot_charts_bulk("2023-24", mode="team")
+    shot_charts.populate_shot_charts_bulk("2023-24", mode="team")
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM PlayerShotChart").fetchone()[0] == 3
+    conn.close()
+
+
+def test_league_mode_chunks_by_month_over_the_stored_game_dates(db_path, mocker):
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE Games (game_id TEXT PRIMARY KEY, game_date TEXT, season TEXT)")
+    # The 2019-20 season resumed in the bubble and ran into October 2020
+    conn.executemany("INSERT INTO Games VALUES (?, ?, '2019-20')",
+                     [("0021900001", "2019-10-22"), ("0021900970", "2020-07-30"), ("0041900406", "2020-10-11")])
+    conn.commit()
+    conn.close()
+    client = MagicMock()
+    client.get_shot_chart_detail.return_value = _response([])
+    mocker.patch.object(shot_charts, "get_nba_stats_client", return_value=client)
+    mocker.patch.object(shot_charts, "get_db_connection", side_effect=lambda: sqlite3.connect(db_path))
+
+    assert shot_charts.populate_shot_charts_bulk("2019-20", mode="league") == 0
+
+    calls = client.get_shot_chart_detail.call_args_list
+    ranges = {(c.kwargs["date_from"], c.kwargs["date_to"]) for c in calls}
+    assert len(ranges) == 13
+    assert {("10/22/2019", "10/31/2019"), ("02/01/2020", "02/29/2020"), ("07/01/2020", "07/31/2020"),
+            ("10/01/2020", "10/11/2020")} <= ranges
+    # Months without games (spring 2020) are empty answers, not failures to retry
+    assert all(c.kwargs["team_id"] == 0 and c.kwargs["allow_empty"] for c in calls)
+    assert shot_charts.populate_shot_charts_bulk("2023-24", mode="league") == 0
+    assert len(client.get_shot_chart_detail.call_args_list) == 13
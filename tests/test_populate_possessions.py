@@ -0,0 +1,169 @@
+import queue
+import sqlite3
+import threading
+
+import pandas as pd
+import pytest
+
+from src.nba_stats.config import settings
+from src.nba_stats.scripts import populate_possessions as possessions
+from src.nba_stats.scripts.create_tables import create_possessions_table
+
+GAME_IDS = [f"00223000{i:02d}" for i in range(1, 8)]
+
+
+def _pbp(game_id, events=3):
+    return pd.DataFrame({
+        "GAME_ID": [game_id] * (events + 1),
+        "EVENTNUM": list(range(1, events + 1)) + [events],  # last event duplicated by the API
+        "EVENTMSGTYPE": [1] * (events + 1),
+        "PERIOD": [1] * (events + 1),
+        "home_player_1_id": [2544] * (events + 1),
+        "offensive_team_id": [1610612747] * (events + 1),
+    })
+
+
+@pytest.fixture
+def db_path(tmp_path, mocker):
+    path = tmp_path / "possessions.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE Games (game_id TEXT PRIMARY KEY, season TEXT, home_team_id INTEGER, away_team_id INTEGER);
+        CREATE TABLE Possessions (
+            game_id TEXT NOT NULL, event_num INTEGER NOT NULL, event_type INTEGER CHECK (event_type < 100),
+            period INTEGER, home_player_1_id INTEGER, offensive_team_id INTEGER,
+            PRIMARY KEY (game_id, event_num)
+        );
+    """)
+    conn.executemany("INSERT INTO Games VALUES (?, '2023-24', 1610612747, 1610612743)", [(g,) for g in GAME_IDS])
+    conn.commit()
+    conn.close()
+    mocker.patch.object(possessions, "get_db_connection", side_effect=lambda: sqlite3.connect(path))
+    return path
+
+
+def _counts(db_path):
+    conn = sqlite3.connect(db_path)
+    counts = dict(conn.execute("SELECT game_id, COUNT(*) FROM Possessions GROUP BY game_id"))
+    conn.close()
+    return counts
+
+
+def test_workers_fetch_concurrently_and_all_games_are_written(db_path, mocker):
+    active, peak, lock = [0], [0], threading.Lock()
+    barrier = threading.Barrier(3, timeout=5)
+
+    def fetch(game_id, home_team_id, away_team_id, force_refresh=False):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        if game_id in GAME_IDS[:3]:
+            barrier.wait()  # only passes if three fetches are in flight at once
+        with lock:
+            active[0] -= 1
+        return _pbp(game_id)
+
+    mocker.patch.object(possessions, "_fetch_pbp_for_game", side_effect=fetch)
+    sleep = mocker.patch("time.sleep")
+
+    possessions.populate_possessions("2023-24", workers=3, games_per_transaction=4)
+
+    assert peak[0] >= 3
+    assert _counts(db_path) == {game_id: 3 for game_id in GAME_IDS}
+    sleep.assert_not_called()
+
+
+def test_failed_games_are_skipped_and_picked_up_on_rerun(db_path, mocker):
+    fetch = mocker.patch.object(possessions, "_fetch_pbp_for_game",
+                                side_effect=lambda g, h, a, **kwargs: pd.DataFrame() if g == GAME_IDS[2] else _pbp(g))
+
+    possessions.populate_possessions("2023-24", workers=2)
+    assert GAME_IDS[2] not in _counts(db_path)
+
+    fetch.reset_mock()
+    fetch.side_effect = lambda g, h, a, **kwargs: _pbp(g)
+    possessions.populate_possessions("2023-24", workers=2)
+
+    assert fetch.call_count == 1
+    assert fetch.call_args.args[0] == GAME_IDS[2]
+    assert len(_counts(db_path)) == len(GAME_IDS)
+
+
+def test_writer_batches_games_and_rolls_back_a_bad_game_alone(db_path):
+    results = queue.Queue()
+    bad = _pbp(GAME_IDS[1]).rename(columns=possessions.COLUMN_MAPPING)
+    bad.loc[2, "event_type"] = 500  # violates the CHECK constraint after one row is already inserted
+    results.put((GAME_IDS[0], _pbp(GAME_IDS[0]).drop_duplicates(["GAME_ID", "EVENTNUM"])
+                 .rename(columns=possessions.COLUMN_MAPPING)))
+    results.put((GAME_IDS[1], bad))
+    results.put((GAME_IDS[2], pd.DataFrame()))
+    results.put(settings.SENTINEL)
+
+    writer = possessions.PossessionsWriter(results, games_per_transaction=10)
+    writer.start()
+    writer.join(timeout=5)
+
+    assert writer.transactions == 1
+    assert writer.games_written == 1 and writer.rows_written == 3
+    assert sorted(writer.failed_games) == [GAME_IDS[1], GAME_IDS[2]]
+    assert _counts(db_path) == {GAME_IDS[0]: 3}
+
+
+def test_writer_replaces_partial_rows_from_an_earlier_run(db_path, mocker):
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO Possessions (game_id, event_num, event_type) VALUES (?, 99, 1)", (GAME_IDS[0],))
+    conn.commit()
+    conn.close()
+    mocker.patch.object(possessions, "_fetch_pbp_for_game", side_effect=lambda g, h, a, **kwargs: _pbp(g))
+
+    results = queue.Queue()
+    results.put((GAME_IDS[0], possessions._prepare_game_rows(GAME_IDS[0], 1610612747, 1610612743)))
+    results.put(settings.SENTINEL)
+    writer = possessions.PossessionsWriter(results)
+    writer.start()
+    writer.join(timeout=5)
+
+    assert _counts(db_path) == {GAME_IDS[0]: 3}
+
+
+def test_bulk_load_writer_matches_default_writer(db_path, mocker):
+    mocker.patch.object(possessions, "_fetch_pbp_for_game", side_effect=lambda g, h, a, **kwargs: _pbp(g))
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE INDEX idx_possessions_offense ON Possessions(offensive_team_id)")
+    conn.commit()
+    conn.close()
+
+    possessions.populate_possessions("2023-24", workers=2, bulk_load=True, drop_indexes=True)
+
+    assert _counts(db_path) == {game_id: 3 for game_id in GAME_IDS}
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'Possessions' "
+                        "AND sql IS NOT NULL").fetchall() == [
+        ("idx_possessions_offense",)]
+    conn.close()
+
+
+def test_compact_layout_is_written_directly_and_resumes(tmp_path, mocker):
+    path = tmp_path / "compact.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE Games (game_id TEXT PRIMARY KEY, season TEXT, home_team_id INTEGER, away_team_id INTEGER);
+        CREATE TABLE Teams (team_id INTEGER PRIMARY KEY, team_name TEXT, team_abbreviation TEXT, team_city TEXT);
+    """)
+    create_possessions_table(conn)
+    conn.executemany("INSERT INTO Games VALUES (?, '2023-24', 1610612747, 1610612743)", [(g,) for g in GAME_IDS])
+    conn.commit()
+    conn.close()
+    mocker.patch.object(possessions, "get_db_connection", side_effect=lambda: sqlite3.connect(path))
+    fetch = mocker.patch.object(possessions, "_fetch_pbp_for_game",
+                                side_effect=lambda g, h, a, **kwargs: pd.DataFrame() if g == GAME_IDS[0] else _pbp(g))
+
+    possessions.populate_possessions("2023-24", workers=2)
+    assert _counts(path) == {game_id: 3 for game_id in GAME_IDS[1:]}
+
+    fetch.reset_mock()
+    fetch.side_effect = lambda g, h, a, **kwargs: _pbp(g)
+    possessions.populate_possessions("2023-24", workers=2)
+    assert [c.args[0] for c in fetch.call_args_list] == [GAME_IDS[0]]
+    assert _counts(path) == {game_id: 3 for game_id in GAME_IDS}
@@ -0,0 +1,72 @@
+import pickle
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.nba_stats.db import ingestion_ledger as ledger
+from src.nba_stats.db import possession_matrix as pm
+from src.nba_stats.scripts.create_tables import create_true_possessions_table
+from src.nba_stats.utils.true_possessions import POSSESSION_COLUMNS
+
+
+def _derive_game(conn, game_id, points, complete=True):
+    rows = []
+    for n, scored in enumerate(points, start=1):
+        row = {column: 0 for column in POSSESSION_COLUMNS}
+        row.update({"game_id": game_id, "season": "2023-24", "possession_num": n, "period": 1 + n // 2,
+                    "offensive_team_id": 1610612747, "defensive_team_id": 1610612743, "points": scored,
+                    "end_reason": "turnover"})
+        row.update({f"off_player_{i}_id": 200000 + i for i in range(1, 6)})
+        row.update({f"def_player_{i}_id": 1600000 + i for i in range(1, 6)})
+        rows.append(row)
+    if not complete:
+        rows[-1]["def_player_5_id"] = None
+    conn.execute("DELETE FROM TruePossessions WHERE game_id = ?", (game_id,))
+    pd.DataFrame(rows).to_sql("TruePossessions", conn, if_exists="append", index=False)
+    ledger.record(conn, pm.LEDGER_SOURCE, pm.LEDGER_ENDPOINT, game_id, ledger.SUCCESS, row_count=len(rows),
+                  payload_hash=str(points), season="2023-24")
+    conn.commit()
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(tmp_path / "matrix.db")
+    create_true_possessions_table(conn)
+    ledger.create_ingestion_ledger_table(conn)
+    _derive_game(conn, "0022300002", [2, 0, 3], complete=False)
+    _derive_game(conn, "0022300001", [1])
+    yield conn
+    conn.close()
+
+
+def test_matrix_maps_complete_lineups_in_game_order(conn, tmp_path):
+    root = str(tmp_path / "matrix")
+    assert pm.open_matrix("2023-24", root) is None
+
+    matrix = pm.load_matrix(conn, "2023-24", root)
+
+    assert len(matrix) == 3
+    assert isinstance(matrix.off_players, np.memmap) and matrix.off_players.dtype == np.int32
+    assert matrix.off_players.shape == (3, 5) and matrix.def_players[0].tolist() == [1600001 + i for i in range(5)]
+    assert matrix.points.tolist() == [1, 2, 0] and matrix.points.dtype == np.int16
+    assert matrix.game_ids().tolist() == [22300001, 22300002, 22300002]
+    assert matrix.offensive_team.tolist() == [1610612747] * 3
+
+    reopened = pickle.loads(pickle.dumps(matrix))
+    assert reopened.path == matrix.path and reopened.points.tolist() == [1, 2, 0]
+
+
+def test_matrix_is_rebuilt_when_the_ledger_moves_on(conn, tmp_path):
+    root = str(tmp_path / "matrix")
+    first = pm.load_matrix(conn, "2023-24", root)
+    assert pm.load_matrix(conn, "2023-24", root).ledger_version == first.ledger_version
+
+    _derive_game(conn, "0022300003", [3, 2])
+    matrix = pm.load_matrix(conn, "2023-24", root)
+
+    assert matrix.ledger_version != first.ledger_version
+    assert matrix.points.tolist() == [1, 2, 0, 3, 2]
+    assert pm.build_matrix(conn, "2022-23", root) == 0
+    assert len(pm.open_matrix("2022-23", root)) == 0
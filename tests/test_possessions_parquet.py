@@ -0,0 +1,89 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from src.nba_stats.db import ingestion_ledger as ledger
+from src.nba_stats.db import possession_matrix as pm
+from src.nba_stats.db import possessions_parquet as parquet
+from src.nba_stats.scripts.create_tables import create_true_possessions_table
+from src.nba_stats.utils.true_possessions import POSSESSION_COLUMNS
+
+
+def _possession(game_id, possession_num, season, points, complete=True):
+    row = {column: 0 for column in POSSESSION_COLUMNS}
+    row.update({"game_id": game_id, "season": season, "possession_num": possession_num, "period": 1,
+                "offensive_team_id": 1610612747, "defensive_team_id": 1610612743, "points": points,
+                "duration_seconds": 12.5, "end_reason": "made_field_goal"})
+    row.update({f"off_player_{i}_id": i for i in range(1, 6)})
+    row.update({f"def_player_{i}_id": 100 + i for i in range(1, 6)})
+    if not complete:
+        row["off_player_1_id"] = None
+    return row
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(tmp_path / "possessions.db")
+    create_true_possessions_table(conn)
+    ledger.create_ingestion_ledger_table(conn)
+    rows = [_possession("0022200001", 1, "2022-23", 2), _possession("0022200001", 2, "2022-23", 0),
+            _possession("0022300001", 1, "2023-24", 3), _possession("0022300001", 2, "2023-24", 1, complete=False)]
+    pd.DataFrame(rows).to_sql("TruePossessions", conn, if_exists="append", index=False)
+    for game_id, season in (("0022200001", "2022-23"), ("0022300001", "2023-24")):
+        ledger.record(conn, pm.LEDGER_SOURCE, pm.LEDGER_ENDPOINT, game_id, ledger.SUCCESS, row_count=2,
+                      payload_hash="v1", season=season)
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def test_loads_come_from_sqlite_without_pyarrow(conn, tmp_path, mocker):
+    mocker.patch.object(parquet, "ARROW_AVAILABLE", False)
+
+    df = parquet.load_possessions(conn, season="2023-24", columns=parquet.ID_COLUMNS + [parquet.OUTCOME_COLUMN],
+                                  root=str(tmp_path / "parquet"))
+
+    assert list(df.columns) == parquet.ID_COLUMNS + ["points"]
+    assert df["points"].tolist() == [3]
+
+
+@pytest.mark.skipif(not parquet.ARROW_AVAILABLE, reason="pyarrow not installed")
+def test_export_round_trips_with_projection_and_pushdown(conn, tmp_path):
+    root = str(tmp_path / "parquet")
+    assert parquet.export_season(conn, "2022-23", root) == 2
+    columns = parquet.ID_COLUMNS + [parquet.OUTCOME_COLUMN]
+
+    # 2023-24 is not exported yet, so it comes from SQLite
+    assert parquet.exported_seasons(root) == ["2022-23"]
+    assert parquet.load_possessions(conn, season="2023-24", columns=columns, root=root)["points"].tolist() == [3]
+
+    assert parquet.export_season(conn, "2023-24", root) == 2
+    from_parquet = parquet.load_possessions(conn, columns=columns, root=root)
+    from_sqlite = parquet.read_true_possessions(conn, columns=columns)
+    assert from_parquet["points"].tolist() == from_sqlite["points"].tolist() == [2, 0, 3]
+    assert from_parquet["off_player_1_id"].tolist() == from_sqlite["off_player_1_id"].tolist()
+
+    scored = parquet.read_possessions(root, columns=["game_id", "points"], filters=[("points", ">", 0)])
+    assert sorted(scored["points"]) == [1, 2, 3]
+
+    # A stale partition falls back to SQLite until it is exported again
+    conn.execute("DELETE FROM TruePossessions WHERE season = '2022-23' AND possession_num = 2")
+    assert parquet.load_possessions(conn, season="2022-23", root=root)["points"].tolist() == [2]
+
+
+@pytest.mark.skipif(not parquet.ARROW_AVAILABLE, reason="pyarrow not installed")
+def test_a_partition_is_stale_once_the_ledger_moves_on(conn, tmp_path):
+    root = str(tmp_path / "parquet")
+    parquet.export_season(conn, "2023-24", root)
+    assert parquet.partition_version(root, "2023-24") == pm.ledger_version(conn, "2023-24")
+
+    # Re-derived with the same number of possessions, but different points
+    conn.execute("UPDATE TruePossessions SET points = 0 WHERE season = '2023-24'")
+    ledger.record(conn, pm.LEDGER_SOURCE, pm.LEDGER_ENDPOINT, "0022300001", ledger.SUCCESS, row_count=2,
+                  payload_hash="v2", season="2023-24")
+    assert parquet.load_possessions(conn, season="2023-24", root=root)["points"].tolist() == [0]
+
+    parquet.export_season(conn, "2023-24", root)
+    assert parquet.partition_version(root, "2023-24") == pm.ledger_version(conn, "2023-24")
+    assert parquet.read_possessions(root, columns=["points"], seasons=["2023-24"])["points"].tolist() == [0, 0]
@@ -0,0 +1,159 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from src.nba_stats.api.result_set import decode_result_set
+from src.nba_stats.db.possessions_store import CompactPossessionsWriter, game_key, is_compact
+from src.nba_stats.scripts.create_tables import create_possessions_table, create_wide_possessions_table
+from src.nba_stats.scripts.migrate_db import migrate_possessions_to_compact
+from src.nba_stats.scripts.populate_possessions import COLUMN_MAPPING
+from src.nba_stats.utils.lineup_tracker import enrich_play_by_play, synthetic_play_by_play
+
+HOME, AWAY = 1610612747, 1610612743
+GAME_IDS = ["0022300001", "0022300002"]
+
+# Columns whose values both layouts store; team text and timestamps differ by design
+COMPARED_COLUMNS = """
+    game_id, event_num, event_type, event_action_type, period, wc_time_string, pc_time_string,
+    home_description, neutral_description, visitor_description, score, score_margin,
+    person1_type, player1_id, player1_name, player1_team_id,
+    person2_type, player2_id, player2_name, player2_team_id,
+    person3_type, player3_id, player3_name, player3_team_id,
+    home_player_1_id, home_player_2_id, home_player_3_id, home_player_4_id, home_player_5_id,
+    away_player_1_id, away_player_2_id, away_player_3_id, away_player_4_id, away_player_5_id,
+    offensive_team_id, defensive_team_id
+"""
+
+
+def _game(game_id, seed):
+    pbp_df = pd.DataFrame(decode_result_set(synthetic_play_by_play(game_id, seed=seed), name=0))
+    enriched = enrich_play_by_play(pbp_df, HOME, AWAY).rename(columns=COLUMN_MAPPING)
+    # Exercise the dictionary-encoded columns, which the synthetic feed leaves empty
+    enriched["score"] = [f"{i} - {i + 2}" if i % 7 == 0 else None for i in range(len(enriched))]
+    enriched["score_margin"] = [str(i % 5 - 2) if i % 7 == 0 else None for i in range(len(enriched))]
+    return enriched
+
+
+@pytest.fixture
+def games():
+    return {game_id: _game(game_id, seed) for seed, game_id in enumerate(GAME_IDS, start=1)}
+
+
+def _connect(path, create):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE Teams (team_id INTEGER PRIMARY KEY, team_name TEXT, team_abbreviation TEXT, team_city TEXT)")
+    conn.execute(f"INSERT INTO Teams VALUES ({HOME}, 'Lakers', 'LAL', 'Los Angeles')")
+    create(conn)
+    return conn
+
+
+def _insert_wide(conn, games):
+    columns = [c.strip() for c in COMPARED_COLUMNS.split(",")]
+    for game_id, df in games.items():
+        rows = df.reindex(columns=columns).astype(object).where(df.reindex(columns=columns).notna(), None)
+        conn.executemany(f"INSERT INTO Possessions ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})",
+                         rows.itertuples(index=False, name=None))
+    conn.commit()
+
+
+def _read(conn):
+    return conn.execute(f"SELECT {COMPARED_COLUMNS} FROM Possessions ORDER BY game_id, event_num").fetchall()
+
+
+def test_view_reads_back_what_the_wide_table_stores(tmp_path, games):
+    wide = _connect(tmp_path / "wide.db", create_wide_possessions_table)
+    _insert_wide(wide, games)
+    compact = _connect(tmp_path / "compact.db", create_possessions_table)
+    writer = CompactPossessionsWriter(compact)
+    for game_id, df in games.items():
+        assert writer.replace_game(game_id, df) == len(df)
+    compact.commit()
+
+    assert is_compact(compact) and not is_compact(wide)
+    assert _read(compact) == _read(wide)
+    # Team text is resolved from Teams; the wide table never had it filled in
+    row = compact.execute("SELECT player1_team_city, player1_team_abbreviation FROM Possessions "
+                          f"WHERE player1_team_id = {HOME} LIMIT 1").fetchone()
+    assert row == ("Los Angeles", "LAL")
+    fact_types = {t for (t,) in compact.execute("SELECT DISTINCT type FROM pragma_table_info('PossessionEvents') "
+                                                "WHERE name != 'game_id'")}
+    assert fact_types == {"INTEGER"}
+
+
+def test_legacy_writes_through_the_view_match_the_writer(tmp_path, games):
+    via_writer = _connect(tmp_path / "writer.db", create_possessions_table)
+    writer = CompactPossessionsWriter(via_writer)
+    for game_id, df in games.items():
+        writer.replace_game(game_id, df)
+    via_writer.commit()
+    via_view = _connect(tmp_path / "view.db", create_possessions_table)
+    _insert_wide(via_view, games)
+
+    assert _read(via_view) == _read(via_writer)
+
+    via_view.execute("DELETE FROM Possessions WHERE game_id = ?", (GAME_IDS[0],))
+    assert via_view.execute("SELECT DISTINCT game_id FROM Possessions").fetchall() == [(GAME_IDS[1],)]
+    assert via_view.execute("SELECT COUNT(*) FROM PossessionDescriptions WHERE game_id = ?",
+                            (GAME_IDS[0],)).fetchone()[0] == 0
+
+
+def test_replace_game_overwrites_and_reset_recovers_after_rollback(tmp_path, games):
+    conn = _connect(tmp_path / "compact.db", create_possessions_table)
+    conn.isolation_level = None
+    writer = CompactPossessionsWriter(conn)
+    df = games[GAME_IDS[0]]
+
+    conn.execute("BEGIN")
+    writer.replace_game(GAME_IDS[0], df)
+    conn.execute("ROLLBACK")
+    writer.reset()
+    writer.replace_game(GAME_IDS[0], df)
+    writer.replace_game(GAME_IDS[0], df.head(10))
+
+    assert conn.execute("SELECT COUNT(*) FROM Possessions").fetchone()[0] == 10
+    assert conn.execute("SELECT COUNT(*) FROM Possessions WHERE score IS NOT NULL").fetchone()[0] == 2
+
+
+def test_season_join_through_the_view_uses_the_primary_key(tmp_path, games):
+    conn = _connect(tmp_path / "compact.db", create_possessions_table)
+    conn.execute("CREATE TABLE Games (game_id TEXT PRIMARY KEY, season TEXT)")
+    conn.execute("CREATE INDEX idx_games_season ON Games(season)")
+    conn.executemany("INSERT INTO Games VALUES (?, '2023-24')", [(game_id,) for game_id in GAME_IDS])
+    writer = CompactPossessionsWriter(conn)
+    for game_id, df in games.items():
+        writer.replace_game(game_id, df)
+    conn.commit()
+
+    query = ("SELECT p.game_id, p.event_num, p.score FROM Possessions p JOIN Games g ON p.game_id = g.game_id "
+             "WHERE g.season = ?")
+    plan = " | ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", ("2023-24",)))
+    assert "SEARCH e USING PRIMARY KEY (game_id=?)" in plan and "SCAN e" not in plan
+    assert len(conn.execute(query, ("2023-24",)).fetchall()) == sum(len(df) for df in games.values())
+
+
+def test_game_key_rejects_non_game_ids():
+    assert game_key("0022300001") == 22300001
+    with pytest.raises(ValueError):
+        game_key("22300001")
+
+
+def test_migration_converts_wide_table_and_shrinks_the_file(tmp_path, games):
+    path = tmp_path / "migrate.db"
+    conn = _connect(path, create_wide_possessions_table)
+    _insert_wide(conn, games)
+    conn.execute("CREATE INDEX idx_possessions_player1 ON Possessions(player1_id)")
+    conn.commit()
+    expected = _read(conn)
+    conn.execute("VACUUM")
+    wide_size = path.stat().st_size
+
+    assert migrate_possessions_to_compact(conn)
+    conn.commit()
+    conn.execute("VACUUM")
+
+    assert _read(conn) == expected
+    assert conn.execute("SELECT type FROM sqlite_master WHERE name = 'Possessions'").fetchone() == ("view",)
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'Possessions_wide'").fetchone() is None
+    assert path.stat().st_size < wide_size
+    assert not migrate_possessions_to_compact(conn)
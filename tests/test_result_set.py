@@ -0,0 +1,131 @@
+import json
+import sqlite3
+
+import numpy as np
+import pytest
+
+from src.nba_stats.api.result_set import (
+    ARROW_AVAILABLE,
+    ResultSetNotFoundError,
+    decode_result_set,
+)
+from src.nba_stats.scripts.populate_player_shot_charts import SHOT_COLUMNS, SHOT_INSERT_SQL, _shot_rows
+
+
+PBP_RESPONSE = {
+    "resource": "playbyplay",
+    "resultSets": [
+        {
+            "name": "PlayByPlay",
+            "headers": ["GAME_ID", "EVENTNUM", "EVENTMSGTYPE", "PERIOD", "PLAYER1_ID", "HOMEDESCRIPTION"],
+            "rowSet": [
+                ["0022300001", 1, 12, 1, None, None],
+                ["0022300001", 2, 10, 1, 203999, "Jump Ball"],
+                ["0022300001", 3, 1, 1, 201142, "Durant 2' Layup"],
+            ],
+        },
+        {
+            "name": "AvailableVideo",
+            "headers": ["VIDEO_AVAILABLE_FLAG"],
+            "rowSet": [[1]],
+        },
+    ],
+}
+
+
+def test_decodes_first_result_set_by_default():
+    columns = decode_result_set(PBP_RESPONSE)
+
+    assert list(columns) == PBP_RESPONSE["resultSets"][0]["headers"]
+    assert columns["EVENTNUM"].dtype == np.int64
+    assert columns["EVENTNUM"].tolist() == [1, 2, 3]
+    # Columns with nulls stay as objects so None survives
+    assert columns["PLAYER1_ID"].dtype == object
+    assert columns["PLAYER1_ID"].tolist() == [None, 203999, 201142]
+
+
+def test_projection_and_name_lookup():
+    columns = decode_result_set(PBP_RESPONSE, name="PlayByPlay", columns=["PERIOD", "EVENTMSGTYPE"])
+    assert list(columns) == ["PERIOD", "EVENTMSGTYPE"]
+
+    video = decode_result_set(PBP_RESPONSE, name="AvailableVideo")
+    assert video["VIDEO_AVAILABLE_FLAG"].tolist() == [1]
+
+
+def test_dtypes_fill_nulls():
+    columns = decode_result_set(
+        PBP_RESPONSE,
+        columns=["PLAYER1_ID", "EVENTNUM"],
+        dtypes={"PLAYER1_ID": "int64", "EVENTNUM": "float64"},
+    )
+    assert columns["PLAYER1_ID"].tolist() == [0, 203999, 201142]
+    assert columns["EVENTNUM"].dtype == np.float64
+
+    floats = decode_result_set(PBP_RESPONSE, columns=["PLAYER1_ID"], dtypes={"PLAYER1_ID": float})
+    assert np.isnan(floats["PLAYER1_ID"][0])
+
+
+def test_accepts_raw_payload_and_single_dict_result_set():
+    raw = json.dumps({"resultSets": {"name": "Shots", "headers": ["A", "B"], "rowSet": [[1, "x"], [2, "y"]]}})
+    columns = decode_result_set(raw.encode("utf-8"))
+    assert columns["A"].tolist() == [1, 2]
+    assert columns["B"].tolist() == ["x", "y"]
+
+
+def test_mixed_columns_keep_their_python_values():
+    response = {"resultSets": [{"name": "Shots", "headers": ["SCORE_MARGIN", "PCT"],
+                                "rowSet": [[1, 0.5], ["TIE", 1], [-3, 0.25]]}]}
+    columns = decode_result_set(response)
+    assert columns["SCORE_MARGIN"].dtype == object
+    assert columns["SCORE_MARGIN"].tolist() == [1, "TIE", -3]
+    assert columns["PCT"].dtype == np.float64
+
+
+def test_empty_row_set_returns_empty_columns():
+    response = {"resultSets": [{"name": "PlayByPlay", "headers": ["A", "B"], "rowSet": []}]}
+    columns = decode_result_set(response, dtypes={"A": "int64"})
+    assert len(columns["A"]) == 0 and columns["A"].dtype == np.int64
+    assert len(columns["B"]) == 0
+
+
+def test_missing_result_set_or_column_raises():
+    with pytest.raises(ResultSetNotFoundError):
+        decode_result_set(PBP_RESPONSE, name="Nope")
+    with pytest.raises(ResultSetNotFoundError):
+        decode_result_set({"resource": "x"})
+    with pytest.raises(KeyError, match="NOT_A_COLUMN"):
+        decode_result_set(PBP_RESPONSE, columns=["NOT_A_COLUMN"])
+
+
+@pytest.mark.skipif(ARROW_AVAILABLE, reason="pyarrow installed")
+def test_as_arrow_requires_pyarrow():
+    with pytest.raises(ImportError):
+        decode_result_set(PBP_RESPONSE, as_arrow=True)
+
+
+@pytest.mark.skipif(not ARROW_AVAILABLE, reason="pyarrow not installed")
+def test_as_arrow_preserves_nulls():
+    table = decode_result_set(PBP_RESPONSE, columns=["PLAYER1_ID"], as_arrow=True)
+    assert table.column("PLAYER1_ID").to_pylist() == [None, 203999, 201142]
+
+
+def test_shot_rows_from_columns():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""
+        CREATE TABLE PlayerShotChart (
+            player_id INTEGER, team_id INTEGER, game_id TEXT, season TEXT, action_type TEXT,
+            event_type TEXT, shot_type TEXT, shot_zone_basic TEXT, shot_zone_area TEXT,
+            shot_zone_range TEXT, shot_distance INTEGER, loc_x INTEGER, loc_y INTEGER,
+            shot_made_flag INTEGER
+        )
+    """)
+    row = [2544, 1610612747, "0022300001", "Jump Shot", "Made Shot", "2PT Field Goal",
+           "Mid-Range", "Center(C)", "16-24 ft.", 18, 5, 180, 1]
+    response = {"resultSets": [{"name": "Shot_Chart_Detail", "headers": SHOT_COLUMNS, "rowSet": [row, row]}]}
+
+    conn.executemany(SHOT_INSERT_SQL, _shot_rows(decode_result_set(response, columns=SHOT_COLUMNS), "2023-24"))
+
+    stored = conn.execute("SELECT * FROM PlayerShotChart").fetchall()
+    assert len(stored) == 2
+    assert stored[0] == (2544, 1610612747, "0022300001", "2023-24", "Jump Shot", "Made Shot", "2PT Field Goal",
+                         "Mid-Range", "Center(C)", "16-24 ft.", 18, 5, 180, 1)
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from src.nba_stats.api.cache_store import SQLiteCacheBackend
+from src.nba_stats.api.nba_stats_client import NBAStatsClient
+from src.nba_stats.api.single_flight import AsyncSingleFlight, SingleFlight
+from src.nba_stats.config import settings
+
+PAYLOAD = {"resultSets": [{"name": "LeagueDashPtStats", "headers": ["PLAYER_ID"], "rowSet": [[2544]]}]}
+
+
+def test_single_flight_shares_result_and_errors():
+    group = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"value": [1]}
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        leader = pool.submit(group.do, "key", slow)
+        started.wait(5)
+        followers = [pool.submit(group.do, "key", slow) for _ in range(3)]
+        time.sleep(0.05)
+        release.set()
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert len(calls) == 1
+    assert all(r == {"value": [1]} for r in results)
+    # Followers get their own copy so they can't corrupt each other's response
+    assert results[1] is not results[0]
+    assert group.stats() == {"upstream_calls": 1, "coalesced_calls": 3, "in_flight": 0}
+
+
+
+def test_cancelling_the_async_leader_cancels_its_followers():
+    group = AsyncSingleFlight()
+
+    async def slow():
+        await asyncio.sleep(5)
+
+    async def fast():
+        return {"value": [1]}
+
+    async def run():
+        leader = asyncio.create_task(group.do("key", slow))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(group.do("key", slow))
+        await asyncio.sleep(0)
+        shared = group._calls["key"]
+        leader.cancel()
+        outcomes = await asyncio.gather(leader, follower, return_exceptions=True)
+        return shared, outcomes, await group.do("key", fast)
+
+    shared, (leader, follower), again = asyncio.run(run())
+
+    assert shared.cancelled()
+    assert isinstance(leader, asyncio.CancelledError) and isinstance(follower, asyncio.CancelledError)
+    assert again == {"value": [1]}
+    assert group.stats() == {"upstream_calls": 2, "coalesced_calls": 1, "in_flight": 0}
+
+def test_concurrent_cache_misses_issue_one_upstream_request(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "USE_SHARED_RATE_LIMITER", False)
+    store = SQLiteCacheBackend(tmp_path / "api_cache.db")
+    client = NBAStatsClient(cache=store)
+    monkeypatch.setattr(client, "_wait_for_rate_limit", lambda: None)
+
+    def slow_get(*args, **kwargs):
+        time.sleep(0.2)
+        response = MagicMock(status_code=200, headers={})
+        response.json.return_value = PAYLOAD
+        return response
+
+    client.session.get = MagicMock(side_effect=slow_get)
+    before = client.coalescing_stats()
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [
+            pool.submit(client.get_league_player_tracking_stats, season="2099-00", pt_measure_type="Drives")
+            for _ in range(5)
+        ]
+        results = [f.result() for f in futures]
+
+    after = client.coalescing_stats()
+    assert all(r == PAYLOAD for r in results)
+    assert client.session.get.call_count == 1
+    assert after["upstream_calls"] - before["upstream_calls"] == 1
+    assert after["coalesced_calls"] - before["coalesced_calls"] == 4
+    store.close()
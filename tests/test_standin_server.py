@@ -0,0 +1,77 @@
+import pytest
+import requests
+
+from src.nba_stats.api.cache_store import SQLiteCacheBackend
+from src.nba_stats.api.cassette import Cassette, CassetteRecorder
+from src.nba_stats.api.nba_stats_client import NBAStatsClient
+from src.nba_stats.api.standin_server import BackgroundStandInServer, ChaosConfig, StandInServer
+from src.nba_stats.config import settings
+
+PBP_RESPONSE = {
+    "resultSets": [{
+        "name": "PlayByPlay",
+        "headers": ["GAME_ID", "EVENTNUM", "EVENTMSGTYPE", "PERIOD"],
+        "rowSet": [["0022300001", 1, 12, 1], ["0022300001", 2, 13, 4]]
+    }]
+}
+
+
+@pytest.fixture
+def cassette_path(tmp_path):
+    path = tmp_path / "pbp.jsonl.gz"
+    recorder = CassetteRecorder(path)
+    recorder.record("/playbyplayv2", {"GameID": "0022300001", "StartPeriod": 0, "EndPeriod": 0, "LeagueID": "00"},
+                    PBP_RESPONSE)
+    return path
+
+
+@pytest.fixture
+def offline_client(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "USE_SHARED_RATE_LIMITER", False)
+    store = SQLiteCacheBackend(tmp_path / "api_cache.db")
+    client = NBAStatsClient(cache=store)
+    monkeypatch.setattr(client, "_wait_for_rate_limit", lambda: None)
+    yield client
+    store.close()
+
+
+def test_client_records_every_returned_response(tmp_path, offline_client):
+    recorder = CassetteRecorder(tmp_path / "recorded.jsonl.gz")
+    offline_client.recorder = recorder
+    key = offline_client._get_cache_key("/playbyplayv2", {"GameID": "0022300001", "StartPeriod": 0,
+                                                           "EndPeriod": 0, "LeagueID": "00"})
+    offline_client.cache.put(key, PBP_RESPONSE, endpoint="/playbyplayv2")
+
+    assert offline_client.get_play_by_play("0022300001") == PBP_RESPONSE
+
+    cassette = Cassette.load(recorder.path)
+    entry = cassette.lookup("playbyplayv2", {"GameID": "0022300001", "StartPeriod": "0",
+                                             "EndPeriod": "0", "LeagueID": "00"})
+    assert entry["response"] == PBP_RESPONSE
+
+
+def test_standin_replays_cassette_to_client(cassette_path, offline_client):
+    server = StandInServer(Cassette.load(cassette_path))
+    with BackgroundStandInServer(server) as standin:
+        offline_client.base_url = standin.base_url
+        assert offline_client.get_play_by_play("0022300001") == PBP_RESPONSE
+        assert offline_client.get_play_by_play("0022399999") is None
+
+    assert server.stats.replayed == 1
+    assert server.stats.not_found == 1
+
+
+def test_standin_injects_throttling_and_rate_ceiling(cassette_path):
+    params = {"GameID": "0022300001", "StartPeriod": "0", "EndPeriod": "0", "LeagueID": "00"}
+
+    throttling = StandInServer(Cassette.load(cassette_path), ChaosConfig(throttle_rate=1.0, retry_after=7))
+    with BackgroundStandInServer(throttling) as standin:
+        response = requests.get(f"{standin.base_url}/playbyplayv2", params=params, timeout=5)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "7"
+
+    ceiling = StandInServer(Cassette.load(cassette_path), ChaosConfig(max_requests_per_minute=2))
+    with BackgroundStandInServer(ceiling) as standin:
+        statuses = [requests.get(f"{standin.base_url}/playbyplayv2", params=params, timeout=5).status_code
+                    for _ in range(3)]
+    assert statuses == [200, 200, 429]
@@ -0,0 +1,137 @@
+import json
+
+import pytest
+from requests.adapters import HTTPAdapter
+
+from src.nba_stats.api.aimd import AIMDController
+from src.nba_stats.api.cache_store import SQLiteCacheBackend
+from src.nba_stats.api.cassette import Cassette, CassetteRecorder
+from src.nba_stats.api.nba_stats_client import NBAStatsClient
+from src.nba_stats.api.standin_server import BackgroundStandInServer, ChaosConfig, StandInServer
+from src.nba_stats.api.telemetry import ClientTelemetry, LatencyHistogram, get_client_telemetry, write_telemetry
+from src.nba_stats.config import settings
+
+PBP_RESPONSE = {
+    "resultSets": [{
+        "name": "PlayByPlay",
+        "headers": ["GAME_ID", "EVENTNUM", "EVENTMSGTYPE", "PERIOD"],
+        "rowSet": [["0022300001", 1, 12, 1], ["0022300001", 2, 13, 4]]
+    }]
+}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "USE_SHARED_RATE_LIMITER", False)
+    get_client_telemetry().reset()
+    store = SQLiteCacheBackend(tmp_path / "api_cache.db")
+    controller = AIMDController(initial_rate=60000, max_rate=60000, initial_concurrency=4)
+    yield NBAStatsClient(cache=store, controller=controller)
+    store.close()
+    get_client_telemetry().reset()
+
+
+def test_histogram_buckets_and_quantiles():
+    hist = LatencyHistogram()
+    for seconds in (0.004, 0.02, 0.02, 0.3, 45.0):
+        hist.observe(seconds)
+
+    snapshot = hist.snapshot()
+    assert snapshot["count"] == 5
+    assert snapshot["p50_ms"] == 25.0
+    assert snapshot["max_ms"] == pytest.approx(45000.0)
+    assert snapshot["buckets"] == {"le_5": 1, "le_25": 2, "le_500": 1, "le_60000": 1}
+
+
+def test_snapshot_totals_across_endpoints():
+    telemetry = ClientTelemetry()
+    telemetry.record_request("/playbyplayv2", cache_hit=True)
+    telemetry.record_request("playbyplayv2", cache_hit=False)
+    telemetry.record_request("/shotchartdetail", cache_hit=False)
+    telemetry.record_upstream("/shotchartdetail", bytes_received=1200)
+    telemetry.record_retry("/shotchartdetail", "throttle", count=2)
+    telemetry.record_phase("/shotchartdetail", "network", 0.2)
+
+    snapshot = telemetry.snapshot()
+    assert snapshot["endpoints"]["playbyplayv2"]["cache_hit_ratio"] == 0.5
+    assert snapshot["totals"]["requests"] == 3
+    assert snapshot["totals"]["bytes_received"] == 1200
+    assert snapshot["totals"]["retries"]["throttle"] == 2
+    assert snapshot["totals"]["time_ms"]["network"] == pytest.approx(200.0)
+
+
+def test_client_instruments_upstream_and_cache(tmp_path, client):
+    cassette_path = tmp_path / "pbp.jsonl.gz"
+    CassetteRecorder(cassette_path).record(
+        "/playbyplayv2", {"GameID": "0022300001", "StartPeriod": 0, "EndPeriod": 0, "LeagueID": "00"}, PBP_RESPONSE
+    )
+    server = StandInServer(Cassette.load(cassette_path), ChaosConfig(latency_ms=20))
+    with BackgroundStandInServer(server) as standin:
+        client.base_url = standin.base_url
+        assert client.get_play_by_play("0022300001") == PBP_RESPONSE  # miss, fetched upstream
+        assert client.get_play_by_play("0022300001") == PBP_RESPONSE  # cache hit
+
+    stats = client.stats()
+    pbp = stats["endpoints"]["playbyplayv2"]
+    assert pbp["requests"] == 2
+    assert pbp["cache_hits"] == 1 and pbp["cache_misses"] == 1
+    assert pbp["upstream_calls"] == 1 and pbp["failures"] == 0
+    assert pbp["bytes_received"] > 0
+    assert pbp["latency"]["network"]["count"] == 1
+    assert pbp["latency"]["network"]["total_ms"] >= 20
+    assert pbp["latency"]["sleep"]["count"] == 1
+    assert pbp["latency"]["parse"]["count"] == 1
+    assert "coalescing" in stats and "rate_controller" in stats
+
+
+def test_client_counts_server_errors(tmp_path, client):
+    cassette_path = tmp_path / "empty.jsonl.gz"
+    CassetteRecorder(cassette_path).record("/other", {}, PBP_RESPONSE)
+    server = StandInServer(Cassette.load(cassette_path), ChaosConfig(error_rate=1.0))
+    # Keep urllib3 from retrying the injected 500s so exactly one attempt is made
+    client.session.mount("http://", HTTPAdapter(max_retries=0))
+    with BackgroundStandInServer(server) as standin:
+        client.base_url = standin.base_url
+        assert client.make_request("/playbyplayv2", {"GameID": "0022300001"}) is None
+
+    pbp = client.stats()["endpoints"]["playbyplayv2"]
+    assert pbp["retries"]["server_error"] == 1
+    assert pbp["failures"] == 1
+
+
+def test_write_telemetry_keeps_existing_results(tmp_path):
+    path = tmp_path / "pipeline_results.json"
+    path.write_text(json.dumps({"FTPCT": {"2544": 0.75}}))
+
+    write_telemetry({"totals": {"requests": 3}}, path)
+
+    results = json.loads(path.read_text())
+    assert results["FTPCT"] == {"2544": 0.75}
+    assert results["client_telemetry"]["totals"]["requests"] == 3
+
+
+def test_every_request_path_releases_its_controller_slot(client, mocker):
+    response = mocker.Mock(status_code=200, headers={})
+    response.json.return_value = {"resultSets": {"headers": [], "rowSet": [[1629029, 0.45]]}}
+    mocker.patch.object(client.session, "get", return_value=response)
+    assert client.get_player_opponent_shooting_stats("2023-24") is not None
+    assert client.controller.stats()["in_flight"] == 0
+
+    client.rate_limiter = mocker.Mock()
+    client.rate_limiter.acquire.side_effect = TimeoutError("no token")
+    assert client.make_request("/playbyplayv2", {"GameID": "0022300001"}) is None
+    assert client.get_player_opponent_shooting_stats("2022-23") is None
+    assert client.controller.stats()["in_flight"] == 0
+
+
+def test_empty_answer_is_returned_without_retry_when_allowed(client, mocker):
+    response = mocker.Mock(status_code=200, headers={}, content=b"{}")
+    response.json.return_value = {"resultSets": [{"name": "Shot_Chart_Detail", "headers": ["GAME_ID"], "rowSet": []}]}
+    get = mocker.patch.object(client.session, "get", return_value=response)
+
+    data = client.get_shot_chart_detail(0, 0, "2019-20", date_from="04/01/2020", date_to="04/30/2020",
+                                        allow_empty=True)
+
+    assert data["resultSets"][0]["rowSet"] == []
+    assert get.call_count == 1
+    assert client.stats()["endpoints"]["shotchartdetail"]["retries"].get("empty_response", 0) == 0
@@ -0,0 +1,124 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from src.nba_stats.db import ingestion_ledger as ledger
+from src.nba_stats.db.possessions_store import CompactPossessionsWriter, game_events, read_true_possessions
+from src.nba_stats.scripts import populate_true_possessions as stage
+from src.nba_stats.scripts.create_tables import create_possessions_table, create_true_possessions_table
+from src.nba_stats.utils.true_possessions import EVENT_COLUMNS, segment_possessions
+
+HOME, AWAY = 1610612747, 1610612743
+GAME_ID = "0022400001"
+HOME_FIVE, AWAY_FIVE = [11, 12, 13, 14, 15], [21, 22, 23, 24, 25]
+
+# (event_type, action, clock, score, player1_id, player1_team_id); the last make is a three
+EVENTS = [
+    (12, 0, "12:00", None, None, None),
+    (10, 0, "12:00", None, 11, HOME),
+    (1, 1, "11:40", "0 - 2", 11, HOME),        # make: home possession over
+    (2, 1, "11:20", None, 21, AWAY),
+    (4, 0, "11:18", None, 22, AWAY),           # offensive rebound
+    (1, 1, "11:15", "2 - 2", 22, AWAY),        # and-one make ...
+    (6, 2, "11:15", None, 12, HOME),
+    (3, 10, "11:15", "3 - 2", 22, AWAY),       # ... ends on the free throw
+    (8, 0, "11:15", None, 15, HOME),           # 16 replaces 15
+    (5, 1, "11:00", None, 16, HOME),           # turnover
+    (2, 1, "10:40", None, 23, AWAY),
+    (4, 0, "10:38", None, 13, HOME),           # defensive rebound
+    (2, 1, "10:20", None, 13, HOME),
+    (4, 0, "10:19", None, HOME, None),         # team rebound, still home ball
+    (6, 2, "10:10", None, 24, AWAY),
+    (3, 11, "10:10", "3 - 3", 11, HOME),
+    (3, 12, "10:10", None, 11, HOME),          # missed last free throw ...
+    (4, 0, "10:09", None, 25, AWAY),           # ... defensive rebound
+    (1, 1, "0:02", "6 - 3", 21, AWAY),
+    (13, 0, "0:00", None, None, None),         # no offensive action after the make: dropped
+]
+
+
+def _events():
+    rows = []
+    for event_num, (event_type, action, clock, score, player_id, team_id) in enumerate(EVENTS, start=1):
+        home = HOME_FIVE if event_num <= 9 else [11, 12, 13, 14, 16]
+        rows.append({"game_id": GAME_ID, "event_num": event_num, "event_type": event_type, "event_action_type": action,
+                     "period": 1, "pc_time_string": clock, "score": score, "player1_id": player_id,
+                     "home_description": None, "visitor_description": "Smith 26' 3PT Jump Shot (3 PTS)" if score == "6 - 3" else None,
+                     "player1_team_id": team_id,
+                     **{f"home_player_{i}_id": p for i, p in enumerate(home, start=1)},
+                     **{f"away_player_{i}_id": p for i, p in enumerate(AWAY_FIVE, start=1)}})
+    return pd.DataFrame(rows)
+
+
+def test_events_are_split_at_each_change_of_possession():
+    possessions = segment_possessions(_events(), HOME, AWAY)
+
+    assert possessions["offensive_team_id"].tolist() == [HOME, AWAY, HOME, AWAY, HOME, AWAY]
+    assert possessions["points"].tolist() == [2, 3, 0, 0, 1, 3]
+    assert possessions["end_reason"].tolist() == [
+        "made_field_goal", "free_throws", "turnover", "defensive_rebound", "defensive_rebound", "made_field_goal"]
+    assert possessions["duration_seconds"].tolist() == [20, 25, 15, 22, 29, 607]
+    assert possessions["field_goal_attempts"].tolist() == [1, 2, 0, 1, 1, 1]
+    assert possessions["three_pointers_made"].tolist() == [0, 0, 0, 0, 0, 1]
+    assert possessions[["free_throw_attempts", "free_throws_made"]].sum().tolist() == [3, 2]
+    assert possessions[["start_event_num", "end_event_num"]].values.tolist()[:2] == [[1, 3], [4, 8]]
+    third = possessions.iloc[2]
+    assert [third[f"off_player_{i}_id"] for i in range(1, 6)] == [11, 12, 13, 14, 16]
+    assert [third[f"def_player_{i}_id"] for i in range(1, 6)] == AWAY_FIVE
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(tmp_path / "possessions.db")
+    conn.execute("CREATE TABLE Teams (team_id INTEGER PRIMARY KEY, team_name TEXT, team_abbreviation TEXT, team_city TEXT)")
+    conn.execute("CREATE TABLE Games (game_id TEXT PRIMARY KEY, season TEXT, home_team_id INTEGER, away_team_id INTEGER)")
+    conn.execute("INSERT INTO Games VALUES (?, '2024-25', ?, ?)", (GAME_ID, HOME, AWAY))
+    create_possessions_table(conn)
+    create_true_possessions_table(conn)
+    ledger.create_ingestion_ledger_table(conn)
+    CompactPossessionsWriter(conn).replace_game(GAME_ID, _events())
+    ledger.record(conn, stage.PBP_SOURCE, stage.PBP_ENDPOINT, GAME_ID, ledger.SUCCESS, payload_hash="v1", season="2024-25")
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def test_games_are_derived_again_only_when_their_play_by_play_changes(conn):
+    assert stage.games_to_derive(conn, "2024-25") == [(GAME_ID, HOME, AWAY, "v1")]
+    assert stage.derive_game(conn, GAME_ID, "2024-25", HOME, AWAY, "v1") == 6
+    conn.commit()
+
+    assert stage.games_to_derive(conn, "2024-25") == []
+    assert len(stage.games_to_derive(conn, "2024-25", rebuild=True)) == 1
+    ledger.record(conn, stage.PBP_SOURCE, stage.PBP_ENDPOINT, GAME_ID, ledger.SUCCESS, payload_hash="v2", season="2024-25")
+    assert stage.games_to_derive(conn, "2024-25") == [(GAME_ID, HOME, AWAY, "v2")]
+
+    stored = read_true_possessions(conn, season="2024-25")
+    assert stored["points"].sum() == 9
+    assert stored["possession_num"].tolist() == [1, 2, 3, 4, 5, 6]
+
+
+@pytest.mark.parametrize("error", [ValueError("bad events"), TypeError("bad dtype"), IndexError("no rows")])
+def test_a_failed_game_keeps_its_previous_possessions(conn, mocker, error):
+    stage.derive_game(conn, GAME_ID, "2024-25", HOME, AWAY, "v1")
+    mocker.patch.object(stage, "segment_possessions", side_effect=error)
+
+    assert stage.derive_game(conn, GAME_ID, "2024-25", HOME, AWAY, "v2") == -1
+    assert conn.execute("SELECT COUNT(*) FROM TruePossessions").fetchone() == (6,)
+    assert stage.games_to_derive(conn, "2024-25") == [(GAME_ID, HOME, AWAY, "v1")]
+
+
+def test_a_rebuild_with_the_same_counts_moves_the_derived_version(conn, mocker):
+    stage.derive_game(conn, GAME_ID, "2024-25", HOME, AWAY, "v1")
+    first = ledger.version(conn, stage.LEDGER_SOURCE, stage.LEDGER_ENDPOINT, "2024-25")
+    possessions = segment_possessions(game_events(conn, GAME_ID, EVENT_COLUMNS), HOME, AWAY)
+    assert ledger.stored_hash(conn, stage.LEDGER_SOURCE, stage.LEDGER_ENDPOINT, GAME_ID) == ledger.payload_hash(possessions)
+
+    # A changed derivation that yields as many possessions, e.g. a scoring fix
+    rescored = possessions.assign(points=possessions["points"][::-1].values)
+    mocker.patch.object(stage, "segment_possessions", return_value=rescored)
+    assert stage.derive_game(conn, GAME_ID, "2024-25", HOME, AWAY, "v1") == 6
+
+    assert ledger.version(conn, stage.LEDGER_SOURCE, stage.LEDGER_ENDPOINT, "2024-25") != first
+    assert stage.games_to_derive(conn, "2024-25") == []
@@ -0,0 +1,121 @@
+import sqlite3
+import threading
+
+import pytest
+
+from src.nba_stats.services.database_writer import DatabaseWriter
+from src.nba_stats.services.write_behind import WriteBehindError, WriteBehindWriter
+
+COLUMNS = ["player_id", "season", "points"]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "write_behind.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE Players (player_id INTEGER PRIMARY KEY);
+        CREATE TABLE Stats (
+            player_id INTEGER NOT NULL REFERENCES Players(player_id),
+            season TEXT NOT NULL,
+            points INTEGER,
+            PRIMARY KEY (player_id, season)
+        );
+    """)
+    conn.executemany("INSERT INTO Players VALUES (?)", [(p,) for p in range(1, 11)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def gated_writer(db_path, mocker):
+    """A DatabaseWriter whose writes wait for the returned event, so batches pile up in the queue."""
+    writer = DatabaseWriter(db_path)
+    gate = threading.Event()
+    write_bulk = writer.write_bulk
+
+    def gated(*args, **kwargs):
+        gate.wait(5)
+        return write_bulk(*args, **kwargs)
+
+    spy = mocker.patch.object(writer, "write_bulk", side_effect=gated)
+    return writer, gate, spy
+
+
+def _stats(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT player_id, points FROM Stats ORDER BY player_id").fetchall()
+    conn.close()
+    return rows
+
+
+def test_waiting_batches_are_coalesced_into_one_transaction(db_path, gated_writer):
+    writer, gate, write_bulk = gated_writer
+    with WriteBehindWriter(writer=writer) as behind:
+        futures = [behind.submit("Stats", [(1, "2023-24", 10)], columns=COLUMNS)]
+        while not write_bulk.called:
+            pass
+        futures += [behind.submit("Stats", [(p, "2023-24", p * 10)], columns=COLUMNS) for p in range(2, 11)]
+        futures.append(behind.submit("Stats", [(1, "2023-24", 11)], columns=COLUMNS))
+        gate.set()
+        behind.flush()
+        metrics = behind.metrics()["Stats"]
+
+    assert write_bulk.call_count == 2
+    assert [future.result() for future in futures] == [1] * 11
+    assert _stats(db_path)[0] == (1, 11) and len(_stats(db_path)) == 10
+    assert metrics["batches"] == 11 and metrics["transactions"] == 2 and metrics["rows_written"] == 11
+    assert metrics["queue_depth"] == 0 and metrics["latency_max_s"] >= metrics["latency_avg_s"] > 0
+
+
+def test_submit_blocks_while_the_queue_is_full(db_path, gated_writer):
+    writer, gate, write_bulk = gated_writer
+    behind = WriteBehindWriter(writer=writer, max_pending_batches=1)
+    behind.submit("Stats", [(1, "2023-24", 10)], columns=COLUMNS)
+    while not write_bulk.called:
+        pass
+    behind.submit("Stats", [(2, "2023-24", 20)], columns=COLUMNS)  # fills the queue
+
+    blocked = threading.Thread(target=behind.submit, args=("Stats", [(3, "2023-24", 30)]),
+                               kwargs={"columns": COLUMNS})
+    blocked.start()
+    blocked.join(0.2)
+    assert blocked.is_alive()
+
+    gate.set()
+    blocked.join(5)
+    behind.close()
+    assert _stats(db_path) == [(1, 10), (2, 20), (3, 30)]
+    assert behind.metrics()["Stats"]["blocked_s"] > 0
+
+
+def test_failed_batch_is_reported_to_the_submitter(db_path, gated_writer):
+    writer, gate, write_bulk = gated_writer
+    behind = WriteBehindWriter(writer=writer)
+    good = behind.submit("Stats", [(1, "2023-24", 10)], columns=COLUMNS)
+    bad = behind.submit("Stats", [(99, "2023-24", 10)], columns=COLUMNS)  # no such player
+    also_good = behind.submit("Stats", [(2, "2023-24", 20)], columns=COLUMNS)
+    gate.set()
+
+    with pytest.raises(WriteBehindError, match="FOREIGN KEY"):
+        behind.flush()
+    assert good.result() == 1 and also_good.result() == 1
+    with pytest.raises(WriteBehindError):
+        bad.result()
+    assert _stats(db_path) == [(1, 10), (2, 20)]
+
+    behind.close()  # the error was already reported
+    assert behind.metrics()["Stats"]["failed_batches"] == 1
+    with pytest.raises(RuntimeError):
+        behind.submit("Stats", [(3, "2023-24", 30)], columns=COLUMNS)
+
+
+def test_close_flushes_and_raises(db_path):
+    behind = WriteBehindWriter(db_path)
+    behind.submit("Stats", [(5, "2023-24", 50)], columns=COLUMNS)
+    behind.submit("Stats", [(98, "2023-24", 50)], columns=COLUMNS)
+
+    with pytest.raises(WriteBehindError):
+        behind.close()
+    assert _stats(db_path) == [(5, 50)]
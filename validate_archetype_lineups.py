@@ -41,21 +41,21 @@ def create_archetype_lineups(conn, player_archetypes):
     query = """
     SELECT 
         game_id,
-        event_num,
-        home_player_1_id, home_player_2_id, home_player_3_id, home_player_4_id, home_player_5_id,
-        away_player_1_id, away_player_2_id, away_player_3_id, away_player_4_id, away_player_5_id,
+        possession_num,
+        off_player_1_id, off_player_2_id, off_player_3_id, off_player_4_id, off_player_5_id,
+        def_player_1_id, def_player_2_id, def_player_3_id, def_player_4_id, def_player_5_id,
         offensive_team_id
-    FROM Possessions
-    WHERE home_player_1_id IS NOT NULL 
-    AND home_player_2_id IS NOT NULL 
-    AND home_player_3_id IS NOT NULL 
-    AND home_player_4_id IS NOT NULL 
-    AND home_player_5_id IS NOT NULL
-    AND away_player_1_id IS NOT NULL 
-    AND away_player_2_id IS NOT NULL 
-    AND away_player_3_id IS NOT NULL 
-    AND away_player_4_id IS NOT NULL 
-    AND away_player_5_id IS NOT NULL
+    FROM TruePossessions
+    WHERE off_player_1_id IS NOT NULL 
+    AND off_player_2_id IS NOT NULL 
+    AND off_player_3_id IS NOT NULL 
+    AND off_player_4_id IS NOT NULL 
+    AND off_player_5_id IS NOT NULL
+    AND def_player_1_id IS NOT NULL 
+    AND def_player_2_id IS NOT NULL 
+    AND def_player_3_id IS NOT NULL 
+    AND def_player_4_id IS NOT NULL 
+    AND def_player_5_id IS NOT NULL
     """
     
     possessions = pd.read_sql_query(query, conn)
@@ -65,39 +65,39 @@ def create_archetype_lineups(conn, player_archetypes):
     archetype_lineups = []
     
     for _, row in possessions.iterrows():
-        # Home lineup
-        home_players = [
-            row['home_player_1_id'], row['home_player_2_id'], row['home_player_3_id'],
-            row['home_player_4_id'], row['home_player_5_id']
+        # Offensive lineup
+        offensive_players = [
+            row['off_player_1_id'], row['off_player_2_id'], row['off_player_3_id'],
+            row['off_player_4_id'], row['off_player_5_id']
         ]
         
-        # Away lineup  
-        away_players = [
-            row['away_player_1_id'], row['away_player_2_id'], row['away_player_3_id'],
-            row['away_player_4_id'], row['away_player_5_id']
+        # Defensive lineup  
+        defensive_players = [
+            row['def_player_1_id'], row['def_player_2_id'], row['def_player_3_id'],
+            row['def_player_4_id'], row['def_player_5_id']
         ]
         
         # Convert to archetype lineups
-        home_archetypes = []
-        away_archetypes = []
+        offensive_archetypes = []
+        defensive_archetypes = []
         
-        for player_id in home_players:
+        for player_id in offensive_players:
             archetype_id = player_to_archetype.get(player_id, -1)  # -1 for unknown players
-            home_archetypes.append(archetype_id)
+            offensive_archetypes.append(archetype_id)
             
-        for player_id in away_players:
+        for player_id in defensive_players:
             archetype_id = player_to_archetype.get(player_id, -1)  # -1 for unknown players
-            away_archetypes.append(archetype_id)
+            defensive_archetypes.append(archetype_id)
         
         # Create archetype lineup strings
-        home_archetype_lineup = "_".join(map(str, sorted(home_archetypes)))
-        away_archetype_lineup = "_".join(map(str, sorted(away_archetypes)))
+        offensive_archetype_lineup = "_".join(map(str, sorted(offensive_archetypes)))
+        defensive_archetype_lineup = "_".join(map(str, sorted(defensive_archetypes)))
         
         archetype_lineups.append({
             'game_id': row['game_id'],
-            'event_num': row['event_num'],
-            'home_archetype_lineup': home_archetype_lineup,
-            'away_archetype_lineup': away_archetype_lineup,
+            'possession_num': row['possession_num'],
+            'offensive_archetype_lineup': offensive_archetype_lineup,
+            'defensive_archetype_lineup': defensive_archetype_lineup,
             'offensive_team_id': row['offensive_team_id']
         })
     
@@ -114,25 +114,25 @@ def validate_archetype_lineups(archetype_lineups, player_archetypes):
     archetype_names = dict(zip(player_archetypes['archetype_id'], player_archetypes['archetype_name']))
     archetype_names[-1] = "Unknown"
     
-    # Analyze home lineups
-    home_lineups = archetype_lineups['home_archetype_lineup'].value_counts()
-    away_lineups = archetype_lineups['away_archetype_lineup'].value_counts()
+    # Analyze offensive and defensive lineups
+    offensive_lineups = archetype_lineups['offensive_archetype_lineup'].value_counts()
+    defensive_lineups = archetype_lineups['defensive_archetype_lineup'].value_counts()
     
-    print(f"\nTotal unique home archetype lineups: {len(home_lineups)}")
-    print(f"Total unique away archetype lineups: {len(away_lineups)}")
+    print(f"\nTotal unique offensive archetype lineups: {len(offensive_lineups)}")
+    print(f"Total unique defensive archetype lineups: {len(defensive_lineups)}")
     
     # Check for unknown players
-    unknown_home = archetype_lineups['home_archetype_lineup'].str.contains('-1').sum()
-    unknown_away = archetype_lineups['away_archetype_lineup'].str.contains('-1').sum()
+    unknown_offensive = archetype_lineups['offensive_archetype_lineup'].str.contains('-1').sum()
+    unknown_defensive = archetype_lineups['defensive_archetype_lineup'].str.contains('-1').sum()
     total_possessions = len(archetype_lineups)
     
     print(f"\nPossessions with unknown players:")
-    print(f"  Home lineups: {unknown_home} ({unknown_home/total_possessions*100:.1f}%)")
-    print(f"  Away lineups: {unknown_away} ({unknown_away/total_possessions*100:.1f}%)")
-    print(f"  Total: {unknown_home + unknown_away} ({(unknown_home + unknown_away)/total_possessions*100:.1f}%)")
+    print(f"  Offensive lineups: {unknown_offensive} ({unknown_offensive/total_possessions*100:.1f}%)")
+    print(f"  Defensive lineups: {unknown_defensive} ({unknown_defensive/total_possessions*100:.1f}%)")
+    print(f"  Total: {unknown_offensive + unknown_defensive} ({(unknown_offensive + unknown_defensive)/total_possessions*100:.1f}%)")
     
     # Validation gate: require at least 80% of possessions to have valid archetype assignments
-    valid_possessions = total_possessions - unknown_home - unknown_away
+    valid_possessions = total_possessions - unknown_offensive - unknown_defensive
     valid_percentage = valid_possessions / total_possessions * 100
     
     print(f"\nVALIDATION GATE: {valid_percentage:.1f}% of possessions have valid archetype assignments")
@@ -145,8 +145,8 @@ def validate_archetype_lineups(archetype_lineups, player_archetypes):
         print("✅ PASSED: Sufficient valid archetype assignments for clustering")
     
     # Show examples of valid archetype lineups
-    print(f"\nTop 10 most common home archetype lineups:")
-    for i, (lineup, count) in enumerate(home_lineups.head(10).items()):
+    print(f"\nTop 10 most common offensive archetype lineups:")
+    for i, (lineup, count) in enumerate(offensive_lineups.head(10).items()):
         archetype_list = [archetype_names[int(x)] for x in lineup.split('_')]
         print(f"  {i+1:2d}. {lineup:15s} ({count:5d} times) - {archetype_list}")
     
@@ -161,8 +161,8 @@ def assess_data_density(archetype_lineups):
     
     # Get all unique archetype lineups
     all_lineups = pd.concat([
-        archetype_lineups['home_archetype_lineup'],
-        archetype_lineups['away_archetype_lineup']
+        archetype_lineups['offensive_archetype_lineup'],
+        archetype_lineups['defensive_archetype_lineup']
     ]).value_counts()
     
     print(f"Total unique archetype lineups: {len(all_lineups)}")